@@ -1,9 +1,9 @@
 import time
-from starknet_py.net.full_node_client import FullNodeClient
 from starknet_py.hash.selector import get_selector_from_name
 from decimal import Decimal
 from dotenv import load_dotenv
 from shared.constants import TOKEN_SETTINGS
+from shared.rpc_gateway import Priority, get_full_node_client
 import os
 import logging
 import asyncio
@@ -12,7 +12,10 @@ from dashboard_app.app.schemas.user_transaction import UserTransaction
 load_dotenv()
 NODE_URL = os.getenv("NODE_URL")
 
-client = FullNodeClient(node_url=NODE_URL)
+# Served before the backfill requests of the same process, see `shared.rpc_gateway`
+client = get_full_node_client(
+    node_urls=[NODE_URL] if NODE_URL else None, priority=Priority.DASHBOARD
+)
 TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 
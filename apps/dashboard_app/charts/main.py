@@ -24,6 +24,7 @@ from dashboard_app.helpers.settings import (
     TOKEN_SETTINGS,
 )
 
+from dashboard_app.helpers.materialization import MaterializedData
 
 from dashboard_app.charts.constants import ChartsHeaders, CommonValues
 from dashboard_app.charts.main_chart_figure import (
@@ -34,6 +35,7 @@ from dashboard_app.charts.main_chart_figure import (
     get_total_amount_by_field,
 )
 from dashboard_app.charts.utils import (
+    get_materialized_protocol_data_mappings,
     get_protocol_data_mappings,
     infer_protocol_name,
     process_liquidity,
@@ -70,6 +72,7 @@ class Dashboard:
         collateral_stats: dict | None = None,
         debt_stats: dict | None = None,
         utilization_stats: dict | None = None,
+        materialized_data: MaterializedData | None = None,
     ):
         """
         Initialize the dashboard.
@@ -95,6 +98,7 @@ class Dashboard:
         self.collateral_stats = pd.DataFrame(collateral_stats)
         self.debt_stats = pd.DataFrame(debt_stats)
         self.utilization_stats = pd.DataFrame(utilization_stats)
+        self.materialized_data = materialized_data
 
     def load_sidebar(self):
         """
@@ -541,8 +545,15 @@ class Dashboard:
     def _get_protocol_data_mappings(self) -> tuple:
         """
         Return a tuple of protocol_main_chart_data_mapping and protocol_loans_data_mapping.
+        The materialized data is used when available, otherwise the data is computed.
         :return: tuple
         """
+        if self.materialized_data is not None:
+            return get_materialized_protocol_data_mappings(
+                current_pair=self.current_pair,
+                protocols=self.PROTOCOL_NAMES,
+                materialized_data=self.materialized_data,
+            )
         return get_protocol_data_mappings(
             current_pair=self.current_pair,
             stable_coin_pair=self.stable_coin_pair,
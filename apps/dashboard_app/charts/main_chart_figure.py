@@ -11,7 +11,7 @@ import plotly.express
 import plotly.graph_objs
 from shared.amms import SwapAmm
 from shared.custom_types import Prices
-from shared.state import State
+from shared.state import LoanMatrix, State
 
 from dashboard_app.charts.constants import CommonValues
 from dashboard_app.helpers.settings import TOKEN_SETTINGS
@@ -33,6 +33,7 @@ def get_main_chart_data(
     swap_amms: SwapAmm,
     collateral_token_underlying_symbol: str,
     debt_token_underlying_symbol: str,
+    loan_matrix: LoanMatrix | None = None,
 ) -> pd.DataFrame:
     """
     Generates financial chart data based on token prices, liquidity, and debt information.
@@ -62,13 +63,12 @@ def get_main_chart_data(
     if not debt_token_underlying_address:
         return pd.DataFrame()
 
-    data["liquidable_debt"] = data["collateral_token_price"].apply(
-        lambda x: state.compute_liquidable_debt_at_price(
-            prices=prices,
-            collateral_token_underlying_address=collateral_token_underlying_address,
-            collateral_token_price=x,
-            debt_token_underlying_address=debt_token_underlying_address,
-        )
+    data["liquidable_debt"] = state.compute_liquidable_debt_curve(
+        prices=prices,
+        collateral_token_underlying_address=collateral_token_underlying_address,
+        collateral_token_prices=data["collateral_token_price"],
+        debt_token_underlying_address=debt_token_underlying_address,
+        loan_matrix=loan_matrix,
     )
 
     data["liquidable_debt_at_interval"] = data["liquidable_debt"].diff().abs()
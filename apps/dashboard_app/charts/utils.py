@@ -3,7 +3,6 @@ This moudel process and transform liquidity, loan, and chart data for protocols.
 """
 
 import os
-import asyncio
 from decimal import Decimal
 import difflib
 import json
@@ -15,12 +14,24 @@ from collections import defaultdict
 import pandas as pd
 from shared.redis_client import redis_client
 import streamlit as st
-from shared.state import State
+from shared.state import LoanMatrix, State
 from shared.amms import SwapAmm, SwapAmmToken
 from shared.constants import PAIRS
+from shared.exceptions.db import DatabaseConnectionError
+from shared.rpc_gateway import run_with_rpc_sessions
 
+from dashboard_app.data_conector import DataConnector
 from dashboard_app.helpers.ekubo import EkuboLiquidity
-from dashboard_app.helpers.loans_table import get_loans_table_data
+from dashboard_app.helpers.liquidity_curve import (
+    get_liquidity_curves,
+    get_pair_liquidity_curves,
+)
+from dashboard_app.helpers.loans_table import get_loans_table_data, get_protocol
+from dashboard_app.helpers.materialization import (
+    MaterializedData,
+    read_latest_block,
+    read_materialized_data,
+)
 from dashboard_app.helpers.settings import (
     COLLATERAL_TOKENS,
     DEBT_TOKENS,
@@ -60,6 +71,9 @@ def process_liquidity(
 
     # Process main chart data
     main_chart_data = main_chart_data.astype(float)
+    if "Ekubo_debt_token_supply" in main_chart_data.columns:
+        # The liquidity of Ekubo is already included from the stored order books
+        return main_chart_data, collateral_token_price
     debt_token_underlying_address = UNDERLYING_SYMBOLS_TO_UNDERLYING_ADDRESSES[
         debt_token
     ]
@@ -144,13 +158,11 @@ def create_stablecoin_bundle(data: dict[str, pd.DataFrame]) -> dict[str, pd.Data
                 for col in [
                     "liquidable_debt",
                     "liquidable_debt_at_interval",
-                    "10kSwap_debt_token_supply",
-                    "MySwap_debt_token_supply",
-                    "SithSwap_debt_token_supply",
-                    "JediSwap_debt_token_supply",
-                    "debt_token_supply",
+                    *(col for col in df.columns if col.endswith("debt_token_supply")),
                 ]:
-                    combined_df[col] += combined_df[f"{col}_y"]
+                    # The liquidity of a DEX may be stored for some of the pairs only
+                    if f"{col}_y" in combined_df.columns:
+                        combined_df[col] += combined_df[f"{col}_y"]
 
                 # Drop the '_y' columns after summing the relevant values
                 combined_df.drop(
@@ -423,8 +435,19 @@ def get_data(state: State) -> tuple[dict[str, pd.DataFrame], pd.DataFrame]:
         redis_client.get("pool_balances")
     )
    
-    asyncio.run(swap_amm.get_balance_from_cache(pool_cache))
+    run_with_rpc_sessions(swap_amm.get_balance_from_cache(pool_cache))
     logging.info(f"swap in {time.time() - t_swap}s")
+    # The stored order books of all pairs are loaded at once, pairs without them fall back
+    # to the AMM pools.
+    try:
+        liquidity_curves = get_liquidity_curves(
+            DataConnector().fetch_latest_order_books()
+        )
+    except (EnvironmentError, DatabaseConnectionError) as e:
+        logger.warning(f"Order books are not available: {e}")
+        liquidity_curves = {}
+    # Pack the loan entities once, the liquidable debt curves of all pairs are computed from it.
+    loan_matrix = LoanMatrix.from_loan_entities(state.loan_entities)
     for pair in PAIRS:
         collateral_token_underlying_symbol, debt_token_underlying_symbol = pair.split(
             "-"
@@ -436,6 +459,16 @@ def get_data(state: State) -> tuple[dict[str, pd.DataFrame], pd.DataFrame]:
                 swap_amms=swap_amm,
                 collateral_token_underlying_symbol=collateral_token_underlying_symbol,
                 debt_token_underlying_symbol=debt_token_underlying_symbol,
+                loan_matrix=loan_matrix,
+                liquidity_curves=get_pair_liquidity_curves(
+                    liquidity_curves,
+                    UNDERLYING_SYMBOLS_TO_UNDERLYING_ADDRESSES[
+                        collateral_token_underlying_symbol
+                    ],
+                    UNDERLYING_SYMBOLS_TO_UNDERLYING_ADDRESSES[
+                        debt_token_underlying_symbol
+                    ],
+                ),
             )
         except Exception:
             main_chart_data[pair] = pd.DataFrame()
@@ -444,6 +477,27 @@ def get_data(state: State) -> tuple[dict[str, pd.DataFrame], pd.DataFrame]:
     return main_chart_data, loans_data
 
 
+def compute_materialized_data(
+    block: int, states: list[State], stats: dict[str, pd.DataFrame]
+) -> MaterializedData:
+    """
+    Compute the dashboard data of all protocols once, to be materialized for the dashboard.
+    :param block: The last block of the loan states.
+    :param states: The states of the protocols.
+    :param stats: The protocol stats by name.
+    :return: MaterializedData
+    """
+    materialized_data = MaterializedData(block=block, stats=stats)
+    for state in states:
+        protocol_name = get_protocol(state=state)
+        main_chart_data, loans_data = get_data(state=state)
+        materialized_data.main_chart_data[protocol_name] = create_stablecoin_bundle(
+            main_chart_data
+        )
+        materialized_data.loans_data[protocol_name] = loans_data
+    return materialized_data
+
+
 def get_protocol_data_mappings(
     current_pair: str, stable_coin_pair: str, protocols: list[str], state: State
 ) -> tuple[dict[str, pd.DataFrame], dict[str, dict]]:
@@ -474,6 +528,48 @@ def get_protocol_data_mappings(
     return protocol_main_chart_data, protocol_loans_data
 
 
+@st.cache_data(max_entries=2, show_spinner=False)
+def _read_materialized_data(block: int) -> MaterializedData:
+    return read_materialized_data(block)
+
+
+def load_materialized_data() -> MaterializedData | None:
+    """
+    Load the latest materialized dashboard data. The data of a block is read once and
+    shared by all sessions, so a page load only reads the latest block pointer.
+    :return: MaterializedData or None if no data is materialized yet.
+    """
+    block = read_latest_block()
+    if block is None:
+        return None
+    return _read_materialized_data(block)
+
+
+def get_materialized_protocol_data_mappings(
+    current_pair: str, protocols: list[str], materialized_data: MaterializedData
+) -> tuple[dict[str, pd.DataFrame | None], dict[str, pd.DataFrame]]:
+    """
+    Get protocol data mappings for main chart data and loans data from the materialized
+    data. The stablecoin bundles are materialized as pairs of their own.
+
+    :param current_pair: The current pair for which data is to be fetched.
+    :param protocols: List of protocols for which data is to be fetched.
+    :param materialized_data: The materialized data, see `load_materialized_data`.
+    :return: tuple of dictionaries containing:
+        - protocol_main_chart_data: Mapping of protocol names to their main chart data.
+        - protocol_loans_data: Mapping of protocol names to their loans data.
+    """
+    protocol_main_chart_data = {
+        protocol_name: materialized_data.get_main_chart_data(protocol_name, current_pair)
+        for protocol_name in protocols
+    }
+    protocol_loans_data = {
+        protocol_name: materialized_data.get_loans_data(protocol_name)
+        for protocol_name in protocols
+    }
+    return protocol_main_chart_data, protocol_loans_data
+
+
 def transform_loans_data(
     protocol_loans_data_mapping: dict[str, dict], protocols: list[str]
 ) -> pd.DataFrame:
@@ -3,12 +3,16 @@ This script loads data and runs the dashboard.
 """
 
 import logging
-import asyncio
-from dashboard_app.charts.utils import  streamlit_dev_fill_with_test_data
+from dashboard_app.charts.utils import (
+    load_materialized_data,
+    streamlit_dev_fill_with_test_data,
+)
 from charts.main import Dashboard
 from helpers.load_data import DashboardDataHandler
+from dashboard_app.helpers.materialization import STATS_NAMES
 from streamlit_autorefresh import st_autorefresh
 from shared.constants import CRONTAB_TIME
+from shared.rpc_gateway import run_with_rpc_sessions
 logger = logging.getLogger(__name__)
 ONE_MINUTE_IN_MILISECONDS = 60000
 REFRESH_TIME = ONE_MINUTE_IN_MILISECONDS * int(CRONTAB_TIME)
@@ -22,14 +26,27 @@ if __name__ == "__main__":
     # Set up autorefresh data config
     st_autorefresh(interval=REFRESH_TIME, key="datarefresh")
 
-    dashboard_data_handler =  asyncio.run(DashboardDataHandler.create())
-    (
-        dashboard.state,
-        dashboard.general_stats,
-        dashboard.supply_stats,
-        dashboard.collateral_stats,
-        dashboard.debt_stats,
-        dashboard.utilization_stats,
-    ) = dashboard_data_handler.load_data()
+    # The data materialized by `materialize.py` after each loan state run is only read,
+    # the data is computed on request until the first block is materialized.
+    materialized_data = load_materialized_data()
+    if materialized_data is not None:
+        dashboard.materialized_data = materialized_data
+        (
+            dashboard.general_stats,
+            dashboard.supply_stats,
+            dashboard.collateral_stats,
+            dashboard.debt_stats,
+            dashboard.utilization_stats,
+        ) = (materialized_data.get_stats(name) for name in STATS_NAMES)
+    else:
+        dashboard_data_handler = run_with_rpc_sessions(DashboardDataHandler.create())
+        (
+            dashboard.state,
+            dashboard.general_stats,
+            dashboard.supply_stats,
+            dashboard.collateral_stats,
+            dashboard.debt_stats,
+            dashboard.utilization_stats,
+        ) = dashboard_data_handler.load_data()
 
     dashboard.run()
\ No newline at end of file
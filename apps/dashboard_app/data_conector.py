@@ -4,11 +4,13 @@ This is module connects to a PostgreSQL database and fetches data.
 
 import logging
 import os
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 import pandas as pd
 import sqlalchemy
 from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from shared.exceptions.db import DatabaseConnectionError
 
 load_dotenv()
@@ -38,6 +40,26 @@ class DataConnector:
         WHERE
             ls.protocol_id = 'zkLend';
     """
+    # The loan states of a protocol in block order, so that the later states of a user
+    # overwrite the earlier ones when they are streamed into the state.
+    ZKLEND_LOAN_STATES_SQL_QUERY = """
+        SELECT
+            ls.block,
+            ls.user,
+            ls.collateral,
+            ls.debt,
+            zcd.collateral_enabled
+        FROM
+            loan_state AS ls
+        JOIN
+            zklend_collateral_debt AS zcd
+        ON
+            ls.user = zcd.user_id
+        WHERE
+            ls.protocol_id = 'zkLend'
+        ORDER BY
+            ls.block;
+    """
     ZKLEND_INTEREST_RATE_SQL_QUERY = """
         WITH max_block AS (
             SELECT MAX(block) AS max_block
@@ -49,8 +71,10 @@ class DataConnector:
         WHERE protocol_id = 'zkLend' AND block = (SELECT max_block FROM max_block);
     """
 
+    # The latest row of every position, served by the unique
+    # (user, pool_id, collateral_asset, debt_asset) key.
     VESU_POSITIONS_SQL_QUERY = """
-        SELECT
+        SELECT DISTINCT ON (vp.user, vp.pool_id, vp.collateral_asset, vp.debt_asset)
             vp.user,
             vp.pool_id,
             vp.collateral_asset,
@@ -58,30 +82,41 @@ class DataConnector:
             vp.block_number
         FROM
             vesu_positions AS vp
-        WHERE
-            vp.block_number = (
-                SELECT MAX(block_number)
-                FROM vesu_positions
-                WHERE user = vp.user
-                AND pool_id = vp.pool_id
-            );
+        ORDER BY
+            vp.user, vp.pool_id, vp.collateral_asset, vp.debt_asset,
+            vp.block_number DESC;
     """
 
+    # The latest health factor of every user and pool, served by the
+    # (user_id, protocol_id, timestamp DESC) index.
     VESU_HEALTH_FACTORS_SQL_QUERY = """
-        SELECT
+        SELECT DISTINCT ON (hrl.user_id, hrl.protocol_id)
             hrl.user_id as user,
             hrl.protocol_id as pool_id,
             hrl.value as health_factor,
             hrl.timestamp
         FROM
             health_ratio_level AS hrl
-        WHERE
-            hrl.timestamp = (
-                SELECT MAX(timestamp)
-                FROM health_ratio_level
-                WHERE user_id = hrl.user_id
-                AND protocol_id = hrl.protocol_id
-            );
+        ORDER BY
+            hrl.user_id, hrl.protocol_id, hrl.timestamp DESC;
+    """
+
+    # The latest order book of every pair on every DEX, served by the
+    # (dex, token_a, token_b, timestamp) index. The bids are only loaded for order books
+    # stored without depth.
+    LATEST_ORDER_BOOKS_SQL_QUERY = """
+        SELECT DISTINCT ON (ob.dex, ob.token_a, ob.token_b)
+            ob.dex,
+            ob.token_a,
+            ob.token_b,
+            ob.timestamp,
+            ob.current_price,
+            ob.depth,
+            CASE WHEN ob.depth IS NULL THEN ob.bids END AS bids
+        FROM
+            orderbook AS ob
+        ORDER BY
+            ob.dex, ob.token_a, ob.token_b, ob.timestamp DESC;
     """
 
     def __init__(self):
@@ -272,12 +307,63 @@ class DataConnector:
                 f"Failed to fetch Vesu health factors: {str(e)}"
             )
 
+    def fetch_latest_order_books(self) -> pd.DataFrame:
+        """
+        Fetch the latest order book of every pair on every DEX using the predefined query.
+
+        :return: DataFrame containing the order books
+        """
+        try:
+            with self.engine.connect() as connection:
+                return pd.read_sql(self.LATEST_ORDER_BOOKS_SQL_QUERY, connection)
+        except sqlalchemy.exc.SQLAlchemyError as e:
+            logger.error(f"Database error: {e}")
+            raise DatabaseConnectionError(f"Failed to fetch order books: {str(e)}")
+
 
 class DataConnectorAsync(DataConnector):
     """
     Handles database connection and fetches data asynchronously.
     """
 
+    STREAM_CHUNK_SIZE = 10000
+
+    def __init__(self):
+        """
+        Initialize the DataConnectorAsync with a synchronous and an asyncpg engine.
+        """
+        super().__init__()
+        # The connections are not pooled, as the connector may be used by several event
+        # loops, e.g. one `asyncio.run` per load.
+        self.async_engine = create_async_engine(
+            self.db_url.replace("postgresql://", "postgresql+asyncpg://"),
+            poolclass=NullPool,
+        )
+
+    async def stream_data(
+        self,
+        query: str,
+        params: Optional[dict] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Stream the results of a SQL query in one pass through a server-side cursor.
+
+        :param query: SQL query to execute.
+        :param params: Parameters of the query (optional).
+        :param chunk_size: Number of rows in each yielded chunk.
+        :return: Async iterator of DataFrames with the rows in the order of the query.
+        """
+        try:
+            async with self.async_engine.connect() as connection:
+                result = await connection.stream(sqlalchemy.text(query), params or {})
+                columns = list(result.keys())
+                async for rows in result.partitions(chunk_size):
+                    yield pd.DataFrame(rows, columns=columns)
+        except sqlalchemy.exc.SQLAlchemyError as e:
+            logger.error(f"Database error: {e}")
+            raise DatabaseConnectionError(f"Failed to stream query: {str(e)}")
+
     async def fetch_data(
         self,
         query: str,
@@ -0,0 +1,149 @@
+"""
+A module that merges the order books stored by the data handler into liquidity curves.
+
+The bids of the latest order books of a pair on all DEXes are merged into one cumulative
+depth curve, so that the liquidity available at every price of the main chart is evaluated
+in one vectorized call instead of per price.
+
+Example usage:
+curves = get_liquidity_curves(DataConnector().fetch_latest_order_books())
+pair_curves = get_pair_liquidity_curves(curves, collateral_address, debt_address)
+supply = LiquidityCurve.merge(pair_curves.values()).get_available_liquidity(prices)
+"""
+
+import json
+from collections import defaultdict
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from shared.helpers import add_leading_zeros
+
+
+class LiquidityCurve:
+    """
+    Cumulative depth of the bids of one or more order books of a pair.
+    """
+
+    LOWER_BOUND_VALUE = 0.95
+
+    def __init__(self, prices: np.ndarray, quantities: np.ndarray) -> None:
+        """
+        :param prices: The prices of the bids, in any order.
+        :param quantities: The quantities of the bids.
+        """
+        order = np.argsort(prices, kind="stable")
+        self.prices = np.asarray(prices, dtype=np.float64)[order]
+        # The quantity of the bids priced below the i-th price is at index i
+        self.cumulative_quantities = np.concatenate(
+            [[0.0], np.cumsum(np.asarray(quantities, dtype=np.float64)[order])]
+        )
+
+    @classmethod
+    def from_levels(cls, levels: Iterable[Iterable[float]]) -> "LiquidityCurve":
+        """
+        Build the curve from the (price, quantity) bids of an order book.
+        :param levels: The (price, quantity) bids.
+        :return: LiquidityCurve
+        """
+        levels = np.asarray(list(levels), dtype=np.float64).reshape(-1, 2)
+        return cls(levels[:, 0], levels[:, 1])
+
+    @classmethod
+    def from_depth(cls, depth: dict) -> "LiquidityCurve":
+        """
+        Build the curve from the cumulative depth stored alongside an order book.
+        :param depth: The depth, with the bids sorted by descending price.
+        :return: LiquidityCurve
+        """
+        bids = depth["bids"]
+        cumulative_quantities = np.asarray(bids["quantities"], dtype=np.float64)
+        return cls(
+            np.asarray(bids["prices"], dtype=np.float64),
+            np.diff(cumulative_quantities, prepend=0.0),
+        )
+
+    @classmethod
+    def merge(cls, curves: Iterable["LiquidityCurve"]) -> "LiquidityCurve":
+        """
+        Merge curves, e.g. of the order books of a pair on several DEXes.
+        :param curves: The curves to merge.
+        :return: LiquidityCurve
+        """
+        curves = list(curves)
+        if not curves:
+            return cls(np.empty(0), np.empty(0))
+        return cls(
+            np.concatenate([curve.prices for curve in curves]),
+            np.concatenate([np.diff(curve.cumulative_quantities) for curve in curves]),
+        )
+
+    def get_available_liquidity(
+        self, prices: np.ndarray, price_diff: float | None = None
+    ) -> np.ndarray:
+        """
+        Get the quantity of the bids priced between `max(0.95 * price, price - price_diff)`
+        and the price, inclusive, for every price.
+        :param prices: The prices to evaluate the curve at.
+        :param price_diff: The maximal distance of the bids below the price, e.g. the step
+        of the prices.
+        :return: np.ndarray - The available liquidity at every price.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        lower_bounds = self.LOWER_BOUND_VALUE * prices
+        if price_diff is not None:
+            lower_bounds = np.maximum(lower_bounds, prices - price_diff)
+        upper_indexes = np.searchsorted(self.prices, prices, side="right")
+        lower_indexes = np.searchsorted(self.prices, lower_bounds, side="left")
+        return (
+            self.cumulative_quantities[upper_indexes]
+            - self.cumulative_quantities[lower_indexes]
+        ).clip(min=0.0)
+
+
+def get_liquidity_curves(
+    order_books: pd.DataFrame,
+) -> dict[tuple[str, str], dict[str, LiquidityCurve]]:
+    """
+    Build the liquidity curves of the latest order books.
+    :param order_books: The order books with the columns dex, token_a, token_b, depth and
+    bids. The bids are only used for order books stored without depth.
+    :return: dict - The curves by DEX, by (token_a, token_b) with leading zeros.
+    """
+    curves = defaultdict(dict)
+    for order_book in order_books.itertuples(index=False):
+        depth = order_book.depth
+        if isinstance(depth, str):
+            depth = json.loads(depth)
+        if isinstance(depth, dict):
+            curve = LiquidityCurve.from_depth(depth)
+        else:
+            bids = order_book.bids
+            if isinstance(bids, str):
+                bids = json.loads(bids)
+            curve = LiquidityCurve.from_levels(bids if isinstance(bids, list) else [])
+        pair = (
+            add_leading_zeros(order_book.token_a),
+            add_leading_zeros(order_book.token_b),
+        )
+        curves[pair][order_book.dex] = curve
+    return dict(curves)
+
+
+def get_pair_liquidity_curves(
+    curves: dict[tuple[str, str], dict[str, LiquidityCurve]],
+    collateral_token_underlying_address: str,
+    debt_token_underlying_address: str,
+) -> dict[str, LiquidityCurve]:
+    """
+    Get the liquidity curves of a pair, selling the collateral token for the debt token.
+    :param curves: The curves as returned by `get_liquidity_curves`.
+    :param collateral_token_underlying_address: The collateral token address.
+    :param debt_token_underlying_address: The debt token address.
+    :return: dict - The curves by DEX, empty if no order books of the pair are stored.
+    """
+    pair = (
+        add_leading_zeros(collateral_token_underlying_address),
+        add_leading_zeros(debt_token_underlying_address),
+    )
+    return curves.get(pair, {})
@@ -8,8 +8,9 @@ import math
 from collections import defaultdict
 from time import monotonic
 
-from shared.state import ZkLendState
+from shared.state import State, ZkLendState
 from shared.constants import TOKEN_SETTINGS
+from shared.rpc_gateway import run_with_rpc_sessions
 
 from dashboard_app.data_conector import DataConnectorAsync
 from dashboard_app.helpers.loans_table import get_loans_table_data, get_protocol
@@ -46,8 +47,11 @@ class DashboardDataHandler:
         Factory method to create and initialize an instance with async operations.
         """
         instance = cls()
-        instance.zklend_state = await instance._init_zklend_state()
-        # TODO add also nostra states
+        # The states are streamed concurrently, each through its own connection.
+        (instance.zklend_state,) = await asyncio.gather(
+            instance._init_zklend_state(),
+            # TODO add also nostra states
+        )
         instance.states = [
             instance.zklend_state,
             # nostra_alpha_state,
@@ -63,56 +67,64 @@ class DashboardDataHandler:
         """
         logger.info("Initializing ZkLend state.")
         zklend_state = ZkLendState()
+        # Hold the portfolios of all users in shared array-backed columns
+        zklend_state.use_compact_storage()
         await self._fetch_and_process_zklend_data(zklend_state)
         await self._set_zklend_interest_rates(zklend_state)
         return zklend_state
 
-    async def _fetch_and_process_zklend_data(self, zklend_state):
-        PROTOCOL_ZKLEND = "zkLend"
-        BATCH_SIZE = 1000
+    async def _fetch_and_process_zklend_data(self, zklend_state: ZkLendState) -> None:
+        """
+        Stream the zkLend loan states into the state.
+        :param zklend_state: The state to fill.
+        """
+        zklend_state.last_block_number = await self._stream_loan_states(
+            zklend_state, self.data_connector.ZKLEND_LOAN_STATES_SQL_QUERY
+        )
+
+    async def _stream_loan_states(self, state: State, query: str) -> int:
+        """
+        Stream the loan states of a protocol in one pass and feed them into the loan
+        entities of the state as they arrive. The loan states are ordered by block, so the
+        latest state of every user is kept.
+        :param state: The state to fill.
+        :param query: The loan states query, see `DataConnectorAsync`.
+        :return: int - The last block of the loan states, 0 if there are none.
+        """
+        protocol = get_protocol(state=state)
         start = monotonic()
+        last_block = 0
+        number_of_loan_states = 0
 
         try:
-            first_block = await self.data_connector.fetch_protocol_first_block_number(
-                PROTOCOL_ZKLEND
-            )
-            last_block = await self.data_connector.fetch_protocol_last_block_number(
-                PROTOCOL_ZKLEND
-            )
-
-            current_block = first_block
-            while current_block <= last_block:
-                end_block = min(current_block + BATCH_SIZE - 1, last_block)
-                batch = await self.data_connector.fetch_data(
-                    self.data_connector.ZKLEND_SQL_QUERY,
-                    protocol=PROTOCOL_ZKLEND,
-                    batch_size=BATCH_SIZE,
-                    start_block=current_block,
-                    end_block=end_block,
-                )
-
-                if not batch.empty:
-                    zklend_data_dict = batch.to_dict(orient="records")
-                    for loan_state in zklend_data_dict:
-                        user_loan_state = zklend_state.loan_entities[loan_state["user"]]
+            async for batch in self.data_connector.stream_data(query):
+                has_collateral_enabled = "collateral_enabled" in batch.columns
+                for loan_state in batch.to_dict(orient="records"):
+                    user_loan_state = state.loan_entities[loan_state["user"]]
+                    if has_collateral_enabled:
                         user_loan_state.collateral_enabled.values = loan_state[
                             "collateral_enabled"
                         ]
-                        user_loan_state.collateral.values = loan_state["collateral"]
-                        user_loan_state.debt.values = loan_state["debt"]
-                    logger.info(
-                        f"Processed {len(batch)} records for blocks {current_block} to {end_block}"
-                    )
-                current_block = end_block + 1
-
-            logger.info(f"Processed total of {last_block - first_block + 1} blocks")
-
+                    user_loan_state.collateral.values = loan_state["collateral"]
+                    user_loan_state.debt.values = loan_state["debt"]
+                if not batch.empty:
+                    last_block = max(last_block, int(batch["block"].max()))
+                number_of_loan_states += len(batch)
+                logger.info(
+                    f"Processed {number_of_loan_states} {protocol} loan states "
+                    f"up to block {last_block}"
+                )
         except Exception as e:
-            logger.error(f"Error processing ZkLend data: {e}")
+            logger.error(f"Error processing {protocol} data: {e}")
             raise
 
-        zklend_state.last_block_number = last_block
-        logger.info("Initialized ZkLend state in %.2fs", monotonic() - start)
+        logger.info(
+            "Initialized %s state from %d loan states in %.2fs",
+            protocol,
+            number_of_loan_states,
+            monotonic() - start,
+        )
+        return last_block
 
     async def _set_zklend_interest_rates(self, zklend_state):
         zklend_interest_rate_data = await self.data_connector.fetch_data(
@@ -147,7 +159,7 @@ class DashboardDataHandler:
         :return:
         """
         logger.info("Collecting token parameters.")
-        asyncio.run(self.zklend_state.collect_token_parameters())
+        run_with_rpc_sessions(self.zklend_state.collect_token_parameters())
         logger.info("Token parameters collected.")
 
     def _set_underlying_addresses_to_decimals(self):
@@ -6,6 +6,18 @@ import pandas as pd
 from shared.state import State, NostraAlphaState, NostraMainnetState
 from shared.custom_types import Prices
 
+LOANS_TABLE_COLUMNS = [
+    "User",
+    "Protocol",
+    "Collateral (USD)",
+    "Risk-adjusted collateral (USD)",
+    "Debt (USD)",
+    "Health factor",
+    "Standardized health factor",
+    "Collateral",
+    "Debt",
+]
+
 
 def get_protocol(state: State) -> str:
     """
@@ -94,7 +106,7 @@ def get_loans_table_data(
                 ),
             }
         )
-    return pd.DataFrame(data)
+    return pd.DataFrame(data, columns=LOANS_TABLE_COLUMNS)
 
 
 def get_supply_function_call_parameters(
@@ -0,0 +1,234 @@
+"""
+A module that stores and reads the precomputed dashboard data.
+
+After each loan state run, the materialization job (`dashboard_app/materialize.py`)
+computes the main chart data of every pair, the loans table of every protocol and the
+protocol stats once, and stores them as Parquet files keyed by block:
+
+    <path>/<block>/manifest.json
+    <path>/<block>/<protocol>_data/<pair>.parquet
+    <path>/<block>/<protocol>_data/loans.parquet
+    <path>/<block>/stats/<stats name>.parquet
+    <path>/LATEST
+
+The `LATEST` pointer is written last, so the dashboard never reads a partially written
+block. The path may be local or any URL supported by `fsspec`, e.g. `gs://bucket/dir`.
+
+Example usage:
+write_materialized_data(data)
+data = read_materialized_data(read_latest_block())
+"""
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+import fsspec
+import pandas as pd
+
+from dashboard_app.helpers.loans_table import LOANS_TABLE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+MATERIALIZED_DATA_PATH = os.getenv("MATERIALIZED_DATA_PATH", "materialized_data")
+LATEST_BLOCK_FILE = "LATEST"
+MANIFEST_FILE = "manifest.json"
+STATS_DIRECTORY = "stats"
+STATS_NAMES = ("general", "supply", "collateral", "debt", "utilization")
+# The number of blocks kept in the store, older blocks are removed after each write.
+KEEP_BLOCKS = 3
+
+
+@dataclass
+class MaterializedData:
+    """
+    The precomputed dashboard data of a block.
+    """
+
+    block: int
+    # The main chart data by pair, by protocol.
+    main_chart_data: dict[str, dict[str, pd.DataFrame]] = field(default_factory=dict)
+    # The loans table by protocol.
+    loans_data: dict[str, pd.DataFrame] = field(default_factory=dict)
+    # The protocol stats by name, see `STATS_NAMES`.
+    stats: dict[str, pd.DataFrame] = field(default_factory=dict)
+
+    def get_main_chart_data(self, protocol: str, pair: str) -> pd.DataFrame | None:
+        """
+        Get a copy of the main chart data of a pair.
+        :param protocol: The protocol name.
+        :param pair: The pair, e.g. `ETH-USDC`.
+        :return: DataFrame or None if no data of the pair is stored.
+        """
+        data = self.main_chart_data.get(protocol, {}).get(pair)
+        return None if data is None else data.copy()
+
+    def get_loans_data(self, protocol: str) -> pd.DataFrame:
+        """
+        Get a copy of the loans table of a protocol.
+        :param protocol: The protocol name.
+        :return: DataFrame, empty if no loans of the protocol are stored.
+        """
+        if protocol not in self.loans_data:
+            return pd.DataFrame(columns=LOANS_TABLE_COLUMNS)
+        return self.loans_data[protocol].copy()
+
+    def get_stats(self, name: str) -> pd.DataFrame:
+        """
+        Get a copy of the protocol stats.
+        :param name: The stats name, see `STATS_NAMES`.
+        :return: DataFrame, empty if the stats are not stored.
+        """
+        return self.stats.get(name, pd.DataFrame()).copy()
+
+
+def get_protocol_directory(protocol: str) -> str:
+    """
+    Get the directory of the protocol data, e.g. `nostra_alpha_data`.
+    :param protocol: The protocol name.
+    :return: str
+    """
+    return f"{protocol.lower().replace(' ', '_')}_data"
+
+
+def _get_file_name(pair: str) -> str:
+    """
+    Get a file name of a pair that is safe in any store, e.g. `ETH-All_USD_Stable_Coins`.
+    """
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", pair).strip("_") + ".parquet"
+
+
+def _to_columnar(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert the columns holding `Decimal` values to floats, which Parquet stores natively.
+    """
+    data = data.copy()
+    for column in data.columns[data.dtypes == object]:
+        if data[column].map(lambda value: isinstance(value, Decimal)).any():
+            data[column] = data[column].astype(float)
+    return data
+
+
+def _write_frame(data: pd.DataFrame, path: str) -> None:
+    data = _to_columnar(data)
+    data.columns = data.columns.astype(str)
+    data.to_parquet(path, index=False, engine="fastparquet", compression="gzip")
+
+
+def _read_frame(path: str) -> pd.DataFrame:
+    return pd.read_parquet(path, engine="fastparquet")
+
+
+def write_materialized_data(
+    data: MaterializedData, path: str = MATERIALIZED_DATA_PATH
+) -> None:
+    """
+    Write the data of a block and point the dashboard to it.
+    :param data: The data to write.
+    :param path: The store path.
+    """
+    file_system, root = fsspec.core.url_to_fs(path)
+    path = path.rstrip("/")
+    block_path = f"{path}/{data.block}"
+    manifest = {"main_chart_data": {}, "loans_data": {}, "stats": {}}
+
+    for protocol, main_chart_data in data.main_chart_data.items():
+        directory = get_protocol_directory(protocol)
+        file_system.makedirs(f"{root}/{data.block}/{directory}", exist_ok=True)
+        manifest["main_chart_data"][protocol] = {}
+        for pair, pair_data in main_chart_data.items():
+            # Pairs without data are left out, the dashboard warns about them.
+            if pair_data is None or pair_data.empty:
+                continue
+            file_name = f"{directory}/{_get_file_name(pair)}"
+            _write_frame(pair_data, f"{block_path}/{file_name}")
+            manifest["main_chart_data"][protocol][pair] = file_name
+
+    for protocol, loans_data in data.loans_data.items():
+        if loans_data.empty:
+            continue
+        directory = get_protocol_directory(protocol)
+        file_system.makedirs(f"{root}/{data.block}/{directory}", exist_ok=True)
+        file_name = f"{directory}/loans.parquet"
+        _write_frame(loans_data, f"{block_path}/{file_name}")
+        manifest["loans_data"][protocol] = file_name
+
+    file_system.makedirs(f"{root}/{data.block}/{STATS_DIRECTORY}", exist_ok=True)
+    for name, stats in data.stats.items():
+        stats = pd.DataFrame(stats)
+        if stats.empty:
+            continue
+        file_name = f"{STATS_DIRECTORY}/{name}.parquet"
+        _write_frame(stats, f"{block_path}/{file_name}")
+        manifest["stats"][name] = file_name
+
+    file_system.pipe_file(
+        f"{root}/{data.block}/{MANIFEST_FILE}", json.dumps(manifest).encode()
+    )
+    # Readers follow the pointer, so it is moved only once the block is complete.
+    file_system.pipe_file(f"{root}/{LATEST_BLOCK_FILE}", str(data.block).encode())
+    logger.info(f"Materialized the dashboard data of block {data.block} to {path}.")
+    _remove_old_blocks(file_system, root, data.block)
+
+
+def _remove_old_blocks(
+    file_system: fsspec.AbstractFileSystem, root: str, latest_block: int
+) -> None:
+    blocks = sorted(
+        int(name)
+        for name in (
+            entry.rstrip("/").rsplit("/", 1)[-1]
+            for entry in file_system.ls(root, detail=False)
+        )
+        if name.isdigit() and int(name) <= latest_block
+    )
+    for block in blocks[:-KEEP_BLOCKS]:
+        file_system.rm(f"{root}/{block}", recursive=True)
+
+
+def read_latest_block(path: str = MATERIALIZED_DATA_PATH) -> int | None:
+    """
+    Read the block of the latest materialized data.
+    :param path: The store path.
+    :return: int or None if no data is materialized yet.
+    """
+    file_system, root = fsspec.core.url_to_fs(path)
+    try:
+        return int(file_system.cat_file(f"{root}/{LATEST_BLOCK_FILE}").decode())
+    except FileNotFoundError:
+        return None
+
+
+def read_materialized_data(
+    block: int, path: str = MATERIALIZED_DATA_PATH
+) -> MaterializedData:
+    """
+    Read the materialized data of a block.
+    :param block: The block, as returned by `read_latest_block`.
+    :param path: The store path.
+    :return: MaterializedData
+    """
+    file_system, root = fsspec.core.url_to_fs(path)
+    block_path = f"{path.rstrip('/')}/{block}"
+    manifest = json.loads(file_system.cat_file(f"{root}/{block}/{MANIFEST_FILE}"))
+    return MaterializedData(
+        block=block,
+        main_chart_data={
+            protocol: {
+                pair: _read_frame(f"{block_path}/{file_name}")
+                for pair, file_name in file_names.items()
+            }
+            for protocol, file_names in manifest["main_chart_data"].items()
+        },
+        loans_data={
+            protocol: _read_frame(f"{block_path}/{file_name}")
+            for protocol, file_name in manifest["loans_data"].items()
+        },
+        stats={
+            name: _read_frame(f"{block_path}/{file_name}")
+            for name, file_name in manifest["stats"].items()
+        },
+    )
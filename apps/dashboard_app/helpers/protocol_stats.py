@@ -2,14 +2,13 @@
 This module handles the collection and computation of statistics related to the protocol.
 """
 
-import asyncio
 from collections import defaultdict
 from decimal import Decimal
 import math
 
 import numpy as np
 import pandas as pd
-from shared import blockchain_call
+from shared.batch_call import gather_calls
 from shared.constants import TOKEN_SETTINGS
 from shared.custom_types import Prices
 from shared.state import State
@@ -20,6 +19,7 @@ from dashboard_app.helpers.loans_table import (
 )
 from dashboard_app.helpers.tools import get_prices, get_underlying_address
 from shared.helpers import get_addresses, add_leading_zeros
+from shared.rpc_gateway import run_with_rpc_sessions
 
 
 def get_general_stats(
@@ -76,10 +76,11 @@ def get_supply_stats(
     :param prices: Prices dict
     :return: DataFrame with supply stats
     """
-    data = []
-    for state in states:
+    # Collect the supply calls of all protocols and tokens first, so that they are sent
+    # in a few batch requests instead of one request per call.
+    supply_calls = []
+    for state_index, state in enumerate(states):
         protocol = get_protocol(state=state)
-        token_supplies = {}
         for token in TOKEN_SETTINGS:
             (
                 addresses,
@@ -91,17 +92,29 @@ def get_supply_stats(
                     underlying_symbol=token,
                 ),
             )
-            supply = 0
-            for address in addresses:
-                supply += asyncio.run(
-                    blockchain_call.func_call(
-                        addr=int(address, base=16),
-                        selector=selector,
-                        calldata=[],
-                    )
-                )[0]
-            supply = supply / TOKEN_SETTINGS[token].decimal_factor
-            token_supplies[token] = round(supply, 4)
+            supply_calls.extend(
+                (state_index, token, address, selector) for address in addresses
+            )
+    results = run_with_rpc_sessions(
+        gather_calls(
+            (int(address, base=16), selector, [])
+            for _, _, address, selector in supply_calls
+        )
+    )
+    raw_supplies = defaultdict(int)
+    for (state_index, token, _, _), result in zip(supply_calls, results):
+        raw_supplies[state_index, token] += result[0]
+
+    data = []
+    for state_index, state in enumerate(states):
+        protocol = get_protocol(state=state)
+        token_supplies = {
+            token: round(
+                raw_supplies[state_index, token] / TOKEN_SETTINGS[token].decimal_factor,
+                4,
+            )
+            for token in TOKEN_SETTINGS
+        }
 
         default_value = Decimal(0.0)
         data.append(
@@ -6,13 +6,16 @@ import logging
 import math
 from typing import Iterator
 
+import numpy as np
 import pandas as pd
 import requests
-from shared.state import State
+from shared.state import LoanMatrix, State
 from shared.amms import SwapAmm
 from shared.custom_types import Prices, TokenParameters
 from shared.helpers import add_leading_zeros
 
+from dashboard_app.helpers.liquidity_curve import LiquidityCurve
+
 AMMS = ["10kSwap", "MySwap", "SithSwap", "JediSwap"]
 
 
@@ -150,6 +153,8 @@ def get_main_chart_data(
     swap_amms: SwapAmm,
     collateral_token_underlying_symbol: str,
     debt_token_underlying_symbol: str,
+    loan_matrix: LoanMatrix | None = None,
+    liquidity_curves: dict[str, LiquidityCurve] | None = None,
 ) -> pd.DataFrame:
     """
     Returns the main chart data for the given state and prices.
@@ -159,6 +164,9 @@ def get_main_chart_data(
         swap_amms:
         collateral_token_underlying_symbol:
         debt_token_underlying_symbol:
+        loan_matrix: loan entities of `state` packed once and shared across pairs
+        liquidity_curves: liquidity curves of the stored order books of the pair by DEX,
+            used instead of the AMM pools if given
 
     Returns: DataFrame
 
@@ -186,13 +194,12 @@ def get_main_chart_data(
     if not debt_token_underlying_address:
         return pd.DataFrame()
 
-    data["liquidable_debt"] = data["collateral_token_price"].apply(
-        lambda x: state.compute_liquidable_debt_at_price(
-            prices=prices,
-            collateral_token_underlying_address=collateral_token_underlying_address,
-            collateral_token_price=x,
-            debt_token_underlying_address=debt_token_underlying_address,
-        )
+    data["liquidable_debt"] = state.compute_liquidable_debt_curve(
+        prices=prices,
+        collateral_token_underlying_address=collateral_token_underlying_address,
+        collateral_token_prices=data["collateral_token_price"],
+        debt_token_underlying_address=debt_token_underlying_address,
+        loan_matrix=loan_matrix,
     )
 
     data["liquidable_debt_at_interval"] = data["liquidable_debt"].diff().abs()
@@ -201,24 +208,27 @@ def get_main_chart_data(
     for amm in AMMS:
         data[f"{amm}_debt_token_supply"] = 0
 
-    def compute_supply_at_price(collateral_token_price: float):
-        supplies = {
-            amm: swap_amms.get_supply_at_price(
-                collateral_token_underlying_symbol=collateral_token_underlying_symbol,
-                collateral_token_price=collateral_token_price,
-                debt_token_underlying_symbol=debt_token_underlying_symbol,
-                amm=amm,
+    collateral_token_prices = data["collateral_token_price"].to_numpy(dtype=np.float64)
+    if liquidity_curves:
+        price_diff = data["collateral_token_price"].diff().max()
+        if pd.isna(price_diff):
+            price_diff = None
+        for dex, curve in liquidity_curves.items():
+            data[f"{dex}_debt_token_supply"] = curve.get_available_liquidity(
+                collateral_token_prices, price_diff
             )
-            for amm in AMMS
-        }
-        total_supply = sum(supplies.values())
-        return supplies, total_supply
+        data["debt_token_supply"] = LiquidityCurve.merge(
+            liquidity_curves.values()
+        ).get_available_liquidity(collateral_token_prices, price_diff)
+        return data
 
-    supplies_and_totals = data["collateral_token_price"].apply(compute_supply_at_price)
     for amm in AMMS:
-        data[f"{amm}_debt_token_supply"] = supplies_and_totals.apply(
-            lambda x: x[0][amm]
+        data[f"{amm}_debt_token_supply"] = swap_amms.get_supply_at_prices(
+            collateral_token_underlying_symbol=collateral_token_underlying_symbol,
+            collateral_token_prices=collateral_token_prices,
+            debt_token_underlying_symbol=debt_token_underlying_symbol,
+            amm=amm,
         )
-    data["debt_token_supply"] = supplies_and_totals.apply(lambda x: x[1])
+    data["debt_token_supply"] = sum(data[f"{amm}_debt_token_supply"] for amm in AMMS)
 
     return data
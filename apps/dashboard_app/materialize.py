@@ -0,0 +1,76 @@
+"""
+This script materializes the dashboard data after each loan state run.
+
+The loan states are computed by the data handler every `CRONTAB_TIME` minutes. Whenever
+a new block is stored, the main chart data, loans tables and protocol stats are computed
+once and stored, see `dashboard_app.helpers.materialization`, so that the dashboard only
+reads them.
+
+Usage:
+python dashboard_app/materialize.py [--once]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from shared.constants import CRONTAB_TIME
+from shared.rpc_gateway import run_with_rpc_sessions
+
+from dashboard_app.charts.utils import compute_materialized_data
+from dashboard_app.data_conector import DataConnectorAsync
+from dashboard_app.helpers.load_data import DashboardDataHandler
+from dashboard_app.helpers.materialization import (
+    STATS_NAMES,
+    read_latest_block,
+    write_materialized_data,
+)
+
+logger = logging.getLogger(__name__)
+
+# The protocol whose loan states the dashboard data is built from.
+PROTOCOL_ZKLEND = "zkLend"
+SECONDS_IN_MINUTE = 60
+
+
+def materialize() -> int | None:
+    """
+    Materialize the dashboard data if loan states of a new block are stored.
+    :return: The materialized block or None if the latest block is materialized already.
+    """
+    last_block = asyncio.run(
+        DataConnectorAsync().fetch_protocol_last_block_number(PROTOCOL_ZKLEND)
+    )
+    latest_block = read_latest_block()
+    if latest_block is not None and last_block <= latest_block:
+        logger.info(f"The dashboard data of block {latest_block} is up to date.")
+        return None
+
+    start = time.monotonic()
+    dashboard_data_handler = run_with_rpc_sessions(DashboardDataHandler.create())
+    _, *stats = dashboard_data_handler.load_data()
+    materialized_data = compute_materialized_data(
+        block=dashboard_data_handler.zklend_state.last_block_number,
+        states=dashboard_data_handler.states,
+        stats=dict(zip(STATS_NAMES, stats)),
+    )
+    write_materialized_data(materialized_data)
+    logger.info(
+        f"Materialized block {materialized_data.block} in {time.monotonic() - start:.2f}s"
+    )
+    return materialized_data.block
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    while True:
+        try:
+            materialize()
+        except Exception as e:
+            logger.error(f"Failed to materialize the dashboard data: {e}")
+            if "--once" in sys.argv:
+                raise
+        if "--once" in sys.argv:
+            break
+        time.sleep(int(CRONTAB_TIME) * SECONDS_IN_MINUTE)
@@ -178,7 +178,7 @@ def test_get_general_stats_invalid_loan_stats(mock_state):
 
 @patch("dashboard_app.helpers.protocol_stats.get_protocol")
 @patch("dashboard_app.helpers.protocol_stats.get_supply_function_call_parameters")
-@patch("dashboard_app.helpers.protocol_stats.asyncio.run")
+@patch("dashboard_app.helpers.protocol_stats.run_with_rpc_sessions")
 def test_get_supply_stats(
     mock_run,
     mock_get_params,
@@ -193,7 +193,12 @@ def test_get_supply_stats(
     """
     mock_get_protocol.return_value = "zkLend"
     mock_get_params.return_value = ([token_addresses["ETH"]], "felt_total_supply")
-    mock_run.return_value = [Decimal("1000000000000000000")]
+
+    def run(coroutine):
+        coroutine.close()
+        return [Decimal("1000000000000000000")]
+
+    mock_run.side_effect = run
 
     # Convert prices to Decimal
     prices = {k: Decimal(v) for k, v in mock_prices.items()}
@@ -208,7 +213,7 @@ def test_get_supply_stats(
 
 @patch("dashboard_app.helpers.protocol_stats.get_protocol")
 @patch("dashboard_app.helpers.protocol_stats.get_supply_function_call_parameters")
-@patch("dashboard_app.helpers.protocol_stats.asyncio.run")
+@patch("dashboard_app.helpers.protocol_stats.run_with_rpc_sessions")
 def test_get_supply_stats_blockchain_error(
     mock_run,
     mock_get_params,
@@ -222,7 +227,12 @@ def test_get_supply_stats_blockchain_error(
     """
     mock_get_protocol.return_value = "zkLend"
     mock_get_params.return_value = ([token_addresses["ETH"]], "felt_total_supply")
-    mock_run.side_effect = Exception("Blockchain call failed")
+
+    def run(coroutine):
+        coroutine.close()
+        raise Exception("Blockchain call failed")
+
+    mock_run.side_effect = run
 
     with pytest.raises(Exception):
         get_supply_stats([mock_state], mock_prices)
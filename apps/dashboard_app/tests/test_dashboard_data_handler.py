@@ -1,3 +1,5 @@
+import asyncio
+from collections import defaultdict
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -204,3 +206,34 @@ def test_load_data_invalid_prices(mock_get_prices, handler):
     assert handler.prices == {}
     with pytest.raises(KeyError):
         handler.load_data()
+
+
+def test_stream_loan_states():
+    """The streamed loan states are fed into the state, the latest one of a user wins."""
+
+    async def stream_data(query):
+        yield ZKLEND_DATA
+        yield DataFrame(
+            [
+                {
+                    "user": "user1",
+                    "collateral_enabled": [True, True],
+                    "collateral": [400, 200],
+                    "debt": [0, 150],
+                    "block": 9,
+                }
+            ]
+        )
+
+    with patch(f"{DashboardDataHandler.__module__}.DataConnectorAsync"):
+        handler = DashboardDataHandler()
+    handler.data_connector.stream_data = stream_data
+    state = MagicMock(get_protocol_name="zkLend")
+    state.loan_entities = defaultdict(MagicMock)
+
+    last_block = asyncio.run(handler._stream_loan_states(state, "query"))
+
+    assert last_block == 9
+    assert state.loan_entities["user1"].collateral.values == [400, 200]
+    assert state.loan_entities["user1"].collateral_enabled.values == [True, True]
+    assert state.loan_entities["user2"].debt.values == [100]
@@ -0,0 +1,83 @@
+"""Tests for the liquidity curves of the stored order books."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_app.helpers.liquidity_curve import (
+    LiquidityCurve,
+    get_liquidity_curves,
+    get_pair_liquidity_curves,
+)
+
+ETH = "0x49d36570d4e46f48e99674bd3fcc84644ddd6b96f7c741b1562b82f9e004dc7"
+USDC = "0x53c91253bc9682c04929ca02ed00b3e423f6710d2ee7e0d5ebb06f3ecf368a8"
+
+
+def _scan(levels, price, price_diff):
+    """The available liquidity as summed up by `EkuboLiquidity`."""
+    lower_bound = max(LiquidityCurve.LOWER_BOUND_VALUE * price, price - price_diff)
+    return sum(quantity for bid, quantity in levels if lower_bound <= bid <= price)
+
+
+def test_available_liquidity_matches_scan():
+    """The vectorized curve gives the liquidity of a scan of the merged bids."""
+    rng = np.random.default_rng(5)
+    ekubo = list(zip(rng.uniform(50, 100, 300), rng.uniform(0, 10, 300)))
+    haiko = list(zip(rng.uniform(50, 100, 200), rng.uniform(0, 10, 200)))
+    prices = np.arange(2.0, 120.0, 2.0)
+
+    curve = LiquidityCurve.merge(
+        [LiquidityCurve.from_levels(ekubo), LiquidityCurve.from_levels(haiko)]
+    )
+
+    assert curve.get_available_liquidity(prices, 2.0) == pytest.approx(
+        [_scan(ekubo + haiko, price, 2.0) for price in prices]
+    )
+
+
+def test_from_depth():
+    """A curve built from the stored depth equals the one built from the bids."""
+    depth = {
+        "asks": {"prices": [], "quantities": []},
+        "bids": {"prices": [99.0, 98.0, 97.0], "quantities": [1.0, 3.0, 6.0]},
+    }
+    prices = np.array([97.0, 98.0, 99.0, 100.0])
+
+    assert LiquidityCurve.from_depth(depth).get_available_liquidity(
+        prices
+    ) == pytest.approx(
+        LiquidityCurve.from_levels(
+            [(99.0, 1.0), (98.0, 2.0), (97.0, 3.0)]
+        ).get_available_liquidity(prices)
+    )
+
+
+def test_get_liquidity_curves():
+    """The curves are grouped by pair with leading zeros, and by DEX."""
+    order_books = pd.DataFrame(
+        {
+            "dex": ["Ekubo", "Haiko"],
+            "token_a": [ETH, ETH],
+            "token_b": [USDC, USDC],
+            "depth": [
+                {
+                    "asks": {"prices": [], "quantities": []},
+                    "bids": {"prices": [99.0], "quantities": [2.0]},
+                },
+                None,
+            ],
+            "bids": [None, "[[98.0, 4.0]]"],
+        }
+    )
+
+    curves = get_liquidity_curves(order_books)
+    pair_curves = get_pair_liquidity_curves(
+        curves,
+        "0x049d36570d4e46f48e99674bd3fcc84644ddd6b96f7c741b1562b82f9e004dc7",
+        "0x053c91253bc9682c04929ca02ed00b3e423f6710d2ee7e0d5ebb06f3ecf368a8",
+    )
+
+    assert set(pair_curves) == {"Ekubo", "Haiko"}
+    assert pair_curves["Haiko"].get_available_liquidity([99.0]).tolist() == [4.0]
+    assert get_pair_liquidity_curves(curves, USDC, ETH) == {}
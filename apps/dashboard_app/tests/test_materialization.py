@@ -0,0 +1,114 @@
+"""Tests for the materialized dashboard data."""
+
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from dashboard_app.helpers import materialization
+from dashboard_app.helpers.loans_table import LOANS_TABLE_COLUMNS
+from dashboard_app.helpers.materialization import (
+    MaterializedData,
+    read_latest_block,
+    read_materialized_data,
+    write_materialized_data,
+)
+
+STABLECOIN_PAIR = "ETH-(All USD Stable Coins)"
+
+
+def _get_materialized_data(block: int) -> MaterializedData:
+    return MaterializedData(
+        block=block,
+        main_chart_data={
+            "zkLend": {
+                "ETH-USDC": pd.DataFrame(
+                    {
+                        "collateral_token_price": [1.0, 2.0],
+                        "liquidable_debt": [3.0, 4.0],
+                    }
+                ),
+                STABLECOIN_PAIR: pd.DataFrame(
+                    {"collateral_token_price": [1.0], "liquidable_debt": [5.0]}
+                ),
+                "ETH-DAI": pd.DataFrame(),
+            }
+        },
+        loans_data={
+            "zkLend": pd.DataFrame(
+                {"User": ["0x1"], "Debt (USD)": [Decimal("1.5")], "Debt": ["ETH: 1"]}
+            )
+        },
+        stats={
+            "general": pd.DataFrame(
+                {"Protocol": ["zkLend"], "Total debt (USD)": [1.5]}
+            ),
+            "utilization": pd.DataFrame(),
+        },
+    )
+
+
+@pytest.fixture
+def pickled_frames(monkeypatch):
+    """Store the frames as pickles, the layout does not depend on the Parquet engine."""
+    monkeypatch.setattr(
+        materialization, "_write_frame", lambda data, path: data.to_pickle(path)
+    )
+    monkeypatch.setattr(materialization, "_read_frame", pd.read_pickle)
+
+
+def test_write_and_read(tmp_path, pickled_frames):
+    """The latest block is read back, pairs and stats without data are left out."""
+    path = str(tmp_path)
+    assert read_latest_block(path) is None
+
+    write_materialized_data(_get_materialized_data(10), path)
+    block = read_latest_block(path)
+    data = read_materialized_data(block, path)
+
+    assert block == 10
+    assert set(data.main_chart_data["zkLend"]) == {"ETH-USDC", STABLECOIN_PAIR}
+    assert data.get_main_chart_data("zkLend", STABLECOIN_PAIR)[
+        "liquidable_debt"
+    ].tolist() == [5.0]
+    assert data.get_main_chart_data("zkLend", "ETH-DAI") is None
+    assert data.get_main_chart_data("Nostra Alpha", "ETH-USDC") is None
+    assert data.get_loans_data("zkLend")["Debt (USD)"].tolist() == [1.5]
+    assert data.get_loans_data("Nostra Alpha").columns.tolist() == LOANS_TABLE_COLUMNS
+    assert set(data.stats) == {"general"}
+    assert data.get_stats("utilization").empty
+
+
+def test_old_blocks_are_removed(tmp_path, pickled_frames):
+    """Only the latest blocks are kept in the store."""
+    for block in range(1, 6):
+        write_materialized_data(_get_materialized_data(block), str(tmp_path))
+
+    blocks = sorted(int(entry.name) for entry in tmp_path.iterdir() if entry.is_dir())
+    assert blocks == [3, 4, 5]
+    assert read_latest_block(str(tmp_path)) == 5
+
+
+def test_copies_are_returned():
+    """The frames shared by all sessions are not modified by the charts."""
+    data = _get_materialized_data(1)
+
+    data.get_main_chart_data("zkLend", "ETH-USDC")["liquidable_debt"] = 0.0
+    data.get_loans_data("zkLend").drop(columns="Debt", inplace=True)
+
+    assert data.main_chart_data["zkLend"]["ETH-USDC"]["liquidable_debt"].tolist() == [
+        3.0,
+        4.0,
+    ]
+    assert "Debt" in data.loans_data["zkLend"].columns
+
+
+def test_parquet_round_trip(tmp_path):
+    """The frames are stored as Parquet, with `Decimal` values as floats."""
+    pytest.importorskip("fastparquet")
+    write_materialized_data(_get_materialized_data(7), str(tmp_path))
+
+    data = read_materialized_data(7, str(tmp_path))
+
+    assert data.get_loans_data("zkLend")["Debt (USD)"].tolist() == [1.5]
+    assert data.get_stats("general")["Protocol"].tolist() == ["zkLend"]
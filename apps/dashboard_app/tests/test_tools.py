@@ -1,7 +1,9 @@
 import pytest
 
 pytest.importorskip("data_handler")
+import numpy as np
 import pandas as pd
+from dashboard_app.helpers.liquidity_curve import LiquidityCurve
 from dashboard_app.helpers.tools import (
     get_collateral_token_range,
     get_prices,
@@ -87,11 +89,17 @@ class MockState:
     def compute_liquidable_debt_at_price(self, *args, **kwargs):
         return 10
 
+    def compute_liquidable_debt_curve(self, collateral_token_prices, **kwargs):
+        return [10] * len(collateral_token_prices)
+
 
 class MockSwapAmm:
     def get_supply_at_price(self, *args, **kwargs):
         return 5
 
+    def get_supply_at_prices(self, collateral_token_prices, *args, **kwargs):
+        return np.full(len(collateral_token_prices), 5.0)
+
 
 def test_get_main_chart_data():
     """Tests if get_main_chart_data correctly generates a DataFrame with required columns."""
@@ -101,3 +109,27 @@ def test_get_main_chart_data():
     result = get_main_chart_data(state, prices, swap_amms, "COLLATERAL", "DEBT")
     assert isinstance(result, pd.DataFrame)
     assert "collateral_token_price" in result.columns
+    assert (result["debt_token_supply"] == 20).all()
+
+
+def test_get_main_chart_data_with_liquidity_curves():
+    """Tests if the liquidity of the stored order books replaces the AMM supply."""
+    curves = {
+        "Ekubo": LiquidityCurve.from_levels([(97.0, 1.0), (98.0, 2.0)]),
+        "Haiko": LiquidityCurve.from_levels([(98.5, 4.0)]),
+    }
+    result = get_main_chart_data(
+        MockState(),
+        {"0xabc": 100, "0xdef": 50},
+        MockSwapAmm(),
+        "COLLATERAL",
+        "DEBT",
+        liquidity_curves=curves,
+    )
+    # The prices are 2.5 apart, so the bids within 2.5 below a price are available
+    at_price = result.set_index("collateral_token_price")
+    assert at_price.loc[97.5, "Ekubo_debt_token_supply"] == 1.0
+    assert at_price.loc[97.5, "Haiko_debt_token_supply"] == 0.0
+    assert at_price.loc[100.0, "Ekubo_debt_token_supply"] == 2.0
+    assert at_price.loc[100.0, "debt_token_supply"] == 6.0
+    assert (result["10kSwap_debt_token_supply"] == 0).all()
@@ -11,11 +11,10 @@ from celery import shared_task
 from data_handler.handlers.events.nostra.transform_events import NostraTransformer
 from data_handler.handlers.events.zklend.transform_events import ZklendTransformer
 from data_handler.handlers.loan_states.vesu.events import VesuLoanEntity
+from shared.rpc_gateway import close_rpc_sessions
 
 logger = logging.getLogger(__name__)
 
-CHUNK_SIZE = 5
-
 """in the event of mulitple loop run async method in a new thread to avoid event loop conflicts"""
 
 
@@ -33,6 +32,8 @@ def run_async_in_thread(coro):
         except Exception as e:
             exception = e
         finally:
+            # The HTTP sessions of the loop can't be closed once the loop is
+            loop.run_until_complete(close_rpc_sessions())
             loop.close()
 
     thread = threading.Thread(target=run_coro)
@@ -62,7 +63,7 @@ def process_zklend_events():
         logger.info(
             "Successfully processed ZkLend events in %.2fs. Blocks: %d to %d",
             execution_time,
-            transformer.last_block - transformer.PAGINATION_SIZE,
+            transformer.start_block,
             transformer.last_block,
         )
     except (
@@ -105,7 +106,7 @@ def process_nostra_events():
         logger.info(
             "Successfully processed Nostra events in %.2fs. Blocks: %d to %d",
             execution_time,
-            transformer.last_block - transformer.PAGINATION_SIZE,
+            transformer.start_block,
             transformer.last_block,
         )
     except (
@@ -134,21 +135,22 @@ def process_nostra_events():
 def process_vesu_events(self):
     """
     Process and store Vesu protocol events.
-    Fetches ModifyPosition events from the blockchain, updates user positions,
-    and stores them in a mock database.
+    Fetches the ModifyPosition events since the stored cursor from the blockchain and
+    upserts the user positions page by page.
     """
     start_time = datetime.utcnow()
     logger.info("Starting Vesu event processing")
     try:
         vesu_entity = VesuLoanEntity()
-        run_async_in_thread(vesu_entity.update_positions_data())
+        positions = run_async_in_thread(vesu_entity.update_positions_data())
         execution_time = (datetime.utcnow() - start_time).total_seconds()
         logger.info(
-            "Successfully processed Vesu events in %.2fs (UTC). Blocks: %d to %d",
+            "Successfully processed Vesu events in %.2fs (UTC). "
+            "Blocks: %d to %d, %d positions",
             execution_time,
-            vesu_entity.last_processed_block
-            - CHUNK_SIZE,  # default as update_positions_data chunk_size
+            vesu_entity.start_block,
             vesu_entity.last_processed_block,
+            positions,
         )
     except (ValueError, TypeError, RuntimeError) as exc:
         execution_time = (datetime.utcnow() - start_time).total_seconds()
@@ -19,12 +19,15 @@ from data_handler.handlers.liquidable_debt.protocols import (
 from data_handler.handlers.loan_states.nostra_alpha.run import (
     NostraAlphaStateComputation,
 )
-from data_handler.handlers.order_books.constants import TOKEN_MAPPING
-from data_handler.handlers.order_books.ekubo.api_connector import EkuboAPIConnector
-from data_handler.handlers.order_books.uniswap_v2.main import UniswapV2OrderBook
+from data_handler.handlers.loan_states.orchestrator import (
+    run_loan_states_computations as run_loan_states_computations_in_parallel,
+)
+from data_handler.handlers.order_books.collection import (
+    collect_uniswap_v2_order_books,
+)
 
 from data_handler.db.crud import DBConnector
-from data_handler.db.models import OrderBookModel
+from shared.rpc_gateway import run_with_rpc_sessions
 
 from celery import shared_task
 
@@ -78,24 +81,40 @@ def run_loan_states_computation_for_nostra_mainnet():
     )
 
 
+@shared_task(name="run_loan_states_computations")
+def run_loan_states_computations():
+    """
+    Run the zkLend, Nostra Alpha and Nostra Mainnet loan state computations in parallel,
+    each replayed in its own process.
+    """
+    start = monotonic()
+    logging.basicConfig(level=logging.INFO)
+
+    logging.info("Starting loan state computations")
+    progress = run_loan_states_computations_in_parallel(
+        [
+            ZkLendLoanStateComputation,
+            NostraAlphaStateComputation,
+            NostraMainnetStateComputation,
+        ]
+    )
+
+    logging.info(
+        "Finished loan state computations of %s, Time taken: %s seconds",
+        ", ".join(progress),
+        monotonic() - start,
+    )
+
+
 @shared_task(name="uniswap_v2_order_book")
 def uniswap_v2_order_book():
     """
-    Fetch the current price and liquidity of the pair from the Uniswap V2 AMMs.
+    Fetch the current price and liquidity of all pairs from the Uniswap V2 AMMs
+    concurrently and write the order books in one transaction.
     """
-    all_tokens = set(TOKEN_MAPPING.keys())
-    for base_token in TOKEN_MAPPING:
-        current_tokens = all_tokens - {base_token}
-        for quote_token in current_tokens:
-            try:
-                order_book = UniswapV2OrderBook(base_token, quote_token)
-                order_book.fetch_price_and_liquidity()
-                serialized_data = order_book.serialize()
-                connector.write_to_db(OrderBookModel(**serialized_data.model_dump()))
-            except Exception as e:
-                logging.exception(
-                    f"With token pair: {base_token} and {quote_token} something happened: {e}"
-                )
+    order_books = run_with_rpc_sessions(collect_uniswap_v2_order_books())
+    connector.write_batch_to_db(order_books)
+    logger.info(f"Saved {len(order_books)} Uniswap V2 order books.")
 
 
 @shared_task(name="run_liquidable_debt_computation_for_zklend")
@@ -37,16 +37,8 @@ app = Celery(
 )
 
 app.conf.beat_schedule = {
-    f"run_loan_states_computation_for_zklend_every_{CRONTAB_TIME}_mins": {
-        "task": "run_loan_states_computation_for_zklend",
-        "schedule": crontab(minute=f"*/{CRONTAB_TIME}"),
-    },
-    f"run_loan_states_computation_for_nostra_alpha_every_{CRONTAB_TIME}_mins": {
-        "task": "run_loan_states_computation_for_nostra_alpha",
-        "schedule": crontab(minute=f"*/{CRONTAB_TIME}"),
-    },
-    f"run_loan_states_computation_for_nostra_mainnet_every_{CRONTAB_TIME}_mins": {
-        "task": "run_loan_states_computation_for_nostra_mainnet",
+    f"run_loan_states_computations_every_{CRONTAB_TIME}_mins": {
+        "task": "run_loan_states_computations",
         "schedule": crontab(minute=f"*/{CRONTAB_TIME}"),
     },
     f"run_liquidable_debt_computation_for_zklend_every_{CRONTAB_TIME}_mins": {
@@ -92,6 +84,7 @@ from data_handler.background_tasks.data_handler.generic_tasks import (
     run_loan_states_computation_for_nostra_mainnet,
     uniswap_v2_order_book,
     run_loan_states_computation_for_zklend,
+    run_loan_states_computations,
 )
 
 from data_handler.background_tasks.tasks import check_health_ratio_level_changes
@@ -4,19 +4,30 @@
 - NostraEventDBConnector: Manages Nostra event-specific operations.
 - ZkLendEventDBConnector: Manages ZkLend event-specific operations."""
 
+import csv
+import io
+import json
 import logging
+import math
 import uuid
-from typing import List, Optional, Type, TypeVar
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Type, TypeVar
 
 
 from shared.db.base import Base
 from shared.db.conf import SQLALCHEMY_DATABASE_URL
 from data_handler.db.models import (
+    EventCursor,
     InterestRate,
     LoanState,
     OrderBookModel,
+    StateSnapshot,
+    VesuPosition,
     ZkLendCollateralDebt,
 )
+from data_handler.db.models.event import EventBaseModel
+from data_handler.handlers.order_books.depth import build_depth
 from data_handler.db.models.nostra_events import (
     BearingCollateralBurnEventModel,
     BearingCollateralMintEventModel,
@@ -37,14 +48,82 @@ from data_handler.db.models.zklend_events import (
     WithdrawalEventModel,
 )
 from shared.protocol_ids import ProtocolIDs
-from sqlalchemy import Subquery, and_, create_engine, desc, func, select
+from sqlalchemy import create_engine, desc, func, select, tuple_
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Query, Session, aliased, scoped_session, sessionmaker
+from sqlalchemy.orm import (
+    Query,
+    Session,
+    defer,
+    scoped_session,
+    sessionmaker,
+)
 
 logger = logging.getLogger(__name__)
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Columns streamed by the COPY-based bulk writers, in the order of the CSV rows.
+LOAN_STATE_COPY_COLUMNS: tuple[str, ...] = (
+    "id",
+    "protocol_id",
+    "user",
+    "collateral",
+    "debt",
+    "deposit",
+    "block",
+    "timestamp",
+)
+INTEREST_RATE_COPY_COLUMNS: tuple[str, ...] = (
+    "id",
+    "protocol_id",
+    "collateral",
+    "debt",
+    "block",
+    "timestamp",
+)
+LIQUIDABLE_DEBT_COPY_COLUMNS: tuple[str, ...] = (
+    "id",
+    "protocol_name",
+    "collateral_token",
+    "debt_token",
+    "collateral_token_price",
+    "liquidable_debt",
+    "block",
+)
+HEALTH_RATIO_LEVEL_COPY_COLUMNS: tuple[str, ...] = (
+    "id",
+    "protocol_id",
+    "user_id",
+    "value",
+    "timestamp",
+)
+
+
+class EventBatch:
+    """
+    Collects the event models written while `DBConnector.event_batch` is active, grouped
+    by model, so that they can be inserted in bulk. The `event_id` of the models, i.e. the
+    DeRisk API ID of the events, makes the bulk insert idempotent.
+    """
+
+    def __init__(self) -> None:
+        self.rows: dict[Type[EventBaseModel], list[dict]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self.rows.values())
+
+    def add(self, event: EventBaseModel) -> None:
+        """
+        Adds the event model to the batch.
+        :param event: EventBaseModel
+        """
+        row = {
+            column.key: getattr(event, column.key)
+            for column in event.__mapper__.column_attrs
+        }
+        row["id"] = row.get("id") or uuid.uuid4()
+        self.rows[type(event)].append(row)
+
 
 class DBConnector:
     """
@@ -57,6 +136,9 @@ class DBConnector:
     - remove_object: Removes an object by its ID from the database.
     """
 
+    # The batch collecting the written event models, see `event_batch`
+    _event_batch: Optional[EventBatch] = None
+
     def __init__(self, db_url: str = SQLALCHEMY_DATABASE_URL):
         """
         Initialize the database connection and session factory.
@@ -74,6 +156,11 @@ class DBConnector:
         :raise SQLAlchemyError: If the database operation fails.
         :return: None
         """
+        if self._event_batch is not None and isinstance(obj, EventBaseModel):
+            # Written in bulk when the batch is closed
+            self._event_batch.add(obj)
+            return
+
         db = self.Session()
         try:
             db.add(obj)
@@ -86,6 +173,53 @@ class DBConnector:
         finally:
             db.close()
 
+    @contextmanager
+    def event_batch(self) -> Iterator[EventBatch]:
+        """
+        Collects the event models written by `write_to_db`, e.g. by the `create_*_event`
+        methods, and inserts them with `write_events_to_db` in one transaction when the
+        block exits without an error.
+        :return: Iterator[EventBatch]
+        :raise SQLAlchemyError: If the database operation fails.
+        """
+        batch = EventBatch()
+        self._event_batch = batch
+        try:
+            yield batch
+        finally:
+            self._event_batch = None
+        self.write_events_to_db(batch.rows)
+
+    def write_events_to_db(
+        self, rows_by_model: dict[Type[EventBaseModel], list[dict]]
+    ) -> None:
+        """
+        Bulk inserts event rows, one statement per model and one transaction for all.
+        Events whose `event_id` is stored already are skipped.
+        :param rows_by_model: The rows to insert, grouped by event model.
+        :raise SQLAlchemyError: If the database operation fails.
+        """
+        rows_by_model = {model: rows for model, rows in rows_by_model.items() if rows}
+        if not rows_by_model:
+            return
+        db: Session = self.Session()
+        try:
+            for model, rows in rows_by_model.items():
+                db.execute(
+                    insert(model).on_conflict_do_nothing(index_elements=["event_id"]),
+                    rows,
+                )
+            db.commit()
+            logger.info(
+                f"Saved {sum(map(len, rows_by_model.values()))} events "
+                f"of {len(rows_by_model)} types."
+            )
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise e
+        finally:
+            db.close()
+
     def get_object(
         self, model: Type[ModelType] = None, obj_id: uuid = None
     ) -> ModelType | None:
@@ -126,41 +260,22 @@ class DBConnector:
         finally:
             db.close()
 
-    def _get_subquery(self) -> Subquery:
-        """
-        Returns subquery for loan state last blocks query
-        :return: Subquery
-        """
-        session = self.Session()
-        return (
-            session.query(
-                LoanState.user, func.max(LoanState.block).label("latest_block")
-            )
-            .group_by(LoanState.user)
-            .subquery()
-        )
-
-    def get_latest_block_loans(self) -> Query:
+    def get_latest_block_loans(
+        self, protocol_id: Optional[ProtocolIDs] = None
+    ) -> list[LoanState]:
         """
-        Returns a lastt block query
-        :return: Last block query
+        Returns the latest loan state of every user, there is one per protocol and user.
+        :param protocol_id: ProtocolIDs - The protocol ID to filter by (optional).
+        :return: list of LoanState
         """
-        session = self.Session()
-        subquery = self._get_subquery()
-
-        result = (
-            session.query(LoanState)
-            .join(
-                subquery,
-                and_(
-                    LoanState.user == subquery.c.user,
-                    LoanState.block == subquery.c.latest_block,
-                ),
-            )
-            .all()
-        )
-
-        return result
+        db = self.Session()
+        try:
+            query = db.query(LoanState)
+            if protocol_id is not None:
+                query = query.filter(LoanState.protocol_id == protocol_id)
+            return query.all()
+        finally:
+            db.close()
 
     def get_loans(
         self,
@@ -279,6 +394,229 @@ class DBConnector:
             db.close()
             logging.info("Loan states have been written to the database.")
 
+    @staticmethod
+    def _to_copy_buffer(rows: Iterable[Sequence]) -> io.StringIO:
+        """
+        Serializes the rows into an in-memory CSV buffer for `COPY ... FROM STDIN`.
+        `None` is written as an empty unquoted field, which COPY reads as NULL.
+        :param rows: Iterable of row tuples, in the order of the copied columns.
+        :return: io.StringIO
+        """
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        return buffer
+
+    @staticmethod
+    def _to_json(value: Optional[dict]) -> Optional[str]:
+        """
+        Serializes a JSON column value, Decimals are stored as floats as in the ORM path.
+        :param value: dict | None
+        :return: str | None
+        """
+        if value is None:
+            return None
+        return json.dumps(value, default=float)
+
+    @staticmethod
+    def _to_int(value: Any) -> Optional[int]:
+        """
+        Converts block numbers and timestamps coming from pandas (NumPy ints or NaN) to int.
+        :param value: Any
+        :return: int | None
+        """
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return None
+        return int(value)
+
+    def _copy_and_merge(
+        self,
+        table_name: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence],
+        merge_statement: str,
+    ) -> int:
+        """
+        Streams the rows into a temporary copy of `table_name` via PostgreSQL `COPY` and
+        merges them into the table with a single set-based statement, in one transaction.
+        :param table_name: The target table.
+        :param columns: The copied columns.
+        :param rows: Iterable of row tuples, in the order of `columns`.
+        :param merge_statement: SQL merging `tmp_<table_name>` into the target table.
+        :return: The number of rows written by the merge statement.
+        :raise psycopg2.Error: If the database operation fails.
+        """
+        temp_table = f"tmp_{table_name}"
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        buffer = self._to_copy_buffer(rows)
+        connection = self.engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMP TABLE {temp_table} "
+                    f"(LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                cursor.copy_expert(
+                    f"COPY {temp_table} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+                cursor.execute(merge_statement)
+                written = cursor.rowcount
+            connection.commit()
+            return written
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    def copy_loan_states_to_db(self, loan_states: Iterable[dict]) -> int:
+        """
+        Bulk upserts loan states via `COPY` into a temporary table and one
+        `INSERT ... ON CONFLICT DO UPDATE`. Like `write_loan_states_to_db`, existing rows
+        (based on protocol_id and user) get the new collateral and debt. If a user occurs
+        several times, the row with the highest block wins.
+        :param loan_states: Iterable of dicts with the keys protocol_id, user, collateral,
+            debt, deposit, block and timestamp.
+        :return: The number of inserted or updated rows.
+        :raise psycopg2.Error: If the database operation fails.
+        """
+        rows = (
+            (
+                uuid.uuid4(),
+                getattr(item["protocol_id"], "value", item["protocol_id"]),
+                item["user"],
+                self._to_json(item.get("collateral")),
+                self._to_json(item.get("debt")),
+                self._to_json(item.get("deposit")),
+                self._to_int(item.get("block")),
+                self._to_int(item.get("timestamp")),
+            )
+            for item in loan_states
+        )
+        column_list = ", ".join(f'"{column}"' for column in LOAN_STATE_COPY_COLUMNS)
+        merge_statement = (
+            f"INSERT INTO loan_state ({column_list}) "
+            f'SELECT DISTINCT ON (protocol_id, "user") {column_list} '
+            "FROM tmp_loan_state "
+            'ORDER BY protocol_id, "user", block DESC NULLS LAST '
+            "ON CONFLICT ON CONSTRAINT loan_state_protocol_id_user_key "
+            "DO UPDATE SET collateral = EXCLUDED.collateral, debt = EXCLUDED.debt"
+        )
+        written = self._copy_and_merge(
+            "loan_state", LOAN_STATE_COPY_COLUMNS, rows, merge_statement
+        )
+        logger.info(f"Successfully updated or added {written} loan states.")
+        return written
+
+    def copy_interest_rates_to_db(self, interest_rates: Iterable[dict]) -> int:
+        """
+        Bulk inserts interest rates via `COPY` into a temporary table and one
+        `INSERT ... SELECT`. Blocks that already have an interest rate of the protocol
+        are skipped, so that re-processing a page does not duplicate them.
+        :param interest_rates: Iterable of dicts with the keys protocol_id, collateral,
+            debt, block and timestamp.
+        :return: The number of inserted rows.
+        :raise psycopg2.Error: If the database operation fails.
+        """
+        rows = (
+            (
+                uuid.uuid4(),
+                getattr(item["protocol_id"], "value", item["protocol_id"]),
+                self._to_json(item.get("collateral")),
+                self._to_json(item.get("debt")),
+                self._to_int(item.get("block")),
+                self._to_int(item.get("timestamp")),
+            )
+            for item in interest_rates
+        )
+        column_list = ", ".join(f'"{column}"' for column in INTEREST_RATE_COPY_COLUMNS)
+        merge_statement = (
+            f"INSERT INTO interest_rate ({column_list}) "
+            f"SELECT DISTINCT ON (protocol_id, block) {column_list} "
+            "FROM tmp_interest_rate AS new "
+            "WHERE NOT EXISTS (SELECT 1 FROM interest_rate AS old "
+            "WHERE old.protocol_id = new.protocol_id AND old.block = new.block) "
+            "ORDER BY protocol_id, block, timestamp DESC"
+        )
+        written = self._copy_and_merge(
+            "interest_rate", INTEREST_RATE_COPY_COLUMNS, rows, merge_statement
+        )
+        logger.info(f"Successfully added {written} interest rates.")
+        return written
+
+    def copy_liquidable_debts_to_db(self, liquidable_debts: Iterable[dict]) -> int:
+        """
+        Bulk inserts liquidable debts via `COPY` into a temporary table and one
+        `INSERT ... SELECT`. Protocols that already have liquidable debts of the block
+        are skipped, so that re-running the computation does not duplicate them.
+        :param liquidable_debts: Iterable of dicts with the keys protocol_name,
+            collateral_token, debt_token, collateral_token_price, liquidable_debt
+            and block.
+        :return: The number of inserted rows.
+        :raise psycopg2.Error: If the database operation fails.
+        """
+        rows = (
+            (
+                uuid.uuid4(),
+                getattr(item["protocol_name"], "value", item["protocol_name"]),
+                item["collateral_token"],
+                item["debt_token"],
+                item["collateral_token_price"],
+                item["liquidable_debt"],
+                self._to_int(item.get("block")),
+            )
+            for item in liquidable_debts
+        )
+        column_list = ", ".join(
+            f'"{column}"' for column in LIQUIDABLE_DEBT_COPY_COLUMNS
+        )
+        merge_statement = (
+            f"INSERT INTO liquidable_debt ({column_list}) "
+            f"SELECT {column_list} FROM tmp_liquidable_debt AS new "
+            "WHERE NOT EXISTS (SELECT 1 FROM liquidable_debt AS old "
+            "WHERE old.protocol_name = new.protocol_name AND old.block = new.block)"
+        )
+        written = self._copy_and_merge(
+            "liquidable_debt", LIQUIDABLE_DEBT_COPY_COLUMNS, rows, merge_statement
+        )
+        logger.info(f"Successfully added {written} liquidable debts.")
+        return written
+
+    def copy_health_ratio_levels_to_db(
+        self, health_ratio_levels: Iterable[dict]
+    ) -> int:
+        """
+        Bulk inserts health ratio levels via `COPY` into a temporary table and one
+        `INSERT ... SELECT`, in one transaction.
+        :param health_ratio_levels: Iterable of dicts with the keys protocol_id, user_id,
+            value and timestamp.
+        :return: The number of inserted rows.
+        :raise psycopg2.Error: If the database operation fails.
+        """
+        rows = (
+            (
+                uuid.uuid4(),
+                getattr(item["protocol_id"], "value", item["protocol_id"]),
+                item["user_id"],
+                item["value"],
+                self._to_int(item.get("timestamp")),
+            )
+            for item in health_ratio_levels
+        )
+        column_list = ", ".join(
+            f'"{column}"' for column in HEALTH_RATIO_LEVEL_COPY_COLUMNS
+        )
+        merge_statement = (
+            f"INSERT INTO health_ratio_level ({column_list}) "
+            f"SELECT {column_list} FROM tmp_health_ratio_level"
+        )
+        written = self._copy_and_merge(
+            "health_ratio_level", HEALTH_RATIO_LEVEL_COPY_COLUMNS, rows, merge_statement
+        )
+        logger.info(f"Successfully added {written} health ratio levels.")
+        return written
+
     def get_latest_order_book(
         self, dex: str, token_a: str, token_b: str
     ) -> OrderBookModel | None:
@@ -291,59 +629,75 @@ class DBConnector:
         """
         db = self.Session()
         try:
-            order_book_condition = and_(
-                OrderBookModel.dex == dex,
-                OrderBookModel.token_a == token_a,
-                OrderBookModel.token_b == token_b,
-            )
-            max_timestamp = (
-                select(func.max(OrderBookModel.timestamp))
-                .where(order_book_condition)
-                .scalar_subquery()
-            )
             return db.execute(
-                select(OrderBookModel).where(
-                    OrderBookModel.timestamp == max_timestamp, order_book_condition
+                select(OrderBookModel)
+                .where(
+                    OrderBookModel.dex == dex,
+                    OrderBookModel.token_a == token_a,
+                    OrderBookModel.token_b == token_b,
                 )
+                .order_by(OrderBookModel.timestamp.desc())
+                .limit(1)
             ).scalar()
         finally:
             db.close()
 
-    def get_unique_users_last_block_objects(
-        self, protocol_id: ProtocolIDs
-    ) -> LoanState:
+    def get_latest_order_books(
+        self, pairs: Iterable[tuple[str, str, str]]
+    ) -> dict[tuple[str, str, str], OrderBookModel]:
         """
-        Retrieves the latest loan states for unique users.
+        Retrieves the latest order books of many pairs of tokens and DEXes in one query.
+        Only the cumulative depth of the order books is loaded, the levels are loaded just
+        to build the depth of order books stored without it.
+        :param pairs: Iterable of (dex, token_a, token_b) tuples.
+        :return: dict - OrderBookModel instances by (dex, token_a, token_b), pairs without
+        order books are omitted.
         """
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return {}
         db = self.Session()
         try:
-            # Create a subquery to get the max block for each user
-            subquery = (
-                db.query(LoanState.user, func.max(LoanState.block).label("max_block"))
-                .filter(LoanState.protocol_id == protocol_id)
-                .group_by(LoanState.user)
-                .subquery()
-            )
-
-            # Alias the subquery for clarity
-            alias_subquery = aliased(subquery)
-
-            # Join the main LoanState table with the subquery
-            return (
-                db.query(LoanState)
-                .join(
-                    alias_subquery,
-                    and_(
-                        LoanState.user == alias_subquery.c.user,
-                        LoanState.block == alias_subquery.c.max_block,
-                    ),
+            order_books = db.scalars(
+                select(OrderBookModel)
+                .options(defer(OrderBookModel.asks), defer(OrderBookModel.bids))
+                .where(
+                    tuple_(
+                        OrderBookModel.dex,
+                        OrderBookModel.token_a,
+                        OrderBookModel.token_b,
+                    ).in_(pairs)
                 )
-                .filter(LoanState.protocol_id == protocol_id)
-                .all()
-            )
+                .distinct(
+                    OrderBookModel.dex, OrderBookModel.token_a, OrderBookModel.token_b
+                )
+                .order_by(
+                    OrderBookModel.dex,
+                    OrderBookModel.token_a,
+                    OrderBookModel.token_b,
+                    OrderBookModel.timestamp.desc(),
+                )
+            ).all()
+            for order_book in order_books:
+                if order_book.depth is None:
+                    order_book.depth = build_depth(
+                        order_book.asks or [], order_book.bids or []
+                    )
+            return {
+                (order_book.dex, order_book.token_a, order_book.token_b): order_book
+                for order_book in order_books
+            }
         finally:
             db.close()
 
+    def get_unique_users_last_block_objects(
+        self, protocol_id: ProtocolIDs
+    ) -> list[LoanState]:
+        """
+        Retrieves the latest loan states for unique users.
+        """
+        return self.get_latest_block_loans(protocol_id=protocol_id)
+
     def get_last_interest_rate_record_by_protocol_id(
         self, protocol_id: ProtocolIDs
     ) -> InterestRate | None:
@@ -386,6 +740,171 @@ class DBConnector:
         finally:
             db.close()
 
+    def get_interest_rates_by_block_range(
+        self, protocol_id: str, start_block: int, end_block: int
+    ) -> list[InterestRate]:
+        """
+        Fetch all InterestRate instances needed to resolve the interest rate of any block
+        in the given range: the closest instance at or below the start block and all
+        instances within the range.
+
+        :param protocol_id: The protocol ID to search for.
+        :param start_block: The first block of the range.
+        :param end_block: The last block of the range.
+        :return: A list of InterestRate instances ordered by block.
+        """
+        db = self.Session()
+        try:
+            floor_block = (
+                select(func.max(InterestRate.block))
+                .where(InterestRate.protocol_id == protocol_id)
+                .where(InterestRate.block <= start_block)
+                .scalar_subquery()
+            )
+            return (
+                db.query(InterestRate)
+                .filter(InterestRate.protocol_id == protocol_id)
+                .filter(InterestRate.block >= func.coalesce(floor_block, start_block))
+                .filter(InterestRate.block <= end_block)
+                .order_by(InterestRate.block)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def write_state_snapshot(
+        self, protocol_id: str, block: int, data: bytes, keep_last: int = 2
+    ) -> None:
+        """
+        Writes a state snapshot and removes the older snapshots of the protocol
+        except for the `keep_last` most recent ones.
+        :param protocol_id: The protocol ID of the state.
+        :param block: The last block included in the snapshot.
+        :param data: The binary snapshot.
+        :param keep_last: The number of snapshots to keep, including the new one.
+        :raise SQLAlchemyError: If the database operation fails.
+        """
+        db: Session = self.Session()
+        try:
+            db.add(StateSnapshot(protocol_id=protocol_id, block=block, data=data))
+            db.flush()
+            kept_ids = (
+                select(StateSnapshot.id)
+                .where(StateSnapshot.protocol_id == protocol_id)
+                .order_by(desc(StateSnapshot.block))
+                .limit(keep_last)
+            )
+            db.query(StateSnapshot).filter(
+                StateSnapshot.protocol_id == protocol_id,
+                StateSnapshot.id.not_in(kept_ids),
+            ).delete(synchronize_session=False)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise e
+        finally:
+            db.close()
+
+    def get_latest_state_snapshot(self, protocol_id: str) -> StateSnapshot | None:
+        """
+        Retrieves the most recent state snapshot of the protocol.
+        :param protocol_id: The protocol ID of the state.
+        :return: StateSnapshot | None
+        """
+        db = self.Session()
+        try:
+            return (
+                db.query(StateSnapshot)
+                .filter(StateSnapshot.protocol_id == protocol_id)
+                .order_by(desc(StateSnapshot.block))
+                .first()
+            )
+        finally:
+            db.close()
+
+    def get_event_cursor(self, protocol_id: ProtocolIDs) -> Optional[int]:
+        """
+        Retrieves the last block up to which the events of the protocol are ingested.
+        :param protocol_id: ProtocolIDs - The protocol ID of the events.
+        :return: int | None if the events of the protocol were never ingested.
+        """
+        db = self.Session()
+        try:
+            return db.scalar(
+                select(EventCursor.block).where(EventCursor.protocol_id == protocol_id)
+            )
+        finally:
+            db.close()
+
+    def get_last_vesu_position_block(self) -> Optional[int]:
+        """
+        Retrieves the last block a Vesu position changed at.
+        :return: int | None if there are no positions.
+        """
+        db = self.Session()
+        try:
+            return db.scalar(select(func.max(VesuPosition.block_number)))
+        finally:
+            db.close()
+
+    def write_vesu_positions(self, positions: Iterable[dict], cursor_block: int) -> int:
+        """
+        Upserts Vesu positions by (user, pool_id, collateral_asset, debt_asset), keeping the
+        latest block of every position, and moves the Vesu event cursor to `cursor_block`,
+        in one transaction, so that an interrupted ingestion resumes after the last
+        written page.
+        :param positions: Iterable of dicts with the keys user, pool_id, collateral_asset,
+            debt_asset and block_number.
+        :param cursor_block: The last block whose events are all included.
+        :return: The number of upserted positions.
+        :raise SQLAlchemyError: If the database operation fails.
+        """
+        # One row per key, a statement can not update the same row twice
+        latest_positions = {}
+        for position in positions:
+            key = (
+                position["user"],
+                position["pool_id"],
+                position["collateral_asset"],
+                position["debt_asset"],
+            )
+            latest = latest_positions.get(key)
+            if latest is None or position["block_number"] >= latest["block_number"]:
+                latest_positions[key] = position
+
+        db: Session = self.Session()
+        try:
+            if latest_positions:
+                stmt = insert(VesuPosition).values(list(latest_positions.values()))
+                stmt = stmt.on_conflict_do_update(
+                    constraint="vesu_positions_user_pool_id_assets_key",
+                    set_={
+                        "block_number": func.greatest(
+                            VesuPosition.block_number, stmt.excluded.block_number
+                        )
+                    },
+                )
+                db.execute(stmt)
+            cursor_stmt = insert(EventCursor).values(
+                protocol_id=ProtocolIDs.VESU, block=cursor_block
+            )
+            db.execute(
+                cursor_stmt.on_conflict_do_update(
+                    index_elements=[EventCursor.protocol_id],
+                    set_={"block": cursor_stmt.excluded.block},
+                )
+            )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise e
+        finally:
+            db.close()
+        logger.info(
+            f"Upserted {len(latest_positions)} Vesu positions up to block {cursor_block}."
+        )
+        return len(latest_positions)
+
     def get_all_block_records(self, model: Type[ModelType] = None) -> Query:
         """
         Retrieves all rows of given model in descending order.
@@ -479,6 +998,17 @@ class InitializerDBConnector:
         finally:
             session.close()
 
+    def get_all_zklend(self) -> List[ZkLendCollateralDebt]:
+        """
+        Retrieve all ZkLendCollateralDebt records.
+        :return: A list of ZkLendCollateralDebt objects.
+        """
+        session = self.Session()
+        try:
+            return session.query(ZkLendCollateralDebt).all()
+        finally:
+            session.close()
+
     @staticmethod
     def _convert_decimal_to_float(data: dict | None) -> dict | None:
         """
@@ -548,7 +1078,12 @@ class ZkLendEventDBConnector(DBConnector):
     """
 
     def create_accumulator_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates an AccumulatorsSyncEventModel record in the database.
@@ -557,24 +1092,30 @@ class ZkLendEventDBConnector(DBConnector):
         :param block_number: The block number associated with the event.
         :param event_data: A dictionary containing 'token', 'lending_accumulator', and
         'debt_accumulator'.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = AccumulatorsSyncEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             token=event_data.get("token"),
             lending_accumulator=event_data.get("lending_accumulator"),
             debt_accumulator=event_data.get("debt_accumulator"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"AccumulatorsSyncEvent saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating AccumulatorsSyncEventModel: {e}")
             raise e
 
     def create_liquidation_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a LiquidationEventModel record in the database.
@@ -584,11 +1125,13 @@ class ZkLendEventDBConnector(DBConnector):
         :param event_data: A dictionary containing 'liquidator', 'user', 'debt_token',
         'debt_raw_amount', 'debt_face_amount',
         'collateral_token', and 'collateral_amount'.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = LiquidationEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             liquidator=event_data.get("liquidator"),
             user=event_data.get("user"),
             debt_token=event_data.get("debt_token"),
@@ -599,13 +1142,17 @@ class ZkLendEventDBConnector(DBConnector):
         )
         try:
             self.write_to_db(event)
-            logger.info(f"LiquidationEvent saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating LiquidationEventModel: {e}")
             raise e
 
     def create_repayment_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a RepaymentEventModel record in the database.
@@ -613,11 +1160,13 @@ class ZkLendEventDBConnector(DBConnector):
         :param event_name: The name of the event.
         :param block_number: The block number associated with the event.
         :param event_data: A dictionary containing 'user', 'amount'.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = RepaymentEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             repayer=event_data.get("repayer"),
             beneficiary=event_data.get("beneficiary"),
             token=event_data.get("token"),
@@ -626,13 +1175,17 @@ class ZkLendEventDBConnector(DBConnector):
         )
         try:
             self.write_to_db(event)
-            logger.info(f"RepaymentEvent saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating RepaymentEventModel: {e}")
             raise e
 
     def create_borrowing_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a BorrowingEventModel record in the database.
@@ -640,11 +1193,13 @@ class ZkLendEventDBConnector(DBConnector):
         :param event_name: The name of the event.
         :param block_number: The block number associated with the event.
         :param event_data: A dictionary containing 'user', 'token', 'raw_amount', 'face_amount'.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = BorrowingEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             user=event_data.get("user"),
             token=event_data.get("token"),
             raw_amount=event_data.get("raw_amount"),
@@ -652,13 +1207,17 @@ class ZkLendEventDBConnector(DBConnector):
         )
         try:
             self.write_to_db(event)
-            logger.info(f"BorrowingEvent saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating BorrowingEventModel: {e}")
             raise e
 
     def create_deposit_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a DepositEventModel record in the database.
@@ -666,24 +1225,30 @@ class ZkLendEventDBConnector(DBConnector):
         :param event_name: The name of the event.
         :param block_number: The block number associated with the event.
         :param event_data: A dictionary containing 'user', 'token', 'face_amount'.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = DepositEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             user=event_data.get("user"),
             token=event_data.get("token"),
             face_amount=event_data.get("face_amount"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"DepositEvent saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating DepositEventModel: {e}")
             raise e
 
     def create_withdrawal_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a WithdrawalEventModel record in the database.
@@ -691,24 +1256,30 @@ class ZkLendEventDBConnector(DBConnector):
         :param event_name: The name of the event.
         :param block_number: The block number associated with the event.
         :param event_data: A dictionary containing 'user', 'token', 'face_amount'.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = WithdrawalEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             user=event_data.get("user"),
             token=event_data.get("token"),
             amount=event_data.get("amount"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"WithdrawalEvent saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating WithdrawalEventModel: {e}")
             raise e
 
     def create_collateral_enabled_disabled_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a CollateralEnabledDisabledEventModel record in the database.
@@ -716,17 +1287,18 @@ class ZkLendEventDBConnector(DBConnector):
         :param event_name: The name of the event.
         :param block_number: The block number associated with the event.
         :param event_data: A dictionary containing 'user', 'token'.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = CollateralEnabledDisabledEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             user=event_data.get("user"),
             token=event_data.get("token"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"CollateralEnabledDisabledEvent saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating CollateralEnabledDisabledEventModel: {e}")
             raise e
@@ -776,143 +1348,185 @@ class NostraEventDBConnector(DBConnector):
     """
 
     def create_bearing_collateral_burn_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a BearingCollateralBurnEventModel record in the database.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = BearingCollateralBurnEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             user=event_data.get("user"),
             amount=event_data.get("amount"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"BearingCollateralBurn event saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating BearingCollateralBurnEventModel: {e}")
             raise e
 
     def create_bearing_collateral_mint_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a BearingCollateralMintEventModel record in the database.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = BearingCollateralMintEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             user=event_data.get("user"),
             amount=event_data.get("amount"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"BearingCollateralMint event saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating BearingCollateralMintEventModel: {e}")
             raise e
 
     def create_debt_burn_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a DebtBurnEventModel record in the database.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = DebtBurnEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             user=event_data.get("user"),
             amount=event_data.get("amount"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"DebtBurn event saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating DebtBurnEventModel: {e}")
             raise e
 
     def create_debt_mint_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a DebtMintEventModel record in the database.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = DebtMintEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             user=event_data.get("user"),
             amount=event_data.get("amount"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"DebtMint event saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating DebtMintEventModel: {e}")
             raise e
 
     def create_debt_transfer_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a DebtTransferEventModel record in the database.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = DebtTransferEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             sender=event_data.get("sender"),
             recipient=event_data.get("recipient"),
             amount=event_data.get("amount"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"DebtTransfer event saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating DebtTransferEventModel: {e}")
             raise e
 
     def create_interest_rate_model_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a InterestRateModelEventModel record in the database.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = InterestRateModelEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             debt_token=event_data.get("debt_token"),
             lending_index=event_data.get("lending_index"),
             borrow_index=event_data.get("borrow_index"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"InterestRateModel event saved: {event}")
         except SQLAlchemyError as e:
             logger.error(f"Error creating InterestRateModelEventModel: {e}")
             raise e
 
     def create_non_interest_bearing_collateral_burn_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a NonInterestBearingCollateralBurnEventModel record in the database.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = NonInterestBearingCollateralBurnEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             user=event_data.get("user"),
             amount=event_data.get("amount"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"NonInterestBearingCollateralBurn event saved: {event}")
         except SQLAlchemyError as e:
             logger.error(
                 f"Error creating NonInterestBearingCollateralBurnEventModel: {e}"
@@ -920,22 +1534,28 @@ class NostraEventDBConnector(DBConnector):
             raise e
 
     def create_non_interest_bearing_collateral_mint_event(
-        self, protocol_id: str, event_name: str, block_number: int, event_data: dict
+        self,
+        protocol_id: str,
+        event_name: str,
+        block_number: int,
+        event_data: dict,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Creates a NonInterestBearingCollateralMintEventModel record in the database.
+        :param event_id: The DeRisk API ID of the event.
         """
         event = NonInterestBearingCollateralMintEventModel(
             protocol_id=protocol_id,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             sender=event_data.get("sender"),
             recipient=event_data.get("recipient"),
             amount=event_data.get("amount"),
         )
         try:
             self.write_to_db(event)
-            logger.info(f"NonInterestBearingCollateralMint event saved: {event}")
         except SQLAlchemyError as e:
             logger.error(
                 f"Error creating NonInterestBearingCollateralMintEventModel: {e}"
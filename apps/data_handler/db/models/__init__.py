@@ -1,9 +1,11 @@
 """This module contains all the models used in the database."""
 
+from data_handler.db.models.event import EventCursor
 from data_handler.db.models.liquidable_debt import LiquidableDebt
 from data_handler.db.models.loan_states import (
     InterestRate,
     LoanState,
+    StateSnapshot,
     ZkLendCollateralDebt,
 )
 from data_handler.db.models.order_book import OrderBookModel
@@ -8,8 +8,10 @@ num to enforce valid protocol IDs.
 Fields are indexed for efficient querying.
 """
 
+from typing import Optional
+
 from sqlalchemy_utils.types.choice import ChoiceType
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import BigInteger, Column, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from shared.db.base import Base
@@ -32,6 +34,9 @@ class EventBaseModel(Base):
     The block number in which the event occurred. This field is also indexed to allow
     efficient filtering by block number.
     protocol_id : str
+    event_id : str | None
+    The ID of the event in the DeRisk API. Unique, so that re-ingesting a block range
+    does not duplicate events.
     """
 
     __tablename__ = "event_base_model"
@@ -40,7 +45,24 @@ class EventBaseModel(Base):
     event_name: Mapped[str] = mapped_column(String, index=True)
     block_number: Mapped[int] = mapped_column(Integer, index=True)
     protocol_id = Column(ChoiceType(ProtocolIDs, impl=String()), nullable=False)
+    event_id: Mapped[Optional[str]] = mapped_column(
+        String, nullable=True, unique=True, index=True
+    )
 
     __mapper_args__ = {
         "polymorphic_identity": "event_base",
     }
+
+
+class EventCursor(Base):
+    """
+    Stores how far the on-chain events of a protocol are ingested: all events up to and
+    including `block` are persisted.
+    """
+
+    __tablename__ = "event_cursor"
+
+    protocol_id = Column(
+        ChoiceType(ProtocolIDs, impl=String()), nullable=False, unique=True
+    )
+    block = Column(BigInteger, nullable=False)
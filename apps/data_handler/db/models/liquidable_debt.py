@@ -23,3 +23,5 @@ class LiquidableDebt(Base):
     collateral_token_price = Column(DECIMAL, nullable=False)
     collateral_token = Column(String, nullable=False)
     debt_token = Column(String, nullable=False)
+    # The block of the loan states the liquidable debt was computed from.
+    block = Column(BigInteger, nullable=True, index=True)
@@ -2,11 +2,20 @@
 
 from decimal import Decimal
 
-from sqlalchemy import Column, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Integer,
+    LargeBinary,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.types import JSON
+from sqlalchemy_utils.types.choice import ChoiceType
 
 from data_handler.db.models.base import BaseState
 from shared.db.base import Base
+from shared.protocol_ids import ProtocolIDs
 
 
 class LoanState(BaseState):
@@ -39,6 +48,19 @@ class InterestRate(BaseState):
         return collateral, debt
 
 
+class StateSnapshot(Base):
+    """
+    SQLAlchemy model for the state_snapshot table.
+    Stores the binary snapshot of a protocol state which includes all events up to `block`.
+    """
+
+    __tablename__ = "state_snapshot"
+
+    protocol_id = Column(ChoiceType(ProtocolIDs, impl=String()), nullable=False)
+    block = Column(BigInteger, nullable=False, index=True)
+    data = Column(LargeBinary, nullable=False)
+
+
 class ZkLendCollateralDebt(Base):
     """
     SQLAlchemy model for table with obligation data for ZkLend.
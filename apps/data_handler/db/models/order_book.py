@@ -1,7 +1,7 @@
 """This module contains the OrderBookModel class representing
 an order book entry in the database."""
 
-from sqlalchemy import DECIMAL, BigInteger, Column, String
+from sqlalchemy import DECIMAL, BigInteger, Column, Index, String
 from sqlalchemy.types import JSON
 
 from shared.db.base import Base
@@ -13,6 +13,16 @@ class OrderBookModel(Base):
     """
 
     __tablename__ = "orderbook"
+    __table_args__ = (
+        # Serves the lookups of the latest order book of a pair on a DEX
+        Index(
+            "ix_orderbook_dex_token_a_token_b_timestamp",
+            "dex",
+            "token_a",
+            "token_b",
+            "timestamp",
+        ),
+    )
 
     token_a = Column(String, nullable=False, index=True)
     token_b = Column(String, nullable=False, index=True)
@@ -22,3 +32,5 @@ class OrderBookModel(Base):
     current_price = Column(DECIMAL, nullable=True)
     asks = Column(JSON, nullable=True)
     bids = Column(JSON, nullable=True)
+    # Cumulative depth of the asks and bids, see `order_books.depth.build_depth`
+    depth = Column(JSON, nullable=True)
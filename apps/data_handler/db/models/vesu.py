@@ -1,9 +1,19 @@
-from sqlalchemy import BigInteger, Column, String
+from sqlalchemy import BigInteger, Column, String, UniqueConstraint
 from shared.db.base import Base
 
 
 class VesuPosition(Base):
     __tablename__ = "vesu_positions"
+    # Positions are upserted by their key, see `DBConnector.write_vesu_positions`
+    __table_args__ = (
+        UniqueConstraint(
+            "user",
+            "pool_id",
+            "collateral_asset",
+            "debt_asset",
+            name="vesu_positions_user_pool_id_assets_key",
+        ),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     user = Column(String, index=True)
@@ -54,6 +54,7 @@ class OrderBookResponseModel(BaseModel):
     current_price: Decimal
     asks: List[tuple[float, float]]
     bids: List[tuple[float, float]]
+    depth: Optional[dict] = None
 
     @field_validator("asks", "bids")
     def convert_decimals_to_floats(
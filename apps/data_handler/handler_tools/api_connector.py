@@ -1,7 +1,12 @@
-"""Module for making HTTP GET requests to the DeRisk API using the `requests` library."""
+"""Module for making HTTP GET requests to the DeRisk API using the `requests` library,
+or concurrently using `aiohttp`."""
 
+import asyncio
+import json
 import os
+from typing import Iterable, Optional
 
+import aiohttp
 import requests
 from dotenv import load_dotenv
 
@@ -13,6 +18,9 @@ class DeRiskAPIConnector:
     Class for making HTTP GET requests to the DeRisk API using the `requests` library.
     """
 
+    # The total size of the received responses, used to adapt the page size
+    received_bytes: int = 0
+
     def __init__(self):
         """
         Constructor for the DeRiskAPIConnector class.
@@ -71,6 +79,114 @@ class DeRiskAPIConnector:
         try:
             response = requests.get(self.api_url, params=params)
             response.raise_for_status()
+            self.received_bytes += len(response.content)
             return response.json()
         except requests.RequestException as e:
             return {"error": str(e)}
+
+
+class AsyncDeRiskAPIConnector(DeRiskAPIConnector):
+    """
+    Asynchronous DeRisk API connector. All requests share one pooled keep-alive HTTP session,
+    which limits the number of concurrent requests to `max_concurrency`.
+
+    Example usage:
+    async with AsyncDeRiskAPIConnector() as connector:
+        data = await connector.fetch_addresses_data(addresses, 630000, 631000)
+    """
+
+    def __init__(self, max_concurrency: int = 8, timeout: float = 60.0):
+        """
+        Constructor for the AsyncDeRiskAPIConnector class.
+        :param max_concurrency: The maximum number of concurrent requests.
+        :param timeout: The total timeout of a request in seconds.
+        """
+        super().__init__()
+        self.max_concurrency = max_concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncDeRiskAPIConnector":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """
+        Opens the pooled HTTP session, if it is not open yet.
+        """
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=self.timeout,
+            )
+
+    async def close(self) -> None:
+        """
+        Closes the pooled HTTP session.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def fetch_data(
+        self, from_address: str, min_block_number: int, max_block_number: int
+    ) -> list | dict:
+        """
+        Asynchronous counterpart of `get_data`.
+
+        :param from_address: The address of the contract or account on StarkNet.
+        :param min_block_number: The minimum block number from which to retrieve events.
+        :param max_block_number: The maximum block number to which to retrieve events.
+        :return: The API response data, or a dictionary with the error.
+        """
+        self._validate_data(from_address, min_block_number, max_block_number)
+        await self.open()
+        params = {
+            "from_address": from_address,
+            "min_block_number": min_block_number,
+            "max_block_number": max_block_number,
+        }
+        try:
+            async with self.session.get(self.api_url, params=params) as response:
+                response.raise_for_status()
+                body = await response.read()
+            self.received_bytes += len(body)
+            return json.loads(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            return {"error": str(e) or type(e).__name__}
+
+    async def fetch_addresses_data(
+        self,
+        from_addresses: Iterable[str],
+        min_block_number: int,
+        max_block_number: int,
+    ) -> list[dict]:
+        """
+        Retrieves the events of all addresses for the block range concurrently.
+
+        :param from_addresses: The addresses of the contracts on StarkNet.
+        :param min_block_number: The minimum block number from which to retrieve events.
+        :param max_block_number: The maximum block number to which to retrieve events.
+        :return: The events of all addresses.
+        :raise ConnectionError: If the events of an address could not be retrieved, so that
+            no block range is skipped partially.
+        """
+        from_addresses = list(from_addresses)
+        responses = await asyncio.gather(
+            *(
+                self.fetch_data(from_address, min_block_number, max_block_number)
+                for from_address in from_addresses
+            )
+        )
+        result_data: list[dict] = []
+        for from_address, response in zip(from_addresses, responses):
+            if isinstance(response, dict) and "error" in response:
+                raise ConnectionError(
+                    f"Failed to fetch events of {from_address} from block "
+                    f"{min_block_number} to {max_block_number}: {response['error']}"
+                )
+            result_data.extend(response)
+        return result_data
@@ -0,0 +1,160 @@
+"""
+Adaptive block-window pagination for fetching events from the DeRisk API.
+
+The block window grows while pages are sparse, so that empty stretches of the chain cost
+few requests, and shrinks when a page holds more events or bytes than targeted, so that busy
+stretches do not produce huge pages.
+"""
+
+import logging
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PaginationPolicy:
+    """
+    The policy of an `AdaptivePaginator`.
+
+    :param initial_size: The number of blocks of the first window.
+    :param min_size: The minimum number of blocks of a window.
+    :param max_size: The maximum number of blocks of a window.
+    :param target_events: The targeted number of events per page.
+    :param max_response_bytes: The maximum targeted response size of a page, if any.
+    :param growth_factor: The maximum factor by which the window grows after a page.
+    :param sparse_ratio: Pages with less than `sparse_ratio * target_events` events
+        are considered sparse and grow the window.
+    """
+
+    initial_size: int = 1000
+    min_size: int = 100
+    max_size: int = 50_000
+    target_events: int = 2000
+    max_response_bytes: Optional[int] = 8 * 1024 * 1024
+    growth_factor: float = 2.0
+    sparse_ratio: float = 0.25
+
+    def __post_init__(self):
+        if not 0 < self.min_size <= self.initial_size <= self.max_size:
+            raise ValueError(
+                "The window sizes must satisfy 0 < min_size <= initial_size <= max_size"
+            )
+        if self.target_events <= 0 or self.growth_factor < 1:
+            raise ValueError(
+                "target_events must be positive and growth_factor at least 1"
+            )
+
+
+@dataclass
+class PaginationStats:
+    """
+    Statistics of the pages observed by an `AdaptivePaginator`.
+    """
+
+    pages: int = 0
+    empty_pages: int = 0
+    events: int = 0
+    blocks: int = 0
+    response_bytes: int = 0
+    grown: int = 0
+    shrunk: int = 0
+    max_page_events: int = 0
+    last_page_events: int = 0
+    last_window_size: int = 0
+
+
+class AdaptivePaginator:
+    """
+    Determines the block windows to fetch events for and adapts their size to the
+    observed pages.
+
+    Example usage:
+    paginator = AdaptivePaginator(PaginationPolicy(initial_size=1000))
+    min_block, max_block = paginator.next_window(630000)
+    events = api_connector.get_data(address, min_block, max_block)
+    paginator.record_page(len(events))
+    """
+
+    def __init__(self, policy: Optional[PaginationPolicy] = None):
+        """
+        :param policy: The pagination policy, defaults to `PaginationPolicy()`.
+        """
+        self.policy = policy or PaginationPolicy()
+        self.window_size: int = self.policy.initial_size
+        self.stats = PaginationStats()
+
+    def next_window(self, start_block: int) -> tuple[int, int]:
+        """
+        Returns the next block window starting at the given block.
+        :param start_block: The first block of the window.
+        :return: (min_block, max_block)
+        """
+        return start_block, start_block + self.window_size
+
+    def record_page(
+        self, event_count: int, response_bytes: Optional[int] = None
+    ) -> int:
+        """
+        Records the page of the current window and adapts the size of the next windows.
+        :param event_count: The number of events of the page.
+        :param response_bytes: The response size of the page, if known.
+        :return: The new window size.
+        """
+        policy = self.policy
+        stats = self.stats
+        stats.pages += 1
+        stats.events += event_count
+        stats.blocks += self.window_size
+        stats.response_bytes += response_bytes or 0
+        stats.empty_pages += not event_count
+        stats.max_page_events = max(stats.max_page_events, event_count)
+        stats.last_page_events = event_count
+        stats.last_window_size = self.window_size
+
+        # Scale the window towards the targeted page size. Oversized pages shrink it
+        # proportionally, sparse pages grow it by at most `growth_factor`.
+        scale = 1.0
+        if event_count > policy.target_events:
+            scale = policy.target_events / event_count
+        if (
+            policy.max_response_bytes
+            and (response_bytes or 0) > policy.max_response_bytes
+        ):
+            scale = min(scale, policy.max_response_bytes / response_bytes)
+        if scale == 1.0 and event_count < policy.target_events * policy.sparse_ratio:
+            scale = (
+                policy.target_events / event_count
+                if event_count
+                else policy.growth_factor
+            )
+        scale = min(scale, policy.growth_factor)
+
+        window_size = int(
+            min(max(self.window_size * scale, policy.min_size), policy.max_size)
+        )
+        if window_size > self.window_size:
+            stats.grown += 1
+        elif window_size < self.window_size:
+            stats.shrunk += 1
+        self.window_size = window_size
+        return window_size
+
+    def metrics(self) -> dict:
+        """
+        Returns the policy, the current window size and the page statistics.
+        :return: dict
+        """
+        return {
+            "window_size": self.window_size,
+            **{f"policy_{key}": value for key, value in asdict(self.policy).items()},
+            **asdict(self.stats),
+        }
+
+    def log_metrics(self, name: str) -> None:
+        """
+        Logs the metrics of the paginator.
+        :param name: The name of the paginated process, e.g. the protocol.
+        """
+        logger.info(f"{name} pagination metrics: {self.metrics()}")
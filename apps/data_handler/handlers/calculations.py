@@ -1,10 +1,10 @@
-import asyncio
 import json
 import logging
 
 from celery import shared_task
 from shared.redis_client import redis_client
 from shared.amms import SwapAmm
+from shared.rpc_gateway import run_with_rpc_sessions
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +19,7 @@ def fetch_balance_for_pools():
     logger.info(f"Run fetch_balance_for_pools")
     swap_amm = SwapAmm()
     swap_amm.__init__()
-    result = asyncio.run(swap_amm.get_balance())
+    result = run_with_rpc_sessions(swap_amm.get_balance())
     data = {}
     for symbol, pool in result.items():
         for token in pool:
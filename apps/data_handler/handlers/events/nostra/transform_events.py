@@ -5,11 +5,12 @@ which is used to transform Nostra events.
 
 import logging
 from decimal import Decimal
-from typing import Callable, Dict, Tuple
+from typing import Callable, Dict, Optional, Tuple
 import time
 
 from data_handler.db.crud import NostraEventDBConnector
 from data_handler.handler_tools.api_connector import DeRiskAPIConnector
+from data_handler.handler_tools.pagination import AdaptivePaginator, PaginationPolicy
 from data_handler.handler_tools.constants import ProtocolAddresses
 from shared.data_parser.nostra import NostraDataParser
 from shared.data_parser.serializers import (
@@ -35,6 +36,7 @@ class NostraTransformer:
     PROTOCOL_ADDRESSES: str = ProtocolAddresses().NOSTRA_ALPHA_ADDRESSES
     PROTOCOL_TYPE: ProtocolIDs = ProtocolIDs.NOSTRA_ALPHA
     PAGINATION_SIZE: int = 1000
+    PAGINATION_POLICY: Optional[PaginationPolicy] = None
 
     def __init__(self):
         """
@@ -44,6 +46,12 @@ class NostraTransformer:
         self.api_connector = DeRiskAPIConnector()
         self.db_connector = NostraEventDBConnector()
         self.last_block = self.db_connector.get_last_block(self.PROTOCOL_TYPE)
+        # The first block of the first window fetched by `run`
+        self.start_block: Optional[int] = None
+        self.paginator = AdaptivePaginator(
+            self.PAGINATION_POLICY
+            or PaginationPolicy(initial_size=self.PAGINATION_SIZE)
+        )
         self.data_parser = NostraDataParser()
 
         self.EVENT_MAPPING: Dict[str, Tuple[Callable, str]] = {
@@ -83,9 +91,10 @@ class NostraTransformer:
 
     def fetch_and_transform_events(
         self, from_address: str, min_block: int, max_block: int
-    ) -> None:
+    ) -> int:
         """
         Fetch events from the DeRisk API and transform them into database models.
+        :return: The number of fetched events.
         """
         # Fetch events using the API connector
         response = self.api_connector.get_data(
@@ -97,25 +106,30 @@ class NostraTransformer:
         if "error" in response:
             raise ValueError(f"Error fetching events: {response['error']}")
 
-        # Process each event based on its type
-        for event in response:
-            event_type = event.get("key_name")
-            if event_type not in self.EVENT_MAPPING:
-                continue
-            parser_func, save_to_db_method_name = self.EVENT_MAPPING[event_type]
-            parsed_data = parser_func(event["data"])
+        # Process each event based on its type, the events of the page are saved in
+        # one transaction when the batch is closed
+        with self.db_connector.event_batch():
+            for event in response:
+                event_type = event.get("key_name")
+                if event_type not in self.EVENT_MAPPING:
+                    continue
+                parser_func, save_to_db_method_name = self.EVENT_MAPPING[event_type]
+                parsed_data = parser_func(event["data"])
 
-            getattr(self, save_to_db_method_name)(
-                event_name=event_type,
-                block_number=event.get("block_number"),
-                event_data=parsed_data,
-            )
+                getattr(self, save_to_db_method_name)(
+                    event_name=event_type,
+                    block_number=event.get("block_number"),
+                    event_data=parsed_data,
+                    event_id=event.get("id"),
+                )
+        return len(response)
 
     def save_bearing_collateral_burn_event(
         self,
         event_name: str,
         block_number: int,
         event_data: BearingCollateralBurnEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a BearingCollateralBurn event to the database.
@@ -124,20 +138,19 @@ class NostraTransformer:
             protocol_id=self.PROTOCOL_TYPE.value,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "user": event_data.user,
                 "amount": Decimal(event_data.amount),
             },
         )
-        logger.info(
-            f"Saved BearingCollateralBurn event: User={event_data.user}, Amount={event_data.amount}"
-        )
 
     def save_bearing_collateral_mint_event(
         self,
         event_name: str,
         block_number: int,
         event_data: BearingCollateralMintEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a BearingCollateralMint event to the database.
@@ -146,17 +159,19 @@ class NostraTransformer:
             protocol_id=self.PROTOCOL_TYPE.value,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "user": event_data.user,
                 "amount": Decimal(event_data.amount),
             },
         )
-        logger.info(
-            f"Saved BearingCollateralMint event: User={event_data.user}, Amount={event_data.amount}"
-        )
 
     def save_debt_mint_event(
-        self, event_name: str, block_number: int, event_data: DebtMintEventData
+        self,
+        event_name: str,
+        block_number: int,
+        event_data: DebtMintEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a DebtMint event to the database.
@@ -165,17 +180,19 @@ class NostraTransformer:
             protocol_id=self.PROTOCOL_TYPE.value,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "user": event_data.user,
                 "amount": Decimal(event_data.amount),
             },
         )
-        logger.info(
-            f"Saved DebtMint event: User={event_data.user}, Amount={event_data.amount}"
-        )
 
     def save_debt_burn_event(
-        self, event_name: str, block_number: int, event_data: DebtBurnEventData
+        self,
+        event_name: str,
+        block_number: int,
+        event_data: DebtBurnEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a DebtBurn event to the database.
@@ -184,17 +201,19 @@ class NostraTransformer:
             protocol_id=self.PROTOCOL_TYPE.value,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "user": event_data.user,
                 "amount": Decimal(event_data.amount),
             },
         )
-        logger.info(
-            f"Saved DebtBurn event: User={event_data.user}, Amount={event_data.amount}"
-        )
 
     def save_debt_transfer_event(
-        self, event_name: str, block_number: int, event_data: DebtTransferEventData
+        self,
+        event_name: str,
+        block_number: int,
+        event_data: DebtTransferEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a DebtTransfer event to the database.
@@ -203,21 +222,20 @@ class NostraTransformer:
             protocol_id=self.PROTOCOL_TYPE.value,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "sender": event_data.sender,
                 "recipient": event_data.recipient,
                 "amount": Decimal(event_data.amount),
             },
         )
-        logger.info(
-            f"Saved DebtTransfer event: Sender={event_data.sender}, Recipient={event_data.recipient}, Amount={event_data.amount}"
-        )
 
     def save_interest_rate_model_event(
         self,
         event_name: str,
         block_number: int,
         event_data: InterestRateModelEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save an InterestRateModel event to the database.
@@ -226,21 +244,20 @@ class NostraTransformer:
             protocol_id=self.PROTOCOL_TYPE.value,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "debt_token": event_data.debt_token,
                 "lending_index": Decimal(event_data.lending_index),
                 "borrow_index": Decimal(event_data.borrow_index),
             },
         )
-        logger.info(
-            f"Saved InterestRateModel event: DebtToken={event_data.debt_token}, LendingIndex={event_data.lending_index}, BorrowIndex={event_data.borrow_index}"
-        )
 
     def save_non_interest_bearing_collateral_burn_event(
         self,
         event_name: str,
         block_number: int,
         event_data: NonInterestBearingCollateralBurnEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a NonInterestBearingCollateralBurn event to the database.
@@ -249,20 +266,19 @@ class NostraTransformer:
             protocol_id=self.PROTOCOL_TYPE.value,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "user": event_data.user,
                 "amount": Decimal(event_data.face_amount),
             },
         )
-        logger.info(
-            f"Saved NonInterestBearingCollateralBurn event: User={event_data.user}, Amount={event_data.face_amount}"
-        )
 
     def save_non_interest_bearing_collateral_mint_event(
         self,
         event_name: str,
         block_number: int,
         event_data: NonInterestBearingCollateralMintEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a NonInterestBearingCollateralMint event to the database.
@@ -271,15 +287,13 @@ class NostraTransformer:
             protocol_id=self.PROTOCOL_TYPE.value,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "sender": event_data.sender,
                 "recipient": event_data.recipient,
                 "amount": Decimal(event_data.raw_amount),
             },
         )
-        logger.info(
-            f"Saved NonInterestBearingCollateralMint event: Sender={event_data.sender}, Recipient={event_data.recipient}, Amount={event_data.raw_amount}"
-        )
 
     def run(self) -> None:
         """
@@ -291,17 +305,25 @@ class NostraTransformer:
             retry = 0
             while retry < max_retries:
                 try:
-                    self.fetch_and_transform_events(
+                    min_block, max_block = self.paginator.next_window(self.last_block)
+                    if self.start_block is None:
+                        self.start_block = min_block
+                    received_bytes = self.api_connector.received_bytes
+                    event_count = self.fetch_and_transform_events(
                         from_address=address,
-                        min_block=self.last_block,
-                        max_block=self.last_block + self.PAGINATION_SIZE,
+                        min_block=min_block,
+                        max_block=max_block,
+                    )
+                    self.paginator.record_page(
+                        event_count, self.api_connector.received_bytes - received_bytes
                     )
-                    self.last_block += self.PAGINATION_SIZE
+                    self.last_block = max_block
                     retry += 1
                 except Exception as e:
                     logger.error(f"Error during fetching or saving events: {e}")
             if retry == max_retries:
                 logger.info(f"Reached max retries for address {address}")
+        self.paginator.log_metrics("Nostra events")
 
 
 if __name__ == "__main__":
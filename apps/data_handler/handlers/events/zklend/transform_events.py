@@ -7,7 +7,8 @@ import logging
 from pydantic import BaseModel
 from shared.db.base import Base
 from data_handler.handler_tools.api_connector import DeRiskAPIConnector
-from typing import Dict, Any, Tuple, Type, Callable
+from data_handler.handler_tools.pagination import AdaptivePaginator, PaginationPolicy
+from typing import Dict, Any, Optional, Tuple, Type, Callable
 from shared.protocol_ids import ProtocolIDs
 from shared.data_parser.zklend import ZklendDataParser
 
@@ -89,6 +90,7 @@ class ZklendTransformer:
     PROTOCOL_ADDRESSES: str = ProtocolAddresses.ZKLEND_MARKET_ADDRESSES
     PROTOCOL_TYPE: ProtocolIDs = ProtocolIDs.ZKLEND
     PAGINATION_SIZE: int = 1000
+    PAGINATION_POLICY: Optional[PaginationPolicy] = None
 
     def __init__(self):
         """
@@ -98,12 +100,19 @@ class ZklendTransformer:
         self.api_connector = DeRiskAPIConnector()
         self.db_connector = ZkLendEventDBConnector()
         self.last_block = self.db_connector.get_last_block(self.PROTOCOL_TYPE)
+        # The first block of the first window fetched by `run`
+        self.start_block: Optional[int] = None
+        self.paginator = AdaptivePaginator(
+            self.PAGINATION_POLICY
+            or PaginationPolicy(initial_size=self.PAGINATION_SIZE)
+        )
 
     def fetch_and_transform_events(
         self, from_address: str, min_block: int, max_block: int
-    ) -> None:
+    ) -> int:
         """
         Fetch events from the DeRisk API and transform them into database models.
+        :return: The number of fetched events.
         """
         # Fetch events using the API connector
         response = self.api_connector.get_data(
@@ -115,23 +124,33 @@ class ZklendTransformer:
         if "error" in response:
             raise ValueError(f"Error fetching events: {response['error']}")
 
-        # Process each event based on its type
-        for event in response:
-            event_type = event.get("key_name")
-            if event_type in self.EVENT_MAPPING:
-                parser_func, save_to_db_method_name = self.EVENT_MAPPING[event_type]
-                parsed_data = parser_func(event["data"])
+        # Process each event based on its type, the events of the page are saved in
+        # one transaction when the batch is closed
+        with self.db_connector.event_batch():
+            for event in response:
+                event_type = event.get("key_name")
+                if event_type in self.EVENT_MAPPING:
+                    parser_func, save_to_db_method_name = self.EVENT_MAPPING[event_type]
+                    parsed_data = parser_func(event["data"])
 
-                getattr(self, save_to_db_method_name)(
-                    event_name=event_type,
-                    block_number=event.get("block_number"),
-                    event_data=parsed_data,
-                )
-            else:
-                logger.info(f"ZKLEND: Event type {event_type} not supported, yet...")
+                    getattr(self, save_to_db_method_name)(
+                        event_name=event_type,
+                        block_number=event.get("block_number"),
+                        event_data=parsed_data,
+                        event_id=event.get("id"),
+                    )
+                else:
+                    logger.info(
+                        f"ZKLEND: Event type {event_type} not supported, yet..."
+                    )
+        return len(response)
 
     def save_accumulators_sync_event(
-        self, event_name: str, block_number: int, event_data: AccumulatorsSyncEventData
+        self,
+        event_name: str,
+        block_number: int,
+        event_data: AccumulatorsSyncEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save an accumulators sync event to the database.
@@ -140,6 +159,7 @@ class ZklendTransformer:
             protocol_id=self.PROTOCOL_TYPE,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "token": event_data.token,
                 "lending_accumulator": event_data.lending_accumulator,
@@ -148,7 +168,11 @@ class ZklendTransformer:
         )
 
     def save_liquidation_event(
-        self, event_name: str, block_number: int, event_data: LiquidationEventData
+        self,
+        event_name: str,
+        block_number: int,
+        event_data: LiquidationEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a liquidation event to the database.
@@ -157,6 +181,7 @@ class ZklendTransformer:
             protocol_id=self.PROTOCOL_TYPE,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "liquidator": event_data.liquidator,
                 "user": event_data.user,
@@ -169,7 +194,11 @@ class ZklendTransformer:
         )
 
     def save_borrowing_event(
-        self, event_name: str, block_number: int, event_data: BorrowingEventData
+        self,
+        event_name: str,
+        block_number: int,
+        event_data: BorrowingEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a borrowing event to the database.
@@ -178,6 +207,7 @@ class ZklendTransformer:
             protocol_id=self.PROTOCOL_TYPE,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "user": event_data.user,
                 "token": event_data.token,
@@ -187,7 +217,11 @@ class ZklendTransformer:
         )
 
     def save_deposit_event(
-        self, event_name: str, block_number: int, event_data: DepositEventData
+        self,
+        event_name: str,
+        block_number: int,
+        event_data: DepositEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a deposit event to the database.
@@ -196,6 +230,7 @@ class ZklendTransformer:
             protocol_id=self.PROTOCOL_TYPE,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "user": event_data.user,
                 "token": event_data.token,
@@ -204,7 +239,11 @@ class ZklendTransformer:
         )
 
     def save_withdrawal_event(
-        self, event_name: str, block_number: int, event_data: WithdrawalEventData
+        self,
+        event_name: str,
+        block_number: int,
+        event_data: WithdrawalEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a withdrawal event to the database.
@@ -213,6 +252,7 @@ class ZklendTransformer:
             protocol_id=self.PROTOCOL_TYPE,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "user": event_data.user,
                 "token": event_data.token,
@@ -225,6 +265,7 @@ class ZklendTransformer:
         event_name: str,
         block_number: int,
         event_data: CollateralEnabledDisabledEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a collateral enabled/disabled event to the database.
@@ -233,11 +274,16 @@ class ZklendTransformer:
             protocol_id=self.PROTOCOL_TYPE,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={"user": event_data.user, "token": event_data.token},
         )
 
     def save_repayment_event(
-        self, event_name: str, block_number: int, event_data: RepaymentEventData
+        self,
+        event_name: str,
+        block_number: int,
+        event_data: RepaymentEventData,
+        event_id: Optional[str] = None,
     ) -> None:
         """
         Save a repayment event to the database.
@@ -246,6 +292,7 @@ class ZklendTransformer:
             protocol_id=self.PROTOCOL_TYPE,
             event_name=event_name,
             block_number=block_number,
+            event_id=event_id,
             event_data={
                 "repayer": event_data.repayer,
                 "beneficiary": event_data.beneficiary,
@@ -262,15 +309,23 @@ class ZklendTransformer:
         max_retries = 5
         retry = 0
         while retry < max_retries:
-            self.fetch_and_transform_events(
+            min_block, max_block = self.paginator.next_window(self.last_block)
+            if self.start_block is None:
+                self.start_block = min_block
+            received_bytes = self.api_connector.received_bytes
+            event_count = self.fetch_and_transform_events(
                 from_address=self.PROTOCOL_ADDRESSES,
-                min_block=self.last_block,
-                max_block=self.last_block + self.PAGINATION_SIZE,
+                min_block=min_block,
+                max_block=max_block,
+            )
+            self.paginator.record_page(
+                event_count, self.api_connector.received_bytes - received_bytes
             )
-            self.last_block += self.PAGINATION_SIZE
+            self.last_block = max_block
             retry += 1
         if retry == max_retries:
             logger.info(f"Reached max retries for address {self.PROTOCOL_ADDRESSES}")
+        self.paginator.log_metrics("zkLend events")
 
 
 if __name__ == "__main__":
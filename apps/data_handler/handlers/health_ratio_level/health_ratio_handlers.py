@@ -1,10 +1,10 @@
 """This module contains the health ratio level handlers for different protocols."""
 
-import asyncio
 from datetime import datetime
 from decimal import Decimal
-from typing import Type
+from typing import Optional, Type
 
+import numpy as np
 from data_handler.handlers.liquidable_debt.utils import Prices
 from data_handler.handlers.liquidable_debt.values import (
     HEALTH_FACTOR_FIELD_NAME,
@@ -17,19 +17,32 @@ from shared.loan_entity import (
     NostraMainnetLoanEntity,
     LoanEntity,
 )
-from shared.state import NostraAlphaState, ZkLendState, NostraMainnetState, State
+from shared.state import (
+    LoanMatrix,
+    NostraAlphaState,
+    ZkLendState,
+    NostraMainnetState,
+    State,
+)
 
 from data_handler.db.crud import DBConnector
 from shared.protocol_ids import ProtocolIDs
 from shared.custom_types import TokenValues
+from shared.rpc_gateway import run_with_rpc_sessions
 
 
 class BaseHealthRatioHandler:
     """
     A base handler class that collects data from data_handler.db,
     computes health_ratio level and stores it in the database.
+
+    :cvar PROTOCOL_ID: The protocol of the loan states.
+    :cvar RISK_ADJUSTED_DEBT: Whether the debt is divided by the debt factors.
     """
 
+    PROTOCOL_ID: Optional[str] = None
+    RISK_ADJUSTED_DEBT: bool = False
+
     def __init__(self, state_class: Type[State], loan_entity_class: Type[LoanEntity]):
         self.state_class = state_class
         self.loan_entity_class = loan_entity_class
@@ -41,7 +54,9 @@ class BaseHealthRatioHandler:
         :param protocol_name: Protocol name.
         :return: tuple
         """
-        loan_states_data = self.db_connector.get_latest_block_loans()
+        loan_states_data = self.db_connector.get_latest_block_loans(
+            protocol_id=protocol_name
+        )
         interest_rate_models = (
             self.db_connector.get_last_interest_rate_record_by_protocol_id(
                 protocol_id=protocol_name
@@ -63,11 +78,7 @@ class BaseHealthRatioHandler:
             loan_entity.debt = TokenValues(values=instance.debt)
             loan_entity.collateral = TokenValues(values=instance.collateral)
 
-            state.loan_entities.update(
-                {
-                    instance.user: loan_entity,
-                }
-            )
+            state.add_loan_entity(instance.user, loan_entity)
 
         return state
 
@@ -82,68 +93,77 @@ class BaseHealthRatioHandler:
             "Infinity"
         )
 
-
-class ZkLendHealthRatioHandler(BaseHealthRatioHandler):
-    """
-    A zkLend handler that collects data from data_handler.db,
-    computes health_ratio level and stores it in the database.
-
-    :cvar CONNECTOR: A DB connection object.
-    """
-
-    def __init__(self):
-        super().__init__(state_class=ZkLendState, loan_entity_class=ZkLendLoanEntity)
-
     def calculate_health_ratio(self) -> list[dict]:
         """
-        Calculates health ratio based on provided data.
+        Calculates health ratio based on provided data. The health ratios of all
+        users are computed at once, see `State.compute_health_factors`.
         :return: A list of the ready health ratio data.
         """
-        data, interest_rate_models = self.fetch_data(
-            protocol_name=ProtocolIDs.ZKLEND.value
-        )
+        data, interest_rate_models = self.fetch_data(protocol_name=self.PROTOCOL_ID)
         state = self.state_class()
+        # Hold the portfolios of all users in shared array-backed columns
+        state.use_compact_storage()
         state = self.initialize_loan_entities(state=state, data=data)
 
         # Set up collateral and debt interest rate models
-        state.collateral_interest_rate_models = TokenValues(
-            values=interest_rate_models.collateral
+        if interest_rate_models is not None:
+            state.interest_rate_models.collateral.update(
+                interest_rate_models.collateral or {}
+            )
+            state.interest_rate_models.debt.update(interest_rate_models.debt or {})
+        run_with_rpc_sessions(state.collect_token_parameters())
+
+        loan_matrix = LoanMatrix.from_loan_entities(state.loan_entities)
+        health_ratio_levels = state.compute_health_factors(
+            prices=Prices.get_current_underlying_prices(),
+            risk_adjusted_debt=self.RISK_ADJUSTED_DEBT,
+            loan_matrix=loan_matrix,
         )
-        state.debt_interest_rate_models = TokenValues(values=interest_rate_models.debt)
+        # Same as `health_ratio_is_valid`
+        is_valid = (health_ratio_levels > 0) & np.isfinite(health_ratio_levels)
+
+        timestamp = datetime.now().timestamp()
+        return [
+            {
+                USER_FIELD_NAME: user_id,
+                HEALTH_FACTOR_FIELD_NAME: health_ratio_level,
+                TIMESTAMP_FIELD_NAME: timestamp,
+            }
+            for user_id, health_ratio_level, valid in zip(
+                loan_matrix.users, health_ratio_levels.tolist(), is_valid
+            )
+            if valid
+        ]
 
-        current_prices = Prices()
-        asyncio.run(current_prices.get_lp_token_prices())
+    def save_health_ratio(self, data: list[dict]) -> int:
+        """
+        Stores the health ratio data with one bulk insert.
+        :param data: The health ratio data, as returned by `calculate_health_ratio`.
+        :return: The number of stored health ratio levels.
+        """
+        return self.db_connector.copy_health_ratio_levels_to_db(
+            {
+                "protocol_id": self.PROTOCOL_ID,
+                "user_id": health_ratio[USER_FIELD_NAME],
+                "value": health_ratio[HEALTH_FACTOR_FIELD_NAME],
+                "timestamp": health_ratio[TIMESTAMP_FIELD_NAME],
+            }
+            for health_ratio in data
+        )
 
-        result_data = list()
-        prices = TokenValues(values=current_prices.prices.values)
 
-        for user_id, loan_entity in state.loan_entities.items():
-            risk_adjusted_collateral_usd = loan_entity.compute_collateral_usd(
-                risk_adjusted=True,
-                collateral_interest_rate_model=state.interest_rate_models.collateral,
-                prices=prices,
-            )
-            debt_usd = loan_entity.compute_debt_usd(
-                risk_adjusted=False,
-                debt_interest_rate_model=state.interest_rate_models.debt,
-                prices=prices,
-            )
-            health_ratio_level = loan_entity.compute_health_factor(
-                standardized=False,
-                risk_adjusted_collateral_usd=risk_adjusted_collateral_usd,
-                debt_usd=debt_usd,
-            )
+class ZkLendHealthRatioHandler(BaseHealthRatioHandler):
+    """
+    A zkLend handler that collects data from data_handler.db,
+    computes health_ratio level and stores it in the database.
 
-            if self.health_ratio_is_valid(health_ratio_level):
-                result_data.append(
-                    {
-                        USER_FIELD_NAME: user_id,
-                        HEALTH_FACTOR_FIELD_NAME: health_ratio_level,
-                        TIMESTAMP_FIELD_NAME: datetime.now().timestamp(),
-                    }
-                )
+    :cvar CONNECTOR: A DB connection object.
+    """
 
-        return result_data
+    PROTOCOL_ID = ProtocolIDs.ZKLEND.value
+
+    def __init__(self):
+        super().__init__(state_class=ZkLendState, loan_entity_class=ZkLendLoanEntity)
 
 
 class NostrAlphaHealthRatioHandler(BaseHealthRatioHandler):
@@ -152,62 +172,14 @@ class NostrAlphaHealthRatioHandler(BaseHealthRatioHandler):
     computes health_ratio level and stores it in the database.
     """
 
+    PROTOCOL_ID = ProtocolIDs.NOSTRA_ALPHA.value
+    RISK_ADJUSTED_DEBT = True
+
     def __init__(self):
         super().__init__(
             state_class=NostraAlphaState, loan_entity_class=NostraAlphaLoanEntity
         )
 
-    def calculate_health_ratio(self) -> list[dict]:
-        """
-        Calculates health ratio based on provided data.
-        :return: A list of the ready health ratio data.
-        """
-        data, interest_rate_models = self.fetch_data(
-            protocol_name=ProtocolIDs.NOSTRA_ALPHA.value
-        )
-        state = self.state_class()
-        state = self.initialize_loan_entities(state=state, data=data)
-
-        # Set up collateral and debt interest rate models
-        state.collateral_interest_rate_models = TokenValues(
-            values=interest_rate_models.collateral
-        )
-        state.debt_interest_rate_models = TokenValues(values=interest_rate_models.debt)
-
-        current_prices = Prices()
-        asyncio.run(current_prices.get_lp_token_prices())
-
-        result_data = list()
-        prices = TokenValues(values=current_prices.prices.values)
-
-        for user_id, loan_entity in state.loan_entities.items():
-            risk_adjusted_collateral_usd = loan_entity.compute_collateral_usd(
-                risk_adjusted=True,
-                collateral_interest_rate_model=state.collateral_interest_rate_models,
-                prices=prices,
-            )
-            risk_adjusted_debt_usd = loan_entity.compute_debt_usd(
-                risk_adjusted=True,
-                debt_interest_rate_model=state.debt_interest_rate_models,
-                prices=prices,
-            )
-            health_ratio_level = loan_entity.compute_health_factor(
-                standardized=False,
-                risk_adjusted_collateral_usd=risk_adjusted_collateral_usd,
-                risk_adjusted_debt_usd=risk_adjusted_debt_usd,
-            )
-
-            if self.health_ratio_is_valid(health_ratio_level):
-                result_data.append(
-                    {
-                        USER_FIELD_NAME: user_id,
-                        HEALTH_FACTOR_FIELD_NAME: health_ratio_level,
-                        TIMESTAMP_FIELD_NAME: datetime.now().timestamp(),
-                    }
-                )
-
-        return result_data
-
 
 class NostrMainnetHealthRatioHandler(BaseHealthRatioHandler):
     """
@@ -215,58 +187,10 @@ class NostrMainnetHealthRatioHandler(BaseHealthRatioHandler):
     computes health_ratio level and stores it in the database.
     """
 
+    PROTOCOL_ID = ProtocolIDs.NOSTRA_MAINNET.value
+    RISK_ADJUSTED_DEBT = True
+
     def __init__(self):
         super().__init__(
             state_class=NostraMainnetState, loan_entity_class=NostraMainnetLoanEntity
         )
-
-    def calculate_health_ratio(self) -> list[dict]:
-        """
-        Calculates health ratio based on provided data.
-        :return: A list of the ready health ratio data.
-        """
-        data, interest_rate_models = self.fetch_data(
-            protocol_name=ProtocolIDs.NOSTRA_MAINNET.value
-        )
-        state = self.state_class()
-        state = self.initialize_loan_entities(state=state, data=data)
-
-        # Set up collateral and debt interest rate models
-        state.collateral_interest_rate_models = TokenValues(
-            values=interest_rate_models.collateral
-        )
-        state.debt_interest_rate_models = TokenValues(values=interest_rate_models.debt)
-
-        current_prices = Prices()
-        asyncio.run(current_prices.get_lp_token_prices())
-
-        result_data = list()
-        prices = TokenValues(values=current_prices.prices.values)
-
-        for user_id, loan_entity in state.loan_entities.items():
-            risk_adjusted_collateral_usd = loan_entity.compute_collateral_usd(
-                risk_adjusted=True,
-                collateral_interest_rate_model=state.collateral_interest_rate_models,
-                prices=prices,
-            )
-            risk_adjusted_debt_usd = loan_entity.compute_debt_usd(
-                risk_adjusted=True,
-                debt_interest_rate_model=state.debt_interest_rate_models,
-                prices=prices,
-            )
-            health_ratio_level = loan_entity.compute_health_factor(
-                standardized=False,
-                risk_adjusted_collateral_usd=risk_adjusted_collateral_usd,
-                risk_adjusted_debt_usd=risk_adjusted_debt_usd,
-            )
-
-            if self.health_ratio_is_valid(health_ratio_level):
-                result_data.append(
-                    {
-                        USER_FIELD_NAME: user_id,
-                        HEALTH_FACTOR_FIELD_NAME: health_ratio_level,
-                        TIMESTAMP_FIELD_NAME: datetime.now().timestamp(),
-                    }
-                )
-
-        return result_data
@@ -1,12 +1,12 @@
 """This module contains the classes that handle the liquidable debt data."""
 
-import asyncio
 from decimal import Decimal
-from typing import Iterable, Type
+from typing import Iterable, Optional, Type
 
 from data_handler.handlers.helpers import get_collateral_token_range, get_range
 from data_handler.handlers.liquidable_debt.utils import Prices
 from data_handler.handlers.liquidable_debt.values import (
+    BLOCK_FIELD_NAME,
     COLLATERAL_FIELD_NAME,
     DEBT_FIELD_NAME,
     LIQUIDABLE_DEBT_FIELD_NAME,
@@ -17,9 +17,11 @@ from data_handler.handlers.settings import TOKEN_PAIRS
 
 from data_handler.db.crud import DBConnector
 from data_handler.db.models import LoanState
+from shared.constants import TOKEN_SETTINGS
 from shared.protocol_ids import ProtocolIDs
-from shared.state import LoanEntity, State
+from shared.state import LoanEntity, LoanMatrix, State
 from shared.custom_types import TokenValues
+from shared.rpc_gateway import run_with_rpc_sessions
 
 
 class BaseDBLiquidableDebtDataHandler:
@@ -67,11 +69,7 @@ class BaseDBLiquidableDebtDataHandler:
             loan_entity.debt = TokenValues(values=instance.debt)
             loan_entity.collateral = TokenValues(values=instance.collateral)
 
-            state.loan_entities.update(
-                {
-                    instance.user: loan_entity,
-                }
-            )
+            state.add_loan_entity(instance.user, loan_entity)
 
         return state
 
@@ -90,77 +88,106 @@ class BaseDBLiquidableDebtDataHandler:
 
         return loan_data, interest_rate_models
 
-
-class ZkLendDBLiquidableDebtDataHandler(BaseDBLiquidableDebtDataHandler):
-    """
-    A zkLend handler that collects data from the DB,
-    computes the liquidable debt and stores it in the database.
-
-    :cvar AVAILABLE_PROTOCOLS: A list of all available protocols.
-    """
-
-    def __init__(
-        self,
-        loan_state_class: Type[State],
-        loan_entity_class: Type[LoanEntity],
-    ):
-        super().__init__()
-        self.state_class = loan_state_class
-        self.loan_entity_class = loan_entity_class
-
     def calculate_liquidable_debt(self, protocol_name: str = None) -> list:
         """
-        Calculates liquidable debt based on data provided and updates an existing data.
-        Data to calculate liquidable debt for:
+        Calculates the liquidable debt of all pairs of `TOKEN_PAIRS` in one pass: the
+        loan entities are packed once, the hypothetical prices of each collateral token
+        are shared by its debt tokens and each pair is swept at once, see
+        `State.compute_liquidable_debt_curve`.
         :param protocol_name: str
-        :return: A dictionary of the ready liquidable debt data.
+        :return: A list of the ready liquidable debt data.
         """
         data, interest_rate_models = self.fetch_data(protocol_name=protocol_name)
         if not interest_rate_models:
             return []
         state = self.state_class()
+        # Hold the portfolios of all users in shared array-backed columns
+        state.use_compact_storage()
         state = self.initialize_loan_entities(state=state, data=data)
 
         # Set up collateral and debt interest rate models
-        state.collateral_interest_rate_models = TokenValues(
-            values=interest_rate_models.collateral
+        state.interest_rate_models.collateral.update(
+            interest_rate_models.collateral or {}
         )
-        state.debt_interest_rate_models = TokenValues(values=interest_rate_models.debt)
+        state.interest_rate_models.debt.update(interest_rate_models.debt or {})
+        run_with_rpc_sessions(state.collect_token_parameters())
 
-        current_prices = Prices()
-        asyncio.run(current_prices.get_lp_token_prices())
-
-        hypothetical_collateral_token_prices = self.get_prices_range(
-            collateral_token_name="STRK",
-            current_price=current_prices.prices.values["STRK"],
-        )
+        prices = Prices.get_current_underlying_prices()
+        loan_matrix = LoanMatrix.from_loan_entities(state.loan_entities)
+        block = self.get_block(data)
 
         result_data = list()
-        # Go through first hypothetical prices and then through the debts
-        for hypothetical_price in hypothetical_collateral_token_prices:
-            liquidable_debt = state.compute_liquidable_debt_at_price(
-                prices=TokenValues(values=current_prices.prices.values),
-                collateral_token="STRK",
-                collateral_token_price=hypothetical_price,
-                debt_token="USDC",
-            )
-
-            if liquidable_debt > Decimal("0"):
-                result_data.append(
+        for collateral_token, debt_tokens in TOKEN_PAIRS.items():
+            collateral_token_address = TOKEN_SETTINGS[collateral_token].address
+            current_price = prices.get(collateral_token_address)
+            if current_price is None:
+                continue
+            hypothetical_collateral_token_prices = [
+                float(price)
+                for price in self.get_prices_range(
+                    collateral_token_name=collateral_token,
+                    current_price=Decimal(str(current_price)),
+                )
+            ]
+            for debt_token in debt_tokens:
+                liquidable_debts = state.compute_liquidable_debt_curve(
+                    prices=prices,
+                    collateral_token_underlying_address=collateral_token_address,
+                    collateral_token_prices=hypothetical_collateral_token_prices,
+                    debt_token_underlying_address=TOKEN_SETTINGS[debt_token].address,
+                    loan_matrix=loan_matrix,
+                )
+                result_data.extend(
                     {
                         LIQUIDABLE_DEBT_FIELD_NAME: liquidable_debt,
                         PRICE_FIELD_NAME: hypothetical_price,
-                        COLLATERAL_FIELD_NAME: "STRK",
-                        DEBT_FIELD_NAME: "USDC",
+                        COLLATERAL_FIELD_NAME: collateral_token,
+                        DEBT_FIELD_NAME: debt_token,
+                        BLOCK_FIELD_NAME: block,
                     }
+                    for hypothetical_price, liquidable_debt in zip(
+                        hypothetical_collateral_token_prices, liquidable_debts.tolist()
+                    )
+                    if liquidable_debt > 0
                 )
 
         return result_data
 
+    @staticmethod
+    def get_block(data: list) -> Optional[int]:
+        """
+        Get the block of the loan states, i.e. the last block any of them changed at.
+        :param data: The loan states.
+        :return: int or None if no loan state has a block.
+        """
+        return max(
+            (loan_state.block for loan_state in data if loan_state.block is not None),
+            default=None,
+        )
 
-class NostraAlphaDBLiquidableDebtDataHandler(BaseDBLiquidableDebtDataHandler):
+    def save_liquidable_debt(self, protocol_name: str, data: list) -> int:
+        """
+        Stores the liquidable debt data with one bulk insert.
+        :param protocol_name: str
+        :param data: The data, as returned by `calculate_liquidable_debt`.
+        :return: The number of stored rows.
+        """
+        return self.db_connector.copy_liquidable_debts_to_db(
+            {
+                "protocol_name": protocol_name,
+                "collateral_token": liquidable_debt_info[COLLATERAL_FIELD_NAME],
+                "debt_token": liquidable_debt_info[DEBT_FIELD_NAME],
+                "collateral_token_price": liquidable_debt_info[PRICE_FIELD_NAME],
+                "liquidable_debt": liquidable_debt_info[LIQUIDABLE_DEBT_FIELD_NAME],
+                "block": liquidable_debt_info[BLOCK_FIELD_NAME],
+            }
+            for liquidable_debt_info in data
+        )
+
+
+class ZkLendDBLiquidableDebtDataHandler(BaseDBLiquidableDebtDataHandler):
     """
-    A Nostra_alpha handler that collects data from the DB,
+    A zkLend handler that collects data from the DB,
     computes the liquidable debt and stores it in the database.
 
     :cvar AVAILABLE_PROTOCOLS: A list of all available protocols.
@@ -175,52 +202,23 @@ class NostraAlphaDBLiquidableDebtDataHandler(BaseDBLiquidableDebtDataHandler):
         self.state_class = loan_state_class
         self.loan_entity_class = loan_entity_class
 
-    def calculate_liquidable_debt(self, protocol_name: str = None) -> list:
-        """
-        Calculates liquidable debt based on data provided and updates an existing data.
-        Data to calculate liquidable debt for:
-        :param protocol_name: str
-        :return: A dictionary of the ready liquidable debt data.
-        """
-        data, interest_rate_models = self.fetch_data(protocol_name=protocol_name)
-        state = self.state_class()
-        state = self.initialize_loan_entities(state=state, data=data)
-
-        # Set up collateral and debt interest rate models
-        state.collateral_interest_rate_models = TokenValues(
-            values=interest_rate_models.collateral
-        )
-        state.debt_interest_rate_models = TokenValues(values=interest_rate_models.debt)
 
-        current_prices = Prices()
-        asyncio.run(current_prices.get_lp_token_prices())
-
-        hypothetical_collateral_token_prices = self.get_prices_range(
-            collateral_token_name="STRK",
-            current_price=current_prices.prices.values["STRK"],
-        )
-
-        result_data = list()
-        # Go through first hypothetical prices and then through the debts
-        for hypothetical_price in hypothetical_collateral_token_prices:
-            liquidable_debt = state.compute_liquidable_debt_at_price(
-                prices=TokenValues(values=current_prices.prices.values),
-                collateral_token="STRK",
-                collateral_token_price=hypothetical_price,
-                debt_token="USDC",
-            )
+class NostraAlphaDBLiquidableDebtDataHandler(BaseDBLiquidableDebtDataHandler):
+    """
+    A Nostra_alpha handler that collects data from the DB,
+    computes the liquidable debt and stores it in the database.
 
-            if liquidable_debt > Decimal("0"):
-                result_data.append(
-                    {
-                        LIQUIDABLE_DEBT_FIELD_NAME: liquidable_debt,
-                        PRICE_FIELD_NAME: hypothetical_price,
-                        COLLATERAL_FIELD_NAME: "STRK",
-                        DEBT_FIELD_NAME: "USDC",
-                    }
-                )
+    :cvar AVAILABLE_PROTOCOLS: A list of all available protocols.
+    """
 
-        return result_data
+    def __init__(
+        self,
+        loan_state_class: Type[State],
+        loan_entity_class: Type[LoanEntity],
+    ):
+        super().__init__()
+        self.state_class = loan_state_class
+        self.loan_entity_class = loan_entity_class
 
 
 class NostraMainnetDBLiquidableDebtDataHandler(BaseDBLiquidableDebtDataHandler):
@@ -240,53 +238,6 @@ class NostraMainnetDBLiquidableDebtDataHandler(BaseDBLiquidableDebtDataHandler):
         self.state_class = loan_state_class
         self.loan_entity_class = loan_entity_class
 
-    def calculate_liquidable_debt(self, protocol_name: str = None) -> list:
-        """
-        Calculates liquidable debt based on data provided and updates an existing data.
-        Data to calculate liquidable debt for:
-        :param protocol_name: str
-        :return: A dictionary of the ready liquidable debt data.
-        """
-        data, interest_rate_models = self.fetch_data(protocol_name=protocol_name)
-        state = self.state_class()
-        state = self.initialize_loan_entities(state=state, data=data)
-
-        # Set up collateral and debt interest rate models
-        state.collateral_interest_rate_models = TokenValues(
-            values=interest_rate_models.collateral
-        )
-        state.debt_interest_rate_models = TokenValues(values=interest_rate_models.debt)
-
-        current_prices = Prices()
-        asyncio.run(current_prices.get_lp_token_prices())
-
-        hypothetical_collateral_token_prices = self.get_prices_range(
-            collateral_token_name="STRK",
-            current_price=current_prices.prices.values["STRK"],
-        )
-
-        result_data = list()
-        # Go through first hypothetical prices and then through the debts
-        for hypothetical_price in hypothetical_collateral_token_prices:
-            liquidable_debt = state.compute_liquidable_debt_at_price(
-                prices=TokenValues(values=current_prices.prices.values),
-                collateral_token="STRK",
-                collateral_token_price=hypothetical_price,
-                debt_token="USDC",
-            )
-
-            if liquidable_debt > Decimal("0"):
-                result_data.append(
-                    {
-                        LIQUIDABLE_DEBT_FIELD_NAME: liquidable_debt,
-                        PRICE_FIELD_NAME: hypothetical_price,
-                        COLLATERAL_FIELD_NAME: "STRK",
-                        DEBT_FIELD_NAME: "USDC",
-                    }
-                )
-
-        return result_data
-
 
 class HashstackV0DBLiquidableDebtDataHandler(BaseDBLiquidableDebtDataHandler):
     """
@@ -350,7 +301,7 @@ class HashstackV0DBLiquidableDebtDataHandler(BaseDBLiquidableDebtDataHandler):
         state.debt_interest_rate_models = TokenValues(values=interest_rate_models.debt)
 
         current_prices = Prices()
-        asyncio.run(current_prices.get_lp_token_prices())
+        run_with_rpc_sessions(current_prices.get_lp_token_prices())
 
         hypothetical_collateral_token_prices = self.get_prices_range(
             collateral_token_name="STRK",
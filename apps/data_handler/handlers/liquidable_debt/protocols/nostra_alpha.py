@@ -3,16 +3,9 @@
 from data_handler.handlers.liquidable_debt.debt_handlers import (
     NostraAlphaDBLiquidableDebtDataHandler,
 )
-from data_handler.handlers.liquidable_debt.values import (
-    COLLATERAL_FIELD_NAME,
-    DEBT_FIELD_NAME,
-    LIQUIDABLE_DEBT_FIELD_NAME,
-    PRICE_FIELD_NAME,
-)
 from shared.state import NostraAlphaState
 from shared.loan_entity import NostraAlphaLoanEntity
 
-from data_handler.db.models import LiquidableDebt
 from shared.protocol_ids import ProtocolIDs
 
 
@@ -29,15 +22,7 @@ def run() -> None:
         protocol_name=ProtocolIDs.NOSTRA_ALPHA.value
     )
 
-    for liquidable_debt_info in data:
-        db_row = LiquidableDebt(
-            debt_token=liquidable_debt_info[DEBT_FIELD_NAME],
-            liquidable_debt=liquidable_debt_info[LIQUIDABLE_DEBT_FIELD_NAME],
-            protocol_name=ProtocolIDs.NOSTRA_ALPHA.value,
-            collateral_token_price=liquidable_debt_info[PRICE_FIELD_NAME],
-            collateral_token=liquidable_debt_info[COLLATERAL_FIELD_NAME],
-        )
-        handler.db_connector.write_to_db(db_row)
+    handler.save_liquidable_debt(ProtocolIDs.NOSTRA_ALPHA.value, data)
 
 
 if __name__ == "__main__":
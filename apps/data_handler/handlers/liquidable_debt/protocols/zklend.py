@@ -5,16 +5,9 @@ import logging
 from data_handler.handlers.liquidable_debt.debt_handlers import (
     ZkLendDBLiquidableDebtDataHandler,
 )
-from data_handler.handlers.liquidable_debt.values import (
-    COLLATERAL_FIELD_NAME,
-    DEBT_FIELD_NAME,
-    LIQUIDABLE_DEBT_FIELD_NAME,
-    PRICE_FIELD_NAME,
-)
 from shared.state import ZkLendState
 from shared.loan_entity import ZkLendLoanEntity
 
-from data_handler.db.models import LiquidableDebt
 from shared.protocol_ids import ProtocolIDs
 
 logger = logging.getLogger(__name__)
@@ -33,15 +26,7 @@ def run() -> None:
 
     data = handler.calculate_liquidable_debt(protocol_name=ProtocolIDs.ZKLEND.value)
     logger.info(f"Data for zKlend protocol: {len(data)})")
-    for liquidable_debt_info in data:
-        db_row = LiquidableDebt(
-            debt_token=liquidable_debt_info[DEBT_FIELD_NAME],
-            liquidable_debt=liquidable_debt_info[LIQUIDABLE_DEBT_FIELD_NAME],
-            protocol_name=ProtocolIDs.ZKLEND.value,
-            collateral_token_price=liquidable_debt_info[PRICE_FIELD_NAME],
-            collateral_token=liquidable_debt_info[COLLATERAL_FIELD_NAME],
-        )
-        handler.db_connector.write_to_db(db_row)
+    handler.save_liquidable_debt(ProtocolIDs.ZKLEND.value, data)
     logger.info("Successfully computed liquidable debt for zKlend protocol")
 
 
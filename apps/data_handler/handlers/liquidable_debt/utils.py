@@ -1,6 +1,5 @@
 """This module contains classes to fetch token prices and LP token prices."""
 
-import time
 from decimal import Decimal
 
 import requests
@@ -14,13 +13,15 @@ from data_handler.handlers.settings import (
 )
 from starknet_py.hash.selector import get_selector_from_name
 from starknet_py.net.client_models import Call
-from starknet_py.net.full_node_client import FullNodeClient
 
+from shared.batch_call import get_batch_client
+from shared.call_cache import call_cache
 from shared.constants import TOKEN_SETTINGS
 from shared.helpers import add_leading_zeros
-from shared.custom_types import TokenValues
+from shared.rpc_gateway import get_full_node_client, run_with_rpc_sessions
+from shared.custom_types import Prices as UnderlyingPrices, TokenValues
 
-NET = FullNodeClient(node_url="https://starknet-mainnet.public.blastapi.io")
+NET = get_full_node_client()
 
 
 async def balance_of(token_addr: str, holder_addr: str) -> int:
@@ -44,15 +45,21 @@ async def func_call(addr: int, selector: int, calldata: list[int] = None) -> lis
     :param calldata: The data to call the contract function with.
     :return: A list of the results of the contract function call.
     """
+    return await call_cache.get_or_call(
+        addr, selector, calldata, lambda: _call_contract(addr, selector, calldata)
+    )
+
+
+async def _call_contract(
+    addr: int, selector: int, calldata: list[int] = None
+) -> list[int]:
+    batch_client = get_batch_client()
+    if batch_client is not None:
+        return await batch_client.call(addr, selector, calldata)
     call = Call(
         to_addr=addr, selector=get_selector_from_name(selector), calldata=calldata
     )
-    try:
-        res = await NET.call_contract(call)
-    except BaseException:
-        time.sleep(10)
-        res = await NET.call_contract(call)
-    return res
+    return await NET.call_contract(call)
 
 
 class JediSwapPool:
@@ -208,6 +215,31 @@ class Prices:
                 f"Failed getting prices, status code = {response.status_code}."
             )
 
+    def get_underlying_prices(self) -> UnderlyingPrices:
+        """
+        Get the prices keyed by the underlying token addresses, as the states expect them.
+        :return: Prices
+        """
+        return UnderlyingPrices(
+            None,
+            **{
+                TOKEN_SETTINGS[symbol].address: float(price)
+                for symbol, price in self.prices.values.items()
+                if symbol in TOKEN_SETTINGS
+            },
+        )
+
+    @classmethod
+    def get_current_underlying_prices(cls) -> UnderlyingPrices:
+        """
+        Fetch the current token and LP token prices, keyed by the underlying token
+        addresses, see `get_underlying_prices`.
+        :return: Prices
+        """
+        current_prices = cls()
+        run_with_rpc_sessions(current_prices.get_lp_token_prices())
+        return current_prices.get_underlying_prices()
+
     async def get_lp_token_prices(self) -> None:
         """
         Assigns LP token prices to `self.prices`
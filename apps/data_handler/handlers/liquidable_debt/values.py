@@ -24,6 +24,7 @@ JEDISWAP_VALUE = "JediSwap"
 POOL_SPLIT_VALUE = " Pool: "
 ROW_ID_FIELD_NAME = "id"
 TIMESTAMP_FIELD_NAME = "timestamp"
+BLOCK_FIELD_NAME = "block"
 ALL_NEEDED_FIELDS = (
     USER_FIELD_NAME,
     PROTOCOL_FIELD_NAME,
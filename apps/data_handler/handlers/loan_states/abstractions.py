@@ -1,15 +1,29 @@
 """This module contains the base class for computing loan states
 based on data from a DeRisk API."""
 
+import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from contextlib import aclosing
+from itertools import repeat
+from typing import AsyncIterator, Callable, Dict, Optional
 
 import pandas as pd
 from data_handler.db.crud import DBConnector
-from data_handler.db.models import InterestRate, LoanState
-from data_handler.handler_tools.api_connector import DeRiskAPIConnector
+from data_handler.handler_tools.api_connector import (
+    AsyncDeRiskAPIConnector,
+    DeRiskAPIConnector,
+)
+from data_handler.handler_tools.pagination import AdaptivePaginator, PaginationPolicy
+from data_handler.handlers.loan_states.interest_rates import InterestRateIndex
 from shared.constants import ProtocolIDs
+from shared.rpc_gateway import run_with_rpc_sessions
+from shared.state.events import Event
+from shared.state.snapshots import (
+    TrackedLoanEntities,
+    dump_state_snapshot,
+    load_state_snapshot,
+)
 from shared.state.state import State
 
 logger = logging.getLogger(__name__)
@@ -21,12 +35,28 @@ class LoanStateComputationBase(ABC):
     Attributes:
         PROTOCOL_ADDRESSES (Dict[str, str]): A dictionary mapping protocol names to their addresses.
         PROTOCOL_TYPE (ProtocolIDs): The protocol ID as defined in the ProtocolIDs enum.
+        SNAPSHOT_INTERVAL (Optional[int]): The number of blocks between state snapshots.
+            If set, the state is kept across pages and resumed from the latest snapshot,
+            see `get_state`.
+        PAGINATION_SIZE (int): The number of blocks of the first block window.
+        PAGINATION_POLICY (Optional[PaginationPolicy]): The policy adapting the size of the
+            block windows to the observed pages.
+        FETCH_CONCURRENCY (int): The maximum number of concurrent DeRisk API requests.
+        MAX_EMPTY_PAGES (int): The number of consecutive empty block windows after which
+            `run` stops.
+        START_BLOCK (Optional[int]): The block the computation always starts from,
+            regardless of the last block of the stored loan states.
     """
 
     PROTOCOL_ADDRESSES: Optional[Dict[str, str]] = None
     PROTOCOL_TYPE: Optional[ProtocolIDs] = None
     PAGINATION_SIZE: int = 1000
+    PAGINATION_POLICY: Optional[PaginationPolicy] = None
     INTEREST_RATES_KEYS: list = []
+    SNAPSHOT_INTERVAL: Optional[int] = None
+    FETCH_CONCURRENCY: int = 8
+    MAX_EMPTY_PAGES: int = 5
+    START_BLOCK: Optional[int] = None
 
     def __init__(self):
         """
@@ -36,18 +66,36 @@ class LoanStateComputationBase(ABC):
         self.api_connector = DeRiskAPIConnector()
         self.db_connector = DBConnector()
         self.last_block = self.db_connector.get_last_block(self.PROTOCOL_TYPE)
+        if self.START_BLOCK is not None:
+            self.last_block = self.START_BLOCK
         self.interest_rate_result: list = []
+        self.interest_rate_index = InterestRateIndex()
+        self.paginator = self.create_paginator()
+        self.state: Optional[State] = None
+        self.last_snapshot_block: Optional[int] = None
+        if self.SNAPSHOT_INTERVAL:
+            self.restore_state_snapshot()
+
+    @classmethod
+    def create_paginator(cls) -> AdaptivePaginator:
+        """
+        Creates the paginator sizing the block windows of `run`, which starts with
+        windows of `PAGINATION_SIZE` blocks unless `PAGINATION_POLICY` is set.
 
-    def process_interest_rate_event(
-        self, instance_state: State, event: pd.Series
-    ) -> None:
+        :return: AdaptivePaginator
+        """
+        return AdaptivePaginator(
+            cls.PAGINATION_POLICY or PaginationPolicy(initial_size=cls.PAGINATION_SIZE)
+        )
+
+    def process_interest_rate_event(self, instance_state: State, event: Event) -> None:
         """
         Processes an interest rate event.
 
         :param instance_state: The instance of the state class to call the method on.
         :type instance_state: object
         :param event: The data of the event.
-        :type event: pd.Series
+        :type event: Event
         """
         pass
 
@@ -64,18 +112,22 @@ class LoanStateComputationBase(ABC):
         pass
 
     def process_event(
-        self, instance_state: State, method_name: str, event: pd.Series
+        self,
+        instance_state: State,
+        handler: Optional[Callable[[Event], None]],
+        event: Event,
     ) -> None:
         """
-        Processes an event based on the method name and the event data.
+        Processes an event with its handler.
 
         Updates the last block processed to ensure data consistency
-        and calls the appropriate method to handle the event.
+        and calls the handler of the event.
 
-        :param instance_state: The instance of the state class to call the method on.
+        :param instance_state: The instance of the state class processing the event.
         :type instance_state: object
-        :param method_name: The name of the method to call for processing the event.
-        :param event: The event data as a pandas Series.
+        :param handler: The bound method of the state processing the event, resolved
+            with an `EventDispatcher`, or None if the state does not process it.
+        :param event: The event data.
         """
         try:
             block_number = event.get("block_number")
@@ -83,12 +135,11 @@ class LoanStateComputationBase(ABC):
 
             if block_number and block_number >= self.last_block:
                 self.last_block = block_number
-                method = getattr(instance_state, method_name, None)
-                if method:
-                    method(event)
+                if handler:
+                    handler(event)
                 else:
                     logger.debug(
-                        f"No method named {method_name} found for processing event."
+                        f"No method found for processing {event['key_name']} event."
                     )
         except Exception as e:
             logger.exception(f"Failed to process event due to an error: {e}")
@@ -142,39 +193,48 @@ class LoanStateComputationBase(ABC):
             logger.info("No data to save.")
             return
 
-        objects_to_write = []
-        for index, item in df.iterrows():
-            loan = LoanState(
-                protocol_id=self.PROTOCOL_TYPE,
-                user=str(item["user"]),
-                collateral=item["collateral"],
-                debt=item["debt"],
-                block=item["block"],
-                timestamp=item["timestamp"],
-                deposit=item.get("deposit"),
+        # Stream the rows straight from the columns into the COPY-based bulk upsert
+        deposits = df["deposit"] if "deposit" in df.columns else repeat(None)
+        loan_states = (
+            {
+                "protocol_id": self.PROTOCOL_TYPE,
+                "user": str(user),
+                "collateral": collateral,
+                "debt": debt,
+                "block": block,
+                "timestamp": timestamp,
+                "deposit": deposit,
+            }
+            for user, collateral, debt, block, timestamp, deposit in zip(
+                df["user"],
+                df["collateral"],
+                df["debt"],
+                df["block"],
+                df["timestamp"],
+                deposits,
             )
-            objects_to_write.append(loan)
-        self.db_connector.write_loan_states_to_db(objects_to_write)
+        )
+        self.db_connector.copy_loan_states_to_db(loan_states)
 
     def save_interest_rate_data(self) -> None:
         """
-        Saves the interest rate data to the database.
+        Saves the interest rate data to the database and clears the saved records.
         """
         if not self.interest_rate_result:
             logger.info("No interest rate data to save.")
             return
 
-        objects_to_write = []
-        for item in self.interest_rate_result:
-            loan = InterestRate(
-                protocol_id=self.PROTOCOL_TYPE,
-                collateral=item["collateral"],
-                debt=item["debt"],
-                block=item["block"],
-                timestamp=item["timestamp"],
-            )
-            objects_to_write.append(loan)
-        self.db_connector.write_batch_to_db(objects_to_write)
+        self.db_connector.copy_interest_rates_to_db(
+            {
+                "protocol_id": self.PROTOCOL_TYPE,
+                "collateral": item["collateral"],
+                "debt": item["debt"],
+                "block": item["block"],
+                "timestamp": item["timestamp"],
+            }
+            for item in self.interest_rate_result
+        )
+        self.interest_rate_result = []
 
     def get_result_df(self, loan_entities: dict) -> pd.DataFrame:
         """
@@ -216,7 +276,7 @@ class LoanStateComputationBase(ABC):
         result_df = pd.DataFrame(result_dict)
         return result_df
 
-    def add_interest_rate_data(self, state_instance: State, event: pd.Series) -> None:
+    def add_interest_rate_data(self, state_instance: State, event: Event) -> None:
         """
         Adds interest rate data to the state instance.
         :param state_instance: The state instance to add the data to.
@@ -262,56 +322,342 @@ class LoanStateComputationBase(ABC):
         if block == instance_state.last_interest_rate_block_number:
             return
 
-        interest_rate_data = self.db_connector.get_interest_rate_by_block(
-            block_number=block, protocol_id=protocol_type
-        )
+        if block is None:
+            logger.debug(
+                f"No block number to set the interest rate for {protocol_type}"
+            )
+            return
+
+        if not self.interest_rate_index.covers(block):
+            self.prefetch_interest_rates(block, block)
+
+        interest_rate_data = self.interest_rate_index.get(block)
         if not interest_rate_data:
             logger.debug(
                 f"No interest rate data found for block {block} and protocol {protocol_type}"
             )
             return
 
-        if instance_state.last_interest_rate_block_number != interest_rate_data.block:
-            (
-                collateral_interest_rate,
-                debt_interest_rate,
-            ) = interest_rate_data.get_json_deserialized()
+        (
+            interest_rate_block,
+            collateral_interest_rate,
+            debt_interest_rate,
+        ) = interest_rate_data
+        if instance_state.last_interest_rate_block_number != interest_rate_block:
             instance_state.interest_rate_models.collateral = collateral_interest_rate
             instance_state.interest_rate_models.debt = debt_interest_rate
             instance_state.last_interest_rate_block_number = block
 
+    def prefetch_interest_rates(self, start_block: int, end_block: int) -> None:
+        """
+        Loads all interest rate records needed to resolve the interest rates
+        of the given block range with a single query.
+
+        :param start_block: The first block of the range.
+        :type start_block: int
+        :param end_block: The last block of the range.
+        :type end_block: int
+        """
+        records = self.db_connector.get_interest_rates_by_block_range(
+            protocol_id=self.PROTOCOL_TYPE,
+            start_block=start_block,
+            end_block=end_block,
+        )
+        self.interest_rate_index.load(records, start_block, end_block)
+
+    def prefetch_interest_rates_for_data(self, data: list[dict]) -> None:
+        """
+        Loads the interest rate records covering the blocks of the given events.
+
+        :param data: The data retrieved from the DeRisk API.
+        :type data: list[dict]
+        """
+        blocks = [
+            event["block_number"]
+            for event in data
+            if event.get("block_number") is not None
+        ]
+        if blocks:
+            self.prefetch_interest_rates(min(blocks), max(blocks))
+
+    def create_state(self) -> State:
+        """
+        Creates an empty state of the protocol.
+        Must be implemented by subclasses which set `SNAPSHOT_INTERVAL`.
+
+        :return: State
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} must implement `create_state` to use snapshots."
+        )
+
+    def get_state(self) -> State:
+        """
+        Returns the state kept across pages, creating it on the first call.
+        Its loan entities track the users accessed by each page, see `TrackedLoanEntities`.
+
+        :return: State
+        """
+        if self.state is None:
+            state = self.create_state()
+            state.loan_entities = TrackedLoanEntities(
+                state.loan_entity_class, state.loan_entities
+            )
+            self.state = state
+        return self.state
+
+    def initialize_state(self, state: State) -> None:
+        """
+        Initializes a state which is not restored from a snapshot, e.g. with the loan
+        states stored in the database. The snapshots are taken from this state, so it
+        must include every user whose events are not replayed by the computation.
+        Does nothing by default.
+
+        :param state: The new state.
+        :type state: State
+        """
+
+    def restore_state_snapshot(self) -> None:
+        """
+        Restores the state from the latest snapshot of the protocol, if there is one,
+        and continues processing from the block following the snapshot.
+        """
+        snapshot = self.db_connector.get_latest_state_snapshot(self.PROTOCOL_TYPE)
+        if snapshot is None:
+            logger.info(f"No state snapshot found for {self.PROTOCOL_TYPE}")
+            self.initialize_state(self.get_state())
+            return
+
+        load_state_snapshot(self.get_state(), snapshot.data)
+        self.last_snapshot_block = snapshot.block
+        self.last_block = snapshot.block + 1
+        logger.info(
+            f"Restored {self.PROTOCOL_TYPE} state from the snapshot at block {snapshot.block}"
+        )
+
+    def save_state_snapshot(self, block: int) -> None:
+        """
+        Saves a snapshot of the state.
+
+        :param block: The last block whose events are included in the state.
+        :type block: int
+        """
+        if self.state is None:
+            return
+
+        self.db_connector.write_state_snapshot(
+            protocol_id=self.PROTOCOL_TYPE,
+            block=block,
+            data=dump_state_snapshot(self.state),
+        )
+        self.last_snapshot_block = block
+        logger.info(f"Saved {self.PROTOCOL_TYPE} state snapshot at block {block}")
+
+    def checkpoint_state(self, block: int, force: bool = False) -> None:
+        """
+        Saves a snapshot of the state if at least `SNAPSHOT_INTERVAL` blocks were processed
+        since the last one.
+
+        :param block: The last block whose events are included in the state.
+        :type block: int
+        :param force: Save the snapshot regardless of the interval, unless it exists already.
+        :type force: bool
+        """
+        if not self.SNAPSHOT_INTERVAL or self.state is None:
+            return
+        if self.last_snapshot_block is not None and (
+            block <= self.last_snapshot_block
+            or (not force and block - self.last_snapshot_block < self.SNAPSHOT_INTERVAL)
+        ):
+            return
+        self.save_state_snapshot(block)
+
+    def get_page_addresses(self) -> list[str]:
+        """
+        Returns the addresses whose events are fetched for each block window.
+
+        :return: list of addresses
+        """
+        if isinstance(self.PROTOCOL_ADDRESSES, str):
+            return [self.PROTOCOL_ADDRESSES]
+        return list(self.PROTOCOL_ADDRESSES or [])
+
+    def process_page(self, data: list[dict]) -> None:
+        """
+        Replays the events of one block window and saves the resulting loan states
+        and interest rates.
+
+        :param data: The data retrieved from the DeRisk API.
+        :type data: list[dict]
+        """
+        self.prefetch_interest_rates_for_data(data)
+        processed_data = self.process_data(data)
+        self.save_data(processed_data)
+        self.save_interest_rate_data()
+
+    async def fetch_pages(
+        self, connector: AsyncDeRiskAPIConnector, start_block: int
+    ) -> AsyncIterator[tuple[int, int, list[dict]]]:
+        """
+        Yields the events of all page addresses for consecutive block windows, sized by
+        `self.paginator`. The next window is fetched while the current one is being
+        processed.
+
+        :param connector: The connector to fetch the events with.
+        :type connector: AsyncDeRiskAPIConnector
+        :param start_block: The first block of the first window.
+        :type start_block: int
+        :return: Async iterator of (min_block, max_block, data) tuples.
+        """
+        windows = fetch_block_windows(
+            connector, self.paginator, self.get_page_addresses(), start_block
+        )
+        async with aclosing(windows):
+            async for page in windows:
+                yield page
+
+    def replay_page(self, min_block: int, max_block: int, data: list[dict]) -> int:
+        """
+        Replays the events of a non-empty block window and checkpoints the state.
+
+        :param min_block: The first block of the window.
+        :type min_block: int
+        :param max_block: The last block of the window.
+        :type max_block: int
+        :param data: The events of the window.
+        :type data: list[dict]
+        :return: The last block whose events are included in the state.
+        """
+        self.process_page(data)
+        # All events up to the last fetched block are included in the state
+        last_processed_block = max(
+            [min_block]
+            + [
+                event["block_number"]
+                for event in data
+                if event.get("block_number") is not None
+            ]
+        )
+        self.checkpoint_state(last_processed_block)
+        self.last_block = max_block
+        logger.info(f"Processed data up to block {self.last_block}")
+        return last_processed_block
+
+    async def run_async(self) -> None:
+        """
+        Runs the loan state computation for the specific protocol, fetching the events
+        of all protocol addresses concurrently and one block window ahead.
+        Stops after `MAX_EMPTY_PAGES` consecutive windows without events.
+        """
+        empty_pages = 0
+        last_processed_block = None
+        logger.info(f"Default last block: {self.last_block}")
+
+        async with AsyncDeRiskAPIConnector(self.FETCH_CONCURRENCY) as connector:
+            async with aclosing(self.fetch_pages(connector, self.last_block)) as pages:
+                async for min_block, max_block, data in pages:
+                    if not data:
+                        logger.info(
+                            f"No data found from block {min_block} to {max_block}"
+                        )
+                        self.last_block = max_block
+                        empty_pages += 1
+                        if empty_pages >= self.MAX_EMPTY_PAGES:
+                            logger.info(
+                                f"Reached max retries for block: {self.last_block}"
+                            )
+                            break
+                        continue
+
+                    # Replay the events in a worker thread, so that the next window
+                    # keeps being fetched meanwhile
+                    last_processed_block = await asyncio.to_thread(
+                        self.replay_page, min_block, max_block, data
+                    )
+                    empty_pages = (
+                        0  # Reset retry counter if data is found and processed
+                    )
+
+        if last_processed_block is not None:
+            self.checkpoint_state(last_processed_block, force=True)
+        self.paginator.log_metrics(str(self.PROTOCOL_TYPE))
+
     def run(self) -> None:
         """
         Runs the loan state computation for the specific protocol.
         """
-        max_retries = 5
-        default_last_block = self.last_block
-        for protocol_address in self.PROTOCOL_ADDRESSES:
-            retry = 0
-            logger.info(f"Default last block: {default_last_block}")
+        run_with_rpc_sessions(self.run_async())
 
-            self.last_block = default_last_block
 
-            while retry < max_retries:
-                data = self.get_data(protocol_address, self.last_block)
+async def _fetch_window(
+    connector: AsyncDeRiskAPIConnector,
+    addresses: list[str],
+    min_block: int,
+    max_block: int,
+) -> tuple[list[dict], int]:
+    """
+    Fetches the events of the addresses for one block window.
 
-                if not data:
-                    logger.info(
-                        f"No data found for address {protocol_address} at block {self.last_block}"
-                    )
-                    self.last_block += self.PAGINATION_SIZE
-                    retry += 1
-                    continue
-
-                processed_data = self.process_data(data)
-                self.save_data(processed_data)
-                self.save_interest_rate_data()
-                self.last_block += self.PAGINATION_SIZE
-                logger.info(f"Processed data up to block {self.last_block}")
-                retry = 0  # Reset retry counter if data is found and processed
-
-            if retry == max_retries:
-                logger.info(f"Reached max retries for address {protocol_address}")
+    :return: The events and the size of the responses in bytes.
+    """
+    received_bytes = connector.received_bytes
+    data = await connector.fetch_addresses_data(addresses, min_block, max_block)
+    return data, connector.received_bytes - received_bytes
+
+
+async def fetch_block_windows(
+    connector: AsyncDeRiskAPIConnector,
+    paginator: AdaptivePaginator,
+    addresses: list[str],
+    start_block: int,
+) -> AsyncIterator[tuple[int, int, list[dict]]]:
+    """
+    Yields the events of the addresses for consecutive block windows, sized by the
+    paginator. The next window is fetched while the current one is being processed.
+
+    :param connector: The connector to fetch the events with.
+    :type connector: AsyncDeRiskAPIConnector
+    :param paginator: The paginator sizing the block windows.
+    :type paginator: AdaptivePaginator
+    :param addresses: The addresses whose events are fetched.
+    :type addresses: list[str]
+    :param start_block: The first block of the first window.
+    :type start_block: int
+    :return: Async iterator of (min_block, max_block, data) tuples.
+    """
+    min_block, max_block = paginator.next_window(start_block)
+    next_page = asyncio.create_task(
+        _fetch_window(connector, addresses, min_block, max_block)
+    )
+    boundary_ids: set = set()
+    try:
+        while True:
+            data, response_bytes = await next_page
+            # Only one window is in flight at a time, so the next one can be
+            # sized by the page just received
+            paginator.record_page(len(data), response_bytes)
+            next_min_block, next_max_block = paginator.next_window(max_block)
+            next_page = asyncio.create_task(
+                _fetch_window(connector, addresses, next_min_block, next_max_block)
+            )
+            # Consecutive windows share their boundary block, skip its events
+            # if they were part of the previous window already
+            if boundary_ids:
+                data = [
+                    event
+                    for event in data
+                    if event.get("block_number") != min_block
+                    or event.get("id") not in boundary_ids
+                ]
+            boundary_ids = {
+                event.get("id")
+                for event in data
+                if event.get("block_number") == max_block
+            }
+            yield min_block, max_block, data
+            min_block, max_block = next_min_block, next_max_block
+    finally:
+        next_page.cancel()
 
 
 class HashstackBaseLoanStateComputation(LoanStateComputationBase):
@@ -0,0 +1,73 @@
+"""This module contains the in-memory index of interest rate records used
+by the loan state computations."""
+
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Optional
+
+from data_handler.db.models import InterestRate
+
+
+class InterestRateIndex:
+    """
+    Sorted in-memory index of the `InterestRate` records of a protocol covering a block range.
+
+    The records are deserialized once when loaded and each lookup resolves the closest record
+    at or below the given block via bisection, mirroring `DBConnector.get_interest_rate_by_block`.
+    """
+
+    def __init__(self) -> None:
+        self.blocks: list[int] = []
+        self.rates: list[tuple[dict[str, Decimal], dict[str, Decimal]]] = []
+        self.start_block: Optional[int] = None
+        self.end_block: Optional[int] = None
+
+    def load(
+        self, records: list[InterestRate], start_block: int, end_block: int
+    ) -> None:
+        """
+        Replaces the content of the index with the given records.
+
+        :param records: Interest rate records covering the block range, i.e. the records within
+            the range and the latest record at or below `start_block`.
+        :type records: list[InterestRate]
+        :param start_block: The first block covered by the records.
+        :type start_block: int
+        :param end_block: The last block covered by the records.
+        :type end_block: int
+        """
+        records = sorted(records, key=lambda record: record.block)
+        self.blocks = [record.block for record in records]
+        self.rates = [record.get_json_deserialized() for record in records]
+        self.start_block = start_block
+        self.end_block = end_block
+
+    def covers(self, block: int) -> bool:
+        """
+        Checks whether the lookup of the given block can be resolved from the index.
+
+        :param block: The block number.
+        :type block: int
+        :return: bool
+        """
+        if self.start_block is None or self.end_block is None:
+            return False
+        return self.start_block <= block <= self.end_block
+
+    def get(
+        self, block: int
+    ) -> Optional[tuple[int, dict[str, Decimal], dict[str, Decimal]]]:
+        """
+        Gets the closest interest rates at or below the given block.
+
+        :param block: The block number.
+        :type block: int
+        :return: The block of the record with copies of the collateral and debt
+            interest rates, or None if there is no such record.
+        """
+        position = bisect_right(self.blocks, block)
+        if position == 0:
+            return None
+        collateral, debt = self.rates[position - 1]
+        # The state updates its interest rate models in place, so hand out copies
+        return self.blocks[position - 1], dict(collateral), dict(debt)
@@ -2,6 +2,7 @@
 
 import logging
 from time import monotonic
+from typing import Callable, Optional
 
 import pandas as pd
 from data_handler.handler_tools.constants import (
@@ -11,11 +12,10 @@ from data_handler.handler_tools.constants import (
 from shared.loan_entity.nostra.mainnet import (
     NOSTRA_MAINNET_ADDRESSES_TO_EVENTS,
     NOSTRA_MAINNET_EVENTS_TO_METHODS,
-    NOSTRA_MAINNET_EVENTS_TO_ORDER,
     NOSTRA_MAINNET_INTEREST_RATE_MODEL_ADDRESS,
 )
 from data_handler.handlers.loan_states.abstractions import LoanStateComputationBase
-from shared.state import NostraMainnetState
+from shared.state import Event, EventDispatcher, NostraMainnetState, events_from_data
 from shared.protocol_ids import ProtocolIDs
 
 logger = logging.getLogger(__name__)
@@ -29,24 +29,29 @@ class NostraMainnetStateComputation(LoanStateComputationBase):
     PROTOCOL_TYPE = ProtocolIDs.NOSTRA_MAINNET.value
     PROTOCOL_ADDRESSES = ProtocolAddresses().NOSTRA_MAINNET_ADDRESSES
     INTEREST_RATES_KEYS = ["InterestStateUpdated"]
+    MAX_EMPTY_PAGES = 500
     EVENTS_METHODS_MAPPING = NOSTRA_MAINNET_EVENTS_TO_METHODS
     ADDRESSES_TO_EVENTS = NOSTRA_MAINNET_ADDRESSES_TO_EVENTS
 
     EVENTS_MAPPING = NOSTRA_EVENTS_MAPPING
 
     def process_event(
-        self, instance_state: NostraMainnetState, method_name: str, event: pd.Series
+        self,
+        instance_state: NostraMainnetState,
+        handler: Optional[Callable[[Event], None]],
+        event: Event,
     ) -> None:
         """
-        Processes an event based on the method name and the event data.
+        Processes an event with its handler.
 
         Updates the last block processed to ensure data consistency
-        and calls the appropriate method to handle the event.
+        and calls the handler of the event.
 
-        :param instance_state: The instance of the state class to call the method on.
+        :param instance_state: The instance of the state class processing the event.
         :type instance_state: object
-        :param method_name: The name of the method to call for processing the event.
-        :param event: The event data as a pandas Series.
+        :param handler: The bound method of the state processing the event, resolved
+            with an `EventDispatcher`, or None if the state does not process it.
+        :param event: The event data.
         """
         try:
             block_number = event.get("block_number")
@@ -57,16 +62,17 @@ class NostraMainnetStateComputation(LoanStateComputationBase):
 
             if block_number and block_number >= self.last_block:
                 self.last_block = block_number
-                event_type = self.ADDRESSES_TO_EVENTS[event["from_address"]]
-                getattr(
-                    instance_state,
-                    self.EVENTS_METHODS_MAPPING[(event_type, event["key_name"])],
-                )(event=event)
+                if handler:
+                    handler(event=event)
+                else:
+                    logger.debug(
+                        f"No method found for processing {event['key_name']} event."
+                    )
         except Exception as e:
             logger.exception(f"Failed to process event due to an error: {e}")
 
     def process_interest_rate_event(
-        self, nostra_state: NostraMainnetState, event: pd.Series
+        self, nostra_state: NostraMainnetState, event: Event
     ) -> None:
         """
         Processes an interest rate event.
@@ -74,7 +80,7 @@ class NostraMainnetStateComputation(LoanStateComputationBase):
         :param nostra_state: The Nostra Mainnet state object.
         :type nostra_state: Nostra Mainnet State
         :param event: The data of the event.
-        :type event: pd.Series
+        :type event: Event
         """
         nostra_state.process_interest_rate_model_event(event)
         self.add_interest_rate_data(nostra_state, event)
@@ -94,59 +100,30 @@ class NostraMainnetStateComputation(LoanStateComputationBase):
             list(self.EVENTS_MAPPING.keys()) + self.INTEREST_RATES_KEYS
         )
 
-        # Init DataFrame
-        df = pd.DataFrame(data)
-        df_filtered = df[df["key_name"].isin(events_with_interest_rate)].copy()
-
-        # Map 'key_name' to its corresponding order from the dict
-        df_filtered["sort_order"] = df_filtered["key_name"].map(
-            lambda x: NOSTRA_MAINNET_EVENTS_TO_ORDER.get(x, float("inf"))
-        )
-        sorted_df = df_filtered.sort_values(["block_number", "id"])
-
-        # Filter out events that are not in the mapping
-        for index, row in sorted_df.iterrows():
-            self.process_event(nostra_mainnet_state, None, row)
+        # Keep the known events sorted by block number and ID
+        events = events_from_data(data, key_names=events_with_interest_rate)
+
+        # The methods are keyed by the event type of the address and the key name
+        dispatcher = EventDispatcher(nostra_mainnet_state, self.EVENTS_METHODS_MAPPING)
+        for event in events:
+            event_type = self.ADDRESSES_TO_EVENTS.get(event.from_address)
+            self.process_event(
+                nostra_mainnet_state,
+                dispatcher.get_handler((event_type, event.key_name)),
+                event,
+            )
 
         result_df = self.get_result_df(nostra_mainnet_state.loan_entities)
         return result_df
 
-    def run(self) -> None:
+    def get_page_addresses(self) -> list[str]:
         """
-        Runs the loan state computation for the specific protocol.
-        """
-        max_retries = 500
-        retry = 0
-
-        logger.info(f"Default last block: {self.last_block}")
+        Returns the interest rate model address and the protocol addresses,
+        whose events are fetched for each block window.
 
-        while retry < max_retries:
-            interest_rate_data = self.get_data(
-                NOSTRA_MAINNET_INTEREST_RATE_MODEL_ADDRESS, self.last_block
-            )
-            data = self.get_addresses_data(self.PROTOCOL_ADDRESSES, self.last_block)
-
-            if not data:
-                logger.info(f"No data for block {self.last_block}")
-                self.last_block += self.PAGINATION_SIZE
-                retry += 1
-                continue
-
-            # Process the data
-            all_events_data = interest_rate_data + data
-            processed_data = self.process_data(all_events_data)
-
-            # Save the processed data and  interest rate data
-            self.save_data(processed_data)
-            self.save_interest_rate_data()
-
-            # Update the last block
-            self.last_block += self.PAGINATION_SIZE
-            logger.info(f"Processed data up to block {self.last_block}")
-            retry = 0  # Reset retry counter if data is found and processed
-
-        if retry == max_retries:
-            logger.info(f"Reached max retries for block: {self.last_block}")
+        :return: list of addresses
+        """
+        return [NOSTRA_MAINNET_INTEREST_RATE_MODEL_ADDRESS, *self.PROTOCOL_ADDRESSES]
 
 
 def run_loan_states_computation_for_nostra_mainnet() -> None:
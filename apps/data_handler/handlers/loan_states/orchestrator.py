@@ -0,0 +1,281 @@
+"""
+A module that runs the loan state computations of several protocols in parallel.
+
+The events of all protocols are fetched by one ingest stage, an event loop in the calling
+process that fetches the block windows of every protocol concurrently, one window ahead.
+The events are replayed by one worker process per protocol, so that the replays of the
+protocols no longer share one interpreter. Every protocol has a bounded queue of pages:
+once it is full, the ingest of the protocol waits until its worker catches up
+(backpressure), while the other protocols keep going. The workers report their progress
+back after every page.
+
+Example usage:
+progress = run_loan_states_computations(
+    [ZkLendLoanStateComputation, NostraMainnetStateComputation]
+)
+"""
+
+import asyncio
+import logging
+import queue
+import traceback
+from contextlib import aclosing
+from dataclasses import dataclass
+from time import monotonic
+from typing import Iterable, Optional, Type
+
+import billiard
+from data_handler.handler_tools.api_connector import AsyncDeRiskAPIConnector
+from data_handler.handlers.loan_states.abstractions import (
+    LoanStateComputationBase,
+    fetch_block_windows,
+)
+from shared.rpc_gateway import run_with_rpc_sessions
+
+logger = logging.getLogger(__name__)
+
+# The number of fetched pages a protocol may have waiting for its worker.
+PAGE_QUEUE_SIZE = 4
+# The interval in seconds at which blocked queue operations check the worker is alive.
+POLL_INTERVAL = 1.0
+
+# The reports sent by the workers.
+READY = "ready"
+PROGRESS = "progress"
+DONE = "done"
+ERROR = "error"
+
+
+@dataclass
+class ReplayProgress:
+    """
+    The progress of the replay of a protocol, as reported by its worker.
+    """
+
+    protocol: str
+    start_block: int
+    # The last block of the last replayed window.
+    last_block: Optional[int] = None
+    # The last block whose events are included in the state.
+    last_processed_block: Optional[int] = None
+    pages: int = 0
+    events: int = 0
+    fetched_pages: int = 0
+    started_at: float = 0.0
+
+    def log(self) -> None:
+        """
+        Logs the progress of the replay.
+        """
+        logger.info(
+            f"{self.protocol}: replayed {self.events} events of {self.pages} pages "
+            f"up to block {self.last_block} in {monotonic() - self.started_at:.1f}s, "
+            f"{self.fetched_pages - self.pages} pages queued"
+        )
+
+
+def replay_pages(
+    computation_class: Type[LoanStateComputationBase],
+    pages: billiard.Queue,
+    reports: billiard.Queue,
+) -> None:
+    """
+    Replays the pages fed by the ingest stage, runs in the worker process of a protocol.
+    :param computation_class: The loan state computation of the protocol.
+    :param pages: The (min_block, max_block, data) pages, `None` once all are fed.
+    :param reports: The queue the progress is reported to.
+    """
+    logging.basicConfig(level=logging.INFO)
+    try:
+        computation = computation_class()
+        reports.put((READY, computation.last_block, computation.get_page_addresses()))
+        last_processed_block = None
+        while (page := pages.get()) is not None:
+            min_block, max_block, data = page
+            last_processed_block = computation.replay_page(min_block, max_block, data)
+            reports.put((PROGRESS, max_block, last_processed_block, len(data)))
+        if last_processed_block is not None:
+            computation.checkpoint_state(last_processed_block, force=True)
+        reports.put((DONE,))
+    except Exception:
+        reports.put((ERROR, traceback.format_exc()))
+
+
+def _check_worker(worker: billiard.Process, reports: billiard.Queue) -> None:
+    """
+    Raises the error of a worker which exited, as reported by it if it did.
+    """
+    if worker.is_alive():
+        return
+    while True:
+        try:
+            report = reports.get_nowait()
+        except queue.Empty:
+            break
+        if report[0] == ERROR:
+            raise RuntimeError(f"{worker.name} failed:\n{report[1]}")
+    raise RuntimeError(f"{worker.name} exited with code {worker.exitcode}")
+
+
+def _put_page(
+    pages: billiard.Queue,
+    page: Optional[tuple[int, int, list[dict]]],
+    worker: billiard.Process,
+    reports: billiard.Queue,
+) -> None:
+    """
+    Puts a page in the queue of a worker, waiting while the queue is full.
+    """
+    while True:
+        try:
+            pages.put(page, timeout=POLL_INTERVAL)
+            return
+        except queue.Full:
+            _check_worker(worker, reports)
+
+
+def _get_report(reports: billiard.Queue, worker: billiard.Process) -> tuple:
+    """
+    Gets the next report of a worker, waiting until there is one.
+    """
+    while True:
+        try:
+            return reports.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            _check_worker(worker, reports)
+
+
+def _apply_report(report: tuple, progress: ReplayProgress) -> None:
+    """
+    Updates the progress of a protocol with a report of its worker.
+    """
+    if report[0] == ERROR:
+        raise RuntimeError(f"{progress.protocol} replay failed:\n{report[1]}")
+    if report[0] == PROGRESS:
+        _, progress.last_block, progress.last_processed_block, events = report
+        progress.pages += 1
+        progress.events += events
+        progress.log()
+
+
+def _apply_pending_reports(reports: billiard.Queue, progress: ReplayProgress) -> None:
+    """
+    Updates the progress of a protocol with the reports its worker sent so far.
+    """
+    while True:
+        try:
+            report = reports.get_nowait()
+        except queue.Empty:
+            return
+        _apply_report(report, progress)
+
+
+async def run_protocol(
+    computation_class: Type[LoanStateComputationBase],
+    context: billiard.context.BaseContext,
+    queue_size: int = PAGE_QUEUE_SIZE,
+) -> ReplayProgress:
+    """
+    Runs the loan state computation of a protocol: fetches its block windows in the event
+    loop and replays them in a worker process.
+    Stops after `MAX_EMPTY_PAGES` consecutive windows without events.
+    :param computation_class: The loan state computation of the protocol.
+    :param context: The billiard context to start the worker with.
+    :param queue_size: The number of fetched pages that may wait for the worker.
+    :return: ReplayProgress
+    """
+    protocol = str(computation_class.PROTOCOL_TYPE)
+    pages = context.Queue(maxsize=queue_size)
+    reports = context.Queue()
+    worker = context.Process(
+        target=replay_pages,
+        args=(computation_class, pages, reports),
+        name=f"{protocol} loan states",
+    )
+    worker.start()
+    try:
+        report = await asyncio.to_thread(_get_report, reports, worker)
+        if report[0] == ERROR:
+            raise RuntimeError(f"{protocol} replay failed:\n{report[1]}")
+        _, start_block, addresses = report
+        progress = ReplayProgress(protocol, start_block, started_at=monotonic())
+        logger.info(f"{protocol}: replaying from block {start_block}")
+
+        paginator = computation_class.create_paginator()
+        empty_pages = 0
+        async with AsyncDeRiskAPIConnector(
+            computation_class.FETCH_CONCURRENCY
+        ) as connector:
+            windows = fetch_block_windows(connector, paginator, addresses, start_block)
+            async with aclosing(windows):
+                async for min_block, max_block, data in windows:
+                    if not data:
+                        empty_pages += 1
+                        if empty_pages >= computation_class.MAX_EMPTY_PAGES:
+                            logger.info(
+                                f"{protocol}: no data found up to block {max_block}"
+                            )
+                            break
+                        continue
+                    empty_pages = 0
+                    # Waits while the worker is `queue_size` pages behind
+                    await asyncio.to_thread(
+                        _put_page, pages, (min_block, max_block, data), worker, reports
+                    )
+                    progress.fetched_pages += 1
+                    _apply_pending_reports(reports, progress)
+
+        await asyncio.to_thread(_put_page, pages, None, worker, reports)
+        while True:
+            report = await asyncio.to_thread(_get_report, reports, worker)
+            if report[0] == DONE:
+                break
+            _apply_report(report, progress)
+        await asyncio.to_thread(worker.join)
+        paginator.log_metrics(protocol)
+        return progress
+    finally:
+        if worker.is_alive():
+            worker.terminate()
+
+
+async def run_protocols(
+    computation_classes: Iterable[Type[LoanStateComputationBase]],
+    queue_size: int = PAGE_QUEUE_SIZE,
+) -> dict[str, ReplayProgress]:
+    """
+    Runs the loan state computations of the protocols in parallel.
+    :param computation_classes: The loan state computations of the protocols.
+    :param queue_size: The number of fetched pages that may wait for each worker.
+    :return: dict - The progress by protocol.
+    """
+    # Workers start from a fresh interpreter, the ingest loop runs threads. The billiard
+    # context is used since the daemonic workers of the Celery prefork pool may not start
+    # child processes with `multiprocessing`.
+    context = billiard.get_context("spawn")
+    computation_classes = list(computation_classes)
+    results = await asyncio.gather(
+        *(
+            run_protocol(computation_class, context, queue_size)
+            for computation_class in computation_classes
+        ),
+        return_exceptions=True,
+    )
+    # A failing protocol does not stop the others, its error is raised once all finished
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return {progress.protocol: progress for progress in results}
+
+
+def run_loan_states_computations(
+    computation_classes: Iterable[Type[LoanStateComputationBase]],
+    queue_size: int = PAGE_QUEUE_SIZE,
+) -> dict[str, ReplayProgress]:
+    """
+    Runs the loan state computations of the protocols in parallel.
+    :param computation_classes: The loan state computations of the protocols.
+    :param queue_size: The number of fetched pages that may wait for each worker.
+    :return: dict - The progress by protocol.
+    """
+    return run_with_rpc_sessions(run_protocols(computation_classes, queue_size))
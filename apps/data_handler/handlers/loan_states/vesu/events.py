@@ -4,8 +4,10 @@ This module interacts with the VesuLoan contract on Starknet to fetch user posit
 calculate collateral and debt values, and determine health factors for users.
 """
 
+import logging
 from datetime import datetime
 from decimal import Decimal
+from typing import Iterable, Optional
 
 from sqlalchemy import select
 from starknet_py.hash.selector import get_selector_from_name
@@ -13,15 +15,30 @@ from shared.db.models import HealthRatioLevel
 
 from data_handler.db.crud import DBConnector
 from data_handler.db.models import VesuPosition
+from data_handler.handlers.loan_states.vesu.health import (
+    DEFAULT_MAX_CONCURRENCY,
+    HealthPlan,
+    PositionKey,
+    evaluate_health_factors,
+)
+from shared.protocol_ids import ProtocolIDs
 from shared.starknet_client import StarknetClient
 
+logger = logging.getLogger(__name__)
+
+# The block of the first Vesu event.
+FIRST_VESU_BLOCK = 654244
+# The maximum number of events per page, see `starknet_getEvents`.
+EVENTS_CHUNK_SIZE = 1000
+
 
 class VesuLoanEntity:
     """
     Class to handle VesuLoan events and calculate health factors.
     This class interacts with the VesuLoan contract on Starknet to fetch user positions,
     calculate collateral and debt values, and determine health factors for users.
-    It uses a mock database to store user positions and a cache to optimize data retrieval.
+    It uses a mock database to store user positions. Token decimals, asset and LTV configs
+    and price extensions are cached across tasks by `StarknetClient`, see `shared.call_cache`.
     """
 
     VESU_ADDRESS = "0x02545b2e5d519fc230e9cd781046d3a64e092114f07e44771e0d719d148725ef"
@@ -31,8 +48,8 @@ class VesuLoanEntity:
         self.client = StarknetClient()
         self.db_connector = DBConnector()
         self.session = self.db_connector.Session
-        self._cache = {}
-        self.last_processed_block = 654244  # First VESU event block
+        self.start_block: Optional[int] = None
+        self.last_processed_block: Optional[int] = None
 
     async def _get_token_decimals(self, token_address: int) -> Decimal:
         """
@@ -41,13 +58,13 @@ class VesuLoanEntity:
         :param token_address: Token address in decimal format
 
         :return: Decimal factor based on token decimals (10^n)
+        :raise ValueError: If the token contract returns no decimals
         """
         result = await self.client.func_call(token_address, "decimals", [])
-        if result and len(result) > 0:
-            print(f"Decimals for token {hex(token_address)}: {result[0]}")
-            decimals = result[0]
-            return Decimal(10) ** Decimal(decimals)
-        return Decimal("Inf")
+        if not result:
+            raise ValueError(f"No decimals for token {hex(token_address)}")
+        logger.debug(f"Decimals for token {hex(token_address)}: {result[0]}")
+        return Decimal(10) ** Decimal(result[0])
 
     async def save_health_ratio_level(self, timestamp, user_id, value, protocol_id):
         """Save a HealthRatioLevel record to the DB."""
@@ -62,102 +79,101 @@ class VesuLoanEntity:
         self.session.refresh(record)
         return record
 
-    async def calculate_health_factor(self, user_address: int) -> dict[str, Decimal]:
+    def save_health_ratio_levels(self, health_ratio_levels: Iterable[dict]) -> int:
         """
-        Calculate health factors for all positions of a user.
+        Save HealthRatioLevel records to the DB with one bulk insert.
 
-        :param user_address: User address in int format
-        :return: Dictionary with pool IDs (in hex) as keys and health factors as values
+        :param health_ratio_levels: Dicts with the keys protocol_id, user_id, value and
+            timestamp
+        :return: The number of saved records
         """
-        result = self.session.execute(
-            select(VesuPosition).where(VesuPosition.user == str(user_address))
-        )
-        positions = result.scalars().all()
-
-        if not positions:
-            return {}
-
-        results = {}
-
-        for pos in positions:
-            pool_id = int(pos.pool_id)
-            collateral_asset = int(pos.collateral_asset)
-            debt_asset = int(pos.debt_asset)
+        return self.db_connector.copy_health_ratio_levels_to_db(health_ratio_levels)
 
-            if collateral_asset == 0 or debt_asset == 0:
-                results[hex(pool_id)] = Decimal("inf")
-                continue
+    def get_positions(self, user_addresses: Iterable[int]) -> list[PositionKey]:
+        """
+        Get the distinct positions of the users.
 
-            position = await self._get_position_data(
-                user_address, pool_id, collateral_asset, debt_asset
-            )
-            collateral_shares_low, collateral_shares_high = position[0], position[1]
-            collateral_sign = 0 if collateral_shares_low >= 0 else 1
-
-            collateral_value = await self._get_collateral_value(
-                pool_id,
-                collateral_asset,
-                collateral_shares_low,
-                collateral_shares_high,
-                collateral_sign,
+        :param user_addresses: User addresses in int format
+        :return: The positions, once per (user, pool, collateral, debt)
+        """
+        result = self.session.execute(
+            select(
+                VesuPosition.user,
+                VesuPosition.pool_id,
+                VesuPosition.collateral_asset,
+                VesuPosition.debt_asset,
             )
-
-            debt_config = await self._get_asset_config(pool_id, debt_asset)
-            nominal_debt_low, nominal_debt_high = position[2], position[3]
-            debt_sign = 0 if nominal_debt_low >= 0 else 1
-
-            rate_acc_low, rate_acc_high = debt_config[14], debt_config[15]
-            scale_low, scale_high = debt_config[10], debt_config[11]
-
-            debt_value = await self._calculate_debt(
-                nominal_debt_low,
-                nominal_debt_high,
-                debt_sign,
-                rate_acc_low,
-                rate_acc_high,
-                scale_low,
-                scale_high,
+            .where(VesuPosition.user.in_([str(user) for user in user_addresses]))
+            .distinct()
+        )
+        return [
+            PositionKey(
+                user=int(user),
+                pool_id=int(pool_id),
+                collateral_asset=int(collateral_asset),
+                debt_asset=int(debt_asset),
             )
+            for user, pool_id, collateral_asset, debt_asset in result.all()
+        ]
 
-            ltv_data = await self.get_ltv_config(pool_id, collateral_asset, debt_asset)
-
-            collateral_decimals = await self._get_token_decimals(collateral_asset)
-            debt_decimals = await self._get_token_decimals(debt_asset)
-
-            collateral_factor = Decimal(ltv_data[0]) / collateral_decimals
-
-            collateral_price = await self.fetch_token_price(collateral_asset, pool_id)
-            debt_price = await self.fetch_token_price(debt_asset, pool_id)
-
-            collateral_normalized = collateral_value / collateral_decimals
-            debt_normalized = debt_value / debt_decimals
-
-            collateral_usd = collateral_normalized * collateral_price
-            debt_usd = debt_normalized * debt_price
-
-            health_factor = (
-                (collateral_usd * collateral_factor) / debt_usd
-                if debt_usd > 0
-                else Decimal("inf")
-            )
+    async def calculate_health_factors(
+        self,
+        user_addresses: Iterable[int],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> dict[int, dict[str, Decimal]]:
+        """
+        Calculate health factors for all positions of the users and save them in one batch.
+        The configs, decimals and prices the positions share are read once, see
+        `data_handler.handlers.loan_states.vesu.health`. A position whose reads fail is left
+        out of the results.
+
+        :param user_addresses: User addresses in int format
+        :param max_concurrency: The maximum number of concurrent contract reads
+        :return: Dictionary with user addresses as keys and dictionaries with pool IDs
+            (in hex) as keys and health factors as values
+        """
+        plan = HealthPlan.from_positions(self.get_positions(user_addresses))
+        health_factors = await evaluate_health_factors(self, plan, max_concurrency)
 
-            results[hex(pool_id)] = health_factor
+        results = {}
+        for position in plan.positions:
+            if position in health_factors:
+                health_factor = health_factors[position]
+            elif not position.is_open:
+                # Without a debt asset the position has no debt
+                health_factor = Decimal("inf")
+            else:
+                # The reads of the position failed, its health factor is unknown
+                continue
+            results.setdefault(position.user, {})[hex(position.pool_id)] = health_factor
+
+        timestamp = datetime.now().timestamp()
+        self.save_health_ratio_levels(
+            {
+                "timestamp": timestamp,
+                "user_id": str(position.user),
+                "value": health_factor,
+                "protocol_id": ProtocolIDs.VESU.value,
+            }
+            for position, health_factor in health_factors.items()
+        )
+        return results
 
-            await self.save_health_ratio_level(
-                # session=self.session,
-                timestamp=datetime.now().timestamp(),
-                user_id=str(user_address),
-                value=health_factor,
-                protocol_id="Vesu",
-            )
+    async def calculate_health_factor(self, user_address: int) -> dict[str, Decimal]:
+        """
+        Calculate health factors for all positions of a user.
 
-        return results
+        :param user_address: User address in int format
+        :return: Dictionary with pool IDs (in hex) as keys and health factors as values
+        """
+        results = await self.calculate_health_factors([user_address])
+        return results.get(user_address, {})
 
     async def _get_position_data(
         self, user, pool_id, collateral_asset, debt_asset
     ) -> tuple:
         """
-        Get user position data with caching.
+        Get user position data.
         :param user: User address in decimal format
         :param pool_id: Pool ID in decimal
         :param collateral_asset: Collateral asset address in decimal format
@@ -166,26 +182,10 @@ class VesuLoanEntity:
         """
         vesu_addr = int(self.VESU_ADDRESS, 16)
 
-        cache_key = f"position_{user}_{pool_id}_{collateral_asset}_{debt_asset}"
-        return await self._get_contract_data(
-            cache_key,
-            self.client.func_call,
-            [vesu_addr, "position", [pool_id, collateral_asset, debt_asset, user]],
+        return await self.client.func_call(
+            vesu_addr, "position", [pool_id, collateral_asset, debt_asset, user]
         )
 
-    async def _get_contract_data(self, cache_key, func, params) -> tuple:
-        """
-        Get data from contract with caching.
-
-        :param cache_key: Cache key for the data
-        :param func: Function to call
-        :param params: Parameters for the function call
-        :return: Result of the function call
-        """
-        if cache_key not in self._cache:
-            self._cache[cache_key] = await func(*params)
-        return self._cache[cache_key]
-
     async def _get_collateral_value(
         self, pool_id, asset, shares_low, shares_high, sign=0
     ) -> Decimal:
@@ -201,15 +201,10 @@ class VesuLoanEntity:
         """
         vesu_addr = int(self.VESU_ADDRESS, 16)
 
-        cache_key = f"collateral_{asset}_{shares_low}_{shares_high}_{sign}"
-        result = await self._get_contract_data(
-            cache_key,
-            self.client.func_call,
-            [
-                vesu_addr,
-                "calculate_collateral",
-                [pool_id, asset, shares_low, shares_high, sign],
-            ],
+        result = await self.client.func_call(
+            vesu_addr,
+            "calculate_collateral",
+            [pool_id, asset, shares_low, shares_high, sign],
         )
         return self._u256_to_decimal(result[0], result[1])
 
@@ -237,23 +232,17 @@ class VesuLoanEntity:
         """
         vesu_addr = int(self.VESU_ADDRESS, 16)
 
-        cache_key = f"debt_{nominal_debt_low}_{nominal_debt_high}_{sign}_ \
-        {rate_accumulator_low}_{rate_accumulator_high}"
-        result = await self._get_contract_data(
-            cache_key,
-            self.client.func_call,
+        result = await self.client.func_call(
+            vesu_addr,
+            "calculate_debt",
             [
-                vesu_addr,
-                "calculate_debt",
-                [
-                    nominal_debt_low,
-                    nominal_debt_high,
-                    sign,
-                    rate_accumulator_low,
-                    rate_accumulator_high,
-                    scale_low,
-                    scale_high,
-                ],
+                nominal_debt_low,
+                nominal_debt_high,
+                sign,
+                rate_accumulator_low,
+                rate_accumulator_high,
+                scale_low,
+                scale_high,
             ],
         )
         return self._u256_to_decimal(result[0], result[1])
@@ -268,11 +257,8 @@ class VesuLoanEntity:
         """
         vesu_addr = int(self.VESU_ADDRESS, 16)
 
-        cache_key = f"asset_config_{pool_id}_{asset_address}"
-        return await self._get_contract_data(
-            cache_key,
-            self.client.func_call,
-            [vesu_addr, "asset_config", [pool_id, asset_address]],
+        return await self.client.func_call(
+            vesu_addr, "asset_config", [pool_id, asset_address]
         )
 
     async def get_ltv_config(self, pool_id, collateral, debt) -> tuple:
@@ -286,11 +272,8 @@ class VesuLoanEntity:
         """
         vesu_addr = int(self.VESU_ADDRESS, 16)
 
-        cache_key = f"ltv_{pool_id}_{collateral}_{debt}"
-        return await self._get_contract_data(
-            cache_key,
-            self.client.func_call,
-            [vesu_addr, "ltv_config", [pool_id, collateral, debt]],
+        return await self.client.func_call(
+            vesu_addr, "ltv_config", [pool_id, collateral, debt]
         )
 
     async def fetch_token_price(self, address, pool_id) -> Decimal:
@@ -300,36 +283,25 @@ class VesuLoanEntity:
         :param address: Token address in decimal format
         :param pool_id: Pool ID in decimal
         :return: Token price as a Decimal
+        :raise ValueError: If the price extension reports the price as invalid
         """
-        try:
-            vesu_addr = int(self.VESU_ADDRESS, 16)
-
-            cache_key = f"extension_price_{pool_id}"
-            if cache_key not in self._cache:
-                extension_result = await self.client.func_call(
-                    vesu_addr, "extension", [pool_id]
-                )
-                self._cache[cache_key] = extension_result[0]
-            price_extension_addr = self._cache[cache_key]
+        vesu_addr = int(self.VESU_ADDRESS, 16)
 
-            price_result = await self.client.func_call(
-                price_extension_addr, "price", [pool_id, address]
-            )
-            price_u256 = price_result[0]
-            is_valid = price_result[2] if len(price_result) > 2 else 1
+        extension_result = await self.client.func_call(
+            vesu_addr, "extension", [pool_id]
+        )
+        price_extension_addr = extension_result[0]
 
-            if not is_valid:
-                print(
-                    f"Warning: Price for \
-                    {address} is not valid"
-                )
-                return Decimal("1")
+        price_result = await self.client.func_call(
+            price_extension_addr, "price", [pool_id, address]
+        )
+        price_u256 = price_result[0]
+        is_valid = price_result[2] if len(price_result) > 2 else 1
 
-            return Decimal(price_u256) / Decimal(10**18)
+        if not is_valid:
+            raise ValueError(f"Invalid price for {hex(address)} in pool {hex(pool_id)}")
 
-        except Exception as e:
-            print(f"Error fetching price for {address}: {e}")
-            return Decimal("1")
+        return Decimal(price_u256) / Decimal(10**18)
 
     def _u256_to_decimal(self, low, high) -> Decimal:
         """
@@ -342,55 +314,88 @@ class VesuLoanEntity:
         """
         return Decimal(low) + (Decimal(high) * Decimal(2**128))
 
-    async def update_positions_data(self) -> None:
+    def get_last_processed_block(self) -> int:
+        """
+        Get the last block whose ModifyPosition events are all stored: the persisted event
+        cursor, else the last block of the stored positions, else the block before the
+        first Vesu event.
+
+        :return: Block number
+        """
+        cursor = self.db_connector.get_event_cursor(ProtocolIDs.VESU)
+        if cursor is not None:
+            return cursor
+        last_position_block = self.db_connector.get_last_vesu_position_block()
+        if last_position_block is not None:
+            return last_position_block
+        return FIRST_VESU_BLOCK - 1
+
+    @staticmethod
+    def get_positions_data(events: list) -> list[dict]:
+        """
+        Get the positions changed by ModifyPosition events.
+
+        :param events: ModifyPosition events
+        :return: The positions, as dicts of the VesuPosition columns
+        """
+        return [
+            {
+                "user": str(event.keys[4]),
+                "pool_id": str(event.keys[1]),
+                "collateral_asset": str(event.keys[2]),
+                "debt_asset": str(event.keys[3]),
+                "block_number": event.block_number,
+            }
+            for event in events
+        ]
+
+    async def update_positions_data(self) -> int:
         """
         Process ModifyPosition events to track user positions.
-        Uses continuation tokens to fetch all events across multiple pages.
+        Streams the events from the stored cursor up to the current block page by page,
+        every page is upserted together with the cursor, so that a failed run resumes after
+        the last written page.
 
-        :return: None
+        :return: The number of upserted positions
         """
+        self.last_processed_block = self.get_last_processed_block()
+        self.start_block = self.last_processed_block + 1
         current_block = await self.client.client.get_block_number()
 
         if current_block <= self.last_processed_block:
-            return
+            return 0
 
         continuation_token = None
-        all_events = []
+        written = 0
+        selector = hex(get_selector_from_name("ModifyPosition"))
 
         while True:
             events = await self.client.client.get_events(
                 address=self.VESU_ADDRESS,
-                from_block_number=self.last_processed_block + 1,
+                from_block_number=self.start_block,
                 to_block_number=current_block,
-                keys=[[hex(get_selector_from_name("ModifyPosition"))]],
-                chunk_size=5,
+                keys=[[selector]],
+                chunk_size=EVENTS_CHUNK_SIZE,
                 continuation_token=continuation_token,
             )
-
-            all_events.extend(events.events)
-
             continuation_token = events.continuation_token
+
             if not continuation_token:
-                break
+                cursor_block = current_block
+            elif events.events:
+                # The events of the last block of the page may continue on the next page
+                cursor_block = max(
+                    self.last_processed_block, events.events[-1].block_number - 1
+                )
+            else:
+                cursor_block = self.last_processed_block
 
-        for event in all_events:
-            event_keys = event.keys
-
-            pool_id = event_keys[1]
-            collateral_asset = event_keys[2]
-            debt_asset = event_keys[3]
-            user = event_keys[4]
-            block_number = event.block_number
-
-            position = VesuPosition(
-                user=str(user),
-                pool_id=str(pool_id),
-                collateral_asset=str(collateral_asset),
-                debt_asset=str(debt_asset),
-                block_number=block_number,
+            written += self.db_connector.write_vesu_positions(
+                self.get_positions_data(events.events), cursor_block=cursor_block
             )
-            self.session.add(position)
+            self.last_processed_block = cursor_block
 
-            self.last_processed_block = max(self.last_processed_block, block_number)
+            if not continuation_token:
+                break
 
-        self.session.commit()
+        return written
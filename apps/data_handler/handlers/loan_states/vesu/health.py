@@ -0,0 +1,314 @@
+"""
+Concurrent evaluation of the health factors of Vesu positions.
+
+The health factor of a position needs the position, its collateral and debt values, the asset
+config of its debt asset, the LTV config of its pair, the decimals and the prices of both of
+its assets. The configs, decimals and prices are shared by many positions: a `HealthPlan`
+collects the unique reads of a whole set of positions, they are made once and concurrently, at
+most `max_concurrency` at a time and batched into JSON-RPC batch requests, and every position
+is then evaluated from the shared results.
+
+Example usage:
+plan = HealthPlan.from_positions(positions)
+health_factors = await evaluate_health_factors(vesu_entity, plan)
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Awaitable, Iterable
+
+from shared.batch_call import batched_calls
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY: int = 32
+
+
+@dataclass(frozen=True)
+class PositionKey:
+    """
+    A position of a user in a Vesu pool, all values are felts.
+    """
+
+    user: int
+    pool_id: int
+    collateral_asset: int
+    debt_asset: int
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Whether the position has both a collateral and a debt asset.
+        """
+        return self.collateral_asset != 0 and self.debt_asset != 0
+
+
+@dataclass
+class HealthPlan:
+    """
+    The positions to evaluate and the unique reads they share.
+    """
+
+    positions: list[PositionKey] = field(default_factory=list)
+    # (pool ID, debt asset)
+    asset_configs: set[tuple[int, int]] = field(default_factory=set)
+    # (pool ID, collateral asset, debt asset)
+    ltv_configs: set[tuple[int, int, int]] = field(default_factory=set)
+    decimals: set[int] = field(default_factory=set)
+    # (pool ID, asset)
+    prices: set[tuple[int, int]] = field(default_factory=set)
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[PositionKey]) -> "HealthPlan":
+        """
+        Plan the reads of the positions, duplicate positions are evaluated once.
+        :param positions: The positions to evaluate.
+        :return: HealthPlan
+        """
+        plan = cls()
+        for position in dict.fromkeys(positions):
+            plan.positions.append(position)
+            if not position.is_open:
+                continue
+            pool_id = position.pool_id
+            plan.asset_configs.add((pool_id, position.debt_asset))
+            plan.ltv_configs.add(
+                (pool_id, position.collateral_asset, position.debt_asset)
+            )
+            plan.decimals.update((position.collateral_asset, position.debt_asset))
+            plan.prices.update(
+                ((pool_id, position.collateral_asset), (pool_id, position.debt_asset))
+            )
+        return plan
+
+
+@dataclass
+class SharedReads:
+    """
+    The results of the reads shared by the positions of a plan.
+    """
+
+    asset_configs: dict[tuple[int, int], tuple]
+    ltv_configs: dict[tuple[int, int, int], tuple]
+    decimals: dict[int, Decimal]
+    prices: dict[tuple[int, int], Decimal]
+
+    def covers(self, position: PositionKey) -> bool:
+        """
+        Whether all the shared reads of an open position succeeded.
+        :param position: PositionKey
+        :return: bool
+        """
+        pool_id = position.pool_id
+        collateral_asset, debt_asset = position.collateral_asset, position.debt_asset
+        return (
+            (pool_id, debt_asset) in self.asset_configs
+            and (pool_id, collateral_asset, debt_asset) in self.ltv_configs
+            and collateral_asset in self.decimals
+            and debt_asset in self.decimals
+            and (pool_id, collateral_asset) in self.prices
+            and (pool_id, debt_asset) in self.prices
+        )
+
+
+async def _gather_bounded(
+    coroutines: Iterable[Awaitable],
+    max_concurrency: int,
+    return_exceptions: bool = False,
+) -> list[Any]:
+    """
+    Await the coroutines concurrently, at most `max_concurrency` at a time.
+    :param coroutines: The coroutines.
+    :param max_concurrency: The maximum number of coroutines awaited at once.
+    :param return_exceptions: Whether the raised exceptions are returned as results.
+    :return: The results in the order of the coroutines.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(coroutine: Awaitable) -> Any:
+        async with semaphore:
+            return await coroutine
+
+    return list(
+        await asyncio.gather(
+            *(run(coroutine) for coroutine in coroutines),
+            return_exceptions=return_exceptions,
+        )
+    )
+
+
+async def fetch_shared_reads(
+    vesu_entity, plan: HealthPlan, max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> SharedReads:
+    """
+    Make the reads shared by the positions of a plan, each of them once. A read that fails is
+    logged and left out of the results, see `SharedReads.covers`.
+    :param vesu_entity: The VesuLoanEntity making the reads.
+    :param plan: HealthPlan
+    :param max_concurrency: The maximum number of concurrent reads.
+    :return: SharedReads
+    """
+    asset_configs = list(plan.asset_configs)
+    ltv_configs = list(plan.ltv_configs)
+    decimals = list(plan.decimals)
+    prices = list(plan.prices)
+    results = await _gather_bounded(
+        [
+            *(vesu_entity._get_asset_config(*key) for key in asset_configs),
+            *(vesu_entity.get_ltv_config(*key) for key in ltv_configs),
+            *(vesu_entity._get_token_decimals(asset) for asset in decimals),
+            *(
+                vesu_entity.fetch_token_price(asset, pool_id)
+                for pool_id, asset in prices
+            ),
+        ],
+        max_concurrency,
+        return_exceptions=True,
+    )
+    results = iter(results)
+
+    def collect(keys: list, name: str) -> dict:
+        reads = {}
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to read Vesu {name} {key}: {result!r}")
+                continue
+            reads[key] = result
+        return reads
+
+    return SharedReads(
+        asset_configs=collect(asset_configs, "asset config"),
+        ltv_configs=collect(ltv_configs, "LTV config"),
+        decimals=collect(decimals, "decimals"),
+        prices=collect(prices, "price"),
+    )
+
+
+async def _get_position_values(
+    vesu_entity, position: PositionKey, shared: SharedReads
+) -> tuple[Decimal, Decimal]:
+    """
+    Read the collateral and debt values of a position.
+    :return: (collateral value, debt value), in the units of the assets.
+    """
+    data = await vesu_entity._get_position_data(
+        position.user,
+        position.pool_id,
+        position.collateral_asset,
+        position.debt_asset,
+    )
+    collateral_shares_low, collateral_shares_high = data[0], data[1]
+    nominal_debt_low, nominal_debt_high = data[2], data[3]
+    debt_config = shared.asset_configs[(position.pool_id, position.debt_asset)]
+    return tuple(
+        await asyncio.gather(
+            vesu_entity._get_collateral_value(
+                position.pool_id,
+                position.collateral_asset,
+                collateral_shares_low,
+                collateral_shares_high,
+                0 if collateral_shares_low >= 0 else 1,
+            ),
+            vesu_entity._calculate_debt(
+                nominal_debt_low,
+                nominal_debt_high,
+                0 if nominal_debt_low >= 0 else 1,
+                # Rate accumulator
+                debt_config[14],
+                debt_config[15],
+                # Scale
+                debt_config[10],
+                debt_config[11],
+            ),
+        )
+    )
+
+
+def compute_health_factor(
+    position: PositionKey,
+    collateral_value: Decimal,
+    debt_value: Decimal,
+    shared: SharedReads,
+) -> Decimal:
+    """
+    Compute the health factor of a position from its values and the shared reads.
+    :param position: PositionKey
+    :param collateral_value: The collateral value, in the units of the collateral asset.
+    :param debt_value: The debt value, in the units of the debt asset.
+    :param shared: SharedReads
+    :return: The health factor, infinite without debt.
+    """
+    pool_id = position.pool_id
+    collateral_decimals = shared.decimals[position.collateral_asset]
+    debt_decimals = shared.decimals[position.debt_asset]
+    ltv_config = shared.ltv_configs[
+        (pool_id, position.collateral_asset, position.debt_asset)
+    ]
+    collateral_factor = Decimal(ltv_config[0]) / collateral_decimals
+
+    collateral_usd = (
+        collateral_value
+        / collateral_decimals
+        * shared.prices[(pool_id, position.collateral_asset)]
+    )
+    debt_usd = (
+        debt_value / debt_decimals * shared.prices[(pool_id, position.debt_asset)]
+    )
+    if debt_usd > 0:
+        return collateral_usd * collateral_factor / debt_usd
+    return Decimal("inf")
+
+
+async def evaluate_health_factors(
+    vesu_entity,
+    plan: HealthPlan,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> dict[PositionKey, Decimal]:
+    """
+    Evaluate the health factors of the positions of a plan. The shared reads are made first,
+    then the reads of the positions, both concurrently and batched. A position whose own or
+    shared reads fail is logged and left out, the other positions are still evaluated.
+    :param vesu_entity: The VesuLoanEntity making the reads.
+    :param plan: HealthPlan
+    :param max_concurrency: The maximum number of concurrent reads.
+    :return: The health factors of the open positions that could be read.
+    """
+    positions = [position for position in plan.positions if position.is_open]
+    if not positions:
+        return {}
+
+    async with batched_calls():
+        shared = await fetch_shared_reads(vesu_entity, plan, max_concurrency)
+        skipped = [position for position in positions if not shared.covers(position)]
+        if skipped:
+            logger.error(
+                f"Skipped {len(skipped)} Vesu positions whose shared reads failed."
+            )
+            positions = [position for position in positions if shared.covers(position)]
+        values = await _gather_bounded(
+            (
+                _get_position_values(vesu_entity, position, shared)
+                for position in positions
+            ),
+            max_concurrency,
+            return_exceptions=True,
+        )
+
+    health_factors = {}
+    for position, position_values in zip(positions, values):
+        if isinstance(position_values, Exception):
+            logger.error(
+                f"Failed to read Vesu position {position}: {position_values!r}"
+            )
+            continue
+        health_factors[position] = compute_health_factor(
+            position, *position_values, shared
+        )
+    logger.info(
+        f"Evaluated {len(health_factors)} Vesu positions with "
+        f"{len(plan.asset_configs) + len(plan.ltv_configs)} configs, "
+        f"{len(plan.decimals)} decimals and {len(plan.prices)} prices."
+    )
+    return health_factors
@@ -1,6 +1,5 @@
 """Fetch ZkLend specific token settings."""
 
-import asyncio
 import decimal
 
 from data_handler.handler_tools.constants import ProtocolAddresses
@@ -9,6 +8,7 @@ from pydantic import BaseModel, field_validator
 
 from shared.constants import TOKEN_SETTINGS
 from shared.loan_entity import ZkLendSpecificTokenSettings
+from shared.rpc_gateway import run_with_rpc_sessions
 
 SCALE_FACTOR = decimal.Decimal("1e27")
 
@@ -95,4 +95,6 @@ async def fetch_zklend_specific_token_settings() -> (
 
 
 if __name__ == "__main__":
-    ZKLEND_SPECIFIC_TOKEN_SETTINGS = asyncio.run(fetch_zklend_specific_token_settings())
+    ZKLEND_SPECIFIC_TOKEN_SETTINGS = run_with_rpc_sessions(
+        fetch_zklend_specific_token_settings()
+    )
@@ -2,12 +2,19 @@
 
 import logging
 from time import monotonic
+from typing import Callable, Optional
 
 import pandas as pd
 from data_handler.handler_tools.constants import ProtocolAddresses
 from data_handler.db.crud import InitializerDBConnector
 from data_handler.handlers.loan_states.abstractions import LoanStateComputationBase
-from shared.state import ZkLendState, State
+from shared.state import (
+    Event,
+    EventDispatcher,
+    ZkLendState,
+    State,
+    events_from_data,
+)
 from data_handler.handlers.loan_states.zklend.utils import ZkLendInitializer
 from shared.protocol_ids import ProtocolIDs
 
@@ -24,24 +31,52 @@ class ZkLendLoanStateComputation(LoanStateComputationBase):
 
     PROTOCOL_TYPE = ProtocolIDs.ZKLEND.value
     PROTOCOL_ADDRESSES = ProtocolAddresses().ZKLEND_MARKET_ADDRESSES
+    MAX_EMPTY_PAGES = 500
     INTEREST_RATES_KEYS = [
         "AccumulatorsSync",
         "zklend::market::Market::AccumulatorsSync",
     ]
+    SNAPSHOT_INTERVAL = 10_000
+
+    def create_state(self) -> ZkLendState:
+        """
+        Creates an empty zkLend state.
+
+        :return: ZkLendState
+        """
+        return ZkLendState(
+            save_collateral_cb=db_connector.save_collateral_enabled_by_user
+        )
+
+    def initialize_state(self, state: ZkLendState) -> None:
+        """
+        Loads the stored loan states of all users via ZkLendInitializer, to have actual
+        collateral_enabled values. This is done only if no snapshot exists: a restored
+        state already includes every user, while the stored loan states of the users
+        may include the events after the snapshot, which are replayed.
+
+        :param state: The new zkLend state.
+        :type state: ZkLendState
+        """
+        ZkLendInitializer(state).set_all_last_loan_states()
 
     def process_event(
-        self, instance_state: State, method_name: str, event: pd.Series
+        self,
+        instance_state: State,
+        handler: Optional[Callable[[Event], None]],
+        event: Event,
     ) -> None:
         """
-        Processes an event based on the method name and the event data.
+        Processes an event with its handler.
 
         Updates the last block processed to ensure data consistency
-        and calls the appropriate method to handle the event.
+        and calls the handler of the event.
 
-        :param instance_state: The instance of the state class to call the method on.
+        :param instance_state: The instance of the state class processing the event.
         :type instance_state: object
-        :param method_name: The name of the method to call for processing the event.
-        :param event: The event data as a pandas Series.
+        :param handler: The bound method of the state processing the event, resolved
+            with an `EventDispatcher`, or None if the state does not process it.
+        :param event: The event data.
         """
         try:
             block_number = event.get("block_number")
@@ -52,18 +87,17 @@ class ZkLendLoanStateComputation(LoanStateComputationBase):
                     self.process_interest_rate_event(instance_state, event)
 
                 self.last_block = block_number
-                method = getattr(instance_state, method_name, None)
-                if method:
-                    method(event)
+                if handler:
+                    handler(event)
                 else:
                     logger.info(
-                        f"No method named {method_name} found for processing event."
+                        f"No method found for processing {event['key_name']} event."
                     )
         except Exception as e:
             logger.exception(f"Failed to process event due to an error: {e}")
 
     def process_interest_rate_event(
-        self, zklend_state: ZkLendState, event: pd.Series
+        self, zklend_state: ZkLendState, event: Event
     ) -> None:
         """
         Processes an interest rate event.
@@ -71,7 +105,7 @@ class ZkLendLoanStateComputation(LoanStateComputationBase):
         :param zklend_state: The zkLend state object.
         :type zklend_state: ZkLendState
         :param event: The data of the event.
-        :type event: pd.Series
+        :type event: Event
         """
         zklend_state.process_accumulators_sync_event(event)
         self.add_interest_rate_data(zklend_state, event)
@@ -86,28 +120,28 @@ class ZkLendLoanStateComputation(LoanStateComputationBase):
 
         :return: pd.DataFrame
         """
-        zklend_state = ZkLendState(
-            save_collateral_cb=db_connector.save_collateral_enabled_by_user
-        )
+        # The state is kept across pages and checkpointed, see `checkpoint_state`
+        zklend_state = self.get_state()
+        zklend_state.loan_entities.pop_touched_users()
         events_mapping = zklend_state.EVENTS_METHODS_MAPPING
-        # Init DataFrame
-        df = pd.DataFrame(data)
-        # Init collateral_enabled state via ZkLendInitializer
-        zklend_initializer = ZkLendInitializer(zklend_state)
-        user_ids = zklend_initializer.get_user_ids_from_df(df)
-        zklend_initializer.set_last_loan_states_per_users(user_ids)
-        # Filter out events that are not in the mapping
-        df_filtered = df[df["key_name"].isin(events_mapping.keys())]
-        sorted_df = df_filtered.sort_values(by=["block_number", "id"])
-
-        for index, row in sorted_df.iterrows():
-            method_name = events_mapping.get(row["key_name"], "") or ""
-            self.process_event(zklend_state, method_name, row)
-
-        result_df = self.get_result_df(zklend_state.loan_entities)
+        # Keep only the events in the mapping, sorted by block number and ID
+        events = events_from_data(data, key_names=events_mapping.keys())
+        # Resolve the handlers once per page instead of once per event
+        dispatcher = EventDispatcher(zklend_state, events_mapping)
+        for event in events:
+            self.process_event(
+                zklend_state, dispatcher.get_handler(event.key_name), event
+            )
+
+        # Only the loan entities updated by this page need to be saved
+        loan_entities = {
+            user: zklend_state.loan_entities[user]
+            for user in zklend_state.loan_entities.pop_touched_users()
+        }
+        result_df = self.get_result_df(loan_entities)
         result_df["deposit"] = [
             {token: float(amount) for token, amount in loan.deposit.items()}
-            for loan in zklend_state.loan_entities.values()
+            for loan in loan_entities.values()
         ]
         logger.info(f"Processed data for block {self.last_block}")
         return result_df
@@ -144,36 +178,6 @@ class ZkLendLoanStateComputation(LoanStateComputationBase):
         result_df = pd.DataFrame(result_dict)
         return result_df
 
-    def run(self) -> None:
-        """
-        Runs the loan state computation for the specific protocol.
-        """
-        max_retries = 500
-        retry = 0
-        zklend_protocol_address = self.PROTOCOL_ADDRESSES
-
-        logger.info(f"Default last block: {self.last_block}")
-        while retry < max_retries:
-            data = self.get_data(zklend_protocol_address, self.last_block)
-
-            if not data:
-                logger.info(
-                    f"No data found for address {zklend_protocol_address} at block {self.last_block}"
-                )
-                self.last_block += self.PAGINATION_SIZE
-                retry += 1
-                continue
-
-            processed_data = self.process_data(data)
-            self.save_data(processed_data)
-            self.save_interest_rate_data()
-            self.last_block += self.PAGINATION_SIZE
-            logger.info(f"Processed data up to block {self.last_block}")
-            retry = 0  # Reset retry counter if data is found and processed
-
-        if retry == max_retries:
-            logger.info(f"Reached max retries for address {zklend_protocol_address}")
-
 
 def run_loan_states_computation_for_zklend() -> None:
     """
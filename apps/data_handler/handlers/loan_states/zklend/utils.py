@@ -1,6 +1,7 @@
 """This module contains the ZkLendInitializer class."""
 
 from decimal import Decimal
+from typing import Iterable, Mapping
 
 import pandas as pd
 
@@ -26,10 +27,10 @@ class ZkLendInitializer:
         self.zklend_state = zklend_state
 
     @staticmethod
-    def _select_element(row: pd.Series) -> str:
+    def _select_element(row: pd.Series | Mapping) -> str:
         """
         Selects the element from the given row.
-        :param row: Series row.
+        :param row: Series row or event.
         :return: str
         """
         if "TreasuryUpdate" == row["key_name"]:
@@ -50,6 +51,15 @@ class ZkLendInitializer:
         result = df.apply(self._select_element, axis=1).to_list()
         return list(set(result))
 
+    def get_user_ids_from_events(self, events: Iterable[Mapping]) -> list[str]:
+        """
+        Extracts the user ids from the given events.
+
+        :param events: The events (raw API events or `Event` records) to extract the user ids from.
+        :return: The list of user ids.
+        """
+        return list({self._select_element(event) for event in events})
+
     def set_last_loan_states_per_users(self, users_ids: list[str]) -> None:
         """
         Sets the last loan states for the given users.
@@ -60,6 +70,13 @@ class ZkLendInitializer:
         for loan_state in loan_states:
             self._set_loan_state_per_user(loan_state)
 
+    def set_all_last_loan_states(self) -> None:
+        """
+        Sets the last loan states of all the users stored in the database.
+        """
+        for loan_state in self.db_connector.get_all_zklend():
+            self._set_loan_state_per_user(loan_state)
+
     def _set_loan_state_per_user(self, loan_state: ZkLendCollateralDebt) -> None:
         """
         Sets the loan state for a user.
@@ -3,13 +3,17 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
 from decimal import Decimal
+import threading
 import time
+from typing import Optional
 
 import requests
 
 from data_handler.db.schemas import OrderBookResponseModel
 
+from data_handler.handlers.order_books.commons import TickEngine
 from data_handler.handlers.order_books.constants import TOKEN_MAPPING, TokenConfig
+from data_handler.handlers.order_books.depth import build_depth
 
 
 class OrderBookBase(ABC):
@@ -30,6 +34,8 @@ class OrderBookBase(ABC):
         self.token_a_decimal = self.get_token_decimals(token_a)
         self.token_b_decimal = self.get_token_decimals(token_b)
         self.total_liquidity = Decimal("0")
+        # Set to `TickEngine(precise=True)` to verify the depth with high precision
+        self.tick_engine = TickEngine()
 
     def get_token_configs(self) -> tuple[TokenConfig, TokenConfig]:
         """
@@ -104,6 +110,8 @@ class OrderBookBase(ABC):
         :return: dict - The order book data
         """
         dt_now = datetime.now(timezone.utc)
+        asks = sorted(self.asks, key=lambda x: x[0])
+        bids = sorted(self.bids, key=lambda x: x[0])
 
         return {
             "token_a": self.token_a,
@@ -112,8 +120,9 @@ class OrderBookBase(ABC):
             "block": self.block,
             "dex": self.DEX,
             "current_price": self.current_price,
-            "asks": sorted(self.asks, key=lambda x: x[0]),
-            "bids": sorted(self.bids, key=lambda x: x[0]),
+            "asks": asks,
+            "bids": bids,
+            "depth": build_depth(asks, bids),
         }
 
     def serialize(self) -> OrderBookResponseModel:
@@ -125,12 +134,44 @@ class OrderBookBase(ABC):
         return OrderBookResponseModel(**order_book_data)
 
 
+class RateLimiter:
+    """
+    Spaces out the requests to an API, shared by all threads of the process.
+    """
+
+    def __init__(self, requests_per_second: float) -> None:
+        """
+        :param requests_per_second: The maximum number of requests per second.
+        """
+        self.interval = 1 / requests_per_second
+        self._lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    def wait(self) -> None:
+        """
+        Block until the next request may be sent.
+        """
+        with self._lock:
+            now = time.monotonic()
+            request_at = max(now, self._next_request_at)
+            self._next_request_at = request_at + self.interval
+        if request_at > now:
+            time.sleep(request_at - now)
+
+
 class AbstractionAPIConnector(ABC):
     """
     Abstract base class for making HTTP GET and POST requests using the `requests` library.
+    The requests of a connector are spaced out by its `RATE_LIMITER`, if it has one.
     """
 
     API_URL: str = None
+    RATE_LIMITER: Optional[RateLimiter] = None
+
+    @classmethod
+    def _wait_for_rate_limit(cls) -> None:
+        if cls.RATE_LIMITER is not None:
+            cls.RATE_LIMITER.wait()
 
     @classmethod
     def send_get_request(cls, endpoint: str, params=None, max_retries=3) -> dict:
@@ -150,6 +191,7 @@ class AbstractionAPIConnector(ABC):
         exc: Exception | None = None
         while attempts < max_retries:
             try:
+                cls._wait_for_rate_limit()
                 response = requests.get(f"{cls.API_URL}{endpoint}", params=params)
                 if response.status_code == 429:
                     timeout_secs = int(response.headers.get("retry-after", 0)) or 60
@@ -179,6 +221,7 @@ class AbstractionAPIConnector(ABC):
         :rtype: dict
         """
         try:
+            cls._wait_for_rate_limit()
             response = requests.post(f"{cls.API_URL}{endpoint}", data=data, json=json)
             response.raise_for_status()
             return response.json()
@@ -0,0 +1,219 @@
+"""
+Concurrent collection of order books across token pairs and DEXes.
+
+The order books of all pairs of a DEX are fetched concurrently, so that their snapshots are
+taken at nearly the same time. The data shared by the pairs, e.g. the pools of Ekubo or the
+supported tokens, USD prices and latest block of Haiko, is fetched once per run. The order
+book classes use blocking HTTP connectors, so they run in worker threads, at most
+`max_concurrency` per DEX, and the requests of every connector are spaced out by its
+`RATE_LIMITER`.
+
+Example usage:
+order_books = asyncio.run(collect_haiko_order_books())
+DBConnector().write_batch_to_db(order_books)
+"""
+
+import asyncio
+import logging
+from itertools import permutations
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+
+from data_handler.db.models import OrderBookModel
+from data_handler.handlers.order_books.abstractions import OrderBookBase
+from data_handler.handlers.order_books.constants import TOKEN_MAPPING
+from data_handler.handlers.order_books.ekubo.api_connector import EkuboAPIConnector
+from data_handler.handlers.order_books.ekubo.main import EkuboOrderBook
+from data_handler.handlers.order_books.haiko.api_connector import (
+    HaikoAPIConnector,
+    HaikoBlastAPIConnector,
+)
+from data_handler.handlers.order_books.haiko.main import HaikoOrderBook
+from data_handler.handlers.order_books.uniswap_v2.main import UniswapV2OrderBook
+from data_handler.handlers.order_books.uniswap_v2.swap_amm import SwapAmm
+
+logger = logging.getLogger(__name__)
+
+# Creates an order book and fetches its data
+OrderBookJob = Callable[[], OrderBookBase]
+
+DEFAULT_MAX_CONCURRENCY: int = 8
+
+
+def get_token_pairs() -> list[tuple[str, str]]:
+    """
+    Get all ordered pairs of the tokens in `TOKEN_MAPPING`.
+    :return: list of (base token, quote token) addresses
+    """
+    return list(permutations(TOKEN_MAPPING, 2))
+
+
+async def _run_in_threads(
+    function: Callable[..., Any],
+    arguments: Iterable[tuple],
+    max_concurrency: int,
+) -> list[Any]:
+    """
+    Call a blocking function with each of the arguments in worker threads.
+    :param function: The blocking function.
+    :param arguments: The positional arguments of every call.
+    :param max_concurrency: The maximum number of concurrent calls.
+    :return: The results in the order of the arguments, or the raised exceptions.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(args: tuple) -> Any:
+        async with semaphore:
+            return await asyncio.to_thread(function, *args)
+
+    return list(
+        await asyncio.gather(*(run(args) for args in arguments), return_exceptions=True)
+    )
+
+
+def _run_job(job: OrderBookJob) -> OrderBookModel:
+    order_book = job()
+    return OrderBookModel(**order_book.serialize().model_dump())
+
+
+async def collect_order_books(
+    jobs: dict[tuple[str, ...], OrderBookJob],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[OrderBookModel]:
+    """
+    Run the order book jobs concurrently. A failed job is logged and skipped.
+    :param jobs: The jobs by their (token a, token b, ...) key, e.g. the pair or the pool.
+    :param max_concurrency: The maximum number of concurrent jobs.
+    :return: The order books of the jobs that succeeded.
+    """
+    results = await _run_in_threads(
+        _run_job, ((job,) for job in jobs.values()), max_concurrency
+    )
+    order_books = []
+    for (token_a, token_b, *_), result in zip(jobs, results):
+        if isinstance(result, Exception):
+            logger.error(
+                f"With token pair: {token_a} and {token_b} something happened: "
+                f"{result!r}"
+            )
+            continue
+        order_books.append(result)
+    return order_books
+
+
+async def collect_ekubo_order_books(
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[OrderBookModel]:
+    """
+    Collect the order books of all Ekubo pools of the tokens in `TOKEN_MAPPING`. The price of
+    a pair is fetched once for all of its pools.
+    :param max_concurrency: The maximum number of concurrent requests.
+    :return: The order books, one per pool.
+    """
+    connector = EkuboAPIConnector()
+    pool_states = await asyncio.to_thread(connector.get_pools)
+    pool_states = [
+        pool_state
+        for pool_state in pool_states
+        if isinstance(pool_state, dict)
+        and pool_state["token0"] in TOKEN_MAPPING
+        and pool_state["token1"] in TOKEN_MAPPING
+    ]
+    pairs = list(
+        dict.fromkeys(
+            (pool_state["token0"], pool_state["token1"]) for pool_state in pool_states
+        )
+    )
+    prices = dict(
+        zip(
+            pairs,
+            await _run_in_threads(connector.get_pair_price, pairs, max_concurrency),
+        )
+    )
+
+    def make_job(pool_state: dict) -> OrderBookJob:
+        def job() -> OrderBookBase:
+            pair = (pool_state["token0"], pool_state["token1"])
+            if isinstance(prices[pair], Exception):
+                raise prices[pair]
+            order_book = EkuboOrderBook(*pair)
+            order_book.fetch_price_and_liquidity(
+                pd.DataFrame([pool_state]), price_data=prices[pair]
+            )
+            return order_book
+
+        return job
+
+    jobs = {
+        (pool_state["token0"], pool_state["token1"], pool_state["key_hash"]): make_job(
+            pool_state
+        )
+        for pool_state in pool_states
+    }
+    return await collect_order_books(jobs, max_concurrency)
+
+
+async def collect_haiko_order_books(
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[OrderBookModel]:
+    """
+    Collect the order books of all pairs of the tokens in `TOKEN_MAPPING` from Haiko. The
+    supported tokens, the USD prices and the latest block are fetched once for all pairs.
+    :param max_concurrency: The maximum number of concurrent requests.
+    :return: The order books of the pairs that have markets on Haiko.
+    :raise RuntimeError: If the data shared by the pairs could not be fetched.
+    """
+    token_names = [token.name for token in TOKEN_MAPPING.values()]
+    supported_tokens, usd_prices, latest_block_info = await asyncio.gather(
+        asyncio.to_thread(HaikoAPIConnector.get_supported_tokens, False),
+        asyncio.to_thread(HaikoAPIConnector.get_tokens_usd_prices, token_names),
+        asyncio.to_thread(HaikoBlastAPIConnector.get_block_info),
+    )
+    for name, response in (
+        ("supported tokens", supported_tokens),
+        ("USD prices", usd_prices),
+        ("latest block", latest_block_info),
+    ):
+        if isinstance(response, dict) and response.get("error"):
+            raise RuntimeError(f"Failed to fetch the {name} for Haiko: {response}")
+
+    def make_job(token_a: str, token_b: str) -> OrderBookJob:
+        def job() -> OrderBookBase:
+            order_book = HaikoOrderBook(
+                token_a,
+                token_b,
+                supported_tokens=supported_tokens,
+                usd_prices=usd_prices,
+            )
+            order_book.fetch_price_and_liquidity(latest_block_info=latest_block_info)
+            return order_book
+
+        return job
+
+    jobs = {pair: make_job(*pair) for pair in get_token_pairs()}
+    return await collect_order_books(jobs, max_concurrency)
+
+
+async def collect_uniswap_v2_order_books(
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[OrderBookModel]:
+    """
+    Collect the order books of all pairs of the tokens in `TOKEN_MAPPING` from the Uniswap V2
+    AMMs. The balances of the pools are fetched once for all pairs.
+    :param max_concurrency: The maximum number of concurrent jobs.
+    :return: The order books of the pairs that have pools.
+    """
+    swap_amm = SwapAmm()
+    await swap_amm.init()
+
+    def make_job(token_a: str, token_b: str) -> OrderBookJob:
+        def job() -> OrderBookBase:
+            order_book = UniswapV2OrderBook(token_a, token_b, swap_amm=swap_amm)
+            order_book.fetch_price_and_liquidity()
+            return order_book
+
+        return job
+
+    jobs = {pair: make_job(*pair) for pair in get_token_pairs()}
+    return await collect_order_books(jobs, max_concurrency)
@@ -0,0 +1,87 @@
+"""
+Cumulative depth of order books.
+
+The depth of an order book snapshot is stored alongside its levels: the bids sorted by
+descending price and the asks sorted by ascending price, each with the prefix sums of their
+quantities. The quantity that moves the price by a given ratio is then found by a binary
+search over the prices instead of a scan of all levels.
+
+Example usage:
+depth = build_depth(asks, bids)
+quantities = get_quantities_to_move_price(depth, current_price, [Decimal("0.05")])
+"""
+
+from bisect import bisect_right
+from decimal import Decimal
+from itertools import accumulate
+from operator import neg
+from typing import Iterable, Literal
+
+Side = Literal["asks", "bids"]
+
+
+def _build_side_depth(
+    levels: Iterable[tuple[float, float]], descending: bool
+) -> dict[str, list[float]]:
+    levels = sorted(
+        ((float(price), float(quantity)) for price, quantity in levels),
+        key=lambda level: level[0],
+        reverse=descending,
+    )
+    return {
+        "prices": [price for price, _ in levels],
+        "quantities": list(accumulate(quantity for _, quantity in levels)),
+    }
+
+
+def build_depth(
+    asks: Iterable[tuple[float, float]], bids: Iterable[tuple[float, float]]
+) -> dict[str, dict[str, list[float]]]:
+    """
+    Build the cumulative depth of an order book.
+    :param asks: The (price, quantity) asks.
+    :param bids: The (price, quantity) bids.
+    :return: dict - The `prices` and cumulative `quantities` of the asks, sorted by
+    ascending price, and of the bids, sorted by descending price.
+    """
+    return {
+        "asks": _build_side_depth(asks, descending=False),
+        "bids": _build_side_depth(bids, descending=True),
+    }
+
+
+def get_quantities_to_move_price(
+    depth: dict[str, dict[str, list[float]]],
+    current_price: Decimal,
+    price_change_ratios: Iterable[Decimal],
+    side: Side = "bids",
+) -> list[Decimal]:
+    """
+    Get the quantities that can be traded before the price moves by the given ratios. For
+    the bids, it is the quantity of the levels priced at least `(1 - ratio) * current_price`,
+    for the asks, the quantity of the levels priced at most `(1 + ratio) * current_price`.
+    :param depth: The cumulative depth, as built by `build_depth`.
+    :param current_price: The current price of the pair.
+    :param price_change_ratios: The price change ratios, between 0 and 1.
+    :param side: "bids" to move the price down, "asks" to move it up.
+    :return: list of Decimal - The quantities in the order of the ratios.
+    :raise ValueError: If a ratio is not between 0 and 1 or the current price is zero.
+    """
+    if current_price == 0:
+        raise ValueError("Current price of the pair is zero.")
+    prices = depth[side]["prices"]
+    cumulative_quantities = depth[side]["quantities"]
+    quantities = []
+    for price_change_ratio in price_change_ratios:
+        if not 0 < price_change_ratio < 1:
+            raise ValueError("Provide valid price change ratio.")
+        if side == "bids":
+            min_price = (Decimal("1") - price_change_ratio) * current_price
+            count = bisect_right(prices, -min_price, key=neg)
+        else:
+            max_price = (Decimal("1") + price_change_ratio) * current_price
+            count = bisect_right(prices, max_price)
+        quantities.append(
+            Decimal(repr(cumulative_quantities[count - 1])) if count else Decimal("0")
+        )
+    return quantities
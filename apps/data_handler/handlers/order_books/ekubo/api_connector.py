@@ -3,13 +3,17 @@
 import time
 from typing import Any, Dict
 
-from data_handler.handlers.order_books.abstractions import AbstractionAPIConnector
+from data_handler.handlers.order_books.abstractions import (
+    AbstractionAPIConnector,
+    RateLimiter,
+)
 
 
 class EkuboAPIConnector(AbstractionAPIConnector):
     """A class that interacts with the Ekubo API to fetch data related to the Ekubo protocol."""
 
     API_URL = "https://mainnet-api.ekubo.org"
+    RATE_LIMITER = RateLimiter(requests_per_second=10)
 
     @classmethod
     def get_token_prices(cls, quote_token: str) -> dict:
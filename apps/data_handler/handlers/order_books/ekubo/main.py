@@ -1,13 +1,18 @@
 """This module contains the EkuboOrderBook class."""
 
 from decimal import Decimal, getcontext
+from typing import Optional
 
+import numpy as np
 import pandas as pd
 from data_handler.handlers.order_books.abstractions import OrderBookBase
 from data_handler.handlers.order_books.ekubo.api_connector import EkuboAPIConnector
 
 getcontext().prec = 18
 
+# The price changes by this factor between consecutive ticks
+TICK_BASE = "1.000001"
+
 
 class EkuboOrderBook(OrderBookBase):
     """Ekubo Order Book class."""
@@ -31,11 +36,19 @@ class EkuboOrderBook(OrderBookBase):
         price_data = self.connector.get_pair_price(self.token_a, self.token_b)
         self.current_price = Decimal(price_data.get("price", "0"))
 
-    def fetch_price_and_liquidity(self, pool_df: pd.DataFrame) -> None:
+    def fetch_price_and_liquidity(
+        self, pool_df: pd.DataFrame, price_data: Optional[dict] = None
+    ) -> None:
         """
         Fetch the current price and liquidity of the pair from the Ekubo API.
-        """
-        self.set_current_price()
+        :param pool_df: pd.DataFrame - The states of the pools of the pair.
+        :param price_data: dict - The price of the pair as returned by `get_pair_price`,
+            if it was already fetched, e.g. for another pool of the pair.
+        """
+        if price_data is None:
+            self.set_current_price()
+        else:
+            self.current_price = Decimal(price_data.get("price", "0"))
         for _, row in list(pool_df.iterrows()):
             key_hash = row["key_hash"]
             # Fetch pool liquidity data
@@ -94,38 +107,22 @@ class EkuboOrderBook(OrderBookBase):
         if not ask_ticks:
             return
 
-        glob_liq = Decimal(row["liquidity"])
-
-        # Calculate for current tick (loops start with the next one)
-        next_tick = Decimal(ask_ticks[0]["tick"])
-        prev_tick = Decimal(next_tick - row["tick_spacing"])
-
-        prev_sqrt = self._get_pure_sqrt_ratio(prev_tick)
-        next_sqrt = self._get_pure_sqrt_ratio(next_tick)
-
-        supply = abs(
-            ((glob_liq / prev_sqrt) - (glob_liq / next_sqrt)) / 10**self.token_a_decimal
+        engine = self.tick_engine
+        ticks = engine.array(tick["tick"] for tick in ask_ticks)
+        # The range of the current tick starts one tick spacing below the first ask tick,
+        # the liquidity changes by the delta of every crossed tick.
+        prev_ticks = engine.shift(ticks[0] - row["tick_spacing"], ticks)
+        liquidity = engine.cumulative(
+            engine.scalar(row["liquidity"]),
+            engine.array(tick["net_liquidity_delta_diff"] for tick in ask_ticks),
         )
-        price = self.tick_to_price(prev_tick)
-        self.asks.append((price, supply))
-
-        for index, tick in enumerate(ask_ticks):
-            if index == 0:
-                continue
-            glob_liq += Decimal(ask_ticks[index - 1]["net_liquidity_delta_diff"])
-            prev_tick = Decimal(ask_ticks[index - 1]["tick"])
-
-            curr_tick = Decimal(tick["tick"])
-
-            prev_sqrt = self._get_pure_sqrt_ratio(prev_tick)
-            next_sqrt = self._get_pure_sqrt_ratio(curr_tick)
-
-            supply = abs(
-                ((glob_liq / prev_sqrt) - (glob_liq / next_sqrt))
-                / 10**self.token_a_decimal
-            )
-            price = self.tick_to_price(prev_tick)
-            self.asks.append((price, supply))
+        supply = engine.token0_amounts(
+            liquidity,
+            self._get_pure_sqrt_ratios(prev_ticks),
+            self._get_pure_sqrt_ratios(ticks),
+            10**self.token_a_decimal,
+        )
+        self.asks.extend(engine.levels(self._ticks_to_prices(prev_ticks), supply))
 
     def add_bids(self, liquidity_data: list[dict], row: pd.Series) -> None:
         """
@@ -137,36 +134,42 @@ class EkuboOrderBook(OrderBookBase):
         if not bid_ticks:
             return
 
-        glob_liq = Decimal(row["liquidity"])
-
-        next_tick = bid_ticks[0]["tick"]
-        prev_tick = next_tick + row["tick_spacing"]
+        engine = self.tick_engine
+        ticks = engine.array(tick["tick"] for tick in bid_ticks)
+        # The range of the current tick ends one tick spacing above the first bid tick,
+        # the liquidity changes by the delta of every crossed tick.
+        prev_ticks = engine.shift(ticks[0] + row["tick_spacing"], ticks)
+        liquidity = engine.cumulative(
+            engine.scalar(row["liquidity"]),
+            engine.array(tick["net_liquidity_delta_diff"] for tick in bid_ticks),
+            sign=-1,
+        )
+        supply = engine.token1_amounts(
+            liquidity,
+            self._get_pure_sqrt_ratios(prev_ticks),
+            self._get_pure_sqrt_ratios(ticks),
+            10**self.token_b_decimal,
+        )
+        self.bids.extend(engine.levels(self._ticks_to_prices(prev_ticks), supply))
 
-        prev_sqrt = self._get_pure_sqrt_ratio(prev_tick)
-        next_sqrt = self._get_pure_sqrt_ratio(next_tick)
+    def _get_pure_sqrt_ratios(self, ticks: np.ndarray) -> np.ndarray:
+        """
+        Vectorized `_get_pure_sqrt_ratio`.
+        :param ticks: tick values
+        :return: square root ratios
+        """
+        return self.tick_engine.power(TICK_BASE, ticks / 2)
 
-        supply = abs(
-            ((glob_liq * prev_sqrt) - (glob_liq * next_sqrt)) / 10**self.token_b_decimal
+    def _ticks_to_prices(self, ticks: np.ndarray) -> np.ndarray:
+        """
+        Vectorized `tick_to_price`.
+        :param ticks: tick values
+        :return: prices by ticks
+        """
+        engine = self.tick_engine
+        return engine.power(TICK_BASE, ticks) * engine.scalar(
+            Decimal(10) ** (self.token_a_decimal - self.token_b_decimal)
         )
-        price = self.tick_to_price(prev_tick)
-        self.bids.append((price, supply))
-
-        for index, tick in enumerate(bid_ticks):
-            if index == 0:
-                continue
-            glob_liq -= Decimal(bid_ticks[index - 1]["net_liquidity_delta_diff"])
-            prev_tick = Decimal(bid_ticks[index - 1]["tick"])
-            curr_tick = Decimal(tick["tick"])
-
-            prev_sqrt = self._get_pure_sqrt_ratio(prev_tick)
-            next_sqrt = self._get_pure_sqrt_ratio(curr_tick)
-
-            supply = (
-                abs(((glob_liq * prev_sqrt) - (glob_liq * next_sqrt)))
-                / 10**self.token_b_decimal
-            )
-            price = self.tick_to_price(prev_tick)
-            self.bids.append((price, supply))
 
     def _get_pure_sqrt_ratio(self, tick: Decimal) -> Decimal:
         """
@@ -174,7 +177,7 @@ class EkuboOrderBook(OrderBookBase):
         :param tick: tick value
         :return: square root ratio
         """
-        return Decimal("1.000001").sqrt() ** tick
+        return Decimal(TICK_BASE).sqrt() ** tick
 
     @staticmethod
     def sort_ticks_by_asks_and_bids(
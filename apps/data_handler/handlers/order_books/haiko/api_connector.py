@@ -1,12 +1,18 @@
 """This module contains API connectors for Haiko and Blast APIs."""
 
-from data_handler.handlers.order_books.abstractions import AbstractionAPIConnector
+from typing import Iterable
+
+from data_handler.handlers.order_books.abstractions import (
+    AbstractionAPIConnector,
+    RateLimiter,
+)
 
 
 class HaikoAPIConnector(AbstractionAPIConnector):
     """This module contains API connectors for Haiko and Blast APIs."""
 
     API_URL = "https://app.haiko.xyz/api/v1"
+    RATE_LIMITER = RateLimiter(requests_per_second=5)
 
     @classmethod
     def get_supported_tokens(cls, existing_only: bool = True) -> list[dict]:
@@ -107,11 +113,22 @@ class HaikoAPIConnector(AbstractionAPIConnector):
         endpoint = f"/usd-prices?network=mainnet&tokens={token_a_name},{token_b_name}"
         return cls.send_get_request(endpoint)  # type: ignore
 
+    @classmethod
+    def get_tokens_usd_prices(cls, token_names: Iterable[str]) -> dict:
+        """
+        Get USD prices for many tokens in one request.
+        :param token_names: Names of the tokens, e.g. `ETH`.
+        :return: USD prices of the tokens, in the format of `get_usd_prices`.
+        """
+        endpoint = f"/usd-prices?network=mainnet&tokens={','.join(token_names)}"
+        return cls.send_get_request(endpoint)  # type: ignore
+
 
 class HaikoBlastAPIConnector(AbstractionAPIConnector):
     """This module contains API connectors for Haiko and Blast APIs."""
 
     API_URL = "https://starknet-mainnet.blastapi.io"
+    RATE_LIMITER = RateLimiter(requests_per_second=5)
     PROJECT_ID = "a419bd5a-ec9e-40a7-93a4-d16467fb79b3"
 
     @classmethod
@@ -2,6 +2,7 @@
 
 from decimal import Decimal
 from pathlib import Path
+from typing import Optional
 
 from data_handler.handlers.order_books.abstractions import OrderBookBase
 from data_handler.handlers.order_books.constants import TOKEN_MAPPING
@@ -17,13 +18,24 @@ class HaikoOrderBook(OrderBookBase):
 
     DEX = "Haiko"
 
-    def __init__(self, token_a, token_b, apply_filtering: bool = False):
+    def __init__(
+        self,
+        token_a,
+        token_b,
+        apply_filtering: bool = False,
+        supported_tokens: Optional[list[dict]] = None,
+        usd_prices: Optional[dict] = None,
+    ):
         """
         Initialize the HaikoOrderBook object.
         :param token_a: baseToken hexadecimal address
         :param token_b: quoteToken hexadecimal address
         :param apply_filtering: bool -
         If True apply min and max price filtering to the order book data
+        :param supported_tokens: list - Tokens supported by Haiko, as returned by
+        `get_supported_tokens`, if they were already fetched, e.g. for another pair
+        :param usd_prices: dict - USD prices of the tokens, as returned by
+        `get_usd_prices`, if they were already fetched
         """
         super().__init__(token_a, token_b)
         self.haiko_connector = HaikoAPIConnector()
@@ -37,8 +49,8 @@ class HaikoOrderBook(OrderBookBase):
         self._decimals_diff = 10 ** (
             self.token_a_decimal - self.token_b_decimal or self.token_a_decimal
         )
-        self._check_tokens_supported()
-        self._set_usd_prices()
+        self._check_tokens_supported(supported_tokens)
+        self._set_usd_prices(usd_prices)
 
     def _get_valid_tokens_addresses(self) -> tuple[str, str]:
         """
@@ -49,25 +61,35 @@ class HaikoOrderBook(OrderBookBase):
             raise ValueError("Token addresses must be strings.")
         return hex(int(self.token_a, base=16)), hex(int(self.token_b, base=16))
 
-    def _set_usd_prices(self) -> None:
-        """Set USD prices for tokens based on Haiko API."""
+    def _set_usd_prices(self, prices: Optional[dict] = None) -> None:
+        """
+        Set USD prices for tokens based on Haiko API.
+        :param prices: dict - Already fetched USD prices of the tokens
+        """
         token_a_info = TOKEN_MAPPING.get(self.token_a)
         token_b_info = TOKEN_MAPPING.get(self.token_b)
         if not token_a_info or not token_b_info:
             raise ValueError("Information about tokens isn't available.")
         token_a_name = token_a_info.name
         token_b_name = token_b_info.name
-        prices = self.haiko_connector.get_usd_prices(token_a_name, token_b_name)
+        if prices is None:
+            prices = self.haiko_connector.get_usd_prices(token_a_name, token_b_name)
         self.token_a_price = Decimal(prices.get(token_a_name, 0))
         self.token_b_price = Decimal(prices.get(token_b_name, 0))
         if self.token_a_price == 0 or self.token_b_price == 0:
             raise RuntimeError("Prices for tokens aren't available.")
 
-    def _check_tokens_supported(self) -> None:
-        """Check if a pair of tokens is supported by Haiko"""
-        supported_tokens = self.haiko_connector.get_supported_tokens(
-            existing_only=False
-        )
+    def _check_tokens_supported(
+        self, supported_tokens: Optional[list[dict]] = None
+    ) -> None:
+        """
+        Check if a pair of tokens is supported by Haiko
+        :param supported_tokens: list - Already fetched tokens supported by Haiko
+        """
+        if supported_tokens is None:
+            supported_tokens = self.haiko_connector.get_supported_tokens(
+                existing_only=False
+            )
         if isinstance(supported_tokens, dict) and supported_tokens.get("error"):
             raise RuntimeError(f"Unexpected error from API: {supported_tokens}")
         valid_tokens = self._get_valid_tokens_addresses()
@@ -89,11 +111,19 @@ class HaikoOrderBook(OrderBookBase):
         self.asks.sort(key=lambda ask: ask[0])
         self.bids.sort(key=lambda bid: bid[0], reverse=True)
 
-    def fetch_price_and_liquidity(self) -> None:
+    def fetch_price_and_liquidity(
+        self, latest_block_info: Optional[dict] = None
+    ) -> None:
+        """
+        Fetch the markets of the pair and their depth from the Haiko API.
+        :param latest_block_info: dict - The latest block as returned by `get_block_info`,
+        if it was already fetched, e.g. for another pair
+        """
         tokens_markets = self._filter_markets_data(
             self.haiko_connector.get_pair_markets(self.token_a, self.token_b)
         )
-        latest_block_info = self.blast_connector.get_block_info()
+        if latest_block_info is None:
+            latest_block_info = self.blast_connector.get_block_info()
         if latest_block_info.get("error"):
             raise RuntimeError(f"Blast-api returned an error: {latest_block_info}")
 
@@ -152,29 +182,27 @@ class HaikoOrderBook(OrderBookBase):
         """
         if not market_asks:
             return
-        local_asks = []
-        x = self._get_token_amount(
-            pool_liquidity,
-            self.current_price.sqrt(),
-            market_asks[0]["price"].sqrt(),
+        engine = self.tick_engine
+        prices = engine.array(ask["price"] for ask in market_asks)
+        # Every level spans from the previous price, starting at the current price,
+        # to its price, with the liquidity of the previous price.
+        level_prices = engine.shift(engine.scalar(self.current_price), prices)
+        liquidity = engine.shift(
+            engine.scalar(pool_liquidity),
+            engine.array(ask["liquidityCumulative"] for ask in market_asks),
         )
-        local_asks.append((self.current_price, x))
-        for index, ask in enumerate(market_asks):
-            if index == 0:
-                continue
-            current_price = Decimal(market_asks[index - 1]["price"])
-            x = self._get_token_amount(
-                Decimal(market_asks[index - 1]["liquidityCumulative"]),
-                current_price.sqrt(),
-                Decimal(market_asks[index]["price"]).sqrt(),
-            )
-            local_asks.append((current_price, x))
-        if self.apply_filtering:
-            self.asks.extend(
-                [ask for ask in local_asks if price_range[0] < ask[0] < price_range[1]]
+        start_sqrt_prices = engine.sqrt(level_prices)
+        end_sqrt_prices = engine.sqrt(prices)
+        if (start_sqrt_prices == 0).any() or (end_sqrt_prices == 0).any():
+            raise ValueError("Square root of prices for asks can't be zero.")
+        amounts = engine.token0_amounts(
+            liquidity, start_sqrt_prices, end_sqrt_prices, self._decimals_diff
+        )
+        self.asks.extend(
+            engine.levels(
+                level_prices, amounts, price_range if self.apply_filtering else None
             )
-            return
-        self.asks.extend(local_asks)
+        )
 
     def add_bids(self, market_bids: list[dict], price_range: tuple) -> None:
         """
@@ -184,32 +212,26 @@ class HaikoOrderBook(OrderBookBase):
         """
         if not market_bids:
             return
-        local_bids = []
-        prev_price = Decimal(market_bids[0]["price"])
-        y = self._get_token_amount(
-            Decimal(market_bids[0]["liquidityCumulative"]),
-            self.current_price.sqrt(),
-            prev_price.sqrt(),
-            is_ask=False,
+        engine = self.tick_engine
+        prices = engine.array(bid["price"] for bid in market_bids)
+        # Every level spans from the previous price, starting at the current price,
+        # to its price, with the liquidity of its price.
+        start_sqrt_prices = engine.sqrt(
+            engine.shift(engine.scalar(self.current_price), prices)
         )
-        local_bids.append((prev_price, y))
-        for index, bid in enumerate(market_bids[::-1]):
-            if index == 0:
-                continue
-            current_price = Decimal(market_bids[index - 1]["price"])
-            y = self._get_token_amount(
-                Decimal(market_bids[index]["liquidityCumulative"]),
-                current_price.sqrt(),
-                Decimal(market_bids[index]["price"]).sqrt(),
-                is_ask=False,
-            )
-            local_bids.append((current_price, y))
-        if self.apply_filtering:
-            self.bids.extend(
-                [bid for bid in local_bids if price_range[0] < bid[0] < price_range[1]]
+        amounts = engine.token0_amounts(
+            engine.array(bid["liquidityCumulative"] for bid in market_bids),
+            start_sqrt_prices,
+            engine.sqrt(prices),
+            self._decimals_diff,
+        )
+        self.bids.extend(
+            engine.levels(
+                engine.shift(prices[0], prices),
+                amounts,
+                price_range if self.apply_filtering else None,
             )
-            return
-        self.bids.extend(local_bids)
+        )
 
     def _get_token_amount(
         self,
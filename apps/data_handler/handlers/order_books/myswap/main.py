@@ -1,14 +1,15 @@
 """MySwap order book class."""
 
-import asyncio
 import itertools
 import logging
 import math
 import os
 from decimal import Decimal
 
+import numpy as np
 import pandas as pd
 from shared.blockchain_call import func_call
+from shared.rpc_gateway import run_with_rpc_sessions
 from data_handler.handlers.order_books.abstractions import OrderBookBase
 from data_handler.handlers.order_books.commons import get_logger
 from data_handler.handlers.order_books.myswap.api_connection.api_connector import (
@@ -68,7 +69,7 @@ class MySwapOrderBook(OrderBookBase):
 
     def fetch_price_and_liquidity(self) -> None:
         """Sync wrapper for the async fetch_price_and_liquidity method."""
-        asyncio.run(self._async_fetch_price_and_liquidity())
+        run_with_rpc_sessions(self._async_fetch_price_and_liquidity())
 
     def _filter_pools_data(self, all_pools: dict) -> list:
         """
@@ -151,31 +152,12 @@ class MySwapOrderBook(OrderBookBase):
         """
         if pool_asks.empty:
             return
-        local_asks = []
-        next_tick = Decimal(pool_asks.iloc[0]["tick"].item())
-        next_price = self.tick_to_price(next_tick)
-        y = self._get_token_amount(
-            current_liq=pool_liquidity,
-            current_sqrt=self.current_price.sqrt(),
-            next_sqrt=next_price.sqrt(),
-            is_ask=False,
+        engine = self.tick_engine
+        liquidity = engine.shift(
+            engine.scalar(pool_liquidity),
+            engine.array(int(liq) for liq in pool_asks["liq"]),
         )
-        local_asks.append((next_price, y))
-        for index, bid_info in enumerate(pool_asks.iloc[::-1].itertuples(index=False)):
-            if index == 0:
-                continue
-            current_tick = Decimal(pool_asks.iloc[index - 1]["tick"].item())
-            current_price = self.tick_to_price(current_tick)
-            y = self._get_token_amount(
-                current_liq=Decimal(int(pool_asks.iloc[index - 1]["liq"])),
-                current_sqrt=current_price.sqrt(),
-                next_sqrt=Decimal(
-                    self.tick_to_price(pool_asks.iloc[index]["tick"].item())
-                ).sqrt(),
-                is_ask=False,
-            )
-            local_asks.append((current_price, y))
-        self.asks.extend(local_asks)
+        self.asks.extend(self._get_levels(pool_asks, liquidity))
 
     def add_bids(self, pool_bids: pd.DataFrame) -> None:
         """
@@ -184,31 +166,28 @@ class MySwapOrderBook(OrderBookBase):
         """
         if pool_bids.empty:
             return
-        local_bids = []
-        next_tick = Decimal(pool_bids.iloc[0]["tick"].item())
-        next_price = self.tick_to_price(next_tick)
-        y = self._get_token_amount(
-            current_liq=Decimal(int(pool_bids.iloc[0]["liq"])),
-            current_sqrt=self.current_price.sqrt(),
-            next_sqrt=next_price.sqrt(),
-            is_ask=False,
+        liquidity = self.tick_engine.array(int(liq) for liq in pool_bids["liq"])
+        self.bids.extend(self._get_levels(pool_bids, liquidity))
+
+    def _get_levels(
+        self, pool_ticks: pd.DataFrame, liquidity: np.ndarray
+    ) -> list[tuple[Decimal, Decimal]]:
+        """
+        Compute the order book levels of the ticks. Every level spans from the price of the
+        previous tick, starting at the current price, to the price of its tick.
+        :param pool_ticks: pd.DataFrame - Sorted ticks of the pool.
+        :param liquidity: np.ndarray - The liquidity within each level.
+        :return: list of (price, amount) tuples
+        """
+        engine = self.tick_engine
+        prices = self._ticks_to_prices(engine.array(pool_ticks["tick"]))
+        amounts = engine.token0_amounts(
+            liquidity,
+            engine.sqrt(engine.shift(engine.scalar(self.current_price), prices)),
+            engine.sqrt(prices),
+            self._decimals_diff,
         )
-        local_bids.append((next_price, y))
-        for index, bid_info in enumerate(pool_bids.iloc[::-1].itertuples(index=False)):
-            if index == 0:
-                continue
-            current_tick = Decimal(pool_bids.iloc[index - 1]["tick"].item())
-            current_price = self.tick_to_price(current_tick)
-            y = self._get_token_amount(
-                current_liq=Decimal(int(pool_bids.iloc[index]["liq"])),
-                current_sqrt=current_price.sqrt(),
-                next_sqrt=Decimal(
-                    self.tick_to_price(pool_bids.iloc[index]["tick"].item())
-                ).sqrt(),
-                is_ask=False,
-            )
-            local_bids.append((current_price, y))
-        self.bids.extend(local_bids)
+        return engine.levels(engine.shift(prices[0], prices), amounts)
 
     def _get_token_amount(
         self,
@@ -246,6 +225,17 @@ class MySwapOrderBook(OrderBookBase):
             * self._decimals_diff
         )
 
+    def _ticks_to_prices(self, ticks: np.ndarray) -> np.ndarray:
+        """
+        Vectorized `tick_to_price`.
+        :param ticks: np.ndarray - Tick values
+        :return: np.ndarray - Prices by ticks
+        """
+        engine = self.tick_engine
+        return engine.power(
+            "1.0001", ticks - engine.scalar(MAX_MYSWAP_TICK)
+        ) * engine.scalar(Decimal(2**128) * self._decimals_diff)
+
     def calculate_liquidity_amount(self, tick, liquidity_pair_total) -> Decimal:
         sqrt_ratio = self.get_sqrt_ratio(tick)
         liquidity_delta = liquidity_pair_total / (sqrt_ratio / Decimal(2**128))
@@ -1,11 +1,52 @@
 """
 Module for processing order book data, allowing calculation of the quantity of a base token needed
 to impact the price by a specified ratio on various DEX platforms.
+
+The quantities are looked up in the cumulative depth stored alongside each order book, so
+that many pairs, DEXes and ratios are answered with one query and a binary search per ratio.
+
+Example usage:
+price_impacts = calculate_price_changes(
+    [("Ekubo", token_a, token_b), ("Haiko", token_a, token_b)],
+    [Decimal("0.01"), Decimal("0.05")],
+)
 """
 
 from decimal import Decimal
+from typing import Iterable
 
 from data_handler.db.crud import DBConnector
+from data_handler.handlers.order_books.depth import get_quantities_to_move_price
+
+
+def calculate_price_changes(
+    pairs: Iterable[tuple[str, str, str]],
+    price_change_ratios: Iterable[Decimal],
+    connector: DBConnector | None = None,
+) -> dict[tuple[str, str, str], dict[Decimal, Decimal]]:
+    """
+    Calculate the quantities of `token_a` that can be sold to change the price by the given
+    ratios, for many pairs of tokens and DEXes at once.
+    :param pairs: Iterable of (dex, token_a, token_b) tuples.
+    :param price_change_ratios: The price change ratios, between 0 and 1.
+    :param connector: DBConnector - The connector to read the order books with.
+    :return: dict - The quantities by price change ratio, by (dex, token_a, token_b). Pairs
+    without order books are omitted.
+    :raise ValueError: If a ratio is not between 0 and 1.
+    """
+    price_change_ratios = list(price_change_ratios)
+    if not all(0 < ratio < 1 for ratio in price_change_ratios):
+        raise ValueError("Provide valid price change ratio.")
+    order_books = (connector or DBConnector()).get_latest_order_books(pairs)
+    price_changes = {}
+    for pair, order_book in order_books.items():
+        if not order_book.current_price:
+            continue
+        quantities = get_quantities_to_move_price(
+            order_book.depth, Decimal(order_book.current_price), price_change_ratios
+        )
+        price_changes[pair] = dict(zip(price_change_ratios, quantities))
+    return price_changes
 
 
 class OrderBookProcessor:
@@ -32,29 +73,21 @@ class OrderBookProcessor:
         :return: Decimal - Quantity that can be traded without
         moving price outside acceptable bound.
         """
+        # Check ratio validity
+        if not (0 < price_change_ratio < 1):
+            raise ValueError("Provide valid price change ratio.")
+
         # Fetch order book
-        connector = DBConnector()
-        order_book = connector.get_latest_order_book(
-            self.dex, self.token_a, self.token_b
-        )
+        pair = (self.dex, self.token_a, self.token_b)
+        order_book = DBConnector().get_latest_order_books([pair]).get(pair)
         if not order_book:
             raise ValueError("No order book found for the given DEX and token pair.")
-
-        # Check current price and ratio validity
-        if not (0 < price_change_ratio < 1):
-            raise ValueError("Provide valid price change ratio.")
-        if order_book.current_price == 0:
+        if not order_book.current_price:
             raise ValueError("Current price of the pair is zero.")
 
-        # Calculate the minimum price change
-        min_price = (Decimal("1") - price_change_ratio) * order_book.current_price
-        price_change = Decimal("0")
-        for price, quantity in order_book.bids[::-1]:
-            if price >= min_price:
-                price_change += Decimal(quantity)
-            elif price < min_price:
-                break
-        return price_change
+        return get_quantities_to_move_price(
+            order_book.depth, Decimal(order_book.current_price), [price_change_ratio]
+        )[0]
 
 
 if __name__ == "__main__":
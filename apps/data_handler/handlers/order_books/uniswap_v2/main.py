@@ -2,7 +2,7 @@
 
 import asyncio
 from decimal import Decimal
-from typing import Iterable
+from typing import Iterable, Optional
 
 from data_handler.handlers.helpers import get_collateral_token_range, get_range
 from data_handler.handlers.order_books.abstractions import OrderBookBase
@@ -14,14 +14,24 @@ class UniswapV2OrderBook(OrderBookBase):
 
     DEX = "Starknet"
 
-    def __init__(self, token_a: str, token_b: str):
+    def __init__(
+        self, token_a: str, token_b: str, swap_amm: Optional[SwapAmm] = None
+    ):
+        """
+        Initialize the UniswapV2OrderBook object.
+        :param token_a: BaseToken contract address
+        :param token_b: QuoteToken contract address
+        :param swap_amm: SwapAmm - Initialized AMM pools shared by many pairs. If not
+        provided, the pools are fetched by `fetch_price_and_liquidity`.
+        """
         super().__init__(token_a, token_b)
         self.token_a = token_a
         self.token_b = token_b
         self.token_a_name = None
         self.token_b_name = None
         self._pool = None
-        self._swap_amm = SwapAmm()
+        self._swap_amm = swap_amm or SwapAmm()
+        self._init_swap_amm = swap_amm is None
         self._set_token_names()
 
     def _set_token_names(self) -> None:
@@ -49,7 +59,8 @@ class UniswapV2OrderBook(OrderBookBase):
 
     async def _async_fetch_price_and_liquidity(self) -> None:
         """Asynchronous implementation of the abstract method to fetch price and liquidity data."""
-        await self._swap_amm.init()
+        if self._init_swap_amm:
+            await self._swap_amm.init()
         self._set_pool()
         self._calculate_order_book()
 
@@ -2,6 +2,7 @@
 This module contains the fixtures for the tests.
 """
 
+from typing import Type
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -12,9 +13,16 @@ from data_handler.db.crud import (
     ZkLendEventDBConnector,
 )
 from data_handler.handler_tools.api_connector import DeRiskAPIConnector
+from shared.call_cache import call_cache
+from shared.constants import TOKEN_SETTINGS
+from shared.custom_types import (
+    ZkLendCollateralTokenParameters,
+    ZkLendDebtTokenParameters,
+)
 from shared.data_parser.nostra import NostraDataParser
 from shared.data_parser.zklend import ZklendDataParser
 from data_handler.handlers.events.nostra.transform_events import NostraTransformer
+from shared.state import ZkLendState
 
 
 @pytest.fixture(scope="module")
@@ -115,3 +123,52 @@ def transformer(
         transformer.db_connector = mock_nostra_event_db_connector
         transformer.data_parser = NostraDataParser()
         return transformer
+
+
+@pytest.fixture(autouse=True)
+def isolated_call_cache() -> None:
+    """
+    Keep the contract call cache in-process and empty, so that the tests don't share
+    cached contract reads or reach Redis.
+    :return: None
+    """
+    call_cache.clear()
+    with patch.object(call_cache, "redis_client", None):
+        yield
+    call_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def mock_zklend_state_class() -> Type[ZkLendState]:
+    """
+    ZkLendState with fixed parameters of ETH, USDC and USDT instead of on-chain ones.
+    :return: Type[ZkLendState]
+    """
+
+    class MockZkLendState(ZkLendState):
+        """ZkLendState with fixed token parameters instead of on-chain ones"""
+
+        async def collect_token_parameters(self) -> None:
+            for symbol, decimals in (("ETH", 18), ("USDC", 6), ("USDT", 6)):
+                token = TOKEN_SETTINGS[symbol].address
+                self.token_parameters.collateral[token] = (
+                    ZkLendCollateralTokenParameters(
+                        address=token,
+                        decimals=decimals,
+                        symbol=symbol,
+                        underlying_symbol=symbol,
+                        underlying_address=token,
+                        collateral_factor=0.8,
+                        liquidation_bonus=0.1,
+                    )
+                )
+                self.token_parameters.debt[token] = ZkLendDebtTokenParameters(
+                    address=token,
+                    decimals=decimals,
+                    symbol=symbol,
+                    underlying_symbol=symbol,
+                    underlying_address=token,
+                    debt_factor=1.0,
+                )
+
+    return MockZkLendState
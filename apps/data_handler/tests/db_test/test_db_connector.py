@@ -2,14 +2,22 @@
 This module contains the tests for the DBConnector.
 """
 
+import csv
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import numpy as np
 import pytest
+from data_handler.db.crud import DBConnector
 from data_handler.db.models import (
     InterestRate,
     LoanState,
     OrderBookModel,
 )
 from shared.protocol_ids import ProtocolIDs
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Query, sessionmaker
 
 
 @pytest.fixture(scope="function")
@@ -144,6 +152,26 @@ def test_get_latest_block_loans(mock_db_connector):
     assert result[1].user == "user2"
 
 
+@pytest.mark.parametrize("protocol_id", [ProtocolIDs.ZKLEND, None])
+def test_get_latest_block_loans_query(monkeypatch, protocol_id):
+    """
+    Test that the loan states, unique per protocol and user, are selected directly.
+    :return: None
+    """
+    monkeypatch.setattr(
+        Query,
+        "all",
+        lambda query: str(query.statement.compile(dialect=postgresql.dialect())),
+    )
+    connector = DBConnector.__new__(DBConnector)
+    connector.Session = sessionmaker()
+
+    statement = connector.get_latest_block_loans(protocol_id=protocol_id)
+
+    assert "DISTINCT" not in statement
+    assert ("WHERE loan_state.protocol_id" in statement) == (protocol_id is not None)
+
+
 def test_get_last_block(mock_db_connector):
     """
     Test the get_last_block method.
@@ -167,6 +195,92 @@ def test_write_loan_states_to_db(mock_db_connector):
     mock_db_connector.write_loan_states_to_db.assert_called_once_with(loan_states)
 
 
+@pytest.fixture(scope="function")
+def copy_db_connector():
+    """
+    DBConnector with a mocked raw connection for the COPY-based bulk writers.
+    :return: Tuple of the connector, the raw connection and its cursor
+    """
+    connector = DBConnector.__new__(DBConnector)
+    connector.engine = MagicMock()
+    connection = connector.engine.raw_connection.return_value
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.rowcount = 2
+    cursor.copied = []
+    cursor.copy_expert.side_effect = lambda sql, buffer: cursor.copied.extend(
+        csv.reader(buffer)
+    )
+    return connector, connection, cursor
+
+
+def test_copy_loan_states_to_db(copy_db_connector):
+    """
+    Test that loan states are streamed via COPY and merged with one upsert.
+    :param copy_db_connector: DBConnector with a mocked raw connection
+    :return: None
+    """
+    connector, connection, cursor = copy_db_connector
+    loan_states = [
+        {
+            "protocol_id": ProtocolIDs.ZKLEND,
+            "user": f"user{i}",
+            "collateral": {"ETH": Decimal("1.5")},
+            "debt": {},
+            "deposit": None,
+            "block": np.int64(12345),
+            "timestamp": 1000000,
+        }
+        for i in range(2)
+    ]
+
+    assert connector.copy_loan_states_to_db(loan_states) == 2
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert statements[0].startswith("CREATE TEMP TABLE tmp_loan_state")
+    assert "ON CONFLICT ON CONSTRAINT loan_state_protocol_id_user_key" in statements[1]
+    assert [row[1:] for row in cursor.copied] == [
+        [
+            ProtocolIDs.ZKLEND.value,
+            f"user{i}",
+            '{"ETH": 1.5}',
+            "{}",
+            "",
+            "12345",
+            "1000000",
+        ]
+        for i in range(2)
+    ]
+    connection.commit.assert_called_once()
+    connection.close.assert_called_once()
+
+
+def test_copy_interest_rates_to_db_rolls_back(copy_db_connector):
+    """
+    Test that a failing merge rolls the bulk write back.
+    :param copy_db_connector: DBConnector with a mocked raw connection
+    :return: None
+    """
+    connector, connection, cursor = copy_db_connector
+    cursor.execute.side_effect = [None, RuntimeError("merge failed")]
+    interest_rates = [
+        {
+            "protocol_id": ProtocolIDs.ZKLEND,
+            "collateral": {"ETH": 1.01},
+            "debt": {"USDC": 1.05},
+            "block": 12345,
+            "timestamp": 1000000,
+        }
+    ]
+
+    with pytest.raises(RuntimeError):
+        connector.copy_interest_rates_to_db(interest_rates)
+
+    assert len(cursor.copied) == 1
+    connection.commit.assert_not_called()
+    connection.rollback.assert_called_once()
+    connection.close.assert_called_once()
+
+
 def test_get_latest_order_book(mock_db_connector):
     """
     Test the get_latest_order_book method.
@@ -237,3 +351,39 @@ def test_get_interest_rate_by_block(mock_db_connector, sample_interest_rate):
     result = mock_db_connector.get_interest_rate_by_block(12345, ProtocolIDs.ZKLEND)
     assert result.collateral == {"ETH": 100.0}
     assert result.debt == {"USDC": 1000.0}
+
+
+def test_write_vesu_positions():
+    """
+    Test that the positions are upserted once per key together with the event cursor.
+    :return: None
+    """
+    connector = DBConnector.__new__(DBConnector)
+    connector.Session = MagicMock()
+    session = connector.Session.return_value
+    position = {"user": "1", "pool_id": "2", "collateral_asset": "3", "debt_asset": "4"}
+
+    written = connector.write_vesu_positions(
+        [
+            {**position, "block_number": 10},
+            {**position, "block_number": 12},
+            {**position, "debt_asset": "5", "block_number": 11},
+        ],
+        cursor_block=20,
+    )
+
+    assert written == 2
+    positions_statement, cursor_statement = (
+        call.args[0] for call in session.execute.call_args_list
+    )
+    compiled = positions_statement.compile(dialect=postgresql.dialect())
+    assert "ON CONFLICT ON CONSTRAINT vesu_positions_user_pool_id_assets_key" in str(
+        compiled
+    )
+    assert sorted(
+        value for key, value in compiled.params.items() if key.startswith("block")
+    ) == [11, 12]
+    compiled = cursor_statement.compile(dialect=postgresql.dialect())
+    assert "ON CONFLICT (protocol_id) DO UPDATE" in str(compiled)
+    assert compiled.params["block"] == 20
+    session.commit.assert_called_once()
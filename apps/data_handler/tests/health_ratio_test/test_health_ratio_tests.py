@@ -6,9 +6,16 @@ from unittest.mock import MagicMock, patch
 
 from data_handler.handlers.health_ratio_level.health_ratio_handlers import (
     BaseHealthRatioHandler,
+    ZkLendHealthRatioHandler,
 )
+from data_handler.handlers.liquidable_debt.values import (
+    HEALTH_FACTOR_FIELD_NAME,
+    TIMESTAMP_FIELD_NAME,
+    USER_FIELD_NAME,
+)
+from data_handler.handlers.liquidable_debt.utils import Prices as CoinGeckoPrices
 from shared.state import State, LoanEntity
-from shared.custom_types import TokenValues
+from shared.custom_types import Prices, TokenValues
 from shared.protocol_ids import ProtocolIDs
 
 
@@ -22,6 +29,7 @@ class MockState(State):
         self.collateral_interest_rate_models = None
         self.debt_interest_rate_models = None
         self.interest_rate_models = MagicMock(collateral={}, debt={})
+        self.portfolio_storage = None
 
     def compute_liquidable_debt_at_price(self, *args, **kwargs):
         """Mock implementation of abstract method"""
@@ -161,3 +169,49 @@ class TestBaseHealthRatioHandler:
         assert result_state.loan_entities["existing_user"].debt.values[
             "BTC"
         ] == Decimal("1.0")
+
+
+ETH = "0x049d36570d4e46f48e99674bd3fcc84644ddd6b96f7c741b1562b82f9e004dc7"
+USDC = "0x053c91253bc9682c04929ca02ed00b3e423f6710d2ee7e0d5ebb06f3ecf368a8"
+
+
+def test_calculate_health_ratio(mock_db_connector, mock_zklend_state_class):
+    """Test that the health ratios of all users are computed at once"""
+    with patch(
+        "data_handler.handlers.health_ratio_level.health_ratio_handlers.DBConnector"
+    ) as mock_db:
+        mock_db.return_value = mock_db_connector
+        handler = ZkLendHealthRatioHandler()
+    handler.state_class = mock_zklend_state_class
+    mock_db_connector.get_latest_block_loans.side_effect = None
+    mock_db_connector.get_latest_block_loans.return_value = [
+        MagicMock(user="user1", collateral={ETH: 1e18}, debt={USDC: 1200e6}),
+        MagicMock(user="user2", collateral={ETH: 1e18}, debt={}),
+        MagicMock(user="user3", collateral={}, debt={USDC: 100e6}),
+    ]
+    mock_db_connector.get_last_interest_rate_record_by_protocol_id.return_value = (
+        MagicMock(collateral={ETH: 1.0}, debt={USDC: 1.0})
+    )
+
+    with patch.object(
+        CoinGeckoPrices,
+        "get_current_underlying_prices",
+        return_value=Prices(None, **{ETH: 3000.0, USDC: 1.0}),
+    ):
+        data = handler.calculate_health_ratio()
+
+    # Users without debt or without collateral have no valid health ratio
+    assert [health_ratio[USER_FIELD_NAME] for health_ratio in data] == ["user1"]
+    assert data[0][HEALTH_FACTOR_FIELD_NAME] == pytest.approx(2.0)
+
+    handler.save_health_ratio(data)
+
+    levels = list(mock_db_connector.copy_health_ratio_levels_to_db.call_args.args[0])
+    assert levels == [
+        {
+            "protocol_id": ProtocolIDs.ZKLEND.value,
+            "user_id": "user1",
+            "value": data[0][HEALTH_FACTOR_FIELD_NAME],
+            "timestamp": data[0][TIMESTAMP_FIELD_NAME],
+        }
+    ]
@@ -5,13 +5,24 @@ Test the debt handler
 import pytest
 from data_handler.handlers.liquidable_debt.debt_handlers import (
     BaseDBLiquidableDebtDataHandler,
+    ZkLendDBLiquidableDebtDataHandler,
+)
+from data_handler.handlers.liquidable_debt.values import (
+    BLOCK_FIELD_NAME,
+    COLLATERAL_FIELD_NAME,
+    DEBT_FIELD_NAME,
+    LIQUIDABLE_DEBT_FIELD_NAME,
+    PRICE_FIELD_NAME,
 )
 from decimal import Decimal
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
 from data_handler.tests.conftest import mock_db_connector
 from data_handler.handlers.helpers import get_collateral_token_range, get_range
+from shared.constants import TOKEN_SETTINGS
+from data_handler.handlers.liquidable_debt.utils import Prices as CoinGeckoPrices
+from shared.custom_types import Prices
 from shared.state import State
-from shared.loan_entity import LoanEntity
+from shared.loan_entity import LoanEntity, ZkLendLoanEntity
 from data_handler.db.models.loan_states import LoanState
 
 
@@ -98,3 +109,62 @@ class TestBaseDBLiquidableDebtDataHandler:
             mock_db_connector.get_last_interest_rate_record_by_protocol_id.assert_called_once_with(
                 protocol_id=protocol_name
             )
+
+
+ETH = TOKEN_SETTINGS["ETH"].address
+USDC = TOKEN_SETTINGS["USDC"].address
+USDT = TOKEN_SETTINGS["USDT"].address
+
+
+def test_calculate_liquidable_debt_of_all_pairs(mock_zklend_state_class):
+    """
+    Test that all pairs are swept in one pass and the rows are stored at once.
+    """
+    with patch(
+        "data_handler.handlers.liquidable_debt.debt_handlers.DBConnector"
+    ) as mock_db:
+        handler = ZkLendDBLiquidableDebtDataHandler(
+            mock_zklend_state_class, ZkLendLoanEntity
+        )
+    mock_db_connector = mock_db.return_value
+    mock_db_connector.get_loans.return_value = [
+        MagicMock(user="user1", collateral={ETH: 1e18}, debt={USDC: 1200e6}, block=110),
+        MagicMock(user="user2", collateral={ETH: 1e18}, debt={}, block=120),
+    ]
+    mock_db_connector.get_last_interest_rate_record_by_protocol_id.return_value = (
+        MagicMock(collateral={ETH: 1.0}, debt={USDC: 1.0, USDT: 1.0})
+    )
+
+    with patch(
+        "data_handler.handlers.liquidable_debt.debt_handlers.TOKEN_PAIRS",
+        {"ETH": ("USDC", "USDT")},
+    ), patch.object(
+        CoinGeckoPrices,
+        "get_current_underlying_prices",
+        return_value=Prices(None, **{ETH: 3000.0, USDC: 1.0, USDT: 1.0}),
+    ):
+        data = handler.calculate_liquidable_debt(protocol_name="zkLend")
+
+    # Only user1 borrows, USDC, and becomes liquidable below the price of 1500
+    assert data
+    assert {(row[COLLATERAL_FIELD_NAME], row[DEBT_FIELD_NAME]) for row in data} == {
+        ("ETH", "USDC")
+    }
+    assert max(row[PRICE_FIELD_NAME] for row in data) < 1500
+    assert all(row[LIQUIDABLE_DEBT_FIELD_NAME] > 0 for row in data)
+    assert {row[BLOCK_FIELD_NAME] for row in data} == {120}
+
+    handler.save_liquidable_debt("zkLend", data)
+
+    liquidable_debts = list(
+        mock_db_connector.copy_liquidable_debts_to_db.call_args.args[0]
+    )
+    assert len(liquidable_debts) == len(data)
+    assert liquidable_debts[0] == {
+        "protocol_name": "zkLend",
+        "collateral_token": "ETH",
+        "debt_token": "USDC",
+        "collateral_token_price": data[0][PRICE_FIELD_NAME],
+        "liquidable_debt": data[0][LIQUIDABLE_DEBT_FIELD_NAME],
+        "block": 120,
+    }
@@ -2,14 +2,18 @@
 Tests for the loan state computations.
 """
 
+import asyncio
+
 import pytest
 import pandas as pd
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 from shared.protocol_ids import ProtocolIDs
 from data_handler.handlers.loan_states.abstractions import (
     HashstackBaseLoanStateComputation,
 )
+from data_handler.handler_tools.pagination import AdaptivePaginator, PaginationPolicy
+from data_handler.handlers.loan_states.interest_rates import InterestRateIndex
 
 
 @pytest.fixture(scope="function")
@@ -21,6 +25,11 @@ def mock_hashstack_computation(mock_api_connector, mock_db_connector):
     computation.PROTOCOL_TYPE = ProtocolIDs.ZKLEND
     computation.api_connector = mock_api_connector
     computation.db_connector = mock_db_connector
+    computation.interest_rate_index = InterestRateIndex()
+    # Fixed block windows of 1000 blocks
+    computation.paginator = AdaptivePaginator(
+        PaginationPolicy(initial_size=1000, min_size=1000, max_size=1000)
+    )
 
     computation.get_result_df = HashstackBaseLoanStateComputation.get_result_df.__get__(
         computation
@@ -142,17 +151,31 @@ def test_save_data_positive(mock_hashstack_computation, sample_loan_state):
                 "user": sample_loan_state.user,
                 "collateral": sample_loan_state.collateral.values,
                 "debt": sample_loan_state.debt.values,
+                "block": sample_loan_state.block,
+                "timestamp": sample_loan_state.timestamp,
             }
         ]
     )
+    written = []
+    db_connector = mock_hashstack_computation.db_connector
+    db_connector.copy_loan_states_to_db.side_effect = written.extend
 
-    def mock_save_data(data_frame):
-        mock_hashstack_computation.db_connector.write_loan_states_to_db(data_frame)
-
-    mock_hashstack_computation.save_data = mock_save_data
     mock_hashstack_computation.save_data(df)
-    mock_hashstack_computation.db_connector.write_loan_states_to_db.assert_called_once()
-    mock_hashstack_computation.db_connector.write_loan_states_to_db.reset_mock()
+
+    db_connector.copy_loan_states_to_db.assert_called_once()
+    db_connector.copy_loan_states_to_db.side_effect = None
+    db_connector.copy_loan_states_to_db.reset_mock()
+    assert written == [
+        {
+            "protocol_id": ProtocolIDs.ZKLEND,
+            "user": "test_user",
+            "collateral": {"ETH": "100.0"},
+            "debt": {"USDC": "1000.0"},
+            "block": 12345,
+            "timestamp": 1000000,
+            "deposit": None,
+        }
+    ]
 
 
 def test_save_data_empty_df(mock_hashstack_computation):
@@ -161,7 +184,7 @@ def test_save_data_empty_df(mock_hashstack_computation):
     """
     df = pd.DataFrame()
     mock_hashstack_computation.save_data(df)
-    mock_hashstack_computation.db_connector.write_loan_states_to_db.assert_not_called()
+    mock_hashstack_computation.db_connector.copy_loan_states_to_db.assert_not_called()
 
 
 def test_process_event_positive(mock_hashstack_computation, sample_event_data):
@@ -178,19 +201,17 @@ def test_process_event_positive(mock_hashstack_computation, sample_event_data):
         )
     )
     mock_hashstack_computation.process_event(
-        mock_state, "test_method", sample_event_data
+        mock_state, mock_state.test_method, sample_event_data
     )
     mock_method.assert_called_once_with(sample_event_data)
 
 
 def test_process_event_invalid_method(mock_hashstack_computation, sample_event_data):
     """
-    Test process_event method with invalid method name.
+    Test process_event method without a handler.
     """
     mock_state = MagicMock()
-    mock_hashstack_computation.process_event(
-        mock_state, "nonexistent_method", sample_event_data
-    )
+    mock_hashstack_computation.process_event(mock_state, None, sample_event_data)
     # Should not raise an error, just log the missing method
 
 
@@ -206,9 +227,15 @@ def test_save_interest_rate_data_positive(
             mock_hashstack_computation
         )
     )
+    db_connector = mock_hashstack_computation.db_connector
+    db_connector.copy_interest_rates_to_db.side_effect = lambda rows: list(rows)
+
     mock_hashstack_computation.save_interest_rate_data()
-    mock_hashstack_computation.db_connector.write_batch_to_db.assert_called_once()
-    mock_hashstack_computation.db_connector.write_batch_to_db.reset_mock()
+
+    db_connector.copy_interest_rates_to_db.assert_called_once()
+    db_connector.copy_interest_rates_to_db.side_effect = None
+    db_connector.copy_interest_rates_to_db.reset_mock()
+    assert mock_hashstack_computation.interest_rate_result == []
 
 
 def test_save_interest_rate_data_empty(mock_hashstack_computation):
@@ -217,31 +244,41 @@ def test_save_interest_rate_data_empty(mock_hashstack_computation):
     """
     mock_hashstack_computation.interest_rate_result = []
     mock_hashstack_computation.save_interest_rate_data()
-    mock_hashstack_computation.db_connector.write_batch_to_db.assert_not_called()
+    mock_hashstack_computation.db_connector.copy_interest_rates_to_db.assert_not_called()
 
 
 def test_run_positive(mock_hashstack_computation):
     """
     Test run method with successful data processing.
     """
-    mock_hashstack_computation.run = HashstackBaseLoanStateComputation.run.__get__(
-        mock_hashstack_computation
-    )
+    for method_name in (
+        "run",
+        "run_async",
+        "fetch_pages",
+        "get_page_addresses",
+        "process_page",
+        "replay_page",
+    ):
+        setattr(
+            mock_hashstack_computation,
+            method_name,
+            getattr(HashstackBaseLoanStateComputation, method_name).__get__(
+                mock_hashstack_computation
+            ),
+        )
 
     mock_hashstack_computation.PROTOCOL_ADDRESSES = ["0x123"]
     mock_hashstack_computation.last_block = 1000
     mock_hashstack_computation.PAGINATION_SIZE = 1000
-
-    data_returns = [
-        [{"test": "data"}],
-        [],
-        [],
-        [],
-        [],
-        [],
-    ]
-
-    mock_hashstack_computation.get_data = MagicMock(side_effect=data_returns)
+    mock_hashstack_computation.MAX_EMPTY_PAGES = 5
+    mock_hashstack_computation.FETCH_CONCURRENCY = 2
+
+    connector = MagicMock()
+    connector.received_bytes = 0
+    # The run stops after five empty windows, one more window is prefetched
+    connector.fetch_addresses_data = AsyncMock(
+        side_effect=[[{"id": "0x1", "block_number": 1500}]] + [[]] * 6
+    )
 
     mock_hashstack_computation.process_data = MagicMock(
         return_value=[{"processed": "data"}]
@@ -249,21 +286,113 @@ def test_run_positive(mock_hashstack_computation):
     mock_hashstack_computation.save_data = MagicMock()
     mock_hashstack_computation.save_interest_rate_data = MagicMock()
 
-    mock_hashstack_computation.run()
+    with patch(
+        "data_handler.handlers.loan_states.abstractions.AsyncDeRiskAPIConnector"
+    ) as connector_class:
+        connector_class.return_value.__aenter__.return_value = connector
+        mock_hashstack_computation.run()
 
-    assert mock_hashstack_computation.get_data.call_count == 6
+    connector.fetch_addresses_data.assert_any_call(["0x123"], 1000, 2000)
+    connector.fetch_addresses_data.assert_any_call(["0x123"], 6000, 7000)
 
-    mock_hashstack_computation.get_data.assert_any_call("0x123", 1000)
-
-    mock_hashstack_computation.process_data.assert_called_once_with([{"test": "data"}])
+    mock_hashstack_computation.process_data.assert_called_once_with(
+        [{"id": "0x1", "block_number": 1500}]
+    )
     mock_hashstack_computation.save_data.assert_called_once_with(
         [{"processed": "data"}]
     )
     mock_hashstack_computation.save_interest_rate_data.assert_called_once()
+    mock_hashstack_computation.checkpoint_state.assert_called_with(1500, force=True)
 
     assert mock_hashstack_computation.last_block == 7000
 
 
+def test_fetch_pages_skips_boundary_events(mock_hashstack_computation):
+    """
+    Test that events of the block shared by consecutive windows are yielded once.
+    """
+    mock_hashstack_computation.PROTOCOL_ADDRESSES = "0x123"
+    mock_hashstack_computation.PAGINATION_SIZE = 1000
+    mock_hashstack_computation.get_page_addresses = (
+        HashstackBaseLoanStateComputation.get_page_addresses.__get__(
+            mock_hashstack_computation
+        )
+    )
+    boundary_event = {"id": "0x2", "block_number": 2000}
+    connector = MagicMock()
+    connector.received_bytes = 0
+    connector.fetch_addresses_data = AsyncMock(
+        side_effect=[
+            [{"id": "0x1", "block_number": 1500}, boundary_event],
+            [boundary_event, {"id": "0x3", "block_number": 2000}],
+            [],
+        ]
+    )
+
+    async def collect_pages() -> list:
+        pages = HashstackBaseLoanStateComputation.fetch_pages(
+            mock_hashstack_computation, connector, 1000
+        )
+        return [await anext(pages), await anext(pages)]
+
+    pages = asyncio.run(collect_pages())
+
+    assert pages[0] == (
+        1000,
+        2000,
+        [{"id": "0x1", "block_number": 1500}, boundary_event],
+    )
+    assert pages[1] == (2000, 3000, [{"id": "0x3", "block_number": 2000}])
+
+
+def test_fetch_pages_adapts_window_size(mock_hashstack_computation):
+    """
+    Test that the next window is sized by the page received before it is fetched.
+    """
+    mock_hashstack_computation.PROTOCOL_ADDRESSES = ["0x123"]
+    mock_hashstack_computation.get_page_addresses = (
+        HashstackBaseLoanStateComputation.get_page_addresses.__get__(
+            mock_hashstack_computation
+        )
+    )
+    mock_hashstack_computation.paginator = AdaptivePaginator(
+        PaginationPolicy(initial_size=1000, target_events=4)
+    )
+    connector = MagicMock()
+    connector.received_bytes = 0
+    connector.fetch_addresses_data = AsyncMock(
+        side_effect=[
+            [],
+            [{"id": f"0x{i}", "block_number": 3000 + i} for i in range(8)],
+            [],
+        ]
+    )
+
+    async def collect_windows() -> list:
+        pages = HashstackBaseLoanStateComputation.fetch_pages(
+            mock_hashstack_computation, connector, 1000
+        )
+        windows = [(await anext(pages))[:2], (await anext(pages))[:2]]
+        await pages.aclose()
+        return windows
+
+    windows = asyncio.run(collect_windows())
+
+    # The empty page doubles the window, the page with twice the targeted events halves it
+    assert windows == [(1000, 2000), (2000, 4000)]
+    assert mock_hashstack_computation.paginator.next_window(4000) == (4000, 5000)
+
+
+def _mock_interest_rate(block: int, collateral: dict, debt: dict) -> MagicMock:
+    """
+    Creates a mock interest rate record.
+    """
+    interest_rate = MagicMock()
+    interest_rate.block = block
+    interest_rate.get_json_deserialized.return_value = (collateral, debt)
+    return interest_rate
+
+
 @pytest.mark.parametrize(
     "block,expected_calls",
     [
@@ -278,27 +407,158 @@ def test_set_interest_rate(mock_hashstack_computation, block, expected_calls):
     mock_state = MagicMock()
     mock_state.last_interest_rate_block_number = 1000
 
-    mock_interest_rate = MagicMock()
-    mock_interest_rate.get_json_deserialized.return_value = (
-        {"ETH": 0.1},
-        {"USDC": 0.05},
-    )
-    mock_hashstack_computation.db_connector.get_interest_rate_by_block.return_value = (
-        mock_interest_rate
-    )
+    db_connector = mock_hashstack_computation.db_connector
+    db_connector.get_interest_rates_by_block_range.return_value = [
+        _mock_interest_rate(999, {"ETH": 0.1}, {"USDC": 0.05})
+    ]
 
     mock_hashstack_computation.set_interest_rate = (
         HashstackBaseLoanStateComputation.set_interest_rate.__get__(
             mock_hashstack_computation
         )
     )
+    mock_hashstack_computation.prefetch_interest_rates = (
+        HashstackBaseLoanStateComputation.prefetch_interest_rates.__get__(
+            mock_hashstack_computation
+        )
+    )
 
     mock_hashstack_computation.set_interest_rate(mock_state, block, ProtocolIDs.ZKLEND)
+    assert db_connector.get_interest_rates_by_block_range.call_count == expected_calls
+    db_connector.get_interest_rates_by_block_range.reset_mock()
+
+
+def test_set_interest_rate_uses_prefetched_page(mock_hashstack_computation):
+    """
+    Test set_interest_rate resolves all blocks of a prefetched page with a single query.
+    """
+    mock_state = MagicMock()
+    mock_state.last_interest_rate_block_number = 0
+
+    db_connector = mock_hashstack_computation.db_connector
+    db_connector.get_interest_rates_by_block_range.return_value = [
+        _mock_interest_rate(1000, {"ETH": 1}, {"USDC": 1}),
+        _mock_interest_rate(1005, {"ETH": 2}, {"USDC": 3}),
+    ]
+
+    for method_name in (
+        "set_interest_rate",
+        "prefetch_interest_rates",
+        "prefetch_interest_rates_for_data",
+    ):
+        setattr(
+            mock_hashstack_computation,
+            method_name,
+            getattr(HashstackBaseLoanStateComputation, method_name).__get__(
+                mock_hashstack_computation
+            ),
+        )
+
+    data = [{"block_number": block} for block in (1002, 1004, 1006, 1010)]
+    mock_hashstack_computation.prefetch_interest_rates_for_data(data)
+    db_connector.get_interest_rates_by_block_range.assert_called_once_with(
+        protocol_id=mock_hashstack_computation.PROTOCOL_TYPE,
+        start_block=1002,
+        end_block=1010,
+    )
+
+    mock_hashstack_computation.set_interest_rate(mock_state, 1004, ProtocolIDs.ZKLEND)
+    assert mock_state.interest_rate_models.collateral == {"ETH": 1}
+    mock_hashstack_computation.set_interest_rate(mock_state, 1006, ProtocolIDs.ZKLEND)
+    assert mock_state.interest_rate_models.collateral == {"ETH": 2}
+    assert mock_state.interest_rate_models.debt == {"USDC": 3}
+
+    assert db_connector.get_interest_rates_by_block_range.call_count == 1
+    db_connector.get_interest_rates_by_block_range.reset_mock()
+
+
+def test_interest_rate_index_get():
+    """
+    Test InterestRateIndex resolves the closest record at or below a block.
+    """
+    index = InterestRateIndex()
+    index.load(
+        [
+            _mock_interest_rate(20, {"ETH": 2}, {}),
+            _mock_interest_rate(10, {"ETH": 1}, {}),
+        ],
+        start_block=15,
+        end_block=30,
+    )
+
+    assert index.get(5) is None
+    assert index.get(15) == (10, {"ETH": 1}, {})
+    assert index.get(20) == (20, {"ETH": 2}, {})
+    assert index.covers(30)
+    assert not index.covers(31)
+
+    # Mutating the returned rates does not affect the index
+    index.get(25)[1]["ETH"] = 5
+    assert index.get(25) == (20, {"ETH": 2}, {})
+
+
+@pytest.mark.parametrize(
+    "last_snapshot_block,block,force,expected_calls",
+    [
+        (None, 1500, False, 1),  # No snapshot yet
+        (1000, 1500, False, 0),  # Within the interval
+        (1000, 11000, False, 1),  # Interval reached
+        (1000, 1500, True, 1),  # Forced at the end of a run
+        (1500, 1500, True, 0),  # Snapshot of this block exists already
+    ],
+)
+def test_checkpoint_state(
+    mock_hashstack_computation, last_snapshot_block, block, force, expected_calls
+):
+    """
+    Test checkpoint_state saves snapshots every SNAPSHOT_INTERVAL blocks.
+    """
+    mock_hashstack_computation.SNAPSHOT_INTERVAL = 10_000
+    mock_hashstack_computation.state = MagicMock()
+    mock_hashstack_computation.last_snapshot_block = last_snapshot_block
+    mock_hashstack_computation.checkpoint_state = (
+        HashstackBaseLoanStateComputation.checkpoint_state.__get__(
+            mock_hashstack_computation
+        )
+    )
+
+    mock_hashstack_computation.checkpoint_state(block, force=force)
+    assert mock_hashstack_computation.save_state_snapshot.call_count == expected_calls
+
+
+@pytest.mark.parametrize(
+    "snapshot,expected_last_block,expected_initializations",
+    [
+        (MagicMock(block=1500, data=b""), 1501, 0),  # Resumed from the snapshot
+        (None, 1000, 1),  # No snapshot, the new state is initialized
+    ],
+)
+def test_restore_state_snapshot(
+    mock_hashstack_computation, snapshot, expected_last_block, expected_initializations
+):
+    """
+    Test restore_state_snapshot initializes the state only without a snapshot.
+    """
+    mock_hashstack_computation.db_connector.get_latest_state_snapshot.return_value = (
+        snapshot
+    )
+    mock_hashstack_computation.restore_state_snapshot = (
+        HashstackBaseLoanStateComputation.restore_state_snapshot.__get__(
+            mock_hashstack_computation
+        )
+    )
+
+    with patch(
+        "data_handler.handlers.loan_states.abstractions.load_state_snapshot"
+    ) as mock_load:
+        mock_hashstack_computation.restore_state_snapshot()
+
+    assert mock_load.call_count == 1 - expected_initializations
+    assert mock_hashstack_computation.last_block == expected_last_block
     assert (
-        mock_hashstack_computation.db_connector.get_interest_rate_by_block.call_count
-        == expected_calls
+        mock_hashstack_computation.initialize_state.call_count
+        == expected_initializations
     )
-    mock_hashstack_computation.db_connector.get_interest_rate_by_block.reset_mock()
 
 
 def test_get_result_df_positive(mock_hashstack_computation, sample_loan_state):
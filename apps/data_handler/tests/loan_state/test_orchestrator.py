@@ -0,0 +1,108 @@
+"""
+Tests for the parallel loan state computations.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import billiard
+import pytest
+from data_handler.handler_tools.pagination import AdaptivePaginator, PaginationPolicy
+from data_handler.handlers.loan_states import orchestrator
+
+
+class FakeComputation:
+    """
+    A loan state computation replaying the pages without a database.
+    """
+
+    PROTOCOL_TYPE = "fake"
+    FETCH_CONCURRENCY = 1
+    MAX_EMPTY_PAGES = 2
+
+    def __init__(self):
+        self.last_block = 1000
+
+    @classmethod
+    def create_paginator(cls) -> AdaptivePaginator:
+        # Fixed block windows of 1000 blocks
+        return AdaptivePaginator(
+            PaginationPolicy(initial_size=1000, min_size=1000, max_size=1000)
+        )
+
+    def get_page_addresses(self) -> list[str]:
+        return ["0x123"]
+
+    def replay_page(self, min_block: int, max_block: int, data: list[dict]) -> int:
+        return max(event["block_number"] for event in data)
+
+    def checkpoint_state(self, block: int, force: bool = False) -> None:
+        pass
+
+
+class FailingComputation(FakeComputation):
+    """
+    A loan state computation failing to replay the pages.
+    """
+
+    PROTOCOL_TYPE = "failing"
+
+    def replay_page(self, min_block: int, max_block: int, data: list[dict]) -> int:
+        raise ValueError("Invalid event")
+
+
+def _run(computation_class) -> dict:
+    """
+    Runs the computation with the events of two pages followed by empty pages.
+    """
+    connector = MagicMock()
+    connector.received_bytes = 0
+    connector.fetch_addresses_data = AsyncMock(
+        side_effect=[
+            [{"id": "0x1", "block_number": 1500}],
+            [{"id": "0x2", "block_number": 2500}, {"id": "0x3", "block_number": 2600}],
+        ]
+        + [[]] * 3
+    )
+    with patch.object(orchestrator, "AsyncDeRiskAPIConnector") as connector_class:
+        connector_class.return_value.__aenter__.return_value = connector
+        progress = orchestrator.run_loan_states_computations(
+            [computation_class], queue_size=1
+        )
+
+    connector.fetch_addresses_data.assert_any_call(["0x123"], 1000, 2000)
+    return progress
+
+
+def test_run_loan_states_computations():
+    """
+    Test that the fetched pages are replayed in the worker and its progress is reported.
+    """
+    progress = _run(FakeComputation)["fake"]
+
+    assert progress.start_block == 1000
+    assert progress.pages == 2
+    assert progress.fetched_pages == 2
+    assert progress.events == 3
+    assert progress.last_block == 3000
+    assert progress.last_processed_block == 2600
+
+
+def test_run_loan_states_computations_raises_worker_error():
+    """
+    Test that an error of a worker is raised by the orchestrator.
+    """
+    with pytest.raises(RuntimeError, match="Invalid event"):
+        _run(FailingComputation)
+
+
+def _run_replayed_pages() -> int:
+    return _run(FakeComputation)["fake"].pages
+
+
+def test_run_loan_states_computations_in_pool_worker():
+    """
+    Test that the workers are started from a daemonic worker of a prefork pool, as
+    the ones of Celery.
+    """
+    with billiard.Pool(1) as pool:
+        assert pool.apply(_run_replayed_pages) == 2
@@ -122,6 +122,19 @@ def test_set_last_loan_states_per_users_success(
     assert user_loan_state.debt.values == {"USDC": Decimal("1000.0")}
 
 
+def test_set_all_last_loan_states(initializer, mock_zklend_state, sample_loan_state):
+    """Test setting the loan states of all stored users."""
+    initializer.db_connector.get_all_zklend.return_value = [sample_loan_state]
+    initializer.zklend_state = mock_zklend_state
+
+    initializer.set_all_last_loan_states()
+
+    user_loan_state = mock_zklend_state.loan_entities["user1"]
+    assert user_loan_state.collateral_enabled.values == {"ETH": True}
+    assert user_loan_state.collateral.values == {"ETH": Decimal("100.0")}
+    assert user_loan_state.debt.values == {"USDC": Decimal("1000.0")}
+
+
 def test_convert_float_to_decimal_valid_data(mock_zklend_initializer):
     """Test _convert_float_to_decimal with valid input."""
     initializer = mock_zklend_initializer
@@ -0,0 +1,203 @@
+"""
+Tests for the concurrent evaluation of the health factors of Vesu positions.
+"""
+
+from collections import Counter
+from decimal import Decimal
+from typing import Iterable
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from data_handler.handlers.loan_states.vesu.events import VesuLoanEntity
+from data_handler.handlers.loan_states.vesu.health import (
+    HealthPlan,
+    PositionKey,
+    evaluate_health_factors,
+)
+
+POOL = 0x1C8
+ETH = 0xE7
+USDC = 0x05DC
+PRICE_EXTENSION = 0xE1
+# The contract reads of a position, the ones of its shared reads are made by the entity
+POSITION_READS = ("_get_position_data", "_get_collateral_value", "_calculate_debt")
+SHARED_READS = (
+    "_get_asset_config",
+    "get_ltv_config",
+    "_get_token_decimals",
+    "fetch_token_price",
+)
+
+
+class FakeVesuEntity:
+    """
+    Answers the contract reads of a Vesu entity and counts them.
+    """
+
+    def __init__(self):
+        self.reads = Counter()
+
+    async def _get_position_data(self, user, pool_id, collateral_asset, debt_asset):
+        self.reads["position"] += 1
+        if user == 3:
+            raise ValueError("Invalid position")
+        return (user * 10**18, 0, 1000 * 10**6, 0)
+
+    async def _get_collateral_value(self, pool_id, asset, low, high, sign=0):
+        self.reads["calculate_collateral"] += 1
+        return Decimal(low)
+
+    async def _calculate_debt(self, low, high, sign, *config):
+        self.reads["calculate_debt"] += 1
+        return Decimal(low)
+
+    async def _get_asset_config(self, pool_id, asset):
+        self.reads["asset_config"] += 1
+        return [0] * 16
+
+    async def get_ltv_config(self, pool_id, collateral, debt):
+        self.reads["ltv_config"] += 1
+        return (8 * 10**17,)
+
+    async def _get_token_decimals(self, asset):
+        self.reads["decimals"] += 1
+        return Decimal(10) ** (18 if asset == ETH else 6)
+
+    async def fetch_token_price(self, asset, pool_id):
+        self.reads["price"] += 1
+        return Decimal(1000) if asset == ETH else Decimal(1)
+
+
+def test_plan_deduplicates_reads():
+    """
+    Test that the reads shared by the positions are planned once.
+    """
+    positions = [PositionKey(user, POOL, ETH, USDC) for user in (1, 2, 2, 3)] + [
+        PositionKey(4, POOL, 0, 0)
+    ]
+
+    plan = HealthPlan.from_positions(positions)
+
+    assert len(plan.positions) == 4
+    assert plan.asset_configs == {(POOL, USDC)}
+    assert plan.ltv_configs == {(POOL, ETH, USDC)}
+    assert plan.decimals == {ETH, USDC}
+    assert plan.prices == {(POOL, ETH), (POOL, USDC)}
+
+
+@pytest.mark.asyncio
+async def test_evaluate_health_factors():
+    """
+    Test that every position is evaluated from the shared reads, made once each.
+    """
+    entity = FakeVesuEntity()
+    plan = HealthPlan.from_positions(
+        [PositionKey(user, POOL, ETH, USDC) for user in (1, 2, 3)]
+        + [PositionKey(4, POOL, 0, 0)]
+    )
+
+    health_factors = await evaluate_health_factors(entity, plan, max_concurrency=2)
+
+    # The position of user 3 failed to be read, the one of user 4 is not open
+    assert health_factors == {
+        PositionKey(1, POOL, ETH, USDC): Decimal("0.8"),
+        PositionKey(2, POOL, ETH, USDC): Decimal("1.6"),
+    }
+    assert entity.reads == {
+        "asset_config": 1,
+        "ltv_config": 1,
+        "decimals": 2,
+        "price": 2,
+        "position": 3,
+        "calculate_collateral": 2,
+        "calculate_debt": 2,
+    }
+
+
+def _make_vesu_entity(fake_entity: FakeVesuEntity, reads: Iterable[str]):
+    """
+    Make a VesuLoanEntity whose `reads` are answered by the fake entity.
+    """
+    with (
+        patch("data_handler.handlers.loan_states.vesu.events.StarknetClient"),
+        patch("data_handler.handlers.loan_states.vesu.events.DBConnector"),
+    ):
+        vesu_entity = VesuLoanEntity()
+    for name in reads:
+        setattr(vesu_entity, name, getattr(fake_entity, name))
+    return vesu_entity
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "failing_read, expected",
+    [
+        # The price extension reports the USDC price of the second pool as invalid
+        ("price", {PositionKey(1, POOL, ETH, USDC): Decimal("0.8")}),
+        # The ETH contract returns no decimals
+        ("decimals", {}),
+    ],
+)
+async def test_evaluate_health_factors_skips_positions_of_failed_shared_reads(
+    failing_read, expected
+):
+    """
+    Test that a failed shared read of the entity only skips the positions depending on it.
+    """
+    fake_entity = FakeVesuEntity()
+    vesu_entity = _make_vesu_entity(fake_entity, POSITION_READS + SHARED_READS[:2])
+
+    async def func_call(address, selector, calldata):
+        if selector == "decimals":
+            if failing_read == "decimals" and address == ETH:
+                return []
+            return [18 if address == ETH else 6]
+        if selector == "extension":
+            return [PRICE_EXTENSION]
+        pool_id, asset = calldata
+        is_valid = not (
+            failing_read == "price" and (pool_id, asset) == (POOL + 1, USDC)
+        )
+        return [(1000 if asset == ETH else 1) * 10**18, 0, int(is_valid)]
+
+    vesu_entity.client.func_call = AsyncMock(side_effect=func_call)
+    plan = HealthPlan.from_positions(
+        [PositionKey(1, POOL, ETH, USDC), PositionKey(2, POOL + 1, ETH, USDC)]
+    )
+
+    health_factors = await evaluate_health_factors(vesu_entity, plan, max_concurrency=2)
+
+    assert health_factors == expected
+    # The positions depending on a failed read are not read
+    assert fake_entity.reads["position"] == len(expected)
+
+
+@pytest.mark.asyncio
+async def test_calculate_health_factors_saves_in_one_batch():
+    """
+    Test that the health factors of all users are saved with one bulk insert.
+    """
+    vesu_entity = _make_vesu_entity(FakeVesuEntity(), POSITION_READS + SHARED_READS)
+    vesu_entity.session = MagicMock()
+    vesu_entity.session.execute.return_value.all.return_value = [
+        ("1", str(POOL), str(ETH), str(USDC)),
+        ("2", str(POOL), str(ETH), str(USDC)),
+        ("2", str(POOL + 1), "0", "0"),
+        ("3", str(POOL), str(ETH), str(USDC)),
+    ]
+
+    results = await vesu_entity.calculate_health_factors([1, 2, 3])
+
+    # The position of user 3 failed to be read, its health factor is unknown
+    assert results == {
+        1: {hex(POOL): Decimal("0.8")},
+        2: {hex(POOL): Decimal("1.6"), hex(POOL + 1): Decimal("inf")},
+    }
+    copy = vesu_entity.db_connector.copy_health_ratio_levels_to_db
+    copy.assert_called_once()
+    levels = list(copy.call_args.args[0])
+    assert [(level["user_id"], level["value"]) for level in levels] == [
+        ("1", Decimal("0.8")),
+        ("2", Decimal("1.6")),
+    ]
+    assert {level["protocol_id"] for level in levels} == {"Vesu"}
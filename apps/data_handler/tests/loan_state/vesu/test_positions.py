@@ -0,0 +1,108 @@
+"""
+Tests for the ingestion of the Vesu ModifyPosition events.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from data_handler.handlers.loan_states.vesu.events import (
+    EVENTS_CHUNK_SIZE,
+    FIRST_VESU_BLOCK,
+    VesuLoanEntity,
+)
+from shared.protocol_ids import ProtocolIDs
+
+
+def _event(block_number: int, user: int) -> SimpleNamespace:
+    return SimpleNamespace(keys=[0, 2, 3, 4, user], block_number=block_number)
+
+
+@pytest.fixture
+def vesu_entity():
+    """VesuLoanEntity with a mocked client and DB"""
+    with (
+        patch("data_handler.handlers.loan_states.vesu.events.StarknetClient"),
+        patch("data_handler.handlers.loan_states.vesu.events.DBConnector"),
+    ):
+        entity = VesuLoanEntity()
+    entity.client.client.get_block_number = AsyncMock(return_value=200)
+    entity.db_connector.write_vesu_positions.side_effect = (
+        lambda positions, cursor_block: len(positions)
+    )
+    return entity
+
+
+@pytest.mark.asyncio
+async def test_update_positions_data_resumes_from_cursor(vesu_entity):
+    """
+    Test that the events after the cursor are written page by page with the cursor.
+    """
+    vesu_entity.db_connector.get_event_cursor.return_value = 100
+    vesu_entity.client.client.get_events = AsyncMock(
+        side_effect=[
+            SimpleNamespace(
+                events=[_event(120, 1), _event(150, 2)], continuation_token="1"
+            ),
+            SimpleNamespace(events=[_event(150, 3)], continuation_token=None),
+        ]
+    )
+
+    written = await vesu_entity.update_positions_data()
+
+    assert written == 3
+    vesu_entity.db_connector.get_event_cursor.assert_called_once_with(ProtocolIDs.VESU)
+    first_call = vesu_entity.client.client.get_events.call_args_list[0]
+    assert first_call.kwargs["from_block_number"] == 101
+    assert first_call.kwargs["to_block_number"] == 200
+    assert first_call.kwargs["chunk_size"] == EVENTS_CHUNK_SIZE
+    writes = vesu_entity.db_connector.write_vesu_positions.call_args_list
+    # The events of block 150 continue on the second page
+    assert [call.kwargs["cursor_block"] for call in writes] == [149, 200]
+    assert writes[0].args[0][1] == {
+        "user": "2",
+        "pool_id": "2",
+        "collateral_asset": "3",
+        "debt_asset": "4",
+        "block_number": 150,
+    }
+    assert vesu_entity.start_block == 101
+    assert vesu_entity.last_processed_block == 200
+
+
+@pytest.mark.asyncio
+async def test_update_positions_data_starts_at_first_block(vesu_entity):
+    """
+    Test that the ingestion starts at the first Vesu block without a cursor or positions.
+    """
+    vesu_entity.db_connector.get_event_cursor.return_value = None
+    vesu_entity.db_connector.get_last_vesu_position_block.return_value = None
+    vesu_entity.client.client.get_block_number = AsyncMock(
+        return_value=FIRST_VESU_BLOCK + 10
+    )
+    vesu_entity.client.client.get_events = AsyncMock(
+        return_value=SimpleNamespace(events=[], continuation_token=None)
+    )
+
+    assert await vesu_entity.update_positions_data() == 0
+
+    assert (
+        vesu_entity.client.client.get_events.call_args.kwargs["from_block_number"]
+        == FIRST_VESU_BLOCK
+    )
+    vesu_entity.db_connector.write_vesu_positions.assert_called_once_with(
+        [], cursor_block=FIRST_VESU_BLOCK + 10
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_positions_data_up_to_date(vesu_entity):
+    """
+    Test that nothing is fetched when the cursor is at the current block.
+    """
+    vesu_entity.db_connector.get_event_cursor.return_value = 200
+    vesu_entity.client.client.get_events = AsyncMock()
+
+    assert await vesu_entity.update_positions_data() == 0
+
+    vesu_entity.client.client.get_events.assert_not_called()
@@ -0,0 +1,142 @@
+"""Tests for the concurrent collection of order books."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from data_handler.db.models import OrderBookModel
+from data_handler.db.schemas import OrderBookResponseModel
+from data_handler.handlers.order_books import collection
+from data_handler.handlers.order_books.abstractions import RateLimiter
+
+ETH = "0x49d36570d4e46f48e99674bd3fcc84644ddd6b96f7c741b1562b82f9e004dc7"
+USDC = "0x53c91253bc9682c04929ca02ed00b3e423f6710d2ee7e0d5ebb06f3ecf368a8"
+
+
+def _order_book(token_a: str, token_b: str, dex: str = "Haiko") -> MagicMock:
+    order_book = MagicMock()
+    order_book.serialize.return_value = OrderBookResponseModel(
+        token_a=token_a,
+        token_b=token_b,
+        block=1,
+        timestamp=2,
+        dex=dex,
+        current_price="1.5",
+        asks=[(1.6, 10.0)],
+        bids=[(1.4, 20.0)],
+    )
+    return order_book
+
+
+def test_collect_order_books():
+    """Jobs run concurrently up to the limit, failed jobs are skipped."""
+    running = []
+    max_running = []
+    lock = threading.Lock()
+
+    def make_job(token_a, token_b, fail=False):
+        def job():
+            with lock:
+                running.append(1)
+                max_running.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+            if fail:
+                raise ValueError("Pool not found.")
+            return _order_book(token_a, token_b)
+
+        return job
+
+    jobs = {(f"0x{i}", USDC): make_job(f"0x{i}", USDC) for i in range(6)}
+    jobs[(ETH, USDC)] = make_job(ETH, USDC, fail=True)
+
+    order_books = asyncio.run(collection.collect_order_books(jobs, max_concurrency=3))
+
+    assert [order_book.token_a for order_book in order_books] == [
+        f"0x{i}" for i in range(6)
+    ]
+    assert all(isinstance(order_book, OrderBookModel) for order_book in order_books)
+    assert max(max_running) == 3
+
+
+def test_collect_haiko_order_books_shares_data():
+    """The supported tokens, USD prices and latest block are fetched once per run."""
+    block_info = {"result": {"block_number": 1, "timestamp": 2}}
+    created = []
+
+    def create_order_book(token_a, token_b, **kwargs):
+        created.append(_order_book(token_a, token_b))
+        return created[-1]
+
+    with (
+        patch.object(
+            collection, "TOKEN_MAPPING", {ETH: MagicMock(), USDC: MagicMock()}
+        ),
+        patch.object(collection, "HaikoAPIConnector") as haiko_connector,
+        patch.object(collection, "HaikoBlastAPIConnector") as blast_connector,
+        patch.object(
+            collection, "HaikoOrderBook", side_effect=create_order_book
+        ) as order_book_class,
+    ):
+        haiko_connector.get_supported_tokens.return_value = [{"address": ETH}]
+        haiko_connector.get_tokens_usd_prices.return_value = {"ETH": 1.0}
+        blast_connector.get_block_info.return_value = block_info
+
+        order_books = asyncio.run(collection.collect_haiko_order_books())
+
+    assert {(book.token_a, book.token_b) for book in order_books} == {
+        (ETH, USDC),
+        (USDC, ETH),
+    }
+    haiko_connector.get_supported_tokens.assert_called_once_with(False)
+    haiko_connector.get_tokens_usd_prices.assert_called_once()
+    blast_connector.get_block_info.assert_called_once()
+    for call in order_book_class.call_args_list:
+        assert call.kwargs == {
+            "supported_tokens": [{"address": ETH}],
+            "usd_prices": {"ETH": 1.0},
+        }
+    for order_book in created:
+        order_book.fetch_price_and_liquidity.assert_called_once_with(
+            latest_block_info=block_info
+        )
+
+
+def test_collect_ekubo_order_books_shares_pair_prices():
+    """The price of a pair is fetched once for all of its pools."""
+    pools = [
+        {"token0": ETH, "token1": USDC, "key_hash": "0x1"},
+        {"token0": ETH, "token1": USDC, "key_hash": "0x2"},
+        {"token0": ETH, "token1": "0xunknown", "key_hash": "0x3"},
+    ]
+    with (
+        patch.object(collection, "EkuboAPIConnector") as connector_class,
+        patch.object(
+            collection,
+            "EkuboOrderBook",
+            side_effect=lambda a, b: _order_book(a, b, dex="Ekubo"),
+        ),
+    ):
+        connector = connector_class.return_value
+        connector.get_pools.return_value = pools
+        connector.get_pair_price.return_value = {"price": "1.5"}
+
+        order_books = asyncio.run(collection.collect_ekubo_order_books())
+
+    assert len(order_books) == 2
+    connector.get_pair_price.assert_called_once_with(ETH, USDC)
+
+
+def test_rate_limiter():
+    """Requests are spaced out by the interval of the limiter."""
+    limiter = RateLimiter(requests_per_second=4)
+    with (
+        patch("time.monotonic", return_value=10.0),
+        patch("time.sleep") as mock_sleep,
+    ):
+        for _ in range(3):
+            limiter.wait()
+
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [0.25, 0.5]
@@ -0,0 +1,90 @@
+"""Tests for the cumulative depth of order books and the price impact lookups."""
+
+import random
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from data_handler.db.crud import DBConnector
+from data_handler.db.models import OrderBookModel
+from data_handler.handlers.order_books.depth import (
+    build_depth,
+    get_quantities_to_move_price,
+)
+from data_handler.handlers.order_books.processing import calculate_price_changes
+
+ASKS = [(103.0, 4.0), (101.0, 1.0), (102.0, 2.0)]
+BIDS = [(97.0, 3.0), (99.0, 1.0), (98.0, 2.0)]
+
+
+def test_build_depth():
+    """The levels are sorted away from the current price with prefix sums."""
+    assert build_depth(ASKS, BIDS) == {
+        "asks": {"prices": [101.0, 102.0, 103.0], "quantities": [1.0, 3.0, 7.0]},
+        "bids": {"prices": [99.0, 98.0, 97.0], "quantities": [1.0, 3.0, 6.0]},
+    }
+
+
+def test_get_quantities_to_move_price():
+    """The quantities of the levels within the moved price are summed up."""
+    depth = build_depth(ASKS, BIDS)
+    ratios = [Decimal("0.005"), Decimal("0.02"), Decimal("0.5")]
+
+    assert get_quantities_to_move_price(depth, Decimal("100"), ratios) == [
+        Decimal("0"),
+        Decimal("3.0"),
+        Decimal("6.0"),
+    ]
+    assert get_quantities_to_move_price(depth, Decimal("100"), ratios, "asks") == [
+        Decimal("0"),
+        Decimal("3.0"),
+        Decimal("7.0"),
+    ]
+    with pytest.raises(ValueError):
+        get_quantities_to_move_price(depth, Decimal("100"), [Decimal("1")])
+    with pytest.raises(ValueError):
+        get_quantities_to_move_price(depth, Decimal("0"), [Decimal("0.1")])
+
+
+def test_binary_search_matches_scan():
+    """The binary search gives the same quantities as a scan of the bids."""
+    random.seed(4)
+    bids = [(random.uniform(50, 100), random.uniform(0, 10)) for _ in range(500)]
+    depth = build_depth([], bids)
+    ratios = [Decimal(ratio) / 100 for ratio in range(1, 60)]
+
+    quantities = get_quantities_to_move_price(depth, Decimal("100"), ratios)
+
+    for ratio, quantity in zip(ratios, quantities):
+        min_price = (1 - ratio) * 100
+        expected = sum(amount for price, amount in bids if price >= min_price)
+        assert float(quantity) == pytest.approx(expected)
+
+
+def test_calculate_price_changes():
+    """The price impacts of many pairs are answered from one query."""
+    connector = MagicMock(spec=DBConnector)
+    connector.get_latest_order_books.return_value = {
+        ("Ekubo", "0x1", "0x2"): OrderBookModel(
+            current_price=Decimal("100"), depth=build_depth(ASKS, BIDS)
+        ),
+        ("Haiko", "0x1", "0x2"): OrderBookModel(
+            current_price=Decimal("0"), depth=build_depth([], [])
+        ),
+    }
+    pairs = [("Ekubo", "0x1", "0x2"), ("Haiko", "0x1", "0x2"), ("Haiko", "0x2", "0x1")]
+
+    price_changes = calculate_price_changes(
+        pairs, [Decimal("0.01"), Decimal("0.03")], connector=connector
+    )
+
+    assert price_changes == {
+        ("Ekubo", "0x1", "0x2"): {
+            Decimal("0.01"): Decimal("1.0"),
+            Decimal("0.03"): Decimal("6.0"),
+        }
+    }
+    connector.get_latest_order_books.assert_called_once_with(pairs)
+    with pytest.raises(ValueError):
+        calculate_price_changes(pairs, [Decimal("0")], connector=connector)
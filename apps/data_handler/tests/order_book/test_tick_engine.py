@@ -0,0 +1,192 @@
+"""Tests for the vectorized depth computation of the order books."""
+
+import random
+from decimal import Decimal
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_handler.handlers.order_books.commons import TickEngine, max_relative_error
+from data_handler.handlers.order_books.ekubo.main import EkuboOrderBook
+from data_handler.handlers.order_books.haiko.main import HaikoOrderBook
+from data_handler.handlers.order_books.myswap.main import (
+    MAX_MYSWAP_TICK,
+    MySwapOrderBook,
+)
+
+ETH = "0x49d36570d4e46f48e99674bd3fcc84644ddd6b96f7c741b1562b82f9e004dc7"
+USDC = "0x53c91253bc9682c04929ca02ed00b3e423f6710d2ee7e0d5ebb06f3ecf368a8"
+
+# The fast and the high-precision depth must agree up to float rounding
+TOLERANCE = Decimal("1e-9")
+
+
+@pytest.fixture(params=[False, True], ids=["fast", "precise"])
+def engine(request):
+    return TickEngine(precise=request.param)
+
+
+def test_engine_primitives(engine):
+    """The primitives compute the same values in both modes."""
+    ticks = engine.array([0, 2, 4])
+    liquidity = engine.cumulative(engine.scalar(100), engine.array([10, 20, 30]))
+    sqrt_prices = engine.sqrt(engine.power("4", ticks / 2))
+
+    assert [float(value) for value in liquidity] == [100, 110, 130]
+    assert [float(value) for value in sqrt_prices] == pytest.approx([1, 2, 4])
+    assert [float(value) for value in engine.shift(engine.scalar(5), ticks)] == [
+        5,
+        0,
+        2,
+    ]
+    amounts = engine.token0_amounts(
+        liquidity, engine.shift(engine.scalar(1), sqrt_prices), sqrt_prices, 10
+    )
+    assert [float(value) for value in amounts] == pytest.approx([0, 5.5, 3.25])
+    amounts = engine.token1_amounts(
+        liquidity, engine.shift(engine.scalar(1), sqrt_prices), sqrt_prices, 10
+    )
+    assert [float(value) for value in amounts] == pytest.approx([0, 11, 26])
+
+
+def test_levels(engine):
+    """The levels are filtered by the price range and converted to Decimal."""
+    prices = engine.array(["0.5", "1.5", "2.5"])
+    amounts = engine.array(["10", "20", "30"])
+
+    levels = engine.levels(prices, amounts, (Decimal("0.5"), Decimal("3")))
+
+    assert levels == [(Decimal("1.5"), Decimal("20")), (Decimal("2.5"), Decimal("30"))]
+    assert all(isinstance(value, Decimal) for level in levels for value in level)
+
+
+def test_zero_end_price(engine):
+    """A range ending at the price of zero holds all of its liquidity."""
+    amounts = engine.token0_amounts(
+        engine.array([8]), engine.array([2]), engine.array([0]), 2
+    )
+
+    assert float(amounts[0]) == 2
+
+
+def test_max_relative_error():
+    """The largest relative difference of the prices and amounts is reported."""
+    levels = [(Decimal("1"), Decimal("101")), (Decimal("2"), Decimal("0"))]
+    reference_levels = [(Decimal("1"), Decimal("100")), (Decimal("2"), Decimal("0"))]
+
+    assert max_relative_error(levels, reference_levels) == Decimal("0.01")
+    with pytest.raises(ValueError):
+        max_relative_error(levels, reference_levels[:1])
+
+
+def _verify(make_order_book, fill):
+    """Fill a fast and a high-precision order book and compare their levels."""
+    fast, precise = make_order_book(), make_order_book()
+    precise.tick_engine = TickEngine(precise=True)
+    fill(fast)
+    fill(precise)
+
+    assert fast.asks and fast.bids
+    assert max_relative_error(fast.asks, precise.asks) < TOLERANCE
+    assert max_relative_error(fast.bids, precise.bids) < TOLERANCE
+
+
+def test_ekubo_depth():
+    """The Ekubo depth is computed the same way in both modes."""
+    random.seed(1)
+    ticks = sorted(random.sample(range(-20_000_000, -16_000_000, 1000), 200))
+    liquidity_data = [
+        {"tick": tick, "net_liquidity_delta_diff": random.randint(1, 10**18)}
+        for tick in ticks
+    ]
+    row = pd.Series(
+        {"tick": ticks[100] + 500, "tick_spacing": 1000, "liquidity": 10**19}
+    )
+
+    def make_order_book():
+        with patch("data_handler.handlers.order_books.ekubo.main.EkuboAPIConnector"):
+            return EkuboOrderBook(ETH, USDC)
+
+    def fill(order_book):
+        order_book.add_asks(liquidity_data, row)
+        order_book.add_bids(liquidity_data, row)
+
+    _verify(make_order_book, fill)
+
+
+def test_haiko_depth():
+    """The Haiko depth matches the per-level amounts in both modes."""
+    random.seed(2)
+    prices = sorted(
+        Decimal(random.uniform(1000, 5000)).quantize(Decimal("0.01"))
+        for _ in range(200)
+    )
+    asks = [
+        {"price": price, "liquidityCumulative": Decimal(random.randint(1, 10**18))}
+        for price in prices
+        if price >= 3000
+    ]
+    bids = [
+        {"price": price, "liquidityCumulative": Decimal(random.randint(1, 10**18))}
+        for price in reversed(prices)
+        if price < 3000
+    ]
+
+    def make_order_book():
+        with (
+            patch.object(HaikoOrderBook, "_check_tokens_supported"),
+            patch.object(HaikoOrderBook, "_set_usd_prices"),
+        ):
+            order_book = HaikoOrderBook(ETH, USDC)
+        order_book.set_current_price(Decimal("3000"))
+        return order_book
+
+    def fill(order_book):
+        order_book.add_asks(asks, Decimal(10**17), (Decimal(0), Decimal(10**4)))
+        order_book.add_bids(bids, (Decimal(0), Decimal(10**4)))
+
+    _verify(make_order_book, fill)
+
+    order_book = make_order_book()
+    fill(order_book)
+    expected_ask = order_book._get_token_amount(
+        asks[0]["liquidityCumulative"], asks[0]["price"].sqrt(), asks[1]["price"].sqrt()
+    )
+    assert order_book.asks[1][0] == asks[0]["price"]
+    assert float(order_book.asks[1][1]) == pytest.approx(float(expected_ask), rel=1e-9)
+
+
+def test_myswap_depth():
+    """The MySwap depth and tick prices are computed the same way in both modes."""
+    random.seed(3)
+    current_tick = int(MAX_MYSWAP_TICK) - 80000
+    ticks = sorted(
+        random.sample(range(current_tick - 40000, current_tick + 40000), 200)
+    )
+    data = pd.DataFrame(
+        {"tick": ticks, "liq": [random.randint(1, 10**18) for _ in ticks]}
+    )
+
+    def make_order_book():
+        with (
+            patch("data_handler.handlers.order_books.myswap.main.MySwapAPIConnector"),
+            patch("data_handler.handlers.order_books.myswap.main.get_logger"),
+        ):
+            order_book = MySwapOrderBook(ETH, USDC)
+        order_book.current_price = order_book.tick_to_price(Decimal(current_tick))
+        return order_book
+
+    def fill(order_book):
+        order_book.add_bids(data[data["tick"] < current_tick])
+        order_book.add_asks(data[data["tick"] >= current_tick], Decimal(10**17))
+
+    _verify(make_order_book, fill)
+
+    order_book = make_order_book()
+    prices = order_book._ticks_to_prices(np.array(ticks[:3], dtype=np.float64))
+    assert prices.tolist() == pytest.approx(
+        [float(order_book.tick_to_price(Decimal(tick))) for tick in ticks[:3]],
+        rel=1e-12,
+    )
@@ -5,6 +5,8 @@ from unittest.mock import patch
 
 import pytest
 from data_handler.db.crud import DBConnector
+from data_handler.db.models import OrderBookModel
+from data_handler.handlers.order_books.depth import build_depth
 from data_handler.handlers.order_books.processing import OrderBookProcessor
 from data_handler.handlers.order_books.uniswap_v2 import main
 
@@ -109,8 +111,18 @@ class TestUniswapV2OrderBookProcessor:
             "0x49d36570d4e46f48e99674bd3fcc84644ddd6b96f7c741b1562b82f9e004dc7",
             "0x53c91253bc9682c04929ca02ed00b3e423f6710d2ee7e0d5ebb06f3ecf368a8",
         )
+        pair = (processor.dex, processor.token_a, processor.token_b)
+        # `DBConnector()` returns the return value of the patched `__new__`
+        connector = mock_db_connector.return_value
+        connector.get_latest_order_books.return_value = {
+            pair: OrderBookModel(
+                current_price=Decimal("100"),
+                depth=build_depth([], [(90.0, 1.0), (96.0, 2.0), (99.0, 3.0)]),
+            )
+        }
         price = processor.calculate_price_change(Decimal("0.05"))
         assert isinstance(price, Decimal)  # :)
+        assert price == Decimal("5.0")
 
     def test_calculate_price_change_fail_with_invalid_args(
         self, mock_db_connector, monkeypatch
@@ -2,9 +2,12 @@
 
 import os
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from data_handler.handler_tools.api_connector import DeRiskAPIConnector
+from data_handler.handler_tools.api_connector import (
+    AsyncDeRiskAPIConnector,
+    DeRiskAPIConnector,
+)
 from requests.exceptions import HTTPError
 from unittest.mock import patch, MagicMock
 from requests.exceptions import HTTPError, RequestException
@@ -98,3 +101,44 @@ class TestDeRiskAPIConnector(unittest.TestCase):
                 min_block_number=630000,
                 max_block_number="invalid",  # String instead of int
             )
+
+
+class TestAsyncDeRiskAPIConnector(unittest.IsolatedAsyncioTestCase):
+    """Test class for the AsyncDeRiskAPIConnector class."""
+
+    DERISK_API_URL = "https://api.derisk.io"
+
+    @patch.dict(os.environ, {"DERISK_API_URL": DERISK_API_URL})
+    async def test_fetch_addresses_data_concatenates_responses(self):
+        """Test that the events of all addresses are fetched for the same block range."""
+        connector = AsyncDeRiskAPIConnector(max_concurrency=2)
+        connector.fetch_data = AsyncMock(
+            side_effect=[[{"id": "0x1"}], [], [{"id": "0x2"}, {"id": "0x3"}]]
+        )
+
+        result = await connector.fetch_addresses_data(
+            ["0xa", "0xb", "0xc"], 630000, 631000
+        )
+
+        self.assertEqual(result, [{"id": "0x1"}, {"id": "0x2"}, {"id": "0x3"}])
+        connector.fetch_data.assert_any_call("0xb", 630000, 631000)
+        self.assertEqual(connector.fetch_data.call_count, 3)
+
+    @patch.dict(os.environ, {"DERISK_API_URL": DERISK_API_URL})
+    async def test_fetch_addresses_data_raises_on_error(self):
+        """Test that a failed request of one address fails the whole block range."""
+        connector = AsyncDeRiskAPIConnector()
+        connector.fetch_data = AsyncMock(
+            side_effect=[[{"id": "0x1"}], {"error": "Mocked request exception"}]
+        )
+
+        with self.assertRaises(ConnectionError):
+            await connector.fetch_addresses_data(["0xa", "0xb"], 630000, 631000)
+
+    @patch.dict(os.environ, {"DERISK_API_URL": DERISK_API_URL})
+    async def test_fetch_data_type_errors(self):
+        """Test that fetch_data() raises TypeError for invalid types."""
+        async with AsyncDeRiskAPIConnector() as connector:
+            with self.assertRaises(TypeError):
+                await connector.fetch_data("0xa", "invalid", 631000)
+        self.assertIsNone(connector.session)
@@ -228,6 +228,7 @@ def test_save_bearing_collateral_burn_event(
         protocol_id=ProtocolIDs.NOSTRA_ALPHA.value,
         event_name=sample_bearing_collateral_burn_event_data["key_name"],
         block_number=sample_bearing_collateral_burn_event_data["block_number"],
+        event_id=sample_bearing_collateral_burn_event_data["id"],
         event_data={
             "user": expected_parsed_data.user,
             "amount": expected_parsed_data.amount,
@@ -258,6 +259,7 @@ def test_save_bearing_collateral_mint_event(
         protocol_id=ProtocolIDs.NOSTRA_ALPHA.value,
         event_name=sample_bearing_collateral_mint_event_data["key_name"],
         block_number=sample_bearing_collateral_mint_event_data["block_number"],
+        event_id=sample_bearing_collateral_mint_event_data["id"],
         event_data={
             "user": expected_parsed_data.user,
             "amount": expected_parsed_data.amount,
@@ -284,6 +286,7 @@ def test_save_debt_burn_event(transformer, sample_debt_burn_event_data):
         protocol_id=ProtocolIDs.NOSTRA_ALPHA.value,
         event_name=sample_debt_burn_event_data["key_name"],
         block_number=sample_debt_burn_event_data["block_number"],
+        event_id=sample_debt_burn_event_data["id"],
         event_data={
             "user": expected_parsed_data.user,
             "amount": expected_parsed_data.amount,
@@ -313,6 +316,7 @@ def test_save_debt_mint_event(transformer, sample_debt_mint_event_data):
         protocol_id=ProtocolIDs.NOSTRA_ALPHA.value,
         event_name=sample_debt_mint_event_data["key_name"],
         block_number=sample_debt_mint_event_data["block_number"],
+        event_id=sample_debt_mint_event_data["id"],
         event_data={
             "user": expected_parsed_data.user,
             "amount": expected_parsed_data.amount,
@@ -340,6 +344,7 @@ def test_save_debt_transfer_event(transformer, sample_debt_transfer_event_data):
         protocol_id=ProtocolIDs.NOSTRA_ALPHA.value,
         event_name=sample_debt_transfer_event_data["key_name"],
         block_number=sample_debt_transfer_event_data["block_number"],
+        event_id=sample_debt_transfer_event_data["id"],
         event_data={
             "sender": expected_parsed_data.sender,
             "recipient": expected_parsed_data.recipient,
@@ -372,6 +377,7 @@ def test_save_interest_rate_model_event(
         protocol_id=ProtocolIDs.NOSTRA_ALPHA.value,
         event_name=sample_interest_rate_model_event_data["key_name"],
         block_number=sample_interest_rate_model_event_data["block_number"],
+        event_id=sample_interest_rate_model_event_data["id"],
         event_data={
             "debt_token": expected_parsed_data.debt_token,
             "lending_index": expected_parsed_data.lending_index,
@@ -405,6 +411,7 @@ def test_save_non_interest_bearing_collateral_burn_event(
         block_number=sample_non_interest_bearing_collateral_burn_event_data[
             "block_number"
         ],
+        event_id=sample_non_interest_bearing_collateral_burn_event_data["id"],
         event_data={
             "user": expected_parsed_data.user,
             "amount": expected_parsed_data.face_amount,
@@ -438,6 +445,7 @@ def test_save_non_interest_bearing_collateral_mint_event(
         block_number=sample_non_interest_bearing_collateral_mint_event_data[
             "block_number"
         ],
+        event_id=sample_non_interest_bearing_collateral_mint_event_data["id"],
         event_data={
             "sender": expected_parsed_data.sender,
             "recipient": expected_parsed_data.recipient,
@@ -0,0 +1,88 @@
+"""This module contains tests for the adaptive block-window pagination."""
+
+import pytest
+
+from data_handler.handler_tools.pagination import AdaptivePaginator, PaginationPolicy
+
+
+@pytest.fixture
+def paginator() -> AdaptivePaginator:
+    """
+    Creates a paginator targeting 100 events and 1000 bytes per page.
+    """
+    return AdaptivePaginator(
+        PaginationPolicy(
+            initial_size=1000,
+            min_size=100,
+            max_size=8000,
+            target_events=100,
+            max_response_bytes=1000,
+        )
+    )
+
+
+def test_next_window(paginator):
+    """
+    Test that the window starts at the given block and spans the window size.
+    """
+    assert paginator.next_window(630000) == (630000, 631000)
+
+
+@pytest.mark.parametrize(
+    "event_count,response_bytes,expected_size",
+    [
+        (0, 0, 2000),  # Empty pages grow the window by the growth factor
+        (10, 100, 2000),  # Sparse pages grow it by at most the growth factor
+        (20, 100, 2000),
+        (60, 500, 1000),  # Pages close to the target keep it
+        (400, 500, 250),  # Too many events shrink it proportionally
+        (50, 4000, 250),  # So do too large responses
+        (100000, 500, 100),  # But not below the minimum size
+    ],
+)
+def test_record_page(paginator, event_count, response_bytes, expected_size):
+    """
+    Test that the window size adapts to the recorded page.
+    """
+    assert paginator.record_page(event_count, response_bytes) == expected_size
+    assert paginator.window_size == expected_size
+
+
+def test_window_size_is_bounded(paginator):
+    """
+    Test that empty stretches grow the window up to the maximum size.
+    """
+    for _ in range(10):
+        paginator.record_page(0)
+
+    assert paginator.window_size == 8000
+    assert paginator.next_window(0) == (0, 8000)
+
+
+def test_metrics(paginator):
+    """
+    Test that the metrics expose the policy and the page statistics.
+    """
+    paginator.record_page(0, 0)
+    paginator.record_page(400, 500)
+
+    metrics = paginator.metrics()
+
+    assert metrics["window_size"] == 500
+    assert metrics["policy_target_events"] == 100
+    assert metrics["pages"] == 2
+    assert metrics["empty_pages"] == 1
+    assert metrics["events"] == 400
+    assert metrics["blocks"] == 3000
+    assert metrics["response_bytes"] == 500
+    assert metrics["grown"] == 1
+    assert metrics["shrunk"] == 1
+    assert metrics["max_page_events"] == 400
+
+
+def test_invalid_policy():
+    """
+    Test that inconsistent window sizes are rejected.
+    """
+    with pytest.raises(ValueError):
+        PaginationPolicy(initial_size=50, min_size=100)
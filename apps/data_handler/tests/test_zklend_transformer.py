@@ -5,7 +5,9 @@ Test the zklend transformer
 import pytest
 from typing import Dict, Any
 from shared.protocol_ids import ProtocolIDs
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+from sqlalchemy.dialects import postgresql
+from data_handler.db.crud import ZkLendEventDBConnector
 from data_handler.handlers.events.zklend.transform_events import ZklendTransformer
 
 from shared.data_parser.serializers import (
@@ -231,6 +233,7 @@ def test_save_borrowing_event(transformer, sample_borrowing_event_data):
         protocol_id=ProtocolIDs.ZKLEND,
         event_name=sample_borrowing_event_data["key_name"],
         block_number=sample_borrowing_event_data["block_number"],
+        event_id=sample_borrowing_event_data["id"],
         event_data={
             "user": expected_parsed_data.user,
             "token": expected_parsed_data.token,
@@ -262,6 +265,7 @@ def test_save_repayment_event(transformer, sample_repayment_event_data):
         protocol_id=ProtocolIDs.ZKLEND,
         event_name=sample_repayment_event_data["key_name"],
         block_number=sample_repayment_event_data["block_number"],
+        event_id=sample_repayment_event_data["id"],
         event_data={
             "repayer": expected_parsed_data.repayer,
             "beneficiary": expected_parsed_data.beneficiary,
@@ -330,6 +334,7 @@ def test_save_deposit_event(transformer, sample_deposit_event_data):
         protocol_id=ProtocolIDs.ZKLEND,
         event_name=sample_deposit_event_data["key_name"],
         block_number=sample_deposit_event_data["block_number"],
+        event_id=sample_deposit_event_data["id"],
         event_data={
             "user": expected_parsed_data.user,
             "token": expected_parsed_data.token,
@@ -358,6 +363,7 @@ def test_save_withdrawal_event(transformer, sample_withdrawal_event_data):
         protocol_id=ProtocolIDs.ZKLEND,
         event_name=sample_withdrawal_event_data["key_name"],
         block_number=sample_withdrawal_event_data["block_number"],
+        event_id=sample_withdrawal_event_data["id"],
         event_data={
             "user": expected_parsed_data.user,
             "token": expected_parsed_data.token,
@@ -388,6 +394,7 @@ def test_save_collateral_enabled_event(
         protocol_id=ProtocolIDs.ZKLEND,
         event_name=sample_collateral_enabled_event_data["key_name"],
         block_number=sample_collateral_enabled_event_data["block_number"],
+        event_id=sample_collateral_enabled_event_data["id"],
         event_data={
             "user": expected_parsed_data.user,
             "token": expected_parsed_data.token,
@@ -418,6 +425,7 @@ def test_save_collateral_disabled_event(
         protocol_id=ProtocolIDs.ZKLEND,
         event_name=sample_collateral_disabled_event_data["key_name"],
         block_number=sample_collateral_disabled_event_data["block_number"],
+        event_id=sample_collateral_disabled_event_data["id"],
         event_data={
             "user": expected_parsed_data.user,
             "token": expected_parsed_data.token,
@@ -447,9 +455,48 @@ def test_save_accumulators_sync_event(transformer, sample_accumulators_sync_even
         protocol_id=ProtocolIDs.ZKLEND,
         event_name=sample_accumulators_sync_event_data["key_name"],
         block_number=sample_accumulators_sync_event_data["block_number"],
+        event_id=sample_accumulators_sync_event_data["id"],
         event_data={
             "token": expected_parsed_data.token,
             "lending_accumulator": expected_parsed_data.lending_accumulator,
             "debt_accumulator": expected_parsed_data.debt_accumulator,
         },
     )
+
+
+def test_events_are_saved_in_one_batch(
+    transformer,
+    sample_accumulators_sync_event_data,
+    sample_collateral_enabled_event_data,
+    sample_collateral_disabled_event_data,
+):
+    """
+    Test that the events of a page are inserted in bulk, in one transaction.
+    """
+    db_connector = ZkLendEventDBConnector.__new__(ZkLendEventDBConnector)
+    db_connector.Session = MagicMock()
+    session = db_connector.Session.return_value
+    transformer.db_connector = db_connector
+    transformer.api_connector.get_data.return_value = [
+        sample_accumulators_sync_event_data,
+        sample_collateral_enabled_event_data,
+        sample_collateral_disabled_event_data,
+    ]
+
+    event_count = transformer.fetch_and_transform_events(
+        from_address=transformer.PROTOCOL_ADDRESSES, min_block=0, max_block=1000
+    )
+
+    assert event_count == 3
+    # One statement per event model
+    assert session.execute.call_count == 2
+    session.commit.assert_called_once()
+    rows = [row for call in session.execute.call_args_list for row in call.args[1]]
+    assert [row["event_id"] for row in rows] == [
+        sample_accumulators_sync_event_data["id"],
+        sample_collateral_enabled_event_data["id"],
+        sample_collateral_disabled_event_data["id"],
+    ]
+    assert "ON CONFLICT (event_id) DO NOTHING" in str(
+        session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    )
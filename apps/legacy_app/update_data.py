@@ -39,7 +39,8 @@ def update_data(zklend_state: src.zklend.ZkLendState):
 
     # Iterate over ordered events to obtain the final state of each user.
     t1 = time.time()
-    for _, zklend_event in zklend_events.iterrows():
+    # Plain dict records are much cheaper to build and index than a `pandas.Series` per row.
+    for zklend_event in zklend_events.to_dict("records"):
         zklend_state.process_event(event=zklend_event)
 
     # hashstack_v0_state = src.hashstack_v0.HashstackV0State()
@@ -56,11 +57,11 @@ def update_data(zklend_state: src.zklend.ZkLendState):
     #         continue
 
     nostra_alpha_state = src.nostra_alpha.NostraAlphaState()
-    for _, nostra_alpha_event in nostra_alpha_events.iterrows():
+    for nostra_alpha_event in nostra_alpha_events.to_dict("records"):
         nostra_alpha_state.process_event(event=nostra_alpha_event)
 
     nostra_mainnet_state = src.nostra_mainnet.NostraMainnetState()
-    for _, nostra_mainnet_event in nostra_mainnet_events.iterrows():
+    for nostra_mainnet_event in nostra_mainnet_events.to_dict("records"):
         nostra_mainnet_state.process_event(event=nostra_mainnet_event)
     logging.info(f"updated state in {time.time() - t1}s")
 
@@ -0,0 +1,54 @@
+"""add latest state indexes
+
+Revision ID: 3f8a6c2e9b17
+Revises: 9c4e1b7d2a58
+Create Date: 2026-10-17 16:02:41.127583
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8a6c2e9b17"
+down_revision: Union[str, None] = "9c4e1b7d2a58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The (table, index, columns) of the indexes serving the latest row of every user.
+# Loan states are unique per protocol and user already, Vesu positions per position key.
+INDEXES = (
+    (
+        "health_ratio_level",
+        "ix_health_ratio_level_user_id_protocol_id_timestamp",
+        ["user_id", "protocol_id", sa.text("timestamp DESC")],
+    ),
+)
+
+
+def upgrade() -> None:
+    """Adds the latest state index to 'health_ratio_level'."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+    for table, index_name, columns in INDEXES:
+        if table not in tables:
+            continue
+        indexes = {index["name"] for index in inspector.get_indexes(table)}
+        if index_name not in indexes:
+            op.create_index(index_name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Drops the latest state index."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+    for table, index_name, _ in INDEXES:
+        if table not in tables:
+            continue
+        indexes = {index["name"] for index in inspector.get_indexes(table)}
+        if index_name in indexes:
+            op.drop_index(index_name, table_name=table)
@@ -0,0 +1,71 @@
+"""add event id to events
+
+Revision ID: 7d2e5a9c1f34
+Revises: 3b9e6c2d41a7
+Create Date: 2026-10-17 11:02:17.584213
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2e5a9c1f34"
+down_revision: Union[str, None] = "3b9e6c2d41a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EVENT_TABLES = (
+    "accumulators_sync_event",
+    "liquidation_event",
+    "repayment_event",
+    "deposit_event",
+    "borrowing_event",
+    "withdrawal_event",
+    "collateral_enabled_disabled_event",
+    "bearing_collateral_burn_event",
+    "bearing_collateral_mint_event",
+    "debt_mint_event",
+    "debt_burn_event",
+    "debt_transfer_event",
+    "interest_rate_event",
+    "non_interest_bearing_collateral_mint_event",
+    "non_interest_bearing_collateral_burn_event",
+)
+
+
+def upgrade() -> None:
+    """Adds the unique 'event_id' column to the existing event tables."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    table_names = inspector.get_table_names()
+    for table_name in EVENT_TABLES:
+        if table_name not in table_names:
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table_name)}
+        if "event_id" in columns:
+            continue
+        op.add_column(table_name, sa.Column("event_id", sa.String(), nullable=True))
+        op.create_index(
+            op.f(f"ix_{table_name}_event_id"),
+            table_name,
+            ["event_id"],
+            unique=True,
+        )
+
+
+def downgrade() -> None:
+    """Drops the 'event_id' column from the event tables."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    table_names = inspector.get_table_names()
+    for table_name in EVENT_TABLES:
+        if table_name not in table_names:
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table_name)}
+        if "event_id" not in columns:
+            continue
+        op.drop_index(op.f(f"ix_{table_name}_event_id"), table_name=table_name)
+        op.drop_column(table_name, "event_id")
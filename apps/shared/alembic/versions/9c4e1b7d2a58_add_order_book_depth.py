@@ -0,0 +1,53 @@
+"""add order book depth
+
+Revision ID: 9c4e1b7d2a58
+Revises: 7d2e5a9c1f34
+Create Date: 2026-10-17 14:26:08.391044
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4e1b7d2a58"
+down_revision: Union[str, None] = "7d2e5a9c1f34"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_orderbook_dex_token_a_token_b_timestamp"
+
+
+def upgrade() -> None:
+    """Adds the 'depth' column and the latest order book index to 'orderbook'."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "orderbook" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("orderbook")}
+    if "depth" not in columns:
+        op.add_column("orderbook", sa.Column("depth", sa.JSON(), nullable=True))
+    indexes = {index["name"] for index in inspector.get_indexes("orderbook")}
+    if INDEX_NAME not in indexes:
+        op.create_index(
+            INDEX_NAME,
+            "orderbook",
+            ["dex", "token_a", "token_b", "timestamp"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    """Drops the 'depth' column and the latest order book index from 'orderbook'."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "orderbook" not in inspector.get_table_names():
+        return
+    indexes = {index["name"] for index in inspector.get_indexes("orderbook")}
+    if INDEX_NAME in indexes:
+        op.drop_index(INDEX_NAME, table_name="orderbook")
+    columns = {column["name"] for column in inspector.get_columns("orderbook")}
+    if "depth" in columns:
+        op.drop_column("orderbook", "depth")
@@ -0,0 +1,50 @@
+"""add liquidable debt block
+
+Revision ID: b58d3e1f7a20
+Revises: 3f8a6c2e9b17
+Create Date: 2026-10-17 18:41:52.604317
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b58d3e1f7a20"
+down_revision: Union[str, None] = "3f8a6c2e9b17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_liquidable_debt_block"
+
+
+def upgrade() -> None:
+    """Adds the 'block' column and its index to 'liquidable_debt'."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "liquidable_debt" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("liquidable_debt")}
+    if "block" not in columns:
+        op.add_column(
+            "liquidable_debt", sa.Column("block", sa.BigInteger(), nullable=True)
+        )
+    indexes = {index["name"] for index in inspector.get_indexes("liquidable_debt")}
+    if INDEX_NAME not in indexes:
+        op.create_index(INDEX_NAME, "liquidable_debt", ["block"], unique=False)
+
+
+def downgrade() -> None:
+    """Drops the 'block' column and its index from 'liquidable_debt'."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "liquidable_debt" not in inspector.get_table_names():
+        return
+    indexes = {index["name"] for index in inspector.get_indexes("liquidable_debt")}
+    if INDEX_NAME in indexes:
+        op.drop_index(INDEX_NAME, table_name="liquidable_debt")
+    columns = {column["name"] for column in inspector.get_columns("liquidable_debt")}
+    if "block" in columns:
+        op.drop_column("liquidable_debt", "block")
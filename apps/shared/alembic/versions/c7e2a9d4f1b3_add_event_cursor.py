@@ -0,0 +1,85 @@
+"""add event cursor and unique vesu positions
+
+Revision ID: c7e2a9d4f1b3
+Revises: b58d3e1f7a20
+Create Date: 2026-10-17 20:15:08.318842
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlalchemy_utils
+from alembic import op
+from shared.protocol_ids import ProtocolIDs
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e2a9d4f1b3"
+down_revision: Union[str, None] = "b58d3e1f7a20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONSTRAINT_NAME = "vesu_positions_user_pool_id_assets_key"
+
+
+def upgrade() -> None:
+    """Creates the 'event_cursor' table and makes the 'vesu_positions' unique per key."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+    if "event_cursor" not in tables:
+        op.create_table(
+            "event_cursor",
+            sa.Column("id", sa.UUID(), nullable=False),
+            sa.Column(
+                "protocol_id",
+                sqlalchemy_utils.types.choice.ChoiceType(ProtocolIDs),
+                nullable=False,
+            ),
+            sa.Column("block", sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("protocol_id"),
+        )
+
+    if "vesu_positions" not in tables:
+        return
+    constraints = {
+        constraint["name"]
+        for constraint in inspector.get_unique_constraints("vesu_positions")
+    }
+    if CONSTRAINT_NAME in constraints:
+        return
+    # Keep the latest row of every position, a row was added per event so far
+    op.execute(
+        """
+        DELETE FROM vesu_positions AS old
+        USING vesu_positions AS new
+        WHERE old."user" = new."user"
+          AND old.pool_id = new.pool_id
+          AND old.collateral_asset = new.collateral_asset
+          AND old.debt_asset = new.debt_asset
+          AND (COALESCE(old.block_number, -1), old.id)
+            < (COALESCE(new.block_number, -1), new.id)
+        """
+    )
+    op.create_unique_constraint(
+        CONSTRAINT_NAME,
+        "vesu_positions",
+        ["user", "pool_id", "collateral_asset", "debt_asset"],
+    )
+
+
+def downgrade() -> None:
+    """Drops the 'event_cursor' table and the unique key of 'vesu_positions'."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+    if "vesu_positions" in tables:
+        constraints = {
+            constraint["name"]
+            for constraint in inspector.get_unique_constraints("vesu_positions")
+        }
+        if CONSTRAINT_NAME in constraints:
+            op.drop_constraint(CONSTRAINT_NAME, "vesu_positions", type_="unique")
+    if "event_cursor" in tables:
+        op.drop_table("event_cursor")
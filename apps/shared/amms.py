@@ -1,11 +1,15 @@
 """AMMS module for managing liquidity pools and automated market makers."""
 
+import asyncio
 from dataclasses import dataclass
 from decimal import Decimal
 import json
 from typing import Dict, List, Optional
 
+import numpy as np
+
 from shared.redis_client import redis_client
+from shared.batch_call import batched_calls
 from shared.blockchain_call import balance_of, func_call, get_myswap_pool
 from shared.constants import POOL_MAPPING, TOKEN_SETTINGS
 from shared.helpers import add_leading_zeros
@@ -79,15 +83,24 @@ class Pool(Pair):
         Retrieve the balance for each token in the pool,
         updating both the base and converted balances.
         """
+        # All balances are read concurrently, so that they are batched inside of
+        # a `batched_calls` context.
         myswap_pool = None
         if self.myswap_id is not None:
             myswap_pool = await get_myswap_pool(self.myswap_id)
-        for token in self.tokens:
+        balances = await asyncio.gather(
+            *(
+                balance_of(token.address, address)
+                for token in self.tokens
+                for address in self.addresses
+            )
+        )
+        for index, token in enumerate(self.tokens):
             balance = 0
             if myswap_pool and token.symbol.upper() in myswap_pool:
                 balance += myswap_pool[token.symbol.upper()]
-            for address in self.addresses:
-                balance += await balance_of(token.address, address)
+            offset = index * len(self.addresses)
+            balance += sum(balances[offset : offset + len(self.addresses)])
             token.balance_base = balance
             token.balance_converted = Decimal(balance) / token.decimal_factor
 
@@ -110,6 +123,18 @@ class Pool(Pair):
         constant = Decimal(self.tokens[0].balance_converted * self.tokens[1].balance_converted)
         return (initial_price * constant).sqrt() * (Decimal("1") - Decimal("0.95").sqrt())
 
+    def supply_at_prices(self, initial_prices: np.ndarray) -> np.ndarray:
+        """
+        Vectorized `supply_at_price`, for many prices at once.
+
+        :param initial_prices: The initial prices at which to calculate the supply.
+        :return: The calculated supplies at the initial prices.
+        """
+        constant = float(self.tokens[0].balance_converted * self.tokens[1].balance_converted)
+        return np.sqrt(np.asarray(initial_prices, dtype=np.float64) * constant) * (
+            1 - np.sqrt(0.95)
+        )
+
 
 class MySwapPool(Pool):
     """
@@ -181,12 +206,10 @@ class SwapAmm(Pair):
         """
         Retrieve balances for each pool's tokens asynchronously.
         """
-        res = {}
-        for pool in self.pools.values():
-            tokens = await pool.get_balance()
-            res[pool.id] = tokens
-
-        return res
+        pools = list(self.pools.values())
+        async with batched_calls():
+            balances = await asyncio.gather(*(pool.get_balance() for pool in pools))
+        return {pool.id: tokens for pool, tokens in zip(pools, balances)}
 
     async def get_balance_from_cache(self, data) -> None:
         """
@@ -259,3 +282,25 @@ class SwapAmm(Pair):
             quote_token=debt_token_underlying_symbol,
         )
         return pool.supply_at_price(initial_price=Decimal(collateral_token_price))
+
+    def get_supply_at_prices(
+        self,
+        collateral_token_underlying_symbol: str,
+        collateral_token_prices: np.ndarray,
+        debt_token_underlying_symbol: str,
+        amm: str,
+    ) -> np.ndarray:
+        """
+        Get the supplies at many prices for a specified AMM in one vectorized call.
+
+        :param collateral_token_underlying_symbol: The symbol for the collateral token.
+        :param collateral_token_prices: The prices of the collateral token.
+        :param debt_token_underlying_symbol: The symbol for the debt token.
+        :param amm: The Automated Market Maker (AMM) to use.
+        :return: The calculated supplies at the specified prices.
+        """
+        pool: Pool = self.get_pool(
+            base_token=collateral_token_underlying_symbol,
+            quote_token=debt_token_underlying_symbol,
+        )
+        return pool.supply_at_prices(initial_prices=collateral_token_prices)
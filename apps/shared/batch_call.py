@@ -0,0 +1,247 @@
+"""
+Batching of Starknet contract reads.
+
+Reads issued concurrently, e.g. from `asyncio.gather`, are coalesced into JSON-RPC batch
+requests of `starknet_call`s, so that collecting the parameters of many tokens or the balances
+of many pools costs a handful of round trips instead of one per read. The batch requests go
+through the shared gateway, see `shared.rpc_gateway`.
+
+Example usage:
+async with batched_calls():
+    # `blockchain_call.func_call`, `StarknetClient.func_call` and the helpers built on them
+    # are routed through the batching client while the context is active.
+    symbols = await asyncio.gather(*(get_symbol(address) for address in addresses))
+"""
+
+import asyncio
+import contextvars
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterable, Optional
+
+from starknet_py.hash.selector import get_selector_from_name
+from starknet_py.net.client_errors import ClientError
+
+from shared.rpc_gateway import Priority, get_rpc_gateway
+
+logger = logging.getLogger(__name__)
+
+_active_client: contextvars.ContextVar[Optional["BatchCallClient"]] = (
+    contextvars.ContextVar("batch_call_client", default=None)
+)
+
+
+def _to_felt(value: int | str) -> str:
+    """
+    Convert an address or a calldata value to the hexadecimal felt format of the RPC.
+    :param value: int or hexadecimal string
+    :return: str
+    """
+    return hex(value if isinstance(value, int) else int(value, 16))
+
+
+class BatchCallClient:
+    """
+    Coalesces contract reads into JSON-RPC batch requests.
+
+    Reads are queued and flushed `flush_interval` seconds after the first queued read, or as
+    soon as `max_batch_size` reads are queued. With the default interval of 0, all reads
+    issued within the same tick of the event loop end up in one batch.
+    """
+
+    def __init__(
+        self,
+        node_url: Optional[str] = None,
+        flush_interval: float = 0.0,
+        max_batch_size: int = 100,
+        retries: int = 3,
+        priority: Optional[Priority] = None,
+    ) -> None:
+        """
+        :param node_url: The URL of the Starknet RPC node, defaults to the nodes of the
+            shared gateway, see `shared.rpc_gateway`.
+        :param flush_interval: Seconds to wait for more reads before sending a batch.
+        :param max_batch_size: The maximum number of reads per batch request.
+        :param retries: The number of retries of a failed batch request.
+        :param priority: The priority class of the batch requests, defaults to the one set
+            by `rpc_priority`.
+        """
+        self.gateway = get_rpc_gateway(None if node_url is None else [node_url])
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.retries = retries
+        self.priority = priority
+        self.calls: int = 0
+        self.batches: int = 0
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._requests: set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "BatchCallClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Send the queued reads and wait for the requests in flight.
+        """
+        self._flush()
+        if self._requests:
+            await asyncio.gather(*self._requests, return_exceptions=True)
+
+    async def call(
+        self,
+        addr: int | str,
+        selector: str,
+        calldata: Optional[list[int | str]] = None,
+        block_id: str | dict[str, int] = "latest",
+    ) -> list[int]:
+        """
+        Queue a contract read and wait for its result.
+        :param addr: Contract address.
+        :param selector: Function name to call.
+        :param calldata: List of call arguments.
+        :param block_id: The block to call the contract at, e.g. "latest" or
+            {"block_number": 1000}.
+        :return: Contract call result.
+        :raise ClientError: If the node returns an error for the read.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        request = {
+            "request": {
+                "contract_address": _to_felt(addr),
+                "entry_point_selector": hex(get_selector_from_name(selector)),
+                "calldata": [_to_felt(value) for value in calldata or []],
+            },
+            "block_id": block_id,
+        }
+        self._pending.append((request, future))
+        self.calls += 1
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._send(batch))
+        self._requests.add(task)
+        task.add_done_callback(self._requests.discard)
+
+    async def _send(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        payload = [
+            {"jsonrpc": "2.0", "id": index, "method": "starknet_call", "params": params}
+            for index, (params, _) in enumerate(batch)
+        ]
+        try:
+            responses = await self._post(payload)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+
+        responses_by_id = {response.get("id"): response for response in responses}
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                # The caller was cancelled
+                continue
+            response = responses_by_id.get(index)
+            if response is None:
+                future.set_exception(
+                    ClientError(message="The node did not return a result for the call")
+                )
+            elif "error" in response:
+                error = response["error"]
+                future.set_exception(
+                    ClientError(
+                        message=error.get("message", ""),
+                        code=str(error.get("code")),
+                        data=error.get("data"),
+                    )
+                )
+            else:
+                future.set_result([int(value, 16) for value in response["result"]])
+
+    async def _post(self, payload: list[dict]) -> list[dict]:
+        result = await self.gateway.post(
+            payload, priority=self.priority, retries=self.retries
+        )
+        if isinstance(result, dict):
+            # The whole batch was rejected
+            error = result.get("error", {})
+            raise ClientError(
+                message=error.get("message", str(result)),
+                code=str(error.get("code")),
+            )
+        return result
+
+    async def gather(
+        self, calls: Iterable[tuple[int | str, str, Optional[list[int | str]]]]
+    ) -> list[list[int]]:
+        """
+        Run many contract reads in as few batch requests as possible.
+        :param calls: (addr, selector, calldata) of every read.
+        :return: The results in the order of the calls.
+        """
+        return list(
+            await asyncio.gather(
+                *(
+                    self.call(addr, selector, calldata)
+                    for addr, selector, calldata in calls
+                )
+            )
+        )
+
+
+def get_batch_client() -> Optional[BatchCallClient]:
+    """
+    Get the batching client of the active `batched_calls` context, if any.
+    :return: BatchCallClient or None
+    """
+    return _active_client.get()
+
+
+@asynccontextmanager
+async def batched_calls(**kwargs: Any) -> AsyncIterator[BatchCallClient]:
+    """
+    Route the contract reads of the current task, and of the tasks it starts, through a
+    batching client. Nested contexts reuse the client of the outer one.
+    :param kwargs: Arguments of `BatchCallClient`.
+    :return: BatchCallClient
+    """
+    client = _active_client.get()
+    if client is not None:
+        yield client
+        return
+    async with BatchCallClient(**kwargs) as client:
+        token = _active_client.set(client)
+        try:
+            yield client
+        finally:
+            _active_client.reset(token)
+            logger.info(
+                f"Batched {client.calls} contract calls into {client.batches} requests."
+            )
+
+
+async def gather_calls(
+    calls: Iterable[tuple[int | str, str, Optional[list[int | str]]]],
+) -> list[list[int]]:
+    """
+    Run many contract reads in as few batch requests as possible.
+    :param calls: (addr, selector, calldata) of every read.
+    :return: The results in the order of the calls.
+    """
+    async with batched_calls() as client:
+        return await client.gather(calls)
@@ -2,32 +2,40 @@
 Provides utility functions for making blockchain calls on StarkNet.
 """
 
-import time
-
 import starknet_py.cairo.felt
 import starknet_py.hash.selector
 import starknet_py.net.client_models
 import starknet_py.net.networks
-from starknet_py.net.full_node_client import FullNodeClient
 
-NET = FullNodeClient(node_url="https://starknet-mainnet.public.blastapi.io")
+from shared.batch_call import get_batch_client
+from shared.call_cache import call_cache
+from shared.rpc_gateway import get_full_node_client
+
+NET = get_full_node_client()
 
 
 async def func_call(addr, selector, calldata):
     """
-    Executes a contract call with retry on StarkNet.
+    Executes a contract call on StarkNet, retried by the shared RPC gateway. The results
+    of reads of immutable values and of slowly changing state are cached, see
+    `shared.call_cache`. Inside of a `batched_calls` context, the call is batched with the
+    other concurrent calls.
     """
+    return await call_cache.get_or_call(
+        addr, selector, calldata, lambda: _call_contract(addr, selector, calldata)
+    )
+
+
+async def _call_contract(addr, selector, calldata):
+    batch_client = get_batch_client()
+    if batch_client is not None:
+        return await batch_client.call(addr, selector, calldata)
     call = starknet_py.net.client_models.Call(
         to_addr=addr,
         selector=starknet_py.hash.selector.get_selector_from_name(selector),
         calldata=calldata,
     )
-    try:
-        res = await NET.call_contract(call)
-    except BaseException:
-        time.sleep(10)
-        res = await NET.call_contract(call)
-    return res
+    return await NET.call_contract(call)
 
 
 async def balance_of(token_addr, holder_addr):
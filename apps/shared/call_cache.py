@@ -0,0 +1,259 @@
+"""
+Read-through cache of Starknet contract reads.
+
+Token symbols, decimals, reserve data, Vesu asset and LTV configs or pool balances are read by
+every run of the Celery tasks and by the dashboard. The reads are cached by
+(contract, selector, calldata, block) in an in-process LRU in front of the shared Redis, so that
+the workers only reach the RPC node for reads none of them made recently:
+
+- reads of immutable values, e.g. `symbol` or `decimals`, are cached forever,
+- reads of state, e.g. `get_reserve_data` or `balanceOf`, expire after the TTL of the selector,
+  or are kept per block if the read is made at a given block,
+- any other read, e.g. user positions or prices, is not cached.
+
+Redis is called off the event loop with short timeouts, and skipped for a while after it
+failed, so a slow Redis never blocks the reads.
+
+Example usage:
+result = await call_cache.get_or_call(
+    addr, "decimals", [], lambda: NET.call_contract(call)
+)
+"""
+
+import asyncio
+import json
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+import redis
+
+from shared.batch_call import _to_felt
+from shared.redis_client import cache_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Selectors of values that never change for a contract.
+IMMUTABLE_SELECTORS: frozenset[str] = frozenset(
+    {
+        "symbol",
+        "decimals",
+        "name",
+        "underlyingAsset",
+        "token0",
+        "token1",
+        "extension",
+        # Pure computation on the arguments
+        "calculate_debt",
+    }
+)
+# TTLs in seconds of the reads of state that changes rarely or is fine to be slightly stale.
+STATE_SELECTOR_TTLS: dict[str, int] = {
+    "get_reserve_data": 60,
+    "asset_config": 60,
+    "ltv_config": 300,
+    "collateral_data": 300,
+    "debt_data": 300,
+    "liquidation_settings": 300,
+    "getCollateralData": 300,
+    "getDebtData": 300,
+    "getLiquidationSettings": 300,
+    "balanceOf": 30,
+    "totalSupply": 30,
+    "get_reserves": 30,
+    "get_pool": 30,
+    "get_total_shares": 30,
+}
+# How long the reads made at a given block are kept, the state of a block never changes.
+BLOCK_TTL: int = 3600
+# How long Redis is skipped after it failed.
+REDIS_RETRY_INTERVAL: int = 60
+
+
+class ContractCallCache:
+    """
+    Read-through cache of contract reads, with an in-process LRU in front of Redis. Concurrent
+    identical reads of an event loop are made only once.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = cache_redis_client,
+        max_size: int = 10000,
+        prefix: str = "call_cache",
+    ) -> None:
+        """
+        :param redis_client: The Redis client shared by the workers, or None to cache
+            in-process only.
+        :param max_size: The maximum number of reads kept in the in-process LRU.
+        :param prefix: The prefix of the Redis keys.
+        """
+        self.redis_client = redis_client
+        self.max_size = max_size
+        self.prefix = prefix
+        self.hits: int = 0
+        self.misses: int = 0
+        self._local: OrderedDict[str, tuple[Optional[float], list[int]]] = OrderedDict()
+        # Futures are bound to the event loop they are created in
+        self._in_flight: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Future]
+        ] = weakref.WeakKeyDictionary()
+        self._redis_disabled_until: float = 0.0
+
+    @staticmethod
+    def get_ttl(selector: str, block_number: Optional[int] = None) -> Optional[int]:
+        """
+        Get how long a read is cached.
+        :param selector: Function name of the read.
+        :param block_number: The block the read is made at, None for the latest block.
+        :return: The TTL in seconds, 0 if the read is not cached or None if it never expires.
+        """
+        if selector in IMMUTABLE_SELECTORS:
+            return None
+        if selector not in STATE_SELECTOR_TTLS:
+            return 0
+        return BLOCK_TTL if block_number is not None else STATE_SELECTOR_TTLS[selector]
+
+    def make_key(
+        self,
+        addr: int | str,
+        selector: str,
+        calldata: Optional[list[int | str]] = None,
+        block_number: Optional[int] = None,
+    ) -> str:
+        """
+        Build the cache key of a read. Reads of immutable values share the key of every block.
+        :param addr: Contract address.
+        :param selector: Function name to call.
+        :param calldata: List of call arguments.
+        :param block_number: The block the read is made at, None for the latest block.
+        :return: str
+        """
+        block = "latest" if block_number is None else str(block_number)
+        if selector in IMMUTABLE_SELECTORS:
+            block = "any"
+        arguments = ",".join(_to_felt(value) for value in calldata or [])
+        return f"{self.prefix}:{_to_felt(addr)}:{selector}:{arguments}:{block}"
+
+    async def get_or_call(
+        self,
+        addr: int | str,
+        selector: str,
+        calldata: Optional[list[int | str]],
+        call: Callable[[], Awaitable[list[int]]],
+        block_number: Optional[int] = None,
+    ) -> list[int]:
+        """
+        Get the result of a read from the cache, or make the read and cache its result.
+        :param addr: Contract address.
+        :param selector: Function name to call.
+        :param calldata: List of call arguments.
+        :param call: Makes the read on a cache miss.
+        :param block_number: The block the read is made at, None for the latest block.
+        :return: Contract call result.
+        """
+        ttl = self.get_ttl(selector, block_number)
+        if ttl == 0:
+            return await call()
+
+        key = self.make_key(addr, selector, calldata, block_number)
+        result = self._get_local(key)
+        if result is None:
+            result = await self._get_redis(key)
+            if result is not None:
+                self._set_local(key, result, ttl)
+        if result is not None:
+            self.hits += 1
+            return list(result)
+
+        loop = asyncio.get_running_loop()
+        in_flight_reads = self._in_flight.setdefault(loop, {})
+        in_flight = in_flight_reads.get(key)
+        if in_flight is not None:
+            return list(await asyncio.shield(in_flight))
+
+        self.misses += 1
+        future = loop.create_future()
+        in_flight_reads[key] = future
+        try:
+            result = [int(value) for value in await call()]
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when no other read waits for the result
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            self._set_local(key, result, ttl)
+            await self._set_redis(key, result, ttl)
+        finally:
+            del in_flight_reads[key]
+        return list(result)
+
+    def clear(self) -> None:
+        """
+        Clear the in-process cache. The entries in Redis are kept.
+        """
+        self._local.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_local(self, key: str) -> Optional[list[int]]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return result
+
+    def _set_local(self, key: str, result: list[int], ttl: Optional[int]) -> None:
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._local[key] = (expires_at, result)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    def _redis_available(self) -> bool:
+        return (
+            self.redis_client is not None
+            and time.monotonic() >= self._redis_disabled_until
+        )
+
+    def _disable_redis(self, error: Exception) -> None:
+        logger.warning(
+            "Contract call cache could not reach Redis, retrying in %s seconds. Err: %s",
+            REDIS_RETRY_INTERVAL,
+            error,
+        )
+        self._redis_disabled_until = time.monotonic() + REDIS_RETRY_INTERVAL
+
+    async def _get_redis(self, key: str) -> Optional[list[int]]:
+        if not self._redis_available():
+            return None
+        try:
+            value: Any = await asyncio.to_thread(self.redis_client.get, key)
+        except redis.RedisError as e:
+            self._disable_redis(e)
+            return None
+        return None if value is None else json.loads(value)
+
+    async def _set_redis(self, key: str, result: list[int], ttl: Optional[int]) -> None:
+        if not self._redis_available():
+            return
+        try:
+            await asyncio.to_thread(
+                self.redis_client.set, key, json.dumps(result), ex=ttl
+            )
+        except redis.RedisError as e:
+            self._disable_redis(e)
+
+
+call_cache = ContractCallCache()
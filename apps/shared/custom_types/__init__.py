@@ -10,6 +10,12 @@ from shared.custom_types.base import (
     TokenSettings,
     TokenValues,
 )
+from shared.custom_types.compact import (
+    CompactPortfolio,
+    CompactPortfolioStorage,
+    PortfolioStore,
+    TokenRegistry,
+)
 from shared.custom_types.nostra import (
     NostraAlphaCollateralTokenParameters,
     NostraDebtTokenParameters,
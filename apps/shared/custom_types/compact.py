@@ -0,0 +1,384 @@
+"""
+Compact, array-backed storage of the portfolios of loan entities.
+
+Token addresses are interned to small integer IDs and the balances of all loan entities live in
+shared `(loan entities x tokens)` NumPy matrices, one per portfolio attribute (`collateral`,
+`debt`, `deposit`, ...). Each loan entity holds a lightweight `CompactPortfolio` view on its row,
+which mimics the `Portfolio` API, so that the `process_*_event` methods of the states and the
+valuation methods of the loan entities work unchanged.
+"""
+
+from collections.abc import ItemsView, KeysView, MutableMapping, ValuesView
+from decimal import Decimal
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+import numpy as np
+
+from shared.custom_types.base import Portfolio, TokenValues
+
+
+class TokenRegistry:
+    """
+    Interns token addresses to small integer IDs, shared by all stores of a state.
+    """
+
+    def __init__(self) -> None:
+        self.tokens: list[str] = []
+        self.ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def get_id(self, token: str) -> int:
+        """
+        Get the ID of the token, registering the token if it is new.
+        :param token: Token address.
+        :return: int
+        """
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        return token_id
+
+
+class PortfolioStore:
+    """
+    Balances of one portfolio attribute of all loan entities. Rows are allocated to loan
+    entities, columns follow the token IDs of the `TokenRegistry`. The `present` mask tracks
+    which tokens a portfolio holds, mirroring the keys of a `Portfolio`.
+
+    The default `object` dtype keeps the exact `Decimal` amounts. `np.float64` stores the
+    amounts more compactly, but rounds the wei-scale amounts above 2**53, so it is an opt-in
+    for states that are only valued, which is computed in floats anyway.
+    """
+
+    def __init__(
+        self,
+        tokens: Optional[TokenRegistry] = None,
+        dtype: Any = object,
+        capacity: int = 1024,
+    ) -> None:
+        self.tokens: TokenRegistry = tokens if tokens is not None else TokenRegistry()
+        self.dtype = np.dtype(dtype)
+        self.size: int = 0
+        self.data: np.ndarray = self._empty((capacity, max(len(self.tokens), 8)))
+        self.present: np.ndarray = np.zeros(self.data.shape, dtype=bool)
+
+    def _empty(self, shape: tuple[int, int]) -> np.ndarray:
+        if self.dtype == object:
+            return np.full(shape, Decimal("0"), dtype=object)
+        return np.zeros(shape, dtype=self.dtype)
+
+    def _resize(self, rows: int, columns: int) -> None:
+        data = self._empty((rows, columns))
+        present = np.zeros((rows, columns), dtype=bool)
+        old_rows, old_columns = self.data.shape
+        data[:old_rows, :old_columns] = self.data
+        present[:old_rows, :old_columns] = self.present
+        self.data, self.present = data, present
+
+    def _column(self, token: str) -> int:
+        token_id = self.tokens.get_id(token)
+        rows, columns = self.data.shape
+        if token_id >= columns:
+            self._resize(rows, max(2 * columns, token_id + 1))
+        return token_id
+
+    def allocate_row(self) -> int:
+        """
+        Allocate the row of a new portfolio.
+        :return: Row index.
+        """
+        rows, columns = self.data.shape
+        if self.size == rows:
+            self._resize(2 * rows, columns)
+        self.size += 1
+        return self.size - 1
+
+    def to_value(self, amount: Any) -> Any:
+        """
+        Convert an amount to the stored representation.
+        :param amount: Decimal | float | int
+        :return: Any
+        """
+        if self.dtype != object:
+            return float(amount)
+        # Amounts loaded from the DB may be floats or strings
+        return amount if isinstance(amount, Decimal) else Decimal(str(amount))
+
+    @staticmethod
+    def to_decimal(value: Any) -> Decimal:
+        """
+        Convert a stored value to `Decimal`, which the states use for their arithmetic.
+        :param value: Stored value.
+        :return: Decimal
+        """
+        if isinstance(value, Decimal):
+            return value
+        return Decimal(repr(float(value)))
+
+    def get(self, row: int, token: str) -> Decimal:
+        """
+        Get the amount of the token, registering the token in the portfolio if it is missing.
+        :param row: Row index.
+        :param token: Token address.
+        :return: Decimal
+        """
+        column = self._column(token)
+        self.present[row, column] = True
+        return self.to_decimal(self.data[row, column])
+
+    def set(self, row: int, token: str, amount: Any) -> None:
+        """
+        Set the amount of the token.
+        :param row: Row index.
+        :param token: Token address.
+        :param amount: Decimal | float | int
+        """
+        column = self._column(token)
+        self.data[row, column] = self.to_value(amount)
+        self.present[row, column] = True
+
+    def remove(self, row: int, token: str) -> None:
+        """
+        Remove the token from the portfolio.
+        :param row: Row index.
+        :param token: Token address.
+        :raise KeyError: If the portfolio does not hold the token.
+        """
+        column = self.tokens.ids.get(token)
+        if (
+            column is None
+            or column >= self.data.shape[1]
+            or not self.present[row, column]
+        ):
+            raise KeyError(token)
+        self.data[row, column] = self.to_value(Decimal("0"))
+        self.present[row, column] = False
+
+    def contains(self, row: int, token: str) -> bool:
+        """
+        Check whether the portfolio holds the token.
+        :param row: Row index.
+        :param token: Token address.
+        :return: bool
+        """
+        column = self.tokens.ids.get(token)
+        return (
+            column is not None
+            and column < self.data.shape[1]
+            and bool(self.present[row, column])
+        )
+
+    def row_tokens(self, row: int) -> list[str]:
+        """
+        Get the tokens held by the portfolio.
+        :param row: Row index.
+        :return: list of token addresses
+        """
+        return [
+            self.tokens.tokens[column] for column in np.flatnonzero(self.present[row])
+        ]
+
+    def new_portfolio(
+        self, amounts: Optional[Mapping[str, Any]] = None
+    ) -> "CompactPortfolio":
+        """
+        Allocate a row and get a portfolio view on it.
+        :param amounts: Initial token amounts.
+        :return: CompactPortfolio
+        """
+        portfolio = CompactPortfolio(self, self.allocate_row())
+        if amounts:
+            for token, amount in amounts.items():
+                portfolio[token] = amount
+        return portfolio
+
+    def token_matrix(self, rows: np.ndarray, tokens: list[str]) -> np.ndarray:
+        """
+        Get the balances of the given rows and tokens as a float matrix.
+        :param rows: Row indices.
+        :param tokens: Token addresses defining the order of the columns.
+        :return: np.ndarray of shape `(len(rows), len(tokens))`.
+        """
+        matrix = np.zeros((len(rows), len(tokens)), dtype=np.float64)
+        for index, token in enumerate(tokens):
+            column = self.tokens.ids.get(token)
+            if column is not None and column < self.data.shape[1]:
+                matrix[:, index] = self.data[rows, column].astype(np.float64)
+        return matrix
+
+
+class _PortfolioValues:
+    """
+    The `values` attribute of a `CompactPortfolio`. Calling it behaves like `dict.values`, while
+    `values.items()` exposes the amounts like `TokenValues.values`, which the valuation methods
+    of `LoanEntity` rely on.
+    """
+
+    __slots__ = ("_portfolio",)
+
+    def __init__(self, portfolio: "CompactPortfolio") -> None:
+        self._portfolio = portfolio
+
+    def __call__(self) -> ValuesView:
+        return ValuesView(self._portfolio)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._portfolio)
+
+    def __len__(self) -> int:
+        return len(self._portfolio)
+
+    def __getitem__(self, token: str) -> Decimal:
+        return self._portfolio[token]
+
+    def get(self, token: str, default: Any = None) -> Any:
+        return self._portfolio.get(token, default)
+
+    def keys(self) -> KeysView:
+        return self._portfolio.keys()
+
+    def items(self) -> ItemsView:
+        return self._portfolio.items()
+
+
+class CompactPortfolio(MutableMapping):
+    """
+    A `Portfolio`-compatible view on one row of a `PortfolioStore`. Like `Portfolio`, reading
+    a missing token adds it with a zero amount.
+    """
+
+    __slots__ = ("store", "row")
+
+    MAX_ROUNDING_ERRORS = Portfolio.MAX_ROUNDING_ERRORS
+
+    def __init__(self, store: PortfolioStore, row: int) -> None:
+        self.store: PortfolioStore = store
+        self.row: int = row
+
+    def __getitem__(self, token: str) -> Decimal:
+        return self.store.get(self.row, token)
+
+    def __setitem__(self, token: str, amount: Any) -> None:
+        self.store.set(self.row, token, amount)
+
+    def __delitem__(self, token: str) -> None:
+        self.store.remove(self.row, token)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.row_tokens(self.row))
+
+    def __len__(self) -> int:
+        return int(self.store.present[self.row].sum())
+
+    def __contains__(self, token: object) -> bool:
+        return isinstance(token, str) and self.store.contains(self.row, token)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())})"
+
+    def get(self, token: str, default: Any = None) -> Any:
+        if token in self:
+            return self[token]
+        return default
+
+    @property
+    def values(self) -> _PortfolioValues:
+        return _PortfolioValues(self)
+
+    @values.setter
+    def values(self, amounts: Optional[Mapping[str, Any]]) -> None:
+        # Loan states loaded from the DB replace the amounts via `portfolio.values = {...}`
+        for token in list(self):
+            del self[token]
+        for token, amount in (amounts or {}).items():
+            self[token] = amount
+
+    def __add__(self, second_portfolio: Mapping[str, Decimal]) -> Portfolio:
+        if not isinstance(second_portfolio, (Portfolio, CompactPortfolio)):
+            raise TypeError(f"Cannot add {type(second_portfolio)} to Portfolio.")
+        new_portfolio = Portfolio()
+        for token, amount in self.items():
+            new_portfolio[token] += amount
+        for token, amount in second_portfolio.items():
+            new_portfolio[token] += amount
+        return new_portfolio
+
+    def round_small_value_to_zero(self, token: str) -> None:
+        if abs(self[token]) < self.MAX_ROUNDING_ERRORS[token]:
+            self[token] = Decimal("0")
+
+    def increase_value(self, token: str, value: Decimal) -> None:
+        self[token] += value
+        self.round_small_value_to_zero(token=token)
+
+    def set_value(self, token: str, value: Decimal) -> None:
+        self[token] = value
+        self.round_small_value_to_zero(token=token)
+
+
+class CompactPortfolioStorage:
+    """
+    Moves the `Portfolio` attributes of loan entities into shared `PortfolioStore`s, one store
+    per attribute name, all sharing a single `TokenRegistry`.
+    """
+
+    def __init__(self, dtype: Any = object) -> None:
+        self.tokens: TokenRegistry = TokenRegistry()
+        self.dtype = dtype
+        self.stores: dict[str, PortfolioStore] = {}
+
+    def get_store(self, attribute: str) -> PortfolioStore:
+        """
+        Get the store of the given portfolio attribute, e.g. `collateral`.
+        :param attribute: Attribute name.
+        :return: PortfolioStore
+        """
+        store = self.stores.get(attribute)
+        if store is None:
+            store = self.stores[attribute] = PortfolioStore(self.tokens, self.dtype)
+        return store
+
+    def attach(self, loan_entity: Any) -> Any:
+        """
+        Replace the `Portfolio` and `TokenValues` attributes of the loan entity with compact
+        views.
+        :param loan_entity: LoanEntity
+        :return: The given loan entity.
+        """
+        for attribute, portfolio in list(vars(loan_entity).items()):
+            if isinstance(portfolio, (Portfolio, TokenValues)):
+                # Portfolios loaded from the DB keep their amounts under `values`
+                amounts = getattr(portfolio, "values", None)
+                if not isinstance(amounts, Mapping):
+                    amounts = portfolio
+                setattr(
+                    loan_entity,
+                    attribute,
+                    self.get_store(attribute).new_portfolio(amounts),
+                )
+        return loan_entity
+
+    def loan_entity_factory(self, loan_entity_class: type) -> Callable[[], Any]:
+        """
+        Get a factory creating loan entities with compact portfolios, to be used as the
+        default factory of `State.loan_entities`.
+        :param loan_entity_class: LoanEntity subclass.
+        :return: Callable
+        """
+        return _CompactLoanEntityFactory(self, loan_entity_class)
+
+
+class _CompactLoanEntityFactory:
+    """Picklable default factory of loan entities with compact portfolios."""
+
+    def __init__(
+        self, storage: CompactPortfolioStorage, loan_entity_class: type
+    ) -> None:
+        self.storage = storage
+        self.loan_entity_class = loan_entity_class
+
+    def __call__(self) -> Any:
+        return self.storage.attach(self.loan_entity_class())
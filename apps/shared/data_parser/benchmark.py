@@ -0,0 +1,187 @@
+"""
+Benchmark of the fast-path event parsing against the pydantic serializers on a page of zkLend
+events, as returned by `DeRiskAPIConnector.get_data`.
+
+Usage:
+python -m shared.data_parser.benchmark --page page.json --repeat 5
+Without `--page`, a sample page with one event of every type is repeated `--copies` times.
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Iterable
+
+from shared.data_parser.records import ZKLEND_EVENT_LAYOUTS, EventLayout, decode_address
+
+# zkLend events, one of every supported type, mostly taken from mainnet.
+SAMPLE_PAGE: list[dict[str, Any]] = [
+    {
+        "key_name": "zklend::market::Market::AccumulatorsSync",
+        "data": [
+            "0x53c91253bc9682c04929ca02ed00b3e423f6710d2ee7e0d5ebb06f3ecf368a8",
+            "0x3583127bd9f4ef81d8d7b6e",
+            "0x364c261a781ab91b6c39aca",
+        ],
+    },
+    {
+        "key_name": "zklend::market::Market::Borrowing",
+        "data": [
+            "0x1a0027d1bf86904d1051fe0ca94c39b659135f19504d663d66771a7424ca2eb",
+            "0x49d36570d4e46f48e99674bd3fcc84644ddd6b96f7c741b1562b82f9e004dc7",
+            "0x8ec920c39e9",
+            "0x9184e72a000",
+        ],
+    },
+    {
+        "key_name": "zklend::market::Market::Repayment",
+        "data": [
+            "0x7f121e44b3f446cdcaa28b230546956208d51e96894acc3b482947356bc10ed",
+            "0x7f121e44b3f446cdcaa28b230546956208d51e96894acc3b482947356bc10ed",
+            "0x3fe2b97c1fd336e750087d68b9b867997fd64a2661ff3ca5a7c771641e8e7ac",
+            "0xd60",
+            "0xdaf",
+        ],
+    },
+    {
+        "key_name": "zklend::market::Market::Deposit",
+        "data": [
+            "0x1cfa080d4bbddc206637afad05e5e1abb04da69630f40b2fd9dc578e618ec78",
+            "0x585c32b625999e6e5e78645ff8df7a9001cf5cf3eb6b80ccdd16cb64bd3a34",
+            "0x14839256fce60ba2c",
+        ],
+    },
+    {
+        "key_name": "zklend::market::Market::Withdrawal",
+        "data": [
+            "0x49920f8f551060f726e3c8c2fe26e2b39376027450b7672634824bd60c64022",
+            "0x585c32b625999e6e5e78645ff8df7a9001cf5cf3eb6b80ccdd16cb64bd3a34",
+            "0x176b344f2a78c0000",
+        ],
+    },
+    {
+        "key_name": "zklend::market::Market::CollateralEnabled",
+        "data": [
+            "0x54f9574d3029b81e0d64e3267a7b682ab920b57948644de4581f5ceb30351ea",
+            "0xda114221cb83fa859dbdb4c44beeaa0bb37c7537ad5ae66fe5e0efd20e6eb3",
+        ],
+    },
+    {
+        "key_name": "zklend::market::Market::CollateralDisabled",
+        "data": [
+            "0x237be5917e0f4ceba3067af8f11137cc7262b9444fce220183e7fdffe4c1a40",
+            "0x4718f5a0fc34cc1af16a1cdee98ffb20c31f5cd61d6ab07201858f4287c938d",
+        ],
+    },
+    {
+        "key_name": "zklend::market::Market::Liquidation",
+        "data": [
+            "0x5fc9e5a8a7b0ce8cb8b7b1d42cf8d2b6e1d5a3e8c7b9c6f0a4d2e1b3c5f7a9b",
+            "0x1a0027d1bf86904d1051fe0ca94c39b659135f19504d663d66771a7424ca2eb",
+            "0x53c91253bc9682c04929ca02ed00b3e423f6710d2ee7e0d5ebb06f3ecf368a8",
+            "0x2faf080",
+            "0x2d4a3c0",
+            "0x49d36570d4e46f48e99674bd3fcc84644ddd6b96f7c741b1562b82f9e004dc7",
+            "0x4563918244f40000",
+        ],
+    },
+]
+
+
+def get_event_layout(event: dict[str, Any]) -> EventLayout | None:
+    """
+    Get the layout of a zkLend event by its key name, e.g. `zklend::market::Market::Deposit`.
+    :param event: The event as returned by the DeRisk API.
+    :return: EventLayout or None if the event type is not supported.
+    """
+    return ZKLEND_EVENT_LAYOUTS.get(event.get("key_name", "").rsplit("::", 1)[-1])
+
+
+def parse_page(events: Iterable[dict[str, Any]], fast: bool = True) -> list[Any]:
+    """
+    Parse the supported events of a page.
+    :param events: The events as returned by the DeRisk API.
+    :param fast: Whether to decode the events into records or to validate them with the
+        pydantic serializers.
+    :return: list of records or models
+    """
+    parsed = []
+    for event in events:
+        layout = get_event_layout(event)
+        if layout is None:
+            continue
+        parse = layout.parse if fast else layout.parse_model
+        parsed.append(parse(event["data"]))
+    return parsed
+
+
+def _time(function: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_page(events: list[dict[str, Any]], repeat: int = 5) -> dict[str, Any]:
+    """
+    Time the parsing of a page with both paths and check that they yield the same values.
+    :param events: The events as returned by the DeRisk API.
+    :param repeat: The number of runs of each path, the fastest run is reported.
+    :return: dict with the number of parsed events, the best times and the speedup.
+    """
+    records = parse_page(events, fast=True)
+    models = parse_page(events, fast=False)
+    for record, model in zip(records, models):
+        if record._asdict() != {
+            field: getattr(model, field) for field in record._fields
+        }:
+            raise AssertionError(f"The fast path parsed {record}, expected {model}.")
+
+    # Measure the fast path without the addresses cached by the consistency check
+    def parse_fast() -> list[Any]:
+        decode_address.cache_clear()
+        return parse_page(events, fast=True)
+
+    pydantic_seconds = _time(lambda: parse_page(events, fast=False), repeat)
+    fast_seconds = _time(parse_fast, repeat)
+    return {
+        "events": len(records),
+        "pydantic_seconds": pydantic_seconds,
+        "fast_seconds": fast_seconds,
+        "speedup": pydantic_seconds / fast_seconds if fast_seconds else float("inf"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--page", help="JSON file with a page of events recorded from the DeRisk API."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--copies",
+        type=int,
+        default=1000,
+        help="How many times the sample page is repeated if no page is given.",
+    )
+    args = parser.parse_args()
+
+    if args.page:
+        with open(args.page) as file:
+            events = json.load(file)
+    else:
+        events = SAMPLE_PAGE * args.copies
+
+    result = benchmark_page(events, repeat=args.repeat)
+    print(
+        f"Parsed {result['events']} events: "
+        f"pydantic {result['pydantic_seconds']:.4f}s, "
+        f"fast path {result['fast_seconds']:.4f}s, "
+        f"speedup {result['speedup']:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
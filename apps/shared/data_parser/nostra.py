@@ -4,27 +4,39 @@ This module contains the logic to parse the nostra data to human-readable format
 
 from typing import Any, List
 
-from shared.data_parser.serializers import (
-    BearingCollateralBurnEventData,
-    BearingCollateralMintEventData,
-    DebtBurnEventData,
-    DebtMintEventData,
-    DebtTransferEventData,
-    InterestRateModelEventData,
-    NonInterestBearingCollateralBurnEventData,
-    NonInterestBearingCollateralMintEventData,
+from shared.data_parser.records import (
+    BEARING_COLLATERAL_BURN_LAYOUT,
+    BEARING_COLLATERAL_MINT_LAYOUT,
+    DEBT_BURN_LAYOUT,
+    DEBT_MINT_LAYOUT,
+    DEBT_TRANSFER_LAYOUT,
+    INTEREST_RATE_MODEL_LAYOUT,
+    NON_INTEREST_BEARING_COLLATERAL_BURN_LAYOUT,
+    NON_INTEREST_BEARING_COLLATERAL_MINT_LAYOUT,
+    BearingCollateralBurnEventRecord,
+    BearingCollateralMintEventRecord,
+    DebtBurnEventRecord,
+    DebtMintEventRecord,
+    DebtTransferEventRecord,
+    InterestRateModelEventRecord,
+    NonInterestBearingCollateralBurnEventRecord,
+    NonInterestBearingCollateralMintEventRecord,
 )
 
 
 class NostraDataParser:
     """
     Parses the nostra data to human-readable format.
+
+    The event data is decoded into slotted records by the layouts of
+    `shared.data_parser.records`, bypassing the per-field validation of the pydantic
+    serializers. Use `<LAYOUT>.to_model` to get the serializer of a record.
     """
 
     @classmethod
     def parse_interest_rate_model_event(
         cls, event_data: List[Any]
-    ) -> InterestRateModelEventData:
+    ) -> InterestRateModelEventRecord:
         """
         Parses the interest rate model event data into a human-readable format.
         The event data is fetched from on-chain logs and is structured in the following way:
@@ -35,18 +47,14 @@ class NostraDataParser:
             event_data (List[Any]): A list containing the raw event data.
                 Expected order: [debt_token, lending_index, _, borrow_index, _]
         Returns:
-            InterestRateModelEventData: A model with the parsed event data.
+            InterestRateModelEventRecord: A record with the parsed event data.
         """
-        return InterestRateModelEventData(
-            debt_token=event_data[0],
-            lending_index=event_data[5],
-            borrow_index=event_data[7],
-        )
+        return INTEREST_RATE_MODEL_LAYOUT.parse(event_data)
 
     @classmethod
     def parse_non_interest_bearing_collateral_mint_event(
         cls, event_data: list[Any]
-    ) -> NonInterestBearingCollateralMintEventData:
+    ) -> NonInterestBearingCollateralMintEventRecord:
         """
         Parses the non-interest bearing collateral mint event data into a human-readable format.
 
@@ -60,18 +68,14 @@ class NostraDataParser:
                 sender, recipient, and raw amount.
 
         Returns:
-            NonInterestBearingCollateralMintEventData: A model with the parsed event data.
+            NonInterestBearingCollateralMintEventRecord: A record with the parsed event data.
         """
-        return NonInterestBearingCollateralMintEventData(
-            sender=event_data[0],
-            recipient=event_data[1],
-            raw_amount=event_data[2],
-        )
+        return NON_INTEREST_BEARING_COLLATERAL_MINT_LAYOUT.parse(event_data)
 
     @classmethod
     def parse_non_interest_bearing_collateral_burn_event(
         cls, event_data: list[Any]
-    ) -> NonInterestBearingCollateralBurnEventData:
+    ) -> NonInterestBearingCollateralBurnEventRecord:
         """
         Parses the non-interest bearing collateral burn event data into a human-readable format.
 
@@ -84,19 +88,16 @@ class NostraDataParser:
                 user and face amount.
 
         Returns:
-            NonInterestBearingCollateralBurnEventData: A model with the parsed event data.
+            NonInterestBearingCollateralBurnEventRecord: A record with the parsed event data.
         """
-        return NonInterestBearingCollateralBurnEventData(
-            user=event_data[0],
-            face_amount=event_data[1],
-        )
+        return NON_INTEREST_BEARING_COLLATERAL_BURN_LAYOUT.parse(event_data)
 
     @classmethod
     def parse_interest_bearing_collateral_mint_event(
         cls, event_data: list[Any]
-    ) -> BearingCollateralMintEventData:
+    ) -> BearingCollateralMintEventRecord:
         """
-        Parses the BearingCollateralMint event data into a human-readable format using the BearingCollateralMintEventData serializer.
+        Parses the BearingCollateralMint event data into a human-readable format.
 
         The event data is fetched from on-chain logs and is structured in the following way:
         - event_data[0]: The user address (as a hexadecimal string).
@@ -106,20 +107,17 @@ class NostraDataParser:
             event_data (list[Any]): A list containing the raw event data, typically with 3 or more elements:
                 user address, amount of tokens
         Returns:
-            BearingCollateralMintEventData: A Pydantic model with the parsed and validated event data in a human-readable format.
+            BearingCollateralMintEventRecord: A record with the parsed and validated event data in a human-readable format.
 
         """
-        return BearingCollateralMintEventData(
-            user=event_data[0],
-            amount=event_data[1],
-        )
+        return BEARING_COLLATERAL_MINT_LAYOUT.parse(event_data)
 
     @classmethod
     def parse_interest_bearing_collateral_burn_event(
         cls, event_data: list[Any]
-    ) -> BearingCollateralBurnEventData:
+    ) -> BearingCollateralBurnEventRecord:
         """
-        Parses the BearingCollateralMint event data into a human-readable format using the BearingCollateralMintEventData serializer.
+        Parses the BearingCollateralMint event data into a human-readable format.
 
         The event data is fetched from on-chain logs and is structured in the following way:
         - event_data[0]: The user address (as a hexadecimal string).
@@ -129,65 +127,51 @@ class NostraDataParser:
             event_data (list[Any]): A list containing the raw event data, typically with 3 or more elements:
                 user address, amount of tokens
         Returns:
-            BearingCollateralMintEventData: A Pydantic model with the parsed and validated event data in a human-readable format.
+            BearingCollateralMintEventRecord: A record with the parsed and validated event data in a human-readable format.
 
         """
-        return BearingCollateralBurnEventData(
-            user=event_data[0],
-            amount=event_data[1],
-        )
+        return BEARING_COLLATERAL_BURN_LAYOUT.parse(event_data)
 
     @classmethod
-    def parse_debt_transfer_event(cls, event_data: List[Any]) -> DebtTransferEventData:
+    def parse_debt_transfer_event(
+        cls, event_data: List[Any]
+    ) -> DebtTransferEventRecord:
         """
-        Parses the debt transfer event data into a human-readable format using the
-        DebtBurnEventData serializer.
+        Parses the debt transfer event data into a human-readable format.
 
         Args:
             event_data (List[Any]): A list containing the raw event data.
                 Expected order: [sender, recipient, value, _]
 
         Returns:
-            DebtTransferEventData: A model with the parsed event data.
+            DebtTransferEventRecord: A record with the parsed event data.
         """
-        return DebtTransferEventData(
-            sender=event_data[0],
-            recipient=event_data[1],
-            amount=event_data[2],
-        )
+        return DEBT_TRANSFER_LAYOUT.parse(event_data)
 
     @classmethod
-    def parse_debt_mint_event(cls, event_data: list[Any]) -> DebtMintEventData:
+    def parse_debt_mint_event(cls, event_data: list[Any]) -> DebtMintEventRecord:
         """
-        Parses the debt mint event data into a human-readable format using the
-        DebtMintEventData serializer.
+        Parses the debt mint event data into a human-readable format.
 
         Args:
             event_data (List[Any]): A list containing the raw debt mint event data,
                                     typically with 2 elements: user and amount.
 
         Returns:
-            DebtMintEventData: A Pydantic model with the parsed and validated event data in a human-readable format.
+            DebtMintEventRecord: A record with the parsed and validated event data in a human-readable format.
         """
-        return DebtMintEventData(
-            user=event_data[0],
-            amount=event_data[1],
-        )
+        return DEBT_MINT_LAYOUT.parse(event_data)
 
     @classmethod
-    def parse_debt_burn_event(cls, event_data: list[Any]) -> DebtBurnEventData:
+    def parse_debt_burn_event(cls, event_data: list[Any]) -> DebtBurnEventRecord:
         """
-        Parses the debt burn event data into a human-readable format using the
-        DebtBurnEventData serializer.
+        Parses the debt burn event data into a human-readable format.
 
         Args:
             event_data (List[Any]): A list containing the raw debt burn event data,
                                     typically with 2 elements: user and amount.
 
         Returns:
-            DebtBurnEventData: A Pydantic model with the parsed and validated event data in a human-readable format.
+            DebtBurnEventRecord: A record with the parsed and validated event data in a human-readable format.
         """
-        return DebtBurnEventData(
-            user=event_data[0],
-            amount=event_data[1],
-        )
+        return DEBT_BURN_LAYOUT.parse(event_data)
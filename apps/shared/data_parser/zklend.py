@@ -3,26 +3,37 @@ This module contains the logic to parse the zkLend data to human-readable format
 """
 
 from typing import Any, List
-from shared.data_parser.serializers import (
-    AccumulatorsSyncEventData,
-    LiquidationEventData,
-    WithdrawalEventData,
-    BorrowingEventData,
-    RepaymentEventData,
-    DepositEventData,
-    CollateralEnabledDisabledEventData,
+from shared.data_parser.records import (
+    ACCUMULATORS_SYNC_LAYOUT,
+    BORROWING_LAYOUT,
+    COLLATERAL_ENABLED_DISABLED_LAYOUT,
+    DEPOSIT_LAYOUT,
+    LIQUIDATION_LAYOUT,
+    REPAYMENT_LAYOUT,
+    WITHDRAWAL_LAYOUT,
+    AccumulatorsSyncEventRecord,
+    BorrowingEventRecord,
+    CollateralEnabledDisabledEventRecord,
+    DepositEventRecord,
+    LiquidationEventRecord,
+    RepaymentEventRecord,
+    WithdrawalEventRecord,
 )
 
 
 class ZklendDataParser:
     """
     Parses the zkLend data to human-readable format.
+
+    The event data is decoded into slotted records by the layouts of
+    `shared.data_parser.records`, bypassing the per-field validation of the pydantic
+    serializers. Use `<LAYOUT>.to_model` to get the serializer of a record.
     """
 
     @classmethod
-    def parse_accumulators_sync_event(cls, event_data: list[Any]) -> AccumulatorsSyncEventData:
+    def parse_accumulators_sync_event(cls, event_data: list[Any]) -> AccumulatorsSyncEventRecord:
         """
-        Parses the AccumulatorsSync event data into a human-readable format using the AccumulatorsSyncEventData serializer.
+        Parses the AccumulatorsSync event data into a human-readable format.
         Example:
         https://starkscan.co/event/0x01720382d43a8e4ed117689be64b99d0defe3a15a4a14d3b06864687881223d4_0
 
@@ -31,31 +42,23 @@ class ZklendDataParser:
                 token, lending accumulator, and debt accumulator.
 
         Returns:
-            AccumulatorsSyncEventData: A model with the parsed event data.
+            AccumulatorsSyncEventRecord: A record with the parsed event data.
         """
-        return AccumulatorsSyncEventData(
-            token=event_data[0],
-            lending_accumulator=event_data[1],
-            debt_accumulator=event_data[2],
-        )
+        return ACCUMULATORS_SYNC_LAYOUT.parse(event_data)
 
     @classmethod
-    def parse_deposit_event(cls, event_data: List[Any]) -> DepositEventData:
+    def parse_deposit_event(cls, event_data: List[Any]) -> DepositEventRecord:
         """
         Convert the event list to a Deposit event data object
         :param event_data: list of length 4 of the event data
-        :return: DepositEventData
+        :return: DepositEventRecord
         """
-        return DepositEventData(
-            user=event_data[0],
-            token=event_data[1],
-            face_amount=event_data[2],
-        )
+        return DEPOSIT_LAYOUT.parse(event_data)
 
     @classmethod
-    def parse_withdrawal_event(cls, event_data: list[Any]) -> WithdrawalEventData:
+    def parse_withdrawal_event(cls, event_data: list[Any]) -> WithdrawalEventRecord:
         """
-        Parses the Withdrawal event data into a human-readable format using the WithdrawalEventData serializer.
+        Parses the Withdrawal event data into a human-readable format.
 
         The event data is fetched from on-chain logs and is structured in the following way:
         - event_data[0]: The user address (as a hexadecimal string).
@@ -92,16 +95,12 @@ class ZklendDataParser:
                 user address, amount withdrawn, token address, and additional data.
 
         Returns:
-            WithdrawalEventData: A Pydantic model with the parsed and validated event data in a human-readable format.
+            WithdrawalEventRecord: A record with the parsed and validated event data in a human-readable format.
         """
-        return WithdrawalEventData(
-            user=event_data[0],
-            token=event_data[1],
-            amount=event_data[2],
-        )
+        return WITHDRAWAL_LAYOUT.parse(event_data)
 
     @classmethod
-    def parse_borrowing_event(cls, event_data: list[Any]) -> BorrowingEventData:
+    def parse_borrowing_event(cls, event_data: list[Any]) -> BorrowingEventRecord:
         """
         Parses the Borrowing event data.
 
@@ -109,36 +108,25 @@ class ZklendDataParser:
             event_data (list[Any]): A list containing the raw event data, typically with 4 elements.
 
         Returns:
-            BorrowingEventData: A model with the parsed event data.
+            BorrowingEventRecord: A record with the parsed event data.
         """
-        return BorrowingEventData(
-            user=event_data[0],
-            token=event_data[1],
-            raw_amount=event_data[2],
-            face_amount=event_data[3],
-        )
+        return BORROWING_LAYOUT.parse(event_data)
 
     @classmethod
-    def parse_repayment_event(cls, event_data: List[Any]) -> RepaymentEventData:
+    def parse_repayment_event(cls, event_data: List[Any]) -> RepaymentEventRecord:
         """
-        Parses the Repayment event data into a human-readable format using the RepaymentEventData serializer.
+        Parses the Repayment event data into a human-readable format.
 
         Args:
             event_data (List[Any]): A list containing the raw repayment event data, typically with 5 elements.
 
         Returns:
-            RepaymentEventData: A model with the parsed event data.
+            RepaymentEventRecord: A record with the parsed event data.
         """
-        return RepaymentEventData(
-            repayer=event_data[0],
-            beneficiary=event_data[1],
-            token=event_data[2],
-            raw_amount=event_data[3],
-            face_amount=event_data[4],
-        )
+        return REPAYMENT_LAYOUT.parse(event_data)
 
     @classmethod
-    def parse_liquidation_event(cls, event_data: list[Any]) -> LiquidationEventData:
+    def parse_liquidation_event(cls, event_data: list[Any]) -> LiquidationEventRecord:
         """
         Parses the Liquidation event data.
 
@@ -146,22 +134,14 @@ class ZklendDataParser:
             event_data (list[Any]): A list containing the raw liquidation event data, typically with 7 elements.
 
         Returns:
-            LiquidationEventData: A model with the parsed event data.
+            LiquidationEventRecord: A record with the parsed event data.
         """
-        return LiquidationEventData(
-            liquidator=event_data[0],
-            user=event_data[1],
-            debt_token=event_data[2],
-            debt_raw_amount=event_data[3],
-            debt_face_amount=event_data[4],
-            collateral_token=event_data[5],
-            collateral_amount=event_data[6],
-        )
+        return LIQUIDATION_LAYOUT.parse(event_data)
 
     @classmethod
     def parse_collateral_enabled_disabled_event(
         cls, event_data: dict[str, list[str]]
-    ) -> CollateralEnabledDisabledEventData:
+    ) -> CollateralEnabledDisabledEventRecord:
         """
         Parses the Collateral enabled/disabled event data.
 
@@ -170,9 +150,6 @@ class ZklendDataParser:
                                                containing the corresponding data as strings.:
 
         Returns:
-            CollateralEnabledDisabledEventData: A model with the parsed event data.
+            CollateralEnabledDisabledEventRecord: A record with the parsed event data.
         """
-        return CollateralEnabledDisabledEventData(
-            user=event_data[0],
-            token=event_data[1],
-        )
+        return COLLATERAL_ENABLED_DISABLED_LAYOUT.parse(event_data)
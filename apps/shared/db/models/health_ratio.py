@@ -1,4 +1,4 @@
-from sqlalchemy import DECIMAL, BigInteger, Column, String
+from sqlalchemy import DECIMAL, BigInteger, Column, Index, String
 from sqlalchemy_utils.types.choice import ChoiceType
 
 from shared.db.base import Base
@@ -17,3 +17,12 @@ class HealthRatioLevel(Base):
     user_id = Column(String, index=True)
     value = Column(DECIMAL, nullable=False)
     protocol_id = Column(ChoiceType(ProtocolIDs, impl=String()), nullable=False)
+
+
+# Serves the latest health ratio of every user and protocol.
+Index(
+    "ix_health_ratio_level_user_id_protocol_id_timestamp",
+    HealthRatioLevel.user_id,
+    HealthRatioLevel.protocol_id,
+    HealthRatioLevel.timestamp.desc(),
+)
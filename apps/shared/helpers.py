@@ -1,4 +1,3 @@
-import asyncio
 import decimal
 import logging
 from typing import Dict, Set
@@ -16,6 +15,7 @@ from shared.constants import (
     PAIRS,
     UNDERLYING_SYMBOLS_TO_UNDERLYING_ADDRESSES,
 )
+from shared.rpc_gateway import run_with_rpc_sessions
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -193,7 +193,7 @@ def fetch_token_symbols_from_set_of_loan_addresses(
         """
         return {addr: await get_underlying_token_symbol(addr) for addr in token_addresses}
 
-    return asyncio.run(async_fetch())
+    return run_with_rpc_sessions(async_fetch())
 
 
 def get_addresses(
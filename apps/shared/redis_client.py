@@ -1,3 +1,14 @@
 import redis
 
-redis_client = redis.Redis(host="redis", port=6379, decode_responses=True, db=1)
\ No newline at end of file
+redis_client = redis.Redis(host="redis", port=6379, decode_responses=True, db=1)
+
+# Fails fast instead of blocking its callers, for the caches read on the hot paths.
+REDIS_CACHE_TIMEOUT: float = 0.5
+cache_redis_client = redis.Redis(
+    host="redis",
+    port=6379,
+    decode_responses=True,
+    db=1,
+    socket_timeout=REDIS_CACHE_TIMEOUT,
+    socket_connect_timeout=REDIS_CACHE_TIMEOUT,
+)
@@ -0,0 +1,399 @@
+"""
+Shared gateway to the Starknet RPC nodes.
+
+All JSON-RPC requests of a process, from `blockchain_call`, `StarknetClient`, the batched reads
+of `batch_call`, the liquidable debt handlers and the dashboard, go through one `RpcGateway`
+per set of node URLs:
+
+- the requests of an event loop share one pooled HTTP session, closed before the loop is
+  closed by running the loop with `run_with_rpc_sessions`, or by `close_rpc_sessions`,
+- every node has a token bucket, so requests are spaced out instead of being rejected,
+- a request waiting for a token is served before the waiting requests of lower priority
+  classes, e.g. a dashboard request before the reads of a backfill,
+- a rate-limited or failing node is paused with an exponential backoff, the requests fail over
+  to the next available node meanwhile. Waiting is done with `asyncio.sleep`, so a 429 never
+  blocks the event loop.
+
+The node URLs are read from `STARKNET_NODE_URLS` (comma separated), else `NODE_URL`.
+
+Example usage:
+gateway = get_rpc_gateway()
+result = await gateway.post(
+    {"jsonrpc": "2.0", "id": 0, "method": "starknet_blockNumber", "params": []},
+    priority=Priority.DASHBOARD,
+)
+client = get_full_node_client(priority=Priority.DASHBOARD)
+block_number = run_with_rpc_sessions(client.get_block_number())
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Coroutine, Iterator, Optional, Sequence, TypeVar
+
+import aiohttp
+from starknet_py.net.client_errors import ClientError
+from starknet_py.net.full_node_client import FullNodeClient
+from starknet_py.net.http_client import HttpMethod, RpcHttpClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NODE_URL: str = "https://starknet-mainnet.public.blastapi.io"
+# Requests per second and burst size allowed per node.
+DEFAULT_RATE: float = float(os.getenv("STARKNET_RPC_RATE", "20"))
+DEFAULT_BURST: int = int(os.getenv("STARKNET_RPC_BURST", "40"))
+# The maximum number of open connections per event loop.
+DEFAULT_POOL_SIZE: int = 32
+# Backoff in seconds of a node after a failed request, doubled per attempt.
+BASE_BACKOFF: float = 1.0
+MAX_BACKOFF: float = 60.0
+# The shortest wait of a request for a token.
+MIN_WAIT: float = 0.01
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """
+    Priority classes of the requests, lower values are served first.
+    """
+
+    DASHBOARD = 0
+    BACKFILL = 1
+
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "rpc_priority", default=Priority.BACKFILL
+)
+
+
+@contextmanager
+def rpc_priority(priority: Priority) -> Iterator[None]:
+    """
+    Set the priority of the requests made by the current task, and by the tasks it starts.
+    :param priority: Priority
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def get_node_urls() -> list[str]:
+    """
+    Get the configured node URLs, in order of preference.
+    :return: list of URLs
+    """
+    urls = os.getenv("STARKNET_NODE_URLS") or os.getenv("NODE_URL") or DEFAULT_NODE_URL
+    return [url.strip() for url in urls.split(",") if url.strip()]
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter with priority classes. A request takes a token once no request
+    of a higher priority class waits. The bucket is not bound to an event loop.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, capacity: float = DEFAULT_BURST):
+        """
+        :param rate: The tokens added per second.
+        :param capacity: The maximum number of tokens, i.e. the burst size.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting: Counter[int] = Counter()
+
+    @property
+    def paused_for(self) -> float:
+        """
+        The seconds left until the bucket is resumed.
+        """
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def _refill(self, now: float) -> None:
+        start = max(self._updated_at, self._paused_until)
+        if now > start:
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self._updated_at = now
+
+    def pause(self, seconds: float) -> None:
+        """
+        Take no tokens for `seconds`, e.g. after the node rate-limited a request.
+        :param seconds: The pause in seconds.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0.0
+        self._paused_until = max(self._paused_until, now + seconds)
+
+    def _is_next(self, priority: int) -> bool:
+        return not any(
+            count for waiting, count in self._waiting.items() if waiting < priority
+        )
+
+    async def acquire(self, priority: Priority = Priority.BACKFILL) -> None:
+        """
+        Wait for a token.
+        :param priority: The priority class of the request.
+        """
+        priority = int(priority)
+        self._waiting[priority] += 1
+        try:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if (
+                    now >= self._paused_until
+                    and self.tokens >= 1
+                    and self._is_next(priority)
+                ):
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep(
+                    max(
+                        self._paused_until - now,
+                        (1 - self.tokens) / self.rate,
+                        MIN_WAIT,
+                    )
+                )
+        finally:
+            self._waiting[priority] -= 1
+
+
+class RpcEndpoint:
+    """
+    A node of the gateway with its rate limiter and health.
+    """
+
+    def __init__(self, url: str, rate: float, burst: int):
+        self.url = url
+        self.limiter = TokenBucket(rate, burst)
+        self.requests: int = 0
+        self.failures: int = 0
+
+    @property
+    def is_available(self) -> bool:
+        """
+        Whether the node is not paused after a failure.
+        """
+        return self.limiter.paused_for == 0
+
+    def backoff(self, seconds: float) -> None:
+        """
+        Pause the node after a failed request.
+        :param seconds: The pause in seconds.
+        """
+        self.failures += 1
+        self.limiter.pause(seconds)
+
+
+class RpcGateway:
+    """
+    Sends JSON-RPC requests to the first available node, see the module docstring.
+    """
+
+    def __init__(
+        self,
+        node_urls: Optional[Sequence[str]] = None,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        retries: int = 5,
+        timeout: int = 60,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ) -> None:
+        """
+        :param node_urls: The URLs of the nodes in order of preference, defaults to
+            `get_node_urls`.
+        :param rate: The requests per second allowed per node.
+        :param burst: The burst size allowed per node.
+        :param retries: The number of retries of a failed request.
+        :param timeout: The timeout of a request in seconds.
+        :param pool_size: The maximum number of open connections per event loop.
+        """
+        self.endpoints = [
+            RpcEndpoint(url, rate, burst) for url in node_urls or get_node_urls()
+        ]
+        self.retries = retries
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.pool_size = pool_size
+        # aiohttp sessions are bound to the event loop they are created in
+        self._sessions: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, aiohttp.ClientSession
+        ] = weakref.WeakKeyDictionary()
+
+    @property
+    def url(self) -> str:
+        """
+        The URL of the preferred node.
+        """
+        return self.endpoints[0].url
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+            )
+            self._sessions[loop] = session
+        return session
+
+    async def close(self) -> None:
+        """
+        Close the HTTP session of the running event loop.
+        """
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    def _select_endpoint(self) -> RpcEndpoint:
+        """
+        Select the first available node, else the one resumed first.
+        """
+        for endpoint in self.endpoints:
+            if endpoint.is_available:
+                return endpoint
+        return min(self.endpoints, key=lambda endpoint: endpoint.limiter.paused_for)
+
+    async def post(
+        self,
+        payload: dict | list[dict],
+        priority: Optional[Priority] = None,
+        retries: Optional[int] = None,
+    ) -> Any:
+        """
+        Send a JSON-RPC request or batch, retried on the next available node on failures.
+        :param payload: The JSON-RPC request, or a list of them for a batch.
+        :param priority: The priority class, defaults to the one set by `rpc_priority`.
+        :param retries: The number of retries, defaults to the one of the gateway.
+        :return: The decoded JSON response.
+        :raise ClientError: If the request failed on its last attempt.
+        """
+        priority = _priority.get() if priority is None else priority
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries + 1):
+            endpoint = self._select_endpoint()
+            await endpoint.limiter.acquire(priority)
+            endpoint.requests += 1
+            try:
+                return await self._post(endpoint, payload)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ClientError) as e:
+                if attempt == retries:
+                    raise
+                backoff = min(MAX_BACKOFF, BASE_BACKOFF * 2**attempt)
+                retry_after = getattr(e, "retry_after", None)
+                endpoint.backoff(max(backoff, retry_after or 0))
+                logger.warning(
+                    "Starknet RPC request to %s failed, retrying. Err: %s",
+                    endpoint.url,
+                    e,
+                )
+
+    async def _post(self, endpoint: RpcEndpoint, payload: dict | list[dict]) -> Any:
+        session = self._get_session()
+        async with session.post(endpoint.url, json=payload) as response:
+            if response.status == 429 or response.status >= 500:
+                error = ClientError(
+                    message=f"Request failed with {response.status}",
+                    code=str(response.status),
+                )
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    error.retry_after = float(retry_after)
+                raise error
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+
+class GatewayRpcClient(RpcHttpClient):
+    """
+    The HTTP client of `FullNodeClient`, sending the requests through an `RpcGateway`.
+    """
+
+    def __init__(self, gateway: RpcGateway, priority: Optional[Priority] = None):
+        """
+        :param gateway: RpcGateway
+        :param priority: The priority class, defaults to the one set by `rpc_priority`.
+        """
+        super().__init__(url=gateway.url)
+        self.gateway = gateway
+        self.priority = priority
+
+    async def request(
+        self,
+        address: str,
+        http_method: HttpMethod,
+        params: Optional[dict] = None,
+        payload: Optional[dict | list[dict]] = None,
+    ) -> Any:
+        return await self.gateway.post(payload, priority=self.priority)
+
+
+_gateways: dict[tuple[str, ...], RpcGateway] = {}
+
+
+def get_rpc_gateway(node_urls: Optional[Sequence[str]] = None) -> RpcGateway:
+    """
+    Get the gateway of the process for a set of nodes.
+    :param node_urls: The URLs of the nodes in order of preference, defaults to
+        `get_node_urls`.
+    :return: RpcGateway
+    """
+    key = tuple(node_urls or get_node_urls())
+    gateway = _gateways.get(key)
+    if gateway is None:
+        gateway = _gateways[key] = RpcGateway(key)
+    return gateway
+
+
+async def close_rpc_sessions() -> None:
+    """
+    Close the HTTP sessions of all gateways in the running event loop. Call it before the loop
+    is closed, the sessions of a closed loop can't be closed anymore.
+    """
+    for gateway in list(_gateways.values()):
+        await gateway.close()
+
+
+def run_with_rpc_sessions(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine in a new event loop like `asyncio.run`, the HTTP sessions the coroutine
+    opened are closed before the loop is.
+    :param coroutine: The coroutine to run.
+    :return: The result of the coroutine.
+    """
+
+    async def main() -> T:
+        try:
+            return await coroutine
+        finally:
+            await close_rpc_sessions()
+
+    return asyncio.run(main())
+
+
+def get_full_node_client(
+    node_urls: Optional[Sequence[str]] = None, priority: Optional[Priority] = None
+) -> FullNodeClient:
+    """
+    Get a `FullNodeClient` sending its requests through the shared gateway.
+    :param node_urls: The URLs of the nodes in order of preference, defaults to
+        `get_node_urls`.
+    :param priority: The priority class, defaults to the one set by `rpc_priority`.
+    :return: FullNodeClient
+    """
+    gateway = get_rpc_gateway(node_urls)
+    client = FullNodeClient(node_url=gateway.url)
+    client._client = GatewayRpcClient(gateway, priority)
+    return client
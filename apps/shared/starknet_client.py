@@ -5,28 +5,12 @@ from typing import List, Optional
 
 from starknet_py.hash.selector import get_selector_from_name
 from starknet_py.net.client_models import Call
-from starknet_py.net.full_node_client import FullNodeClient
-from starknet_py.net.http_client import RpcHttpClient
-from starknet_py.net.client_errors import ClientError
-
-logger = logging.getLogger(__name__)
 
+from shared.batch_call import get_batch_client
+from shared.call_cache import call_cache
+from shared.rpc_gateway import get_full_node_client
 
-class _StarknetRpcClient(RpcHttpClient):
-    async def request(self, *args, **kwargs):
-        attempts = 0
-        max_retries = 5
-        exc: Exception | None = None
-        while attempts < max_retries:
-            attempts += 1
-            try:
-                return await super().request(*args, **kwargs)
-            except ClientError as e:
-                logger.warning("Starknet client request failed, retrying. Err: %s", e)
-                exc = e
-                if e.code == "429":
-                    await asyncio.sleep(60)
-        raise exc or Exception("Max retries exceeded")
+logger = logging.getLogger(__name__)
 
 
 class StarknetClient:
@@ -35,42 +19,81 @@ class StarknetClient:
     Provides methods for making contract calls and fetching specific contract data.
     """
 
-    def __init__(self, node_url: str = "https://starknet-mainnet.public.blastapi.io"):
+    def __init__(self, node_url: Optional[str] = None):
         """
-        Initialize StarknetClient with network URL.
+        Initialize StarknetClient with network URL. The requests go through the shared
+        RPC gateway, see `shared.rpc_gateway`.
 
         Args:
-            node_url (str): The URL of the Starknet network to connect to
+            node_url (Optional[str]): The URL of the Starknet network to connect to.
+                Defaults to the nodes of the shared gateway.
         """
-        self.node_url = node_url
-        node_client = FullNodeClient(node_url=self.node_url)
-        node_client._client = _StarknetRpcClient(url=node_url)
-        self.client = node_client
+        self.client = get_full_node_client([node_url] if node_url else None)
+        self.node_url = self.client.url
 
     async def func_call(
-        self, addr: int, selector: str, calldata: List[int], retries: int = 1
+        self,
+        addr: int,
+        selector: str,
+        calldata: List[int],
+        retries: int = 1,
+        block_number: Optional[int] = None,
     ) -> List[int]:
         """
-        Make a call to a Starknet contract.
+        Make a call to a Starknet contract. The results of reads of immutable values and of
+        slowly changing state are cached, see `shared.call_cache`. Inside of a
+        `batched_calls` context, the call is batched with the other concurrent calls.
 
         Args:
             addr (int): Contract address
             selector (str): Function name to call
             calldata (List[int]): List of call arguments
             retries (int, optional): Number of retry attempts. Defaults to 1.
+            block_number (Optional[int]): The block to call the contract at.
+                Defaults to the latest block.
 
         Returns:
             List[int]: Contract call result
         """
+        return await call_cache.get_or_call(
+            addr,
+            selector,
+            calldata,
+            lambda: self._call_contract(
+                addr, selector, calldata, retries, block_number
+            ),
+            block_number=block_number,
+        )
+
+    async def _call_contract(
+        self,
+        addr: int,
+        selector: str,
+        calldata: List[int],
+        retries: int,
+        block_number: Optional[int],
+    ) -> List[int]:
+        batch_client = get_batch_client()
+        if batch_client is not None:
+            block_id = (
+                "latest" if block_number is None else {"block_number": block_number}
+            )
+            return await batch_client.call(addr, selector, calldata, block_id=block_id)
+
         call = Call(
             to_addr=addr,
             selector=get_selector_from_name(selector),
             calldata=calldata,
         )
+        block = (
+            {"block_hash": "latest"}
+            if block_number is None
+            else {"block_number": block_number}
+        )
 
         for attempt in range(retries + 1):
             try:
-                response = await self.client.call_contract(call, block_hash="latest")
+                response = await self.client.call_contract(call, **block)
                 if hasattr(response, "result"):
                     return response.result
                 elif isinstance(response, list):
@@ -1,4 +1,6 @@
 from shared.state.state import State
+from shared.state.loan_matrix import LoanMatrix
+from shared.state.events import Event, EventDispatcher, events_from_data
 from shared.loan_entity.loan_entity import LoanEntity
 from shared.state.zklend import ZkLendState
 from shared.state.nostra import NostraMainnetState, NostraAlphaState
@@ -0,0 +1,128 @@
+"""
+Lightweight event records and the dispatcher resolving their handlers on a `State`.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Collection, Hashable, Iterable, Mapping, Optional
+
+
+@dataclass(slots=True)
+class Event:
+    """
+    A single on-chain event as returned by the DeRisk API.
+
+    Supports item access (`event["data"]`, `event.get("block_number")`) so that it can be
+    passed to the `process_*_event` methods of the states in place of a `pd.Series`.
+    """
+
+    block_number: int
+    timestamp: int
+    key_name: str
+    from_address: Optional[str] = None
+    id: Optional[str] = None
+    keys: list[str] = field(default_factory=list)
+    data: list[str] = field(default_factory=list)
+
+    def __getitem__(self, item: str) -> Any:
+        try:
+            return getattr(self, item)
+        except AttributeError:
+            raise KeyError(item) from None
+
+    def __contains__(self, item: str) -> bool:
+        return item in EVENT_FIELDS
+
+    def get(self, item: str, default: Any = None) -> Any:
+        """
+        Get the value of the given field.
+        :param item: Field name.
+        :param default: Value returned if the field does not exist.
+        :return: Any
+        """
+        return getattr(self, item, default)
+
+    @classmethod
+    def from_dict(cls, raw_event: Mapping[str, Any]) -> "Event":
+        """
+        Build an event from a raw API event, ignoring unknown fields.
+        :param raw_event: Raw event.
+        :return: Event
+        """
+        return cls(
+            block_number=raw_event.get("block_number"),
+            timestamp=raw_event.get("timestamp"),
+            key_name=raw_event.get("key_name"),
+            from_address=raw_event.get("from_address"),
+            id=raw_event.get("id"),
+            keys=raw_event.get("keys") or [],
+            data=raw_event.get("data") or [],
+        )
+
+
+EVENT_FIELDS: frozenset[str] = frozenset(item.name for item in fields(Event))
+
+
+def default_sort_key(event: Event) -> tuple:
+    """
+    Sort events chronologically, i.e. by block number and event ID.
+    :param event: Event
+    :return: tuple
+    """
+    return event.block_number, event.id or ""
+
+
+def events_from_data(
+    data: Iterable[Mapping[str, Any]],
+    key_names: Optional[Collection[str]] = None,
+    sort_key: Callable[[Event], Any] = default_sort_key,
+) -> list[Event]:
+    """
+    Convert a page of raw API events into sorted event records.
+    :param data: Raw events.
+    :param key_names: If set, only the events with these key names are kept.
+    :param sort_key: Key function defining the replay order.
+    :return: list[Event]
+    """
+    if key_names is not None:
+        key_names = set(key_names)
+    events = [
+        Event.from_dict(raw_event)
+        for raw_event in data
+        if key_names is None or raw_event.get("key_name") in key_names
+    ]
+    events.sort(key=sort_key)
+    return events
+
+
+class EventDispatcher:
+    """
+    A precomputed `event key -> bound method` table of a state, so that the handler of an
+    event is resolved with a single dict lookup instead of a `getattr` per event.
+    """
+
+    def __init__(
+        self,
+        state: Any,
+        methods_mapping: Optional[Mapping[Hashable, str]] = None,
+    ) -> None:
+        """
+        :param state: The state whose methods process the events.
+        :param methods_mapping: Mapping of event keys to method names of the state,
+            defaults to `state.EVENTS_METHODS_MAPPING`.
+        """
+        if methods_mapping is None:
+            methods_mapping = state.EVENTS_METHODS_MAPPING
+        self.state = state
+        self.handlers: dict[Hashable, Callable[[Event], None]] = {
+            key: getattr(state, method_name)
+            for key, method_name in methods_mapping.items()
+            if method_name and hasattr(state, method_name)
+        }
+
+    def get_handler(self, key: Hashable) -> Optional[Callable[[Event], None]]:
+        """
+        Get the bound method processing events with the given key.
+        :param key: Event key, usually the key name of the event.
+        :return: Bound method or None if the event is not processed by the state.
+        """
+        return self.handlers.get(key)
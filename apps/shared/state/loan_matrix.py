@@ -0,0 +1,196 @@
+"""
+Columnar representation of the loan entities of a `State`, used for vectorized computations over
+all loan entities at once.
+"""
+
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+import numpy as np
+
+from shared.custom_types.compact import CompactPortfolio
+
+
+def get_token_amounts(holdings: Any) -> Mapping[str, Any]:
+    """
+    Get the token amounts of a collateral or debt holding of a loan entity.
+    `Portfolio` is a dict itself, whereas `TokenValues` (and portfolios loaded from the DB)
+    keep the amounts under the `values` attribute.
+    :param holdings: Portfolio | TokenValues
+    :return: Mapping of token addresses to amounts.
+    """
+    values = getattr(holdings, "values", None)
+    if isinstance(values, Mapping):
+        return values
+    return holdings
+
+
+class LoanMatrix:
+    """
+    A snapshot of the collateral and debt of all loan entities packed into dense
+    `(loan entities x tokens)` float matrices. Rows follow `users`, columns follow
+    `collateral_tokens` and `debt_tokens` respectively. The amounts are raw, i.e. they are
+    neither scaled by the token decimals nor by the interest rate indices.
+    """
+
+    def __init__(
+        self,
+        users: list[str],
+        collateral_tokens: list[str],
+        debt_tokens: list[str],
+        collateral: np.ndarray,
+        debt: np.ndarray,
+    ) -> None:
+        self.users: list[str] = users
+        self.collateral_tokens: list[str] = collateral_tokens
+        self.debt_tokens: list[str] = debt_tokens
+        self.collateral: np.ndarray = collateral
+        self.debt: np.ndarray = debt
+        self._collateral_token_indices: dict[str, int] = {
+            token: index for index, token in enumerate(collateral_tokens)
+        }
+        self._debt_token_indices: dict[str, int] = {
+            token: index for index, token in enumerate(debt_tokens)
+        }
+
+    @classmethod
+    def from_loan_entities(cls, loan_entities: Mapping[str, Any]) -> "LoanMatrix":
+        """
+        Pack the collateral and debt of the given loan entities into matrices.
+        :param loan_entities: Mapping of users to loan entities.
+        :return: LoanMatrix
+        """
+        users = list(loan_entities.keys())
+        compact_matrix = cls._from_compact_portfolios(users, loan_entities)
+        if compact_matrix is not None:
+            return compact_matrix
+        collaterals = [
+            get_token_amounts(loan_entity.collateral)
+            for loan_entity in loan_entities.values()
+        ]
+        debts = [
+            get_token_amounts(loan_entity.debt)
+            for loan_entity in loan_entities.values()
+        ]
+        collateral_tokens = sorted(
+            {token for amounts in collaterals for token in amounts}
+        )
+        debt_tokens = sorted({token for amounts in debts for token in amounts})
+        return cls(
+            users=users,
+            collateral_tokens=collateral_tokens,
+            debt_tokens=debt_tokens,
+            collateral=cls._pack(collaterals, collateral_tokens),
+            debt=cls._pack(debts, debt_tokens),
+        )
+
+    @classmethod
+    def _from_compact_portfolios(
+        cls, users: list[str], loan_entities: Mapping[str, Any]
+    ) -> Optional["LoanMatrix"]:
+        """
+        Slice the matrices directly out of the shared columns if the collateral and debt of all
+        loan entities are `CompactPortfolio` views on the same stores.
+        :param users: Users in the order of the rows.
+        :param loan_entities: Mapping of users to loan entities.
+        :return: LoanMatrix or None if the portfolios are not compact.
+        """
+        if not users:
+            return None
+        collaterals = [loan_entity.collateral for loan_entity in loan_entities.values()]
+        debts = [loan_entity.debt for loan_entity in loan_entities.values()]
+        if not all(
+            isinstance(portfolios[0], CompactPortfolio)
+            and all(
+                isinstance(portfolio, CompactPortfolio)
+                and portfolio.store is portfolios[0].store
+                for portfolio in portfolios
+            )
+            for portfolios in (collaterals, debts)
+        ):
+            return None
+
+        matrices, token_lists = [], []
+        for portfolios in (collaterals, debts):
+            store = portfolios[0].store
+            rows = np.fromiter(
+                (portfolio.row for portfolio in portfolios),
+                dtype=np.intp,
+                count=len(portfolios),
+            )
+            held = np.flatnonzero(store.present[rows].any(axis=0))
+            tokens = sorted(store.tokens.tokens[column] for column in held)
+            token_lists.append(tokens)
+            matrices.append(store.token_matrix(rows, tokens))
+        return cls(
+            users=users,
+            collateral_tokens=token_lists[0],
+            debt_tokens=token_lists[1],
+            collateral=matrices[0],
+            debt=matrices[1],
+        )
+
+    @staticmethod
+    def _pack(rows: list[Mapping[str, Any]], tokens: list[str]) -> np.ndarray:
+        """
+        Pack a list of token amounts into a dense matrix.
+        :param rows: Token amounts of each loan entity.
+        :param tokens: Tokens defining the order of the columns.
+        :return: np.ndarray of shape `(len(rows), len(tokens))`.
+        """
+        token_indices = {token: index for index, token in enumerate(tokens)}
+        matrix = np.zeros((len(rows), len(tokens)), dtype=np.float64)
+        for row_index, amounts in enumerate(rows):
+            for token, amount in amounts.items():
+                matrix[row_index, token_indices[token]] = float(amount)
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def collateral_column(self, token: str) -> np.ndarray:
+        """
+        Get the raw collateral amounts of the given token of all loan entities.
+        :param token: Token address.
+        :return: np.ndarray of zeros if no loan entity holds the token.
+        """
+        index = self._collateral_token_indices.get(token)
+        if index is None:
+            return np.zeros(len(self.users), dtype=np.float64)
+        return self.collateral[:, index]
+
+    def debt_column(self, token: str) -> np.ndarray:
+        """
+        Get the raw debt amounts of the given token of all loan entities.
+        :param token: Token address.
+        :return: np.ndarray of zeros if no loan entity owes the token.
+        """
+        index = self._debt_token_indices.get(token)
+        if index is None:
+            return np.zeros(len(self.users), dtype=np.float64)
+        return self.debt[:, index]
+
+    @staticmethod
+    def token_vector(
+        tokens: Iterable[str], get_value: Callable[[str], float]
+    ) -> np.ndarray:
+        """
+        Build a per-column vector, e.g. of prices or collateral factors.
+        :param tokens: Tokens defining the order of the columns.
+        :param get_value: Function returning the value for a token.
+        :return: np.ndarray
+        """
+        return np.array([get_value(token) for token in tokens], dtype=np.float64)
+
+    def select(self, mask: np.ndarray) -> "LoanMatrix":
+        """
+        Get a new matrix containing only the rows selected by the boolean mask.
+        :param mask: Boolean mask over the loan entities.
+        :return: LoanMatrix
+        """
+        return LoanMatrix(
+            users=[user for user, selected in zip(self.users, mask) if selected],
+            collateral_tokens=self.collateral_tokens,
+            debt_tokens=self.debt_tokens,
+            collateral=self.collateral[mask],
+            debt=self.debt[mask],
+        )
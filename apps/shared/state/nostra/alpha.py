@@ -1,5 +1,6 @@
 import asyncio
 import decimal
+from shared.batch_call import batched_calls
 from shared.starknet_client import StarknetClient
 from shared.data_parser.nostra import NostraDataParser
 from shared.helpers import get_addresses
@@ -24,6 +25,7 @@ from shared.loan_entity.nostra.alpha import (
     NOSTRA_ALPHA_INTEREST_RATE_MODEL_ADDRESS,
     NOSTRA_ALPHA_TOKEN_ADDRESSES,
 )
+from shared.rpc_gateway import run_with_rpc_sessions
 
 
 class NostraAlphaState(State):
@@ -76,7 +78,7 @@ class NostraAlphaState(State):
             str, str
         ] = {}
 
-        asyncio.run(self.collect_token_parameters())
+        run_with_rpc_sessions(self.collect_token_parameters())
 
     @staticmethod
     def _infer_token_type(token_symbol: str) -> tuple[str, bool]:
@@ -97,85 +99,19 @@ class NostraAlphaState(State):
         """
         Collects the token parameters for all the tokens in the protocol.
         """
+        # The reads of all tokens are issued concurrently and batched into a few requests.
         stark_client = StarknetClient()
-        for token_address in self.TOKEN_ADDRESSES:
-            decimals = await stark_client.func_call(
-                addr=token_address,
-                selector="decimals",
-                calldata=[],
-            )
-            decimals = int(decimals[0])
-
-            token_symbol = await get_symbol(token_address=token_address)
-            event, is_interest_bearing = self._infer_token_type(
-                token_symbol=token_symbol
+        async with batched_calls():
+            collected = await asyncio.gather(
+                *(
+                    self._collect_token_parameters(stark_client, token_address)
+                    for token_address in self.TOKEN_ADDRESSES
+                )
             )
+        for token_address, (event, token_parameters) in zip(
+            self.TOKEN_ADDRESSES, collected
+        ):
             self.token_addresses_to_events[token_address] = event
-
-            underlying_token_address = await stark_client.func_call(
-                addr=token_address,
-                selector="underlyingAsset",
-                calldata=[],
-            )
-            underlying_token_address = add_leading_zeros(
-                hex(underlying_token_address[0])
-            )
-            underlying_token_symbol = await get_symbol(
-                token_address=underlying_token_address
-            )
-
-            if event == "collateral":
-                # The order of the arguments is: `id`, `asset`, `collateralFactor`, ``,
-                # `priceOracle`.
-                collateral_data = await stark_client.func_call(
-                    addr=self.CDP_MANAGER_ADDRESS,
-                    selector="getCollateralData",
-                    calldata=[underlying_token_address],
-                )
-                collateral_factor = collateral_data[2] / 1e18
-
-                # The order of the arguments is:
-                # `protocolFee`, ``, `protocolFeeRecipient`, `liquidatorFeeBeta`, ``,
-                # `liquidatorFeeMax`, ``.
-                liquidation_settings = await stark_client.func_call(
-                    addr=self.CDP_MANAGER_ADDRESS,
-                    selector="getLiquidationSettings",
-                    calldata=[underlying_token_address],
-                )
-                liquidator_fee_beta = liquidation_settings[0] / 1e18
-                liquidator_fee_max = liquidation_settings[3] / 1e18
-                protocol_fee = liquidation_settings[5] / 1e18
-
-                token_parameters = NostraAlphaCollateralTokenParameters(
-                    address=token_address,
-                    decimals=decimals,
-                    symbol=token_symbol,
-                    underlying_symbol=underlying_token_symbol,
-                    underlying_address=underlying_token_address,
-                    is_interest_bearing=is_interest_bearing,
-                    collateral_factor=collateral_factor,
-                    liquidator_fee_beta=liquidator_fee_beta,
-                    liquidator_fee_max=liquidator_fee_max,
-                    protocol_fee=protocol_fee,
-                )
-            else:
-                # The order of the arguments is: `id`, `debtTier`, `debtToken`,
-                # `debtFactor`, ``, `priceOracle`.
-                debt_data = await stark_client.func_call(
-                    addr=self.CDP_MANAGER_ADDRESS,
-                    selector="getDebtData",
-                    calldata=[token_address],
-                )
-                debt_factor = debt_data[3] / 1e18
-
-                token_parameters = NostraDebtTokenParameters(
-                    address=token_address,
-                    decimals=decimals,
-                    symbol=token_symbol,
-                    underlying_symbol=underlying_token_symbol,
-                    underlying_address=underlying_token_address,
-                    debt_factor=debt_factor,
-                )
             getattr(self.token_parameters, event)[token_address] = token_parameters
 
         # Create the mapping between the debt
@@ -196,6 +132,93 @@ class NostraAlphaState(State):
                 debt_token_parameters.address
             ] = interest_bearing_collateral_token_addresses[0]
 
+    async def _collect_token_parameters(
+        self, stark_client: StarknetClient, token_address: str
+    ) -> tuple[str, NostraAlphaCollateralTokenParameters | NostraDebtTokenParameters]:
+        """
+        Collects the parameters of a token.
+        :param stark_client: The client to call the contracts with.
+        :param token_address: The token address.
+        :return: The type of the token, `collateral` or `debt`, and its parameters.
+        """
+        decimals, token_symbol, underlying_token_address = await asyncio.gather(
+            stark_client.func_call(
+                addr=token_address,
+                selector="decimals",
+                calldata=[],
+            ),
+            get_symbol(token_address=token_address),
+            stark_client.func_call(
+                addr=token_address,
+                selector="underlyingAsset",
+                calldata=[],
+            ),
+        )
+        decimals = int(decimals[0])
+        event, is_interest_bearing = self._infer_token_type(
+            token_symbol=token_symbol
+        )
+        underlying_token_address = add_leading_zeros(
+            hex(underlying_token_address[0])
+        )
+        underlying_token_symbol = await get_symbol(
+            token_address=underlying_token_address
+        )
+
+        if event == "collateral":
+            # The order of the arguments is: `id`, `asset`, `collateralFactor`, ``,
+            # `priceOracle`.
+            collateral_data = await stark_client.func_call(
+                addr=self.CDP_MANAGER_ADDRESS,
+                selector="getCollateralData",
+                calldata=[underlying_token_address],
+            )
+            collateral_factor = collateral_data[2] / 1e18
+
+            # The order of the arguments is:
+            # `protocolFee`, ``, `protocolFeeRecipient`, `liquidatorFeeBeta`, ``,
+            # `liquidatorFeeMax`, ``.
+            liquidation_settings = await stark_client.func_call(
+                addr=self.CDP_MANAGER_ADDRESS,
+                selector="getLiquidationSettings",
+                calldata=[underlying_token_address],
+            )
+            liquidator_fee_beta = liquidation_settings[0] / 1e18
+            liquidator_fee_max = liquidation_settings[3] / 1e18
+            protocol_fee = liquidation_settings[5] / 1e18
+
+            token_parameters = NostraAlphaCollateralTokenParameters(
+                address=token_address,
+                decimals=decimals,
+                symbol=token_symbol,
+                underlying_symbol=underlying_token_symbol,
+                underlying_address=underlying_token_address,
+                is_interest_bearing=is_interest_bearing,
+                collateral_factor=collateral_factor,
+                liquidator_fee_beta=liquidator_fee_beta,
+                liquidator_fee_max=liquidator_fee_max,
+                protocol_fee=protocol_fee,
+            )
+        else:
+            # The order of the arguments is: `id`, `debtTier`, `debtToken`,
+            # `debtFactor`, ``, `priceOracle`.
+            debt_data = await stark_client.func_call(
+                addr=self.CDP_MANAGER_ADDRESS,
+                selector="getDebtData",
+                calldata=[token_address],
+            )
+            debt_factor = debt_data[3] / 1e18
+
+            token_parameters = NostraDebtTokenParameters(
+                address=token_address,
+                decimals=decimals,
+                symbol=token_symbol,
+                underlying_symbol=underlying_token_symbol,
+                underlying_address=underlying_token_address,
+                debt_factor=debt_factor,
+            )
+        return event, token_parameters
+
     def _is_ignored_user(self, user: str) -> bool:
         """
         Checks if the user should be ignored.
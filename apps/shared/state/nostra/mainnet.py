@@ -1,3 +1,4 @@
+import asyncio
 from decimal import Decimal
 
 import copy
@@ -10,6 +11,7 @@ from shared.loan_entity.nostra.mainnet import (
     NOSTRA_MAINNET_INTEREST_RATE_MODEL_ADDRESS,
     NOSTRA_MAINNET_TOKEN_ADDRESSES,
 )
+from shared.batch_call import batched_calls
 from shared.helpers import get_symbol, get_addresses
 from shared.protocol_ids import ProtocolIDs
 from shared.custom_types import (
@@ -56,82 +58,19 @@ class NostraMainnetState(NostraAlphaState):
         """
         Collects the parameters of all tokens used in the Nostra Mainnet protocol.
         """
+        # The reads of all tokens are issued concurrently and batched into a few requests.
         stark_client = StarknetClient()
-        for token_address in self.TOKEN_ADDRESSES:
-            decimals = await stark_client.func_call(
-                addr=token_address,
-                selector="decimals",
-                calldata=[],
-            )
-            decimals = int(decimals[0])
-
-            token_symbol = await get_symbol(token_address=token_address)
-            event, is_interest_bearing = self._infer_token_type(
-                token_symbol=token_symbol
+        async with batched_calls():
+            collected = await asyncio.gather(
+                *(
+                    self._collect_token_parameters(stark_client, token_address)
+                    for token_address in self.TOKEN_ADDRESSES
+                )
             )
+        for token_address, (event, token_parameters) in zip(
+            self.TOKEN_ADDRESSES, collected
+        ):
             self.token_addresses_to_events[token_address] = event
-
-            underlying_token_address = await stark_client.func_call(
-                addr=token_address,
-                selector="underlyingAsset",
-                calldata=[],
-            )
-            underlying_token_address = add_leading_zeros(
-                hex(underlying_token_address[0])
-            )
-            underlying_token_symbol = await get_symbol(
-                token_address=underlying_token_address
-            )
-            if event == "collateral":
-                try:
-                    # The order of the arguments is: `index`, `collateral_factor`, ``,
-                    # `price_oracle`.
-                    collateral_data = await stark_client.func_call(
-                        addr=self.CDP_MANAGER_ADDRESS,
-                        selector="collateral_data",
-                        calldata=[underlying_token_address],
-                    )
-                    collateral_factor = collateral_data[1] / 1e18
-                except starknet_py.net.client_errors.ClientError:
-                    # For some tokens, the client returns `Collateral not registered`.
-                    collateral_factor = 0.0
-
-                # The order of the arguments is: `protocol_fee`, ``, `protocol_fee_recipient`.
-                liquidation_settings = await stark_client.func_call(
-                    addr=self.CDP_MANAGER_ADDRESS,
-                    selector="liquidation_settings",
-                    calldata=[underlying_token_address],
-                )
-                protocol_fee = liquidation_settings[0] / 1e18
-
-                token_parameters = NostraMainnetCollateralTokenParameters(
-                    address=token_address,
-                    decimals=decimals,
-                    symbol=token_symbol,
-                    underlying_symbol=underlying_token_symbol,
-                    underlying_address=underlying_token_address,
-                    is_interest_bearing=is_interest_bearing,
-                    collateral_factor=collateral_factor,
-                    protocol_fee=protocol_fee,
-                )
-            else:
-                # The order of the arguments is: `index`, `debt_tier`, `debt_factor`, ``,
-                # `price_oracle`.
-                debt_data = await stark_client.func_call(
-                    addr=self.CDP_MANAGER_ADDRESS,
-                    selector="debt_data",
-                    calldata=[token_address],
-                )
-                debt_factor = debt_data[2] / 1e18
-
-                token_parameters = NostraDebtTokenParameters(
-                    address=token_address,
-                    decimals=decimals,
-                    symbol=token_symbol,
-                    underlying_symbol=underlying_token_symbol,
-                    underlying_address=underlying_token_address,
-                    debt_factor=debt_factor,
-                )
             getattr(self.token_parameters, event)[token_address] = token_parameters
 
         # Create the mapping between
@@ -156,6 +95,90 @@ class NostraMainnetState(NostraAlphaState):
                     0
                 ]
 
+    async def _collect_token_parameters(
+        self, stark_client: StarknetClient, token_address: str
+    ) -> tuple[str, NostraMainnetCollateralTokenParameters | NostraDebtTokenParameters]:
+        """
+        Collects the parameters of a token.
+        :param stark_client: The client to call the contracts with.
+        :param token_address: The token address.
+        :return: The type of the token, `collateral` or `debt`, and its parameters.
+        """
+        decimals, token_symbol, underlying_token_address = await asyncio.gather(
+            stark_client.func_call(
+                addr=token_address,
+                selector="decimals",
+                calldata=[],
+            ),
+            get_symbol(token_address=token_address),
+            stark_client.func_call(
+                addr=token_address,
+                selector="underlyingAsset",
+                calldata=[],
+            ),
+        )
+        decimals = int(decimals[0])
+        event, is_interest_bearing = self._infer_token_type(
+            token_symbol=token_symbol
+        )
+        underlying_token_address = add_leading_zeros(
+            hex(underlying_token_address[0])
+        )
+        underlying_token_symbol = await get_symbol(
+            token_address=underlying_token_address
+        )
+        if event == "collateral":
+            try:
+                # The order of the arguments is: `index`, `collateral_factor`, ``,
+                # `price_oracle`.
+                collateral_data = await stark_client.func_call(
+                    addr=self.CDP_MANAGER_ADDRESS,
+                    selector="collateral_data",
+                    calldata=[underlying_token_address],
+                )
+                collateral_factor = collateral_data[1] / 1e18
+            except starknet_py.net.client_errors.ClientError:
+                # For some tokens, the client returns `Collateral not registered`.
+                collateral_factor = 0.0
+
+            # The order of the arguments is: `protocol_fee`, ``, `protocol_fee_recipient`.
+            liquidation_settings = await stark_client.func_call(
+                addr=self.CDP_MANAGER_ADDRESS,
+                selector="liquidation_settings",
+                calldata=[underlying_token_address],
+            )
+            protocol_fee = liquidation_settings[0] / 1e18
+
+            token_parameters = NostraMainnetCollateralTokenParameters(
+                address=token_address,
+                decimals=decimals,
+                symbol=token_symbol,
+                underlying_symbol=underlying_token_symbol,
+                underlying_address=underlying_token_address,
+                is_interest_bearing=is_interest_bearing,
+                collateral_factor=collateral_factor,
+                protocol_fee=protocol_fee,
+            )
+        else:
+            # The order of the arguments is: `index`, `debt_tier`, `debt_factor`, ``,
+            # `price_oracle`.
+            debt_data = await stark_client.func_call(
+                addr=self.CDP_MANAGER_ADDRESS,
+                selector="debt_data",
+                calldata=[token_address],
+            )
+            debt_factor = debt_data[2] / 1e18
+
+            token_parameters = NostraDebtTokenParameters(
+                address=token_address,
+                decimals=decimals,
+                symbol=token_symbol,
+                underlying_symbol=underlying_token_symbol,
+                underlying_address=underlying_token_address,
+                debt_factor=debt_factor,
+            )
+        return event, token_parameters
+
     def process_interest_rate_model_event(self, event: pd.Series) -> None:
         """
         Processes the `InterestStateUpdated` event.
@@ -0,0 +1,119 @@
+"""
+Binary snapshots of a `State`, used to resume event processing from a checkpoint instead of
+rebuilding the state from the database.
+"""
+
+import io
+import pickle
+import zlib
+from collections import defaultdict
+from typing import Any, Hashable
+
+from shared.state.state import State
+
+SNAPSHOT_VERSION: int = 1
+# The attributes of a `State` that are restored from a snapshot. Everything else, e.g. callbacks
+# for persisting data, is set up by the constructor of the state the snapshot is loaded into.
+SNAPSHOT_ATTRIBUTES: tuple[str, ...] = (
+    "loan_entities",
+    "interest_rate_models",
+    "debt_interest_rate_models",
+    "token_parameters",
+    "last_block_number",
+    "last_interest_rate_block_number",
+    "portfolio_storage",
+)
+
+
+class TrackedLoanEntities(defaultdict):
+    """
+    Loan entities that remember which users were accessed since the last call of
+    `pop_touched_users`, so that only the loan entities updated by a batch of events
+    have to be persisted.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.touched_users: set[Hashable] = set()
+
+    def __getitem__(self, user: Hashable) -> Any:
+        self.touched_users.add(user)
+        return super().__getitem__(user)
+
+    def pop_touched_users(self) -> set[Hashable]:
+        """
+        Get the users accessed since the last call and reset the tracking.
+        :return: set of users
+        """
+        touched_users, self.touched_users = self.touched_users, set()
+        return touched_users
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """
+    Pickler that supports the `defaultdict` subclasses of the custom types, e.g. `Portfolio` or
+    `InterestRateModels`. Their default factories are lambdas, which cannot be pickled, so they
+    are rebuilt by calling the constructor of the subclass without arguments.
+    """
+
+    def reducer_override(self, obj: Any) -> Any:
+        if isinstance(obj, defaultdict) and type(obj) is not defaultdict:
+            return (
+                type(obj),
+                (),
+                getattr(obj, "__dict__", None) or None,
+                None,
+                iter(obj.items()),
+            )
+        return NotImplemented
+
+
+def dump_state_snapshot(state: State) -> bytes:
+    """
+    Serialize the loan entities, interest rate models, token parameters and last processed
+    blocks of the state into a compressed binary snapshot.
+    :param state: State
+    :return: bytes
+    """
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "protocol": state.PROTOCOL_NAME,
+        **{attribute: getattr(state, attribute) for attribute in SNAPSHOT_ATTRIBUTES},
+    }
+    # Store the loan entities as a plain dict, the default factory is set up by the state.
+    payload["loan_entities"] = dict(state.loan_entities)
+    buffer = io.BytesIO()
+    _SnapshotPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(payload)
+    return zlib.compress(buffer.getvalue())
+
+
+def load_state_snapshot(state: State, snapshot: bytes) -> State:
+    """
+    Restore a snapshot created by `dump_state_snapshot` into the given state.
+    Snapshots are pickled, so only load snapshots created by this application.
+    :param state: A freshly constructed state of the protocol the snapshot was taken of.
+    :param snapshot: bytes
+    :return: The given state.
+    """
+    payload = pickle.loads(zlib.decompress(snapshot))
+    if payload.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Unsupported state snapshot version {payload.get('version')}, "
+            f"expected {SNAPSHOT_VERSION}."
+        )
+    if payload.get("protocol") != state.PROTOCOL_NAME:
+        raise ValueError(
+            f"Cannot load a snapshot of {payload.get('protocol')} "
+            f"into a {state.PROTOCOL_NAME} state."
+        )
+    for attribute in SNAPSHOT_ATTRIBUTES:
+        if attribute == "loan_entities":
+            state.loan_entities.update(payload["loan_entities"])
+        else:
+            setattr(state, attribute, payload.get(attribute))
+    if state.portfolio_storage is not None:
+        # New loan entities have to share the restored array-backed portfolios
+        state.loan_entities.default_factory = (
+            state.portfolio_storage.loan_entity_factory(state.loan_entity_class)
+        )
+    return state
@@ -1,8 +1,9 @@
 import asyncio
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import Optional
+from typing import Any, Callable, Iterable, Optional
 
+import numpy as np
 import pandas as pd
 
 from shared.error_handler import BOT, MessageTemplates, TokenSettingsNotFound
@@ -10,8 +11,12 @@ from shared.loan_entity import LoanEntity
 from shared.custom_types import (
     CollateralAndDebtInterestRateModels,
     CollateralAndDebtTokenParameters,
+    CompactPortfolioStorage,
     InterestRateModels,
+    Prices,
 )
+from shared.state.events import Event
+from shared.state.loan_matrix import LoanMatrix
 
 
 class State(ABC):
@@ -42,6 +47,37 @@ class State(ABC):
         )
         self.last_block_number: int = 0
         self.last_interest_rate_block_number: int = 0
+        self.portfolio_storage: Optional[CompactPortfolioStorage] = None
+
+    def use_compact_storage(self, dtype: Any = object) -> CompactPortfolioStorage:
+        """
+        Move the portfolios of all loan entities, existing and future ones, into shared
+        array-backed columns, see `CompactPortfolioStorage`.
+        :param dtype: `object` to keep the exact `Decimal` amounts, or `np.float64` for
+            states that are only valued.
+        :return: CompactPortfolioStorage
+        """
+        storage = CompactPortfolioStorage(dtype=dtype)
+        for loan_entity in self.loan_entities.values():
+            storage.attach(loan_entity)
+        self.loan_entities.default_factory = storage.loan_entity_factory(
+            self.loan_entity_class
+        )
+        self.portfolio_storage = storage
+        return storage
+
+    def add_loan_entity(self, user: str, loan_entity: LoanEntity) -> LoanEntity:
+        """
+        Add the loan entity of a user, its portfolios are moved into the compact storage if
+        the state uses one.
+        :param user: The user address.
+        :param loan_entity: LoanEntity
+        :return: The added loan entity.
+        """
+        if self.portfolio_storage is not None:
+            self.portfolio_storage.attach(loan_entity)
+        self.loan_entities[user] = loan_entity
+        return loan_entity
 
     @property
     def get_protocol_name(self) -> str:
@@ -52,7 +88,7 @@ class State(ABC):
             )
         return self.PROTOCOL_NAME
 
-    def process_event(self, method_name: str, event: pd.Series) -> None:
+    def process_event(self, method_name: str, event: Event | pd.Series) -> None:
         # TODO: Save the timestamp of each update?
         if event["block_number"] >= self.last_block_number:
             self.last_block_number = event["block_number"]
@@ -64,6 +100,106 @@ class State(ABC):
     def compute_liquidable_debt_at_price(self, *args, **kwargs):
         pass
 
+    def compute_liquidable_debt_curve(
+        self,
+        prices: Prices,
+        collateral_token_underlying_address: str,
+        collateral_token_prices: Iterable[float],
+        debt_token_underlying_address: str,
+        loan_matrix: Optional[LoanMatrix] = None,
+    ) -> np.ndarray:
+        """
+        Compute the liquidable debt for each of the hypothetical collateral token prices.
+        States without a vectorized implementation evaluate `compute_liquidable_debt_at_price`
+        price by price and ignore `loan_matrix`.
+        :param prices: Current prices of the underlying tokens.
+        :param collateral_token_underlying_address: Collateral token address.
+        :param collateral_token_prices: Hypothetical collateral token prices.
+        :param debt_token_underlying_address: Debt token address.
+        :param loan_matrix: Pre-packed loan entities, see `LoanMatrix.from_loan_entities`.
+        :return: np.ndarray of liquidable debt, one value per collateral token price.
+        """
+        return np.array(
+            [
+                float(
+                    self.compute_liquidable_debt_at_price(
+                        prices=prices,
+                        collateral_token_underlying_address=collateral_token_underlying_address,
+                        collateral_token_price=collateral_token_price,
+                        debt_token_underlying_address=debt_token_underlying_address,
+                    )
+                )
+                for collateral_token_price in collateral_token_prices
+            ],
+            dtype=np.float64,
+        )
+
+    def compute_health_factors(
+        self,
+        prices: Prices,
+        risk_adjusted_debt: bool = False,
+        loan_matrix: Optional[LoanMatrix] = None,
+    ) -> np.ndarray:
+        """
+        Compute the health factors of all loan entities at once: the risk-adjusted collateral
+        in USD divided by the debt in USD, valued as in `LoanEntity.compute_collateral_usd`
+        and `LoanEntity.compute_debt_usd`. Tokens without token parameters or whose
+        underlying price is unknown don't contribute.
+        :param prices: Current prices of the underlying tokens.
+        :param risk_adjusted_debt: Whether the debt is divided by the debt factors.
+        :param loan_matrix: Pre-packed loan entities, see `LoanMatrix.from_loan_entities`.
+        :return: np.ndarray of health factors in the order of `loan_matrix.users`,
+        `inf` for loan entities without debt.
+        """
+        if loan_matrix is None:
+            loan_matrix = LoanMatrix.from_loan_entities(self.loan_entities)
+        collateral_usd = loan_matrix.collateral @ self._get_unit_usd_values(
+            tokens=loan_matrix.collateral_tokens,
+            token_parameters=self.token_parameters.collateral,
+            interest_rate_model=self.interest_rate_models.collateral,
+            prices=prices,
+            get_risk_factor=lambda parameters: parameters.collateral_factor,
+        )
+        debt_usd = loan_matrix.debt @ self._get_unit_usd_values(
+            tokens=loan_matrix.debt_tokens,
+            token_parameters=self.token_parameters.debt,
+            interest_rate_model=self.interest_rate_models.debt,
+            prices=prices,
+            get_risk_factor=(
+                (lambda parameters: 1 / parameters.debt_factor)
+                if risk_adjusted_debt
+                else None
+            ),
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(debt_usd == 0, np.inf, collateral_usd / debt_usd)
+
+    @staticmethod
+    def _get_unit_usd_values(
+        tokens: list[str],
+        token_parameters: dict,
+        interest_rate_model: InterestRateModels,
+        prices: Prices,
+        get_risk_factor: Optional[Callable[[Any], float]] = None,
+    ) -> np.ndarray:
+        """
+        Get the USD value of one raw unit of each token, scaled by the token decimals, the
+        interest rate index and, if given, the risk factor of the token parameters.
+        :return: np.ndarray, zero for tokens which can't be valued.
+        """
+        values = np.zeros(len(tokens), dtype=np.float64)
+        for index, token in enumerate(tokens):
+            parameters = token_parameters.get(token)
+            if parameters is None or parameters.underlying_address not in prices:
+                continue
+            values[index] = (
+                float(prices[parameters.underlying_address])
+                * float(interest_rate_model.get(token, 1.0))
+                * (get_risk_factor(parameters) if get_risk_factor else 1.0)
+                / 10**parameters.decimals
+            )
+        return values
+
     # TODO: This method will likely differ across protocols. -> Leave undefined?
     def compute_number_of_active_loan_entities(self) -> int:
         return sum(
@@ -1,12 +1,18 @@
 from shared.state import State
+from shared.state.loan_matrix import LoanMatrix
+import asyncio
+import copy
 import decimal
 import logging
+from decimal import Decimal
+import numpy as np
 import pandas as pd
 from shared import blockchain_call
+from shared.batch_call import batched_calls
 from shared.protocol_ids import ProtocolIDs
 from shared.helpers import add_leading_zeros, get_symbol
 from shared.data_parser.zklend import ZklendDataParser
-from typing import Optional, Protocol
+from typing import Iterable, Optional, Protocol
 from shared.custom_types import (
     Prices,
     ZkLendCollateralTokenParameters,
@@ -384,6 +390,140 @@ class ZkLendState(State):
             )
         return max_liquidated_amount
 
+    def compute_liquidable_debt_curve(
+        self,
+        prices: Prices,
+        collateral_token_underlying_address: str,
+        collateral_token_prices: Iterable[float],
+        debt_token_underlying_address: str,
+        loan_matrix: Optional[LoanMatrix] = None,
+    ) -> np.ndarray:
+        """
+        Vectorized counterpart of `compute_liquidable_debt_at_price` which evaluates the whole
+        grid of hypothetical collateral token prices at once. The loan entities are packed into
+        a `LoanMatrix` (which can be shared across pairs), collateral factors, interest rate
+        indices and prices are applied as per-token vectors and only the loan entities holding
+        both the collateral and the debt token of interest enter the price sweep.
+        :param prices: Current prices of the underlying tokens.
+        :param collateral_token_underlying_address: Collateral token address.
+        :param collateral_token_prices: Hypothetical collateral token prices.
+        :param debt_token_underlying_address: Debt token address.
+        :param loan_matrix: Pre-packed loan entities, see `LoanMatrix.from_loan_entities`.
+        :return: np.ndarray of liquidable debt, one value per collateral token price.
+        """
+        price_grid = np.asarray(list(collateral_token_prices), dtype=np.float64)
+        if loan_matrix is None:
+            loan_matrix = LoanMatrix.from_loan_entities(self.loan_entities)
+
+        # Filter out entities which don't hold the collateral token of interest as collateral
+        # or haven't borrowed the debt token of interest.
+        # TODO: this assumes that the tokens are the underlying addresses
+        eligible = (
+            loan_matrix.collateral_column(collateral_token_underlying_address) > 0
+        ) & (loan_matrix.debt_column(debt_token_underlying_address) > 0)
+        if not price_grid.size or not eligible.any():
+            return np.zeros(price_grid.size, dtype=np.float64)
+        loan_matrix = loan_matrix.select(eligible)
+
+        # Risk-adjusted collateral in USD = static part + swept part * collateral token price.
+        static_collateral_usd, swept_collateral_units = self._split_usd_value(
+            amounts=loan_matrix.collateral,
+            tokens=loan_matrix.collateral_tokens,
+            token_parameters=self.token_parameters.collateral,
+            interest_rate_model=self.interest_rate_models.collateral,
+            prices=prices,
+            swept_underlying_address=collateral_token_underlying_address,
+            risk_adjusted=True,
+        )
+        static_debt_usd, swept_debt_units = self._split_usd_value(
+            amounts=loan_matrix.debt,
+            tokens=loan_matrix.debt_tokens,
+            token_parameters=self.token_parameters.debt,
+            interest_rate_model=self.interest_rate_models.debt,
+            prices=prices,
+            swept_underlying_address=collateral_token_underlying_address,
+            risk_adjusted=False,
+        )
+        risk_adjusted_collateral_usd = (
+            static_collateral_usd[:, None]
+            + swept_collateral_units[:, None] * price_grid[None, :]
+        )
+        debt_usd = (
+            static_debt_usd[:, None] + swept_debt_units[:, None] * price_grid[None, :]
+        )
+
+        if debt_token_underlying_address == collateral_token_underlying_address:
+            debt_token_price = price_grid
+        else:
+            debt_token_price = np.full_like(
+                price_grid, float(prices[debt_token_underlying_address])
+            )
+        collateral_token_parameters = self.token_parameters.collateral[
+            collateral_token_underlying_address
+        ]
+        denominator = debt_token_price * (
+            1
+            - collateral_token_parameters.collateral_factor
+            * (1 + collateral_token_parameters.liquidation_bonus)
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            health_factor = np.where(
+                debt_usd == 0, np.inf, risk_adjusted_collateral_usd / debt_usd
+            )
+            max_debt_to_be_liquidated = (
+                debt_usd - risk_adjusted_collateral_usd
+            ) / denominator[None, :]
+        # TODO: `health_factor` < 0 should not be possible if the data is right.
+        liquidable = (health_factor < 1.0) & (health_factor > 0.0)
+        # The liquidator can't liquidate more debt than what is available.
+        debt_to_be_liquidated = np.minimum(
+            loan_matrix.debt_column(debt_token_underlying_address)[:, None],
+            max_debt_to_be_liquidated,
+        )
+        return np.where(liquidable, debt_to_be_liquidated, 0.0).sum(axis=0)
+
+    @staticmethod
+    def _split_usd_value(
+        amounts: np.ndarray,
+        tokens: list[str],
+        token_parameters: dict,
+        interest_rate_model: dict,
+        prices: Prices,
+        swept_underlying_address: str,
+        risk_adjusted: bool,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Split the USD value of packed holdings into the part which doesn't depend on the price
+        of the swept token and the amount of the swept token (already scaled by decimals,
+        collateral factors and interest rate indices) which is to be multiplied by its price.
+        Tokens whose underlying price is unknown don't contribute, same as in
+        `LoanEntity.compute_collateral_usd` and `LoanEntity.compute_debt_usd`.
+        :return: tuple of the static USD value and the swept token units per loan entity.
+        """
+        scales = np.zeros(len(tokens), dtype=np.float64)
+        static_prices = np.zeros(len(tokens), dtype=np.float64)
+        swept = np.zeros(len(tokens), dtype=bool)
+        for index, token in enumerate(tokens):
+            parameters = token_parameters.get(token)
+            if parameters is None:
+                continue
+            underlying_address = parameters.underlying_address
+            if underlying_address == swept_underlying_address:
+                swept[index] = True
+            elif underlying_address not in prices:
+                continue
+            else:
+                static_prices[index] = float(prices[underlying_address])
+            scales[index] = (
+                float(interest_rate_model.get(token, 1.0))
+                * (parameters.collateral_factor if risk_adjusted else 1.0)
+                / 10**parameters.decimals
+            )
+        static_usd = amounts[:, ~swept] @ (scales * static_prices)[~swept]
+        swept_units = amounts[:, swept] @ scales[swept]
+        return static_usd, swept_units
+
     async def collect_token_parameters(self) -> None:
         """Collects and sets token parameters for collateral and debt
         tokens under zkLend, including collateral factors, liquidation bonuses, and debt factors.
@@ -401,63 +541,97 @@ class ZkLendState(State):
         logging.info(f"Collecting token parameters for debt tokens: {debt_tokens}")
         # Get parameters for each collateral and debt token. Under zkLend,
         # the collateral token in the events data is
-        # the underlying token directly.
-        for underlying_collateral_token_address in collateral_tokens:
-            underlying_collateral_token_symbol = await get_symbol(
-                token_address=underlying_collateral_token_address
-            )
-            # The order of the arguments is:
-            # `enabled`, `decimals`, `z_token_address`, `interest_rate_model`,
-            # `collateral_factor`, `borrow_factor`,
-            # `reserve_factor`, `last_update_timestamp`, `lending_accumulator`,
-            # `debt_accumulator`, `current_lending_rate`, `current_borrowing_rate`,
-            # `raw_total_debt`, `flash_loan_fee`,
-            # `liquidation_bonus`, `debt_limit`.
-            reserve_data = await blockchain_call.func_call(
-                addr=ZKLEND_MARKET,
-                selector="get_reserve_data",
-                calldata=[underlying_collateral_token_address],
-            )
-            collateral_token_address = add_leading_zeros(hex(reserve_data[2]))
-            collateral_token_symbol = await get_symbol(
-                token_address=collateral_token_address
+        # the underlying token directly. The reads of all tokens are issued
+        # concurrently and batched into a few requests.
+        async with batched_calls():
+            collateral_token_parameters = await asyncio.gather(
+                *(
+                    self._collect_collateral_token_parameters(address)
+                    for address in collateral_tokens
+                )
             )
-            self.token_parameters.collateral[underlying_collateral_token_address] = (
-                ZkLendCollateralTokenParameters(
-                    address=collateral_token_address,
-                    decimals=int(reserve_data[1]),
-                    symbol=collateral_token_symbol,
-                    underlying_symbol=underlying_collateral_token_symbol,
-                    underlying_address=underlying_collateral_token_address,
-                    collateral_factor=reserve_data[4] / 1e27,
-                    liquidation_bonus=reserve_data[14] / 1e27,
+            debt_token_parameters = await asyncio.gather(
+                *(
+                    self._collect_debt_token_parameters(address)
+                    for address in debt_tokens
                 )
             )
-        for underlying_debt_token_address in debt_tokens:
-            underlying_debt_token_symbol = await get_symbol(
-                token_address=underlying_debt_token_address
+        for token_parameters in collateral_token_parameters:
+            self.token_parameters.collateral[token_parameters.underlying_address] = (
+                token_parameters
+            )
+        for token_parameters in debt_token_parameters:
+            self.token_parameters.debt[token_parameters.underlying_address] = (
+                token_parameters
             )
-            # The order of the arguments is: `enabled`, `decimals`,
-            # `z_token_address`, `interest_rate_model`,
-            # `collateral_factor`, `borrow_factor`, `reserve_factor`,
-            # `last_update_timestamp`, `lending_accumulator`,
-            # `debt_accumulator`, `current_lending_rate`, `current_borrowing_rate`,
-            # `raw_total_debt`, `flash_loan_fee`,
-            # `liquidation_bonus`, `debt_limit`.
-            reserve_data = await blockchain_call.func_call(
+
+    @staticmethod
+    async def _get_reserve_data(
+        underlying_token_address: str,
+    ) -> tuple[list[int], str, str]:
+        """
+        Get the reserve data of the token together with the symbols of the token and of its
+        zToken.
+        :param underlying_token_address: The underlying token address.
+        :return: (reserve data, underlying token symbol, zToken symbol)
+        """
+        # The order of the arguments is:
+        # `enabled`, `decimals`, `z_token_address`, `interest_rate_model`,
+        # `collateral_factor`, `borrow_factor`,
+        # `reserve_factor`, `last_update_timestamp`, `lending_accumulator`,
+        # `debt_accumulator`, `current_lending_rate`, `current_borrowing_rate`,
+        # `raw_total_debt`, `flash_loan_fee`,
+        # `liquidation_bonus`, `debt_limit`.
+        underlying_token_symbol, reserve_data = await asyncio.gather(
+            get_symbol(token_address=underlying_token_address),
+            blockchain_call.func_call(
                 addr=ZKLEND_MARKET,
                 selector="get_reserve_data",
-                calldata=[underlying_debt_token_address],
-            )
-            debt_token_address = add_leading_zeros(hex(reserve_data[2]))
-            debt_token_symbol = await get_symbol(token_address=debt_token_address)
-            self.token_parameters.debt[underlying_debt_token_address] = (
-                ZkLendDebtTokenParameters(
-                    address=debt_token_address,
-                    decimals=int(reserve_data[1]),
-                    symbol=debt_token_symbol,
-                    underlying_symbol=underlying_debt_token_symbol,
-                    underlying_address=underlying_debt_token_address,
-                    debt_factor=reserve_data[5] / 1e27,
-                )
-            )
+                calldata=[underlying_token_address],
+            ),
+        )
+        token_symbol = await get_symbol(
+            token_address=add_leading_zeros(hex(reserve_data[2]))
+        )
+        return reserve_data, underlying_token_symbol, token_symbol
+
+    async def _collect_collateral_token_parameters(
+        self, underlying_collateral_token_address: str
+    ) -> ZkLendCollateralTokenParameters:
+        """
+        Collects the parameters of a collateral token.
+        :param underlying_collateral_token_address: The underlying token address.
+        :return: ZkLendCollateralTokenParameters
+        """
+        reserve_data, underlying_symbol, symbol = await self._get_reserve_data(
+            underlying_collateral_token_address
+        )
+        return ZkLendCollateralTokenParameters(
+            address=add_leading_zeros(hex(reserve_data[2])),
+            decimals=int(reserve_data[1]),
+            symbol=symbol,
+            underlying_symbol=underlying_symbol,
+            underlying_address=underlying_collateral_token_address,
+            collateral_factor=reserve_data[4] / 1e27,
+            liquidation_bonus=reserve_data[14] / 1e27,
+        )
+
+    async def _collect_debt_token_parameters(
+        self, underlying_debt_token_address: str
+    ) -> ZkLendDebtTokenParameters:
+        """
+        Collects the parameters of a debt token.
+        :param underlying_debt_token_address: The underlying token address.
+        :return: ZkLendDebtTokenParameters
+        """
+        reserve_data, underlying_symbol, symbol = await self._get_reserve_data(
+            underlying_debt_token_address
+        )
+        return ZkLendDebtTokenParameters(
+            address=add_leading_zeros(hex(reserve_data[2])),
+            decimals=int(reserve_data[1]),
+            symbol=symbol,
+            underlying_symbol=underlying_symbol,
+            underlying_address=underlying_debt_token_address,
+            debt_factor=reserve_data[5] / 1e27,
+        )
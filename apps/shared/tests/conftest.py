@@ -0,0 +1,22 @@
+"""
+This module contains the fixtures for the tests.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from shared.call_cache import call_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_call_cache() -> None:
+    """
+    Keep the contract call cache in-process and empty, so that the tests don't share
+    cached contract reads or reach Redis.
+    :return: None
+    """
+    call_cache.clear()
+    with patch.object(call_cache, "redis_client", None):
+        yield
+    call_cache.clear()
@@ -0,0 +1,148 @@
+"""
+Tests for the batching of Starknet contract reads.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiohttp import web
+from starknet_py.hash.selector import get_selector_from_name
+from starknet_py.net.client_errors import ClientError
+
+from shared import blockchain_call
+from shared.batch_call import (
+    BatchCallClient,
+    batched_calls,
+    gather_calls,
+    get_batch_client,
+)
+
+
+def _respond(payload: list[dict]) -> list[dict]:
+    """Answer every call with its calldata, or with an error for `fail` calls."""
+    responses = []
+    for request in reversed(payload):
+        call = request["params"]["request"]
+        if call["entry_point_selector"] == hex(get_selector_from_name("fail")):
+            responses.append(
+                {"id": request["id"], "error": {"code": 40, "message": "fail"}}
+            )
+        else:
+            responses.append({"id": request["id"], "result": call["calldata"]})
+    return responses
+
+
+@pytest.fixture
+def mock_post():
+    with patch.object(
+        BatchCallClient, "_post", AsyncMock(side_effect=_respond)
+    ) as mock_post:
+        yield mock_post
+
+
+def test_concurrent_calls_are_batched(mock_post):
+    """Concurrent calls are sent in one request and get their own results."""
+
+    async def run():
+        async with BatchCallClient() as client:
+            return await asyncio.gather(
+                *(
+                    client.call(addr=1, selector="balanceOf", calldata=[i])
+                    for i in range(5)
+                )
+            )
+
+    results = asyncio.run(run())
+
+    assert results == [[0], [1], [2], [3], [4]]
+    mock_post.assert_awaited_once()
+    payload = mock_post.await_args.args[0]
+    assert [request["method"] for request in payload] == ["starknet_call"] * 5
+    assert payload[0]["params"]["request"]["contract_address"] == "0x1"
+
+
+def test_max_batch_size(mock_post):
+    """Batches are split at `max_batch_size` calls."""
+
+    async def run():
+        async with BatchCallClient(max_batch_size=2) as client:
+            return await client.gather(("0x2", "decimals", [i]) for i in range(5))
+
+    assert asyncio.run(run()) == [[0], [1], [2], [3], [4]]
+    assert [len(call.args[0]) for call in mock_post.await_args_list] == [2, 2, 1]
+
+
+def test_call_error(mock_post):
+    """An error of one call is raised for that call only."""
+
+    async def run():
+        async with BatchCallClient() as client:
+            return await asyncio.gather(
+                client.call(addr=1, selector="fail"),
+                client.call(addr=1, selector="symbol", calldata=["0xa"]),
+                return_exceptions=True,
+            )
+
+    error, result = asyncio.run(run())
+
+    assert isinstance(error, ClientError)
+    assert error.code == "40"
+    assert result == [10]
+
+
+def test_func_call_is_routed_through_batched_calls(mock_post):
+    """`func_call` uses the batching client of an active `batched_calls` context."""
+
+    async def run():
+        async with batched_calls() as client:
+            async with batched_calls() as nested_client:
+                assert nested_client is client
+            results = await asyncio.gather(
+                blockchain_call.func_call(1, "balanceOf", [7]),
+                blockchain_call.func_call("0x1", "balanceOf", ["0x8"]),
+            )
+        assert get_batch_client() is None
+        return results
+
+    assert asyncio.run(run()) == [[7], [8]]
+    mock_post.assert_awaited_once()
+
+
+def test_gather_calls(mock_post):
+    """`gather_calls` returns the results in the order of the calls."""
+    results = asyncio.run(gather_calls([(1, "a", [3]), (2, "b", [1]), (3, "c", [])]))
+
+    assert results == [[3], [1], []]
+
+
+def test_batch_request_over_http():
+    """The batch is posted as a JSON-RPC array, failed requests are retried."""
+    requests = []
+
+    async def handle(request: web.Request) -> web.Response:
+        requests.append(await request.json())
+        if len(requests) == 1:
+            return web.Response(status=503)
+        return web.json_response(_respond(requests[-1]))
+
+    async def run():
+        app = web.Application()
+        app.router.add_post("/", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            with patch("shared.batch_call.asyncio.sleep", AsyncMock()):
+                async with BatchCallClient(
+                    node_url=f"http://127.0.0.1:{port}/"
+                ) as client:
+                    return await client.gather([(1, "a", [5]), (2, "b", ["0x6"])])
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == [[5], [6]]
+    assert len(requests) == 2
+    assert requests[1][1]["params"]["request"]["calldata"] == ["0x6"]
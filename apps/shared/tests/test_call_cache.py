@@ -0,0 +1,169 @@
+"""
+Tests for the read-through cache of contract reads.
+"""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import redis
+
+from shared import blockchain_call
+from shared.call_cache import BLOCK_TTL, ContractCallCache
+
+
+class FakeRedis:
+    """Stores the values like Redis, without expiring them."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+
+def _read(cache, selector, calldata=(), result=(1,), block_number=None):
+    call = AsyncMock(return_value=list(result))
+    value = asyncio.run(
+        cache.get_or_call(1, selector, list(calldata), call, block_number=block_number)
+    )
+    return value, call.await_count
+
+
+def test_immutable_reads_are_cached_forever():
+    """Reads of immutable values are shared by every block and stored without TTL."""
+    fake_redis = FakeRedis()
+    cache = ContractCallCache(fake_redis)
+
+    assert _read(cache, "decimals", result=[18]) == ([18], 1)
+    assert _read(cache, "decimals", result=[6], block_number=100) == ([18], 0)
+    assert fake_redis.ttls == {"call_cache:0x1:decimals::any": None}
+
+
+def test_uncached_selectors():
+    """Reads of selectors without a policy, e.g. positions, always reach the node."""
+    cache = ContractCallCache(None)
+
+    assert _read(cache, "position", [1, 2]) == ([1], 1)
+    assert _read(cache, "position", [1, 2]) == ([1], 1)
+
+
+def test_state_reads_expire():
+    """Reads of state expire after the TTL of the selector, or are kept per block."""
+    fake_redis = FakeRedis()
+    cache = ContractCallCache(fake_redis)
+
+    with patch("shared.call_cache.time.monotonic", return_value=0):
+        assert _read(cache, "balanceOf", [7], result=[5]) == ([5], 1)
+        assert _read(cache, "balanceOf", ["0x7"], result=[6]) == ([5], 0)
+        assert _read(cache, "balanceOf", [7], result=[4], block_number=10) == ([4], 1)
+    # Expired in the LRU, the Redis entry is expired by Redis itself
+    fake_redis.values.clear()
+    with patch("shared.call_cache.time.monotonic", return_value=31):
+        assert _read(cache, "balanceOf", [7], result=[6]) == ([6], 1)
+        assert _read(cache, "balanceOf", [7], result=[0], block_number=10) == ([4], 0)
+
+    assert fake_redis.ttls["call_cache:0x1:balanceOf:0x7:latest"] == 30
+    assert fake_redis.ttls["call_cache:0x1:balanceOf:0x7:10"] == BLOCK_TTL
+
+
+def test_reads_are_shared_through_redis():
+    """A read cached by one worker is served to another one from Redis."""
+    fake_redis = FakeRedis()
+
+    assert _read(ContractCallCache(fake_redis), "symbol", result=[123]) == ([123], 1)
+    other_worker = ContractCallCache(fake_redis)
+    assert _read(other_worker, "symbol", result=[0]) == ([123], 0)
+    assert other_worker.hits == 1
+
+
+def test_redis_failure():
+    """Reads are cached in-process only while Redis can't be reached."""
+    failing_redis = MagicMock()
+    failing_redis.get.side_effect = redis.ConnectionError("unreachable")
+    cache = ContractCallCache(failing_redis)
+
+    assert _read(cache, "symbol", result=[1]) == ([1], 1)
+    assert _read(cache, "symbol", [2], result=[2]) == ([2], 1)
+    assert _read(cache, "symbol", result=[0]) == ([1], 0)
+    failing_redis.get.assert_called_once()
+    failing_redis.set.assert_not_called()
+
+
+def test_lru_eviction():
+    """The least recently used reads are evicted from the in-process cache."""
+    cache = ContractCallCache(None, max_size=2)
+
+    _read(cache, "symbol", [1])
+    _read(cache, "symbol", [2])
+    _read(cache, "symbol", [1])
+    _read(cache, "symbol", [3])
+
+    assert _read(cache, "symbol", [1]) == ([1], 0)
+    assert _read(cache, "symbol", [2]) == ([1], 1)
+
+
+def test_concurrent_reads_are_made_once():
+    """Concurrent identical reads wait for the result of the first one."""
+    cache = ContractCallCache(None)
+
+    async def call():
+        await asyncio.sleep(0)
+        return [42]
+
+    mock_call = AsyncMock(side_effect=call)
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_call(1, "decimals", [], mock_call) for _ in range(3))
+        )
+
+    assert asyncio.run(run()) == [[42], [42], [42]]
+    assert mock_call.await_count == 1
+
+
+def test_reads_in_flight_are_not_shared_across_event_loops():
+    """A read of another event loop is not awaited, its future is bound to that loop."""
+    cache = ContractCallCache(None)
+    started, release = threading.Event(), threading.Event()
+
+    async def slow_call():
+        started.set()
+        await asyncio.to_thread(release.wait)
+        return [1]
+
+    other_loop = threading.Thread(
+        target=lambda: asyncio.run(cache.get_or_call(1, "decimals", [], slow_call))
+    )
+    other_loop.start()
+    started.wait()
+    try:
+        value = asyncio.run(
+            cache.get_or_call(1, "decimals", [], AsyncMock(return_value=[2]))
+        )
+    finally:
+        release.set()
+        other_loop.join()
+
+    assert value == [2]
+
+
+def test_func_call_is_cached():
+    """`blockchain_call.func_call` reaches the node once for an immutable value."""
+    with patch.object(
+        blockchain_call.NET, "call_contract", AsyncMock(return_value=[18])
+    ) as call_contract:
+
+        async def run():
+            return [
+                await blockchain_call.func_call(5, "decimals", []) for _ in range(2)
+            ]
+
+        assert asyncio.run(run()) == [[18], [18]]
+
+    call_contract.assert_awaited_once()
@@ -0,0 +1,199 @@
+"""
+Tests for the array-backed compact portfolio storage.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from shared.custom_types import (
+    CompactPortfolio,
+    CompactPortfolioStorage,
+    Portfolio,
+    PortfolioStore,
+    TokenValues,
+    ZkLendCollateralTokenParameters,
+)
+from shared.loan_entity import ZkLendLoanEntity
+from shared.state import LoanMatrix, ZkLendState
+from shared.state.snapshots import dump_state_snapshot, load_state_snapshot
+
+ETH = "0x049d36570d4e46f48e99674bd3fcc84644ddd6b96f7c741b1562b82f9e004dc7"
+USDC = "0x053c91253bc9682c04929ca02ed00b3e423f6710d2ee7e0d5ebb06f3ecf368a8"
+STRK = "0x04718f5a0fc34cc1af16a1cdee98ffb20c31f5cd61d6ab07201858f4287c938d"
+
+
+@pytest.fixture(params=[np.float64, object], ids=["float64", "decimal"])
+def portfolio(request) -> CompactPortfolio:
+    return PortfolioStore(dtype=request.param, capacity=1).new_portfolio()
+
+
+def test_compact_portfolio_behaves_like_portfolio(portfolio):
+    """Reading a missing token adds it with a zero amount, like `Portfolio`."""
+    assert portfolio[ETH] == Decimal("0")
+    assert isinstance(portfolio[ETH], Decimal)
+    assert ETH in portfolio
+    assert portfolio.get(USDC) is None
+    assert USDC not in portfolio
+
+    portfolio.increase_value(token=USDC, value=Decimal("2e9"))
+    portfolio.increase_value(token=USDC, value=Decimal("1e9"))
+    assert portfolio[USDC] == Decimal("3e9")
+    # Amounts below the rounding error of the token are zeroed
+    portfolio.set_value(token=USDC, value=Decimal("10"))
+    assert portfolio[USDC] == Decimal("0")
+
+    assert sorted(portfolio) == sorted([ETH, USDC])
+    assert len(portfolio) == 2
+    del portfolio[ETH]
+    assert list(portfolio) == [USDC]
+
+
+def test_compact_portfolio_values(portfolio):
+    """`values` works both as `dict.values` and as `TokenValues.values`."""
+    portfolio.values = {ETH: Decimal("5e18"), USDC: Decimal("1e9")}
+
+    assert sorted(portfolio.values()) == [Decimal("1e9"), Decimal("5e18")]
+    assert dict(portfolio.values.items()) == {
+        ETH: Decimal("5e18"),
+        USDC: Decimal("1e9"),
+    }
+
+    portfolio.values = None
+    assert len(portfolio) == 0
+
+
+def test_compact_portfolio_add(portfolio):
+    """Adding portfolios yields a regular `Portfolio`."""
+    portfolio[ETH] = Decimal("1e18")
+    other = Portfolio(**{ETH: Decimal("2e18"), STRK: Decimal("7e18")})
+
+    result = portfolio + other
+
+    assert isinstance(result, Portfolio)
+    assert result == {ETH: Decimal("3e18"), STRK: Decimal("7e18")}
+
+
+def test_portfolio_store_grows():
+    """Rows and token columns are added on demand without losing data."""
+    store = PortfolioStore(capacity=1)
+    portfolios = [store.new_portfolio() for _ in range(5)]
+    for index, portfolio in enumerate(portfolios):
+        portfolio[f"0x{index}"] = Decimal(index + 1) * Decimal("1e13")
+
+    assert store.data.shape[0] >= 5
+    assert [portfolio[f"0x{index}"] for index, portfolio in enumerate(portfolios)] == [
+        Decimal(index + 1) * Decimal("1e13") for index in range(5)
+    ]
+    assert list(portfolios[0]) == ["0x0"]
+
+
+@pytest.fixture
+def zklend_state() -> ZkLendState:
+    state = ZkLendState()
+    state.loan_entities["0x1"].collateral.increase_value(ETH, Decimal("2e18"))
+    state.loan_entities["0x1"].debt.increase_value(USDC, Decimal("2500e6"))
+    state.loan_entities["0x2"].collateral.increase_value(STRK, Decimal("1000e18"))
+    state.loan_entities["0x2"].deposit.increase_value(STRK, Decimal("1500e18"))
+    state.loan_entities["0x3"].debt.increase_value(STRK, Decimal("10e18"))
+    return state
+
+
+def test_use_compact_storage(zklend_state):
+    """Existing and new loan entities share the array-backed portfolios."""
+    storage = zklend_state.use_compact_storage()
+
+    assert isinstance(storage, CompactPortfolioStorage)
+    assert set(storage.stores) == {"collateral", "debt", "deposit"}
+    loan_entity = zklend_state.loan_entities["0x2"]
+    assert isinstance(loan_entity.collateral, CompactPortfolio)
+    assert loan_entity.collateral[STRK] == Decimal("1000e18")
+    assert loan_entity.deposit[STRK] == Decimal("1500e18")
+
+    new_loan_entity = zklend_state.loan_entities["0x4"]
+    assert isinstance(new_loan_entity, ZkLendLoanEntity)
+    assert new_loan_entity.collateral.store is storage.stores["collateral"]
+
+
+def test_compact_loan_entity_valuation(zklend_state):
+    """The valuation methods of loan entities work on compact portfolios."""
+    zklend_state.use_compact_storage()
+    token_parameters = zklend_state.token_parameters.collateral
+    token_parameters[ETH] = ZkLendCollateralTokenParameters(
+        address=ETH,
+        decimals=18,
+        symbol="zETH",
+        underlying_symbol="ETH",
+        underlying_address=ETH,
+        collateral_factor=0.8,
+        liquidation_bonus=0.1,
+    )
+
+    collateral_usd = zklend_state.loan_entities["0x1"].compute_collateral_usd(
+        risk_adjusted=True,
+        collateral_token_parameters=token_parameters,
+        collateral_interest_rate_model=zklend_state.interest_rate_models.collateral,
+        prices=TokenValues(values={ETH: 3000.0}).values,
+    )
+
+    assert float(collateral_usd) == pytest.approx(2 * 3000.0 * 0.8)
+
+
+def test_loan_matrix_from_compact_portfolios(zklend_state):
+    """The columnar fast path packs the same matrix as the generic one."""
+    expected = LoanMatrix.from_loan_entities(zklend_state.loan_entities)
+    zklend_state.use_compact_storage()
+
+    loan_matrix = LoanMatrix.from_loan_entities(zklend_state.loan_entities)
+
+    assert loan_matrix.users == expected.users
+    assert loan_matrix.collateral_tokens == expected.collateral_tokens
+    assert loan_matrix.debt_tokens == expected.debt_tokens
+    np.testing.assert_allclose(loan_matrix.collateral, expected.collateral)
+    np.testing.assert_allclose(loan_matrix.debt, expected.debt)
+
+
+def test_compact_storage_survives_snapshots(zklend_state):
+    """Snapshots of a compact state restore the shared storage."""
+    zklend_state.use_compact_storage()
+
+    restored = load_state_snapshot(ZkLendState(), dump_state_snapshot(zklend_state))
+
+    assert restored.loan_entities["0x1"].debt[USDC] == Decimal("2500e6")
+    new_loan_entity = restored.loan_entities["0x5"]
+    assert (
+        new_loan_entity.debt.store
+        is restored.loan_entities["0x1"].debt.store
+        is restored.portfolio_storage.stores["debt"]
+    )
+
+
+def test_compact_storage_keeps_exact_amounts_by_default():
+    """Wei-scale amounts above 2**53 are not rounded unless float64 is opted into."""
+    amount = Decimal(2**53 + 1)
+
+    exact = CompactPortfolioStorage().get_store("debt").new_portfolio({ETH: amount})
+    rounded = (
+        CompactPortfolioStorage(dtype=np.float64)
+        .get_store("debt")
+        .new_portfolio({ETH: amount})
+    )
+
+    assert exact[ETH] == amount
+    assert rounded[ETH] != amount
+
+
+def test_add_loan_entity_attaches_token_values(zklend_state):
+    """Loan entities loaded from the DB are moved into the compact storage."""
+    storage = zklend_state.use_compact_storage()
+    loan_entity = ZkLendLoanEntity()
+    loan_entity.collateral = TokenValues(values={ETH: 1e18})
+    loan_entity.debt = TokenValues(values={USDC: "1200000000"})
+
+    zklend_state.add_loan_entity("0x6", loan_entity)
+
+    assert zklend_state.loan_entities["0x6"] is loan_entity
+    assert loan_entity.collateral.store is storage.stores["collateral"]
+    assert loan_entity.collateral[ETH] == Decimal("1e18")
+    assert loan_entity.debt.values[USDC] == Decimal("1200000000")
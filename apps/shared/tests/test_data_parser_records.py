@@ -0,0 +1,92 @@
+"""
+Tests for the fast-path parsing of event data into records.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from shared.data_parser.benchmark import SAMPLE_PAGE, benchmark_page, parse_page
+from shared.data_parser.nostra import NostraDataParser
+from shared.data_parser.records import (
+    DEPOSIT_LAYOUT,
+    INTEREST_RATE_MODEL_LAYOUT,
+    DepositEventRecord,
+)
+from shared.data_parser.serializers import DepositEventData
+from shared.data_parser.zklend import ZklendDataParser
+
+USER = "0x1cfa080d4bbddc206637afad05e5e1abb04da69630f40b2fd9dc578e618ec78"
+TOKEN = "0x585c32b625999e6e5e78645ff8df7a9001cf5cf3eb6b80ccdd16cb64bd3a34"
+
+
+def test_records_match_serializers():
+    """The fast path yields the same values as the pydantic serializers."""
+    records = parse_page(SAMPLE_PAGE, fast=True)
+    models = parse_page(SAMPLE_PAGE, fast=False)
+
+    assert len(records) == len(SAMPLE_PAGE)
+    for record, model in zip(records, models):
+        assert record._asdict() == {
+            field: getattr(model, field) for field in record._fields
+        }
+
+
+def test_parse_deposit_event():
+    """Addresses get leading zeros and amounts are converted to `Decimal`."""
+    record = ZklendDataParser.parse_deposit_event([USER, TOKEN, "0x10"])
+
+    assert isinstance(record, DepositEventRecord)
+    assert record.user == "0x0" + USER[2:]
+    assert record.token == "0x00" + TOKEN[2:]
+    assert record.face_amount == Decimal(16)
+    assert not hasattr(record, "__dict__")
+
+
+def test_parse_interest_rate_model_event():
+    """Fields are read from their positions in the event data."""
+    event_data = [TOKEN, "0x1", "0x0", "0x2", "0x0", "0xde0b6b3a7640000", "0x0", "0x3"]
+
+    record = NostraDataParser.parse_interest_rate_model_event(event_data)
+
+    assert record.debt_token == "0x00" + TOKEN[2:]
+    assert record.lending_index == Decimal(10**18)
+    assert record.borrow_index == Decimal(3)
+    assert INTEREST_RATE_MODEL_LAYOUT.indices["borrow_index"] == 7
+
+
+@pytest.mark.parametrize(
+    "event_data, field",
+    [
+        (["1234", TOKEN, "0x10"], "user"),
+        ([USER, TOKEN, "0xnot-hex"], "face_amount"),
+        ([USER, None, "0x10"], "token"),
+    ],
+)
+def test_invalid_event_data(event_data, field):
+    """Invalid fields raise a `ValueError` naming the field, like the serializers."""
+    with pytest.raises(ValueError, match=field):
+        DEPOSIT_LAYOUT.parse(event_data)
+    with pytest.raises(ValueError, match=field):
+        DEPOSIT_LAYOUT.parse_many([[USER, TOKEN, "0x1"], event_data])
+
+
+def test_parse_many_and_to_model():
+    """Records are decoded in bulk and convert to the serializers at API boundaries."""
+    records = DEPOSIT_LAYOUT.parse_many(
+        ([USER, TOKEN, hex(amount)] for amount in range(3))
+    )
+
+    assert [record.face_amount for record in records] == [Decimal(0), 1, 2]
+    model = DEPOSIT_LAYOUT.to_model(records[2])
+    assert isinstance(model, DepositEventData)
+    assert model == DEPOSIT_LAYOUT.parse_model([USER, TOKEN, "0x2"])
+
+
+def test_benchmark_page():
+    """The benchmark parses every event of the page with both paths."""
+    result = benchmark_page(SAMPLE_PAGE * 2, repeat=1)
+
+    assert result["events"] == 2 * len(SAMPLE_PAGE)
+    assert result["pydantic_seconds"] > 0
+    assert result["fast_seconds"] > 0
@@ -0,0 +1,186 @@
+"""
+Tests for the shared gateway to the Starknet RPC nodes.
+"""
+
+import asyncio
+import gc
+import time
+import warnings
+
+from aiohttp import web
+
+from shared import rpc_gateway
+from shared.rpc_gateway import (
+    GatewayRpcClient,
+    Priority,
+    RpcGateway,
+    TokenBucket,
+    get_rpc_gateway,
+    rpc_priority,
+    run_with_rpc_sessions,
+)
+
+BLOCK_NUMBER_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 0,
+    "method": "starknet_blockNumber",
+    "params": [],
+}
+
+
+async def _start_node(handle) -> tuple[web.AppRunner, str]:
+    app = web.Application()
+    app.router.add_post("/", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/"
+
+
+def test_token_bucket_serves_higher_priority_first():
+    """Waiting dashboard requests take the tokens before the waiting backfill requests."""
+    order = []
+
+    async def request(bucket: TokenBucket, name: str, priority: Priority) -> None:
+        await bucket.acquire(priority)
+        order.append(name)
+
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=1)
+        await bucket.acquire()
+        await asyncio.gather(
+            request(bucket, "backfill 1", Priority.BACKFILL),
+            request(bucket, "backfill 2", Priority.BACKFILL),
+            request(bucket, "dashboard", Priority.DASHBOARD),
+        )
+
+    asyncio.run(run())
+
+    assert order[0] == "dashboard"
+
+
+def test_token_bucket_pause_does_not_block_the_event_loop():
+    """A paused bucket makes the requests wait without blocking other tasks."""
+    ticks = []
+
+    async def tick() -> None:
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def run() -> float:
+        bucket = TokenBucket(rate=100, capacity=1)
+        bucket.pause(0.2)
+        start = time.monotonic()
+        await asyncio.gather(bucket.acquire(), tick())
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.2
+    assert len(ticks) == 5
+
+
+def test_failover_on_rate_limit():
+    """A rate-limited node is paused and the request is sent to the next node."""
+    requests = {"first": 0, "second": 0}
+
+    async def rate_limited(request: web.Request) -> web.Response:
+        requests["first"] += 1
+        return web.Response(status=429, headers={"Retry-After": "30"})
+
+    async def healthy(request: web.Request) -> web.Response:
+        requests["second"] += 1
+        payload = await request.json()
+        return web.json_response(
+            {"jsonrpc": "2.0", "id": payload["id"], "result": 1000}
+        )
+
+    async def run():
+        first, first_url = await _start_node(rate_limited)
+        second, second_url = await _start_node(healthy)
+        gateway = RpcGateway([first_url, second_url])
+        try:
+            start = time.monotonic()
+            result = await gateway.post(BLOCK_NUMBER_REQUEST)
+            # The paused node is skipped without waiting
+            result_again = await gateway.post(BLOCK_NUMBER_REQUEST)
+            elapsed = time.monotonic() - start
+            paused_for = gateway.endpoints[0].limiter.paused_for
+        finally:
+            await gateway.close()
+            await first.cleanup()
+            await second.cleanup()
+        return result, result_again, elapsed, paused_for
+
+    result, result_again, elapsed, paused_for = asyncio.run(run())
+
+    assert result["result"] == result_again["result"] == 1000
+    assert requests == {"first": 1, "second": 2}
+    assert elapsed < 5
+    assert paused_for > 25
+
+
+def test_full_node_client_through_gateway():
+    """The requests of a FullNodeClient share the session and priority of the gateway."""
+    priorities = []
+
+    async def healthy(request: web.Request) -> web.Response:
+        payload = await request.json()
+        return web.json_response(
+            {"jsonrpc": "2.0", "id": payload["id"], "result": 1234}
+        )
+
+    async def run():
+        runner, url = await _start_node(healthy)
+        gateway = RpcGateway([url])
+        limiter = gateway.endpoints[0].limiter
+        acquire = limiter.acquire
+
+        async def recording_acquire(priority=Priority.BACKFILL):
+            priorities.append(priority)
+            await acquire(priority)
+
+        limiter.acquire = recording_acquire
+        client = GatewayRpcClient(gateway)
+        try:
+            with rpc_priority(Priority.DASHBOARD):
+                block_number = await client.call("blockNumber", {})
+        finally:
+            await gateway.close()
+            await runner.cleanup()
+        return block_number
+
+    assert asyncio.run(run()) == 1234
+    assert priorities == [Priority.DASHBOARD]
+
+
+def test_run_with_rpc_sessions_closes_the_sessions(monkeypatch):
+    """The sessions opened by every run are closed before its event loop is."""
+    monkeypatch.setattr(rpc_gateway, "_gateways", {})
+
+    async def healthy(request: web.Request) -> web.Response:
+        payload = await request.json()
+        return web.json_response(
+            {"jsonrpc": "2.0", "id": payload["id"], "result": 1234}
+        )
+
+    async def run():
+        runner, url = await _start_node(healthy)
+        try:
+            return await get_rpc_gateway([url]).post(BLOCK_NUMBER_REQUEST)
+        finally:
+            await runner.cleanup()
+
+    # Collect the garbage of the previous tests, e.g. their unclosed event loops
+    gc.collect()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ResourceWarning)
+        responses = [run_with_rpc_sessions(run()) for _ in range(3)]
+        gc.collect()
+
+    assert [response["result"] for response in responses] == [1234] * 3
+    assert not [
+        str(w.message) for w in caught if issubclass(w.category, ResourceWarning)
+    ]
+    assert all(not gateway._sessions for gateway in rpc_gateway._gateways.values())
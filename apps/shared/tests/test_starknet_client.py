@@ -19,7 +19,7 @@ class TestStarknetClient:
     @pytest.fixture(autouse=True)
     def setup(self):
         """Setup test environment with mocked Network"""
-        self.network_patcher = patch("shared.starknet_client.FullNodeClient")
+        self.network_patcher = patch("shared.rpc_gateway.FullNodeClient")
         self.mock_network_class = self.network_patcher.start()
         self.mock_network = Mock()
         self.mock_network.call_contract = AsyncMock()
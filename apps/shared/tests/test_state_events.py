@@ -0,0 +1,101 @@
+"""
+Tests for the event records and the event dispatcher resolving their handlers on a state.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from shared.state.events import Event, EventDispatcher, events_from_data
+
+
+@pytest.fixture
+def raw_events() -> list[dict]:
+    """Raw events as returned by the DeRisk API, out of order."""
+    return [
+        {
+            "id": "0x2_1",
+            "block_number": 11,
+            "timestamp": 1700000011,
+            "key_name": "Deposit",
+            "from_address": "0xmarket",
+            "keys": ["0xdeposit"],
+            "data": ["0xuser", "0xtoken", "0x10"],
+            "transaction_hash": "0x2",
+        },
+        {
+            "id": "0x1_0",
+            "block_number": 10,
+            "timestamp": 1700000010,
+            "key_name": "Withdrawal",
+            "from_address": "0xmarket",
+            "keys": ["0xwithdrawal"],
+            "data": ["0xuser", "0xtoken", "0x5"],
+        },
+        {
+            "id": "0x1_1",
+            "block_number": 10,
+            "timestamp": 1700000010,
+            "key_name": "TreasuryUpdate",
+            "from_address": "0xmarket",
+            "keys": [],
+            "data": [],
+        },
+    ]
+
+
+def test_event_supports_item_access(raw_events):
+    """Events can be used wherever the states index a `pd.Series`."""
+    event = Event.from_dict(raw_events[0])
+
+    assert event["block_number"] == 11
+    assert event["data"] == ["0xuser", "0xtoken", "0x10"]
+    assert event.get("block_number") == 11
+    assert event.get("transaction_hash") is None
+    assert "key_name" in event
+    with pytest.raises(KeyError):
+        event["transaction_hash"]
+
+
+def test_events_from_data_filters_and_sorts(raw_events):
+    """Only the requested key names are kept and events are sorted by block and ID."""
+    events = events_from_data(raw_events, key_names={"Deposit", "Withdrawal"})
+
+    assert [event.id for event in events] == ["0x1_0", "0x2_1"]
+    assert all(isinstance(event, Event) for event in events)
+
+
+def test_events_from_data_custom_sort_key(raw_events):
+    """The replay order can be customized with a key function."""
+    events = events_from_data(
+        raw_events, sort_key=lambda event: (-event.block_number, event.id)
+    )
+
+    assert [event.id for event in events] == ["0x2_1", "0x1_0", "0x1_1"]
+
+
+def test_event_dispatcher_resolves_bound_methods():
+    """The handlers are the bound methods of the mapping, unknown methods are skipped."""
+    state = MagicMock(spec=["process_deposit_event"])
+    dispatcher = EventDispatcher(
+        state,
+        {"Deposit": "process_deposit_event", "Withdrawal": "process_withdrawal"},
+    )
+
+    assert set(dispatcher.handlers) == {"Deposit"}
+    assert dispatcher.get_handler("Deposit") is state.process_deposit_event
+    assert dispatcher.get_handler("Withdrawal") is None
+
+
+def test_event_dispatcher_tuple_keys():
+    """Events can be keyed by any hashable, e.g. the event type and the key name."""
+    state = MagicMock(spec=["process_collateral_mint_event"])
+    dispatcher = EventDispatcher(
+        state, {("collateral", "Mint"): "process_collateral_mint_event"}
+    )
+
+    assert (
+        dispatcher.get_handler(("collateral", "Mint"))
+        is state.process_collateral_mint_event
+    )
+    assert dispatcher.get_handler((None, "Mint")) is None
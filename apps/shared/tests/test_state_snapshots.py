@@ -0,0 +1,98 @@
+"""
+Tests for the binary state snapshots.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from shared.custom_types import Portfolio, ZkLendCollateralTokenParameters
+from shared.loan_entity import ZkLendLoanEntity
+from shared.protocol_ids import ProtocolIDs
+from shared.state import ZkLendState
+from shared.state.snapshots import (
+    TrackedLoanEntities,
+    dump_state_snapshot,
+    load_state_snapshot,
+)
+
+ETH = "0x049d36570d4e46f48e99674bd3fcc84644ddd6b96f7c741b1562b82f9e004dc7"
+USDC = "0x053c91253bc9682c04929ca02ed00b3e423f6710d2ee7e0d5ebb06f3ecf368a8"
+# Raw amounts, large enough not to be rounded to zero by `Portfolio`
+TWO_ETH = Decimal("2e18")
+THOUSAND_USDC = Decimal("1e9")
+
+
+@pytest.fixture
+def zklend_state() -> ZkLendState:
+    """ZkLendState with loan entities, interest rate models and token parameters."""
+    state = ZkLendState()
+    state.loan_entities["0x1"].deposit.increase_value(token=ETH, value=TWO_ETH)
+    state.loan_entities["0x1"].collateral_enabled[ETH] = True
+    state.loan_entities["0x1"].collateral.increase_value(token=ETH, value=TWO_ETH)
+    state.loan_entities["0x1"].debt.increase_value(token=USDC, value=THOUSAND_USDC)
+    # Loan entities rehydrated from the DB keep their amounts under `values`
+    state.loan_entities["0x2"].collateral.values = {ETH: Decimal("3")}
+    state.interest_rate_models.collateral[ETH] = Decimal("1.01")
+    state.interest_rate_models.debt[USDC] = Decimal("1.05")
+    state.token_parameters.collateral[ETH] = ZkLendCollateralTokenParameters(
+        address=ETH,
+        decimals=18,
+        symbol="zETH",
+        underlying_symbol="ETH",
+        underlying_address=ETH,
+        collateral_factor=0.8,
+        liquidation_bonus=0.1,
+    )
+    state.last_block_number = 123
+    state.last_interest_rate_block_number = 120
+    return state
+
+
+def test_snapshot_round_trip(zklend_state):
+    """A restored state holds the same data as the state the snapshot was taken of."""
+    restored = load_state_snapshot(ZkLendState(), dump_state_snapshot(zklend_state))
+
+    assert set(restored.loan_entities) == {"0x1", "0x2"}
+    loan_entity = restored.loan_entities["0x1"]
+    assert isinstance(loan_entity, ZkLendLoanEntity)
+    assert isinstance(loan_entity.deposit, Portfolio)
+    assert loan_entity.deposit[ETH] == TWO_ETH
+    assert loan_entity.collateral[ETH] == TWO_ETH
+    assert loan_entity.debt[USDC] == THOUSAND_USDC
+    assert loan_entity.collateral_enabled[ETH] is True
+    assert restored.loan_entities["0x2"].collateral.values == {ETH: Decimal("3")}
+    assert restored.interest_rate_models.collateral[ETH] == Decimal("1.01")
+    assert restored.interest_rate_models.debt[USDC] == Decimal("1.05")
+    assert restored.token_parameters.collateral[ETH].collateral_factor == 0.8
+    assert restored.last_block_number == 123
+    assert restored.last_interest_rate_block_number == 120
+
+
+def test_restored_state_keeps_default_factories(zklend_state):
+    """The restored containers behave like freshly constructed ones for unknown keys."""
+    restored = load_state_snapshot(ZkLendState(), dump_state_snapshot(zklend_state))
+
+    assert restored.interest_rate_models.collateral[USDC] == Decimal("1")
+    assert restored.loan_entities["0x1"].collateral_enabled[USDC] is False
+    assert isinstance(restored.loan_entities["0x3"], ZkLendLoanEntity)
+
+
+def test_snapshot_of_another_protocol_is_rejected(zklend_state):
+    """Snapshots can only be loaded into a state of the same protocol."""
+    other_state = ZkLendState()
+    other_state.PROTOCOL_NAME = ProtocolIDs.NOSTRA_MAINNET.value
+
+    with pytest.raises(ValueError):
+        load_state_snapshot(other_state, dump_state_snapshot(zklend_state))
+
+
+def test_tracked_loan_entities_pop_touched_users():
+    """Only the users accessed since the last call are reported."""
+    loan_entities = TrackedLoanEntities(ZkLendLoanEntity)
+    loan_entities["0x1"].deposit.increase_value(token=ETH, value=TWO_ETH)
+    loan_entities["0x2"]
+
+    assert loan_entities.pop_touched_users() == {"0x1", "0x2"}
+    assert "0x1" in loan_entities
+    assert loan_entities.pop_touched_users() == set()
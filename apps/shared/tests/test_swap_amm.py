@@ -439,3 +439,17 @@ def test_tokens_to_id(token_pair, expected_id, swap_amm):
     tokens = sorted([base_token, quote_token])
     expected_id = f"{tokens[0]}/{tokens[1]}"
     assert swap_amm.tokens_to_id(base_token, quote_token) == expected_id
+
+
+def test_supply_at_prices():
+    """Test that the vectorized supply matches the supply at each price."""
+    pool = Pool("ETH", "USDC", ["0x1"], None)
+    pool.tokens[0].balance_converted = Decimal("120.5")
+    pool.tokens[1].balance_converted = Decimal("301250")
+    prices = [100.0, 1500.0, 3012.5]
+
+    supplies = pool.supply_at_prices(prices)
+
+    assert supplies.tolist() == pytest.approx(
+        [float(pool.supply_at_price(Decimal(price))) for price in prices]
+    )
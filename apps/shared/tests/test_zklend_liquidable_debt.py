@@ -0,0 +1,164 @@
+"""
+Tests for the vectorized liquidable debt and health factor computations of `ZkLendState`.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from shared.custom_types import (
+    Prices,
+    TokenValues,
+    ZkLendCollateralTokenParameters,
+    ZkLendDebtTokenParameters,
+)
+from shared.loan_entity import ZkLendLoanEntity
+from shared.state import LoanMatrix, ZkLendState
+
+ETH = "0x049d36570d4e46f48e99674bd3fcc84644ddd6b96f7c741b1562b82f9e004dc7"
+USDC = "0x053c91253bc9682c04929ca02ed00b3e423f6710d2ee7e0d5ebb06f3ecf368a8"
+STRK = "0x04718f5a0fc34cc1af16a1cdee98ffb20c31f5cd61d6ab07201858f4287c938d"
+DECIMALS = {ETH: 18, USDC: 6, STRK: 18}
+
+
+def _make_loan_entity(collateral: dict, debt: dict) -> ZkLendLoanEntity:
+    loan_entity = ZkLendLoanEntity()
+    loan_entity.collateral = TokenValues(
+        values={
+            token: Decimal(amount) * 10 ** DECIMALS[token]
+            for token, amount in collateral.items()
+        }
+    )
+    loan_entity.debt = TokenValues(
+        values={
+            token: Decimal(amount) * 10 ** DECIMALS[token]
+            for token, amount in debt.items()
+        }
+    )
+    return loan_entity
+
+
+@pytest.fixture
+def zklend_state() -> ZkLendState:
+    """ZkLendState with a handful of loan entities at different risk levels."""
+    state = ZkLendState()
+    for token, collateral_factor in ((ETH, 0.8), (USDC, 0.8), (STRK, 0.5)):
+        state.token_parameters.collateral[token] = ZkLendCollateralTokenParameters(
+            address=token,
+            decimals=DECIMALS[token],
+            symbol="z" + token[-4:],
+            underlying_symbol=token[-4:],
+            underlying_address=token,
+            collateral_factor=collateral_factor,
+            liquidation_bonus=0.1,
+        )
+        state.token_parameters.debt[token] = ZkLendDebtTokenParameters(
+            address=token,
+            decimals=DECIMALS[token],
+            symbol="z" + token[-4:],
+            underlying_symbol=token[-4:],
+            underlying_address=token,
+            debt_factor=1.0,
+        )
+    state.interest_rate_models.collateral[ETH] = Decimal("1.02")
+    state.interest_rate_models.debt[USDC] = Decimal("1.05")
+    state.loan_entities["0x1"] = _make_loan_entity({ETH: 1}, {USDC: 2000})
+    state.loan_entities["0x2"] = _make_loan_entity({ETH: 2, STRK: 1000}, {USDC: 2500})
+    state.loan_entities["0x3"] = _make_loan_entity({ETH: 5}, {USDC: 100, STRK: 4000})
+    state.loan_entities["0x4"] = _make_loan_entity({STRK: 500}, {USDC: 100})
+    state.loan_entities["0x5"] = _make_loan_entity({ETH: 1}, {USDC: 0})
+    return state
+
+
+@pytest.fixture
+def prices() -> Prices:
+    return Prices(None, **{ETH: 3000.0, USDC: 1.0, STRK: 0.5})
+
+
+def test_loan_matrix_packs_loan_entities(zklend_state):
+    """The matrix has one row per loan entity and one column per held token."""
+    loan_matrix = LoanMatrix.from_loan_entities(zklend_state.loan_entities)
+
+    assert len(loan_matrix) == 5
+    assert loan_matrix.users == ["0x1", "0x2", "0x3", "0x4", "0x5"]
+    assert set(loan_matrix.collateral_tokens) == {ETH, STRK}
+    assert set(loan_matrix.debt_tokens) == {USDC, STRK}
+    np.testing.assert_allclose(
+        loan_matrix.collateral_column(ETH), [1e18, 2e18, 5e18, 0.0, 1e18]
+    )
+    np.testing.assert_allclose(loan_matrix.debt_column(ETH), np.zeros(5))
+
+
+@pytest.mark.parametrize(
+    "collateral_token, debt_token", [(ETH, USDC), (STRK, USDC), (ETH, STRK)]
+)
+def test_liquidable_debt_curve_matches_scalar_computation(
+    zklend_state, prices, collateral_token, debt_token
+):
+    """The vectorized sweep returns the same values as the per-price computation."""
+    price_grid = np.linspace(
+        prices[collateral_token] * 0.05, prices[collateral_token], 40
+    )
+
+    curve = zklend_state.compute_liquidable_debt_curve(
+        prices=prices,
+        collateral_token_underlying_address=collateral_token,
+        collateral_token_prices=price_grid,
+        debt_token_underlying_address=debt_token,
+    )
+    expected = [
+        float(
+            zklend_state.compute_liquidable_debt_at_price(
+                prices=prices,
+                collateral_token_underlying_address=collateral_token,
+                collateral_token_price=price,
+                debt_token_underlying_address=debt_token,
+            )
+        )
+        for price in price_grid
+    ]
+
+    np.testing.assert_allclose(curve, expected, rtol=1e-9)
+    assert curve[0] > 0.0
+
+
+def test_liquidable_debt_curve_without_eligible_loan_entities(zklend_state, prices):
+    """Pairs no loan entity is exposed to yield a zero curve."""
+    curve = zklend_state.compute_liquidable_debt_curve(
+        prices=prices,
+        collateral_token_underlying_address=USDC,
+        collateral_token_prices=[0.5, 1.0],
+        debt_token_underlying_address=ETH,
+    )
+
+    np.testing.assert_array_equal(curve, [0.0, 0.0])
+
+
+def test_health_factors_match_scalar_computation(zklend_state, prices):
+    """The vectorized health factors equal the ones computed per loan entity."""
+    health_factors = zklend_state.compute_health_factors(prices=prices)
+
+    expected = [
+        float(
+            loan_entity.compute_health_factor(
+                standardized=False,
+                risk_adjusted_collateral_usd=loan_entity.compute_collateral_usd(
+                    risk_adjusted=True,
+                    collateral_token_parameters=zklend_state.token_parameters.collateral,
+                    collateral_interest_rate_model=zklend_state.interest_rate_models.collateral,
+                    prices=prices,
+                ),
+                debt_usd=loan_entity.compute_debt_usd(
+                    risk_adjusted=False,
+                    debt_token_parameters=zklend_state.token_parameters.debt,
+                    debt_interest_rate_model=zklend_state.interest_rate_models.debt,
+                    prices=prices,
+                ),
+            )
+        )
+        for loan_entity in zklend_state.loan_entities.values()
+    ]
+
+    np.testing.assert_allclose(health_factors, expected, rtol=1e-9)
+    assert health_factors[-1] == np.inf